@@ -7,9 +7,49 @@ Uses AI-powered background removal.
 from PIL import Image
 import io
 import base64
-import google.generativeai as genai
+import threading
 from typing import Optional
 
+from config import ALPHA_EXTRACTION
+from lifecycle import configure_gemini, genai
+
+
+# rembg sessions keyed by model name; creating one loads the ONNX model
+_REMBG_SESSIONS = {}
+_REMBG_LOCK = threading.Lock()
+
+
+def rembg_session(model_name: str):
+    """
+    Shared rembg session for a model, created on first use.
+    
+    Raises:
+        ImportError: rembg is not installed
+    """
+    session = _REMBG_SESSIONS.get(model_name)
+    if session is None:
+        from rembg import new_session
+        
+        with _REMBG_LOCK:
+            session = _REMBG_SESSIONS.get(model_name)
+            if session is None:
+                session = new_session(model_name)
+                _REMBG_SESSIONS[model_name] = session
+    return session
+
+
+def preload_rembg_sessions(count: int) -> str:
+    """Load the first `count` ALPHA_EXTRACTION models (a worker warmup task)."""
+    try:
+        import rembg  # noqa: F401
+    except ImportError:
+        return 'rembg not installed'
+    
+    names = [model_name for model_name, _ in ALPHA_EXTRACTION['models'][:count]]
+    for model_name in names:
+        rembg_session(model_name)
+    return f"{', '.join(names) or 'no'} sessions"
+
 
 def extract_player_with_alpha(image: Image.Image, gemini_api_key: str, preserve_elements: list = None) -> Image.Image:
     """
@@ -24,68 +64,105 @@ def extract_player_with_alpha(image: Image.Image, gemini_api_key: str, preserve_
     Returns:
         PIL Image object in RGBA mode with transparent background
     """
+    return extract_player_with_report(image, gemini_api_key, preserve_elements)[0]
+
+
+def alpha_transparency_percent(image: Image.Image) -> float:
+    """Share of pixels (percent) with alpha below 128."""
+    import numpy as np
+    alpha = np.asarray(image.getchannel('A'))
+    return np.count_nonzero(alpha < 128) / alpha.size * 100
+
+
+def extract_player_with_report(image: Image.Image, gemini_api_key: str, preserve_elements: list = None):
+    """
+    Extract the subject, escalating through rembg models only as needed.
+    
+    Models in ALPHA_EXTRACTION['models'] are tried in order. After each one
+    the cutout goes through check_player_integrity; the first that passes
+    is used, so heavier models only run when the cheaper result is broken
+    (missing limbs, fragments, holes).
+    
+    Args:
+        image: PIL Image object (source image)
+        gemini_api_key: Gemini API key for AI processing (legacy fallback)
+        preserve_elements: List of elements to preserve (e.g., ['player', 'ball', 'equipment'])
+    
+    Returns:
+        Tuple of (RGBA image, report dict with 'method', 'models_tried' and
+        per-model 'attempts' including their player integrity results)
+    """
+    from qa_visual import check_player_integrity
+    
+    report = {'method': None, 'model': None, 'models_tried': [], 'attempts': []}
+    
     try:
         print(f"🔍 ALPHA EXTRACTION: Starting professional background removal")
         print(f"   Input image: {image.size} ({image.mode})")
         
-        # Try rembg with multiple models for best results
         try:
-            from rembg import remove, new_session
-            print(f"   Trying multiple rembg models for best quality...")
-            
-            models_to_try = [
-                ('u2net_human_seg', 'Human Segmentation (optimized for people)'),
-                ('isnet-general-use', 'ISNet (newer, higher quality)'),
-                ('u2net', 'U2-Net (general purpose)')
-            ]
+            from rembg import remove
             
             best_result = None
-            best_transparency = 0
+            best_key = None
             best_model = None
             
-            for model_name, model_desc in models_to_try:
+            for model_name, model_desc in ALPHA_EXTRACTION['models']:
                 try:
                     print(f"   Trying {model_name}: {model_desc}...")
-                    session = new_session(model_name)
+                    report['models_tried'].append(model_name)
+                    session = rembg_session(model_name)
                     result = remove(image, session=session)
+                    if result.mode != 'RGBA':
+                        continue
+                    
+                    # Validate transparency quality and subject topology
+                    transparency = alpha_transparency_percent(result)
+                    integrity = check_player_integrity(result)
+                    report['attempts'].append({
+                        'model': model_name,
+                        'transparency_percent': round(transparency, 1),
+                        'player_integrity': integrity
+                    })
+                    print(f"      → Transparency: {transparency:.1f}%, integrity {integrity['score']} ({integrity['issue']})")
+                    
+                    key = (transparency > ALPHA_EXTRACTION['min_transparency'], integrity['score'], transparency)
+                    if best_key is None or key > best_key:
+                        best_result = result
+                        best_key = key
+                        best_model = model_name
                     
-                    # Validate transparency quality
-                    if result.mode == 'RGBA':
-                        alpha_channel = result.split()[-1]
-                        alpha_pixels = list(alpha_channel.getdata())
-                        transparent_count = sum(1 for p in alpha_pixels if p < 128)
-                        total_pixels = len(alpha_pixels)
-                        transparency_percent = (transparent_count / total_pixels) * 100
-                        print(f"      → Transparency: {transparency_percent:.1f}%")
-                        
-                        if transparency_percent > best_transparency:
-                            best_result = result
-                            best_transparency = transparency_percent
-                            best_model = model_name
+                    if key[0] and integrity['passed']:
+                        break
+                    print(f"      → Escalating to next model")
                     
                 except Exception as model_error:
                     print(f"      → {model_name} failed: {model_error}")
                     continue
             
-            if best_result and best_transparency > 30:
-                print(f"   ✅ Best model: {best_model} ({best_transparency:.1f}% transparency)")
+            if best_result and best_key[0]:
+                print(f"   ✅ Best model: {best_model} ({best_key[2]:.1f}% transparency)")
                 print(f"   Applying post-processing enhancements...")
+                report.update(method='rembg', model=best_model)
                 # Apply all post-processing improvements
                 enhanced_result = apply_post_processing(best_result)
-                return enhanced_result
+                return enhanced_result, report
             else:
                 print(f"   ⚠️ All rembg models failed or low quality, using two-pass fallback")
-                return two_pass_removal(image)
+                report['method'] = 'two_pass'
+                return two_pass_removal(image), report
                 
         except ImportError:
             print(f"   rembg not available, using two-pass fallback")
-            return two_pass_removal(image)
+            report['method'] = 'two_pass'
+            return two_pass_removal(image), report
         except Exception as rembg_error:
             print(f"   rembg error: {rembg_error}, using two-pass fallback")
-            return two_pass_removal(image)
+            report['method'] = 'two_pass'
+            return two_pass_removal(image), report
         
         # Legacy Gemini background removal (kept for reference, not used)
-        genai.configure(api_key=gemini_api_key)
+        configure_gemini(gemini_api_key)
         model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
         
         # Build prompt for background removal
@@ -140,19 +217,20 @@ Generate an image with ONLY the subject on a completely transparent background.
                                     print(f"   ⚠️ AI failed to create transparency, auto-detecting background color")
                                     # Auto-detect: use cyan if present, otherwise white
                                     result = auto_detect_and_remove_background(result_image)
-                                    return result
+                                    return result, report
                             
-                            return result_image
+                            return result_image, report
         
         # If AI extraction fails, auto-detect background
         print("AI alpha extraction failed (no response), auto-detecting background on original image")
-        return auto_detect_and_remove_background(image)
+        return auto_detect_and_remove_background(image), report
         
     except Exception as e:
         print(f"Error in AI alpha extraction: {e}")
         print("Auto-detecting background due to exception")
+        report['method'] = 'auto_detect'
         # Fallback to auto-detection
-        return auto_detect_and_remove_background(image)
+        return auto_detect_and_remove_background(image), report
 
 
 def create_simple_alpha(image: Image.Image, threshold: int = 240) -> Image.Image:
@@ -566,7 +644,7 @@ def remove_background_gemini(image: Image.Image, gemini_api_key: str, content_ty
         Image with transparent background
     """
     try:
-        genai.configure(api_key=gemini_api_key)
+        configure_gemini(gemini_api_key)
         model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
         
         # Content-specific prompts
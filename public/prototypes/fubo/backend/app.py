@@ -1,24 +1,28 @@
 import os
-import csv
-from flask import Flask, request, jsonify
+import time
+_import_start = time.perf_counter()
+
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
-import google.generativeai as genai
 from PIL import Image
 import io
 import base64
+import binascii
 import json
 
+# google.generativeai is imported (and configured once) on first use, or during warmup
+from lifecycle import STARTUP, genai, import_modules, preload_enabled, register_warmup, run_warmup
+
 load_dotenv()
 
-# Configure Gemini API
+# Gemini API key (the client is configured from it when first used)
 api_key = os.getenv('GEMINI_API_KEY')
 if not api_key:
     print("ERROR: GEMINI_API_KEY not found in environment variables")
     print("Please set your API key in the .env file")
 else:
     print(f"Gemini API key loaded: {api_key[:10]}...")
-    genai.configure(api_key=api_key)
 
 app = Flask(__name__)
 CORS(app)
@@ -26,36 +30,64 @@ CORS(app)
 # Get the absolute path of the directory this script is in
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Load team colors from CSV
-def load_team_colors():
-    """Load team colors from CSV file."""
-    team_colors = {}
-    try:
-        with open(os.path.join(BASE_DIR, '..', 'team_colors.csv'), 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Skip comment lines
-                if row['sport'].startswith('#'):
-                    continue
-                    
-                key = f"{row['sport']}/{row['team_name']}"
-                team_colors[key] = {
-                    'sport': row['sport'],
-                    'team_name': row['team_name'],
-                    'primary_color': row['primary_color_hex'],
-                    'secondary_color': row['secondary_color_hex'],
-                    'accent_color': row['tertiary_color_hex'],
-                    'text_color': row['text_color_hex']
-                }
-    except FileNotFoundError:
-        print("Team colors CSV not found, using defaults")
-    except Exception as e:
-        print(f"Error loading team colors: {e}")
+# Team colors from CSV, indexed on first use (or warmup) and reloaded when the file changes
+from team_catalog import TeamCatalog
+TEAM_CATALOG = TeamCatalog(os.path.join(BASE_DIR, '..', 'team_colors.csv'))
+
+# Frontend files are served from memory with ETags and precompressed variants
+from static_assets import StaticAssetCache, conditional_response, strong_etag
+FRONTEND_DIR = os.path.join(BASE_DIR, '..')
+FRONTEND_FILES = {
+    'index_v6.html': 'text/html',
+    'index_v5.html': 'text/html',
+    'index_v2.html': 'text/html',
+    'bulk_upload_interface.html': 'text/html',
+    'styles_v2.css': 'text/css',
+    'styles_fubo.css': 'text/css',
+    'app_v2.js': 'application/javascript',
+    'app_v5.js': 'application/javascript',
+    'app_v6.js': 'application/javascript',
+    'favicon.svg': 'image/svg+xml'
+}
+STATIC_FILES = StaticAssetCache()
+
+def serve_frontend_file(name):
+    """Cached response for a FRONTEND_FILES entry, or None if the file is missing."""
+    return STATIC_FILES.serve(os.path.join(FRONTEND_DIR, name), FRONTEND_FILES[name])
+
+class InvalidParameter(ValueError):
+    """A request parameter that is present but not usable (answered with 400)."""
+
+def int_param(value, name, minimum=None, maximum=None):
+    """
+    Parse an optional whole-number request parameter.
     
-    return team_colors
-
-# Load team colors on startup
-TEAM_COLORS = load_team_colors()
+    Args:
+        value: Raw value from JSON or the query string (None/'' mean absent)
+        name: Parameter name for the error message
+        minimum, maximum: Optional inclusive bounds
+    
+    Returns:
+        int, or None if absent
+    
+    Raises:
+        InvalidParameter: Not a whole number, or out of bounds
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        if isinstance(value, (bool, float)):
+            raise ValueError
+        number = int(value)
+    except (TypeError, ValueError):
+        raise InvalidParameter(f"'{name}' must be a whole number, got {value!r}")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise InvalidParameter(f"'{name}' must be between {minimum} and {maximum}, got {number}")
+    return number
 
 def detect_league_team_from_path(file_path):
     """Detect league and team from file path structure."""
@@ -90,14 +122,20 @@ def get_team_colors(league, team):
     if not league or not team:
         return None
     
-    key = f"{league}/{team}"
-    return TEAM_COLORS.get(key)
-
-# Configure the Gemini API client
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    # Accepts CSV names as well as path-derived ones ('nfl', 'giants')
+    return TEAM_CATALOG.colors(league, team)
 
 # Import style prompts module
-from style_prompts import get_style_prompt, get_style_reference
+from style_prompts import get_style_prompt, get_style_reference, get_style_reference_path
+from style_registry import get_registry, is_custom_style_id
+from resampling import resize_to_custom_dimensions
+from image_ingest import ingest_image, UploadRejected
+from config import INGEST_CONFIG
+from file_access import PathNotAllowed
+from reference_assets import ReferenceAssetManager
+from prompt_templates import (get_matchup_visualization_style, color_tuple, content_prompt as build_content_prompt,
+                              generation_prompt_suffix, style_prompt as build_style_prompt,
+                              blended_style_prompt as build_blended_style_prompt, prompt_hash)
 
 def get_optimized_style_prompt(style_name):
     """Get the optimized style prompt based on the GenerativeStylesV3_Clean guide."""
@@ -125,9 +163,10 @@ def detect_sport_from_input(image):
         Look for: equipment (balls, sticks, rackets), uniforms, playing surfaces, poses, etc.
         """
         
-        # Use Gemini to analyze the image
+        # Use Gemini to analyze the image (a small upload is enough to tell the sport)
+        from vision_payloads import VisionPayloads
         model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        response = model.generate_content([prompt, image])
+        response = model.generate_content([prompt, VisionPayloads(image).part('sport_detection')])
         
         if response and response.text:
             detected_sport = response.text.strip().lower()
@@ -271,337 +310,86 @@ def detect_sport_from_league(league):
     else:
         return 'generic'
 
-def get_sport_action_context(sport):
-    """Get sport-specific action context for prompts with authentic game plays."""
-    contexts = {
-        'basketball': 'Slam dunk attempt, blocked shot, three-point shot, driving layup, or mid-air rebound',
-        'football': 'Throwing touchdown pass, making a catch, rushing for touchdown, or defensive interception',
-        'baseball': 'Pitching a fastball, hitting a home run, sliding into base, or making a diving catch',
-        'hockey': 'Taking a slap shot, making a save, checking opponent, or scoring a goal',
-        'soccer': 'Taking a penalty kick, heading the ball, making a slide tackle, or celebrating a goal',
-        'tennis': 'Serving an ace, hitting a forehand winner, making a volley, or diving for a shot',
-        'golf': 'Driving off the tee, putting for birdie, chipping from the rough, or celebrating a hole-in-one',
-        'mma': 'Throwing a knockout punch, executing a takedown, applying a submission hold, or defending strikes',
-        'boxing': 'Throwing a combination, dodging punches, landing a knockout blow, or cornering opponent',
-        'racing': 'Overtaking on the track, celebrating victory, pit stop action, or starting grid position',
-        'generic': 'Dynamic athletic pose in action'
-    }
-    return contexts.get(sport, contexts['generic'])
-
-def get_sport_closeup_details(sport):
-    """Get sport-specific close-up details for equipment and gear."""
-    details = {
-        'basketball': 'Basketball texture and grip pattern, jersey mesh fabric, shoe sole traction, wristband details, equipment materials and construction',
-        'football': 'Football helmet with facemask details, jersey fabric texture, shoulder pad construction, cleat sole pattern, glove grip texture, equipment stitching and materials',
-        'baseball': 'Baseball glove leather texture, bat grain and grip tape, helmet cage details, jersey fabric, cleat spikes, equipment wear patterns',
-        'hockey': 'Hockey helmet cage and padding, stick blade texture, glove leather and padding, skate blade details, jersey fabric, equipment construction',
-        'soccer': 'Soccer ball texture and panel details, cleat stud pattern, shin guard construction, jersey fabric, glove details, equipment materials',
-        'tennis': 'Tennis racquet string pattern, ball felt texture, shoe sole traction, wristband details, equipment materials and construction',
-        'golf': 'Golf club grip texture, ball dimple pattern, glove leather details, shoe spikes, equipment materials and wear patterns',
-        'mma': 'MMA glove padding details, mouthguard texture, equipment materials, protective gear construction, training equipment textures',
-        'boxing': 'Boxing glove leather texture, hand wrap details, mouthguard, equipment materials, protective gear construction',
-        'racing': 'Racing helmet visor details, glove grip texture, suit fabric, equipment materials, safety gear construction',
-        'generic': 'Equipment texture details, material construction, wear patterns, grip surfaces, fabric weaves, hardware details'
-    }
-    return details.get(sport, details['generic'])
-
-def get_venue_type(sport):
-    """Get the appropriate venue type for a sport."""
-    venues = {
-        'basketball': 'basketball arena with hardwood court',
-        'football': 'football stadium with field and goalposts',
-        'baseball': 'baseball ballpark with diamond and outfield',
-        'hockey': 'hockey arena with ice rink and boards',
-        'soccer': 'soccer stadium with field and goals',
-        'tennis': 'tennis center with courts and net',
-        'golf': 'golf course with fairways and greens',
-        'mma': 'MMA arena with octagon cage',
-        'boxing': 'boxing arena with ring and ropes',
-        'racing': 'race track with pit lane and grandstands',
-        'generic': 'sports venue with playing surface'
-    }
-    return venues.get(sport, venues['generic'])
-
-
-def get_stadium_specific_details(sport):
-    """Get sport-specific stadium details for better prompts."""
-    details = {
-        'basketball': 'basketball court with three-point lines, free throw lines, hardwood floor, basketball hoops, team banners, subtle scoreboard, clean court surface with NO FLOOR LOGOS',
-        'football': 'football field with yard lines, end zones, goalposts, sideline, team benches, scoreboard, field goal posts, clean field surface with NO FLOOR LOGOS',
-        'baseball': 'baseball diamond with pitcher\'s mound, home plate, bases, foul lines, outfield wall, bullpen, dugouts, scoreboard, clean field surface with NO FLOOR LOGOS',
-        'hockey': 'hockey rink with blue lines, red lines, face-off circles, goal nets, boards, penalty boxes, subtle scoreboard, clean ice surface with NO FLOOR LOGOS',
-        'soccer': 'soccer field with center circle, penalty areas, goal boxes, corner flags, goal nets, team benches, scoreboard, clean grass field with NO FLOOR LOGOS',
-        'tennis': 'tennis court with net, service lines, baseline, center service line, doubles alleys, umpire chair, scoreboard, clean court surface with NO FLOOR LOGOS',
-        'golf': 'golf course with fairways, greens, bunkers, tee boxes, flagsticks, water hazards, clubhouse, scoreboard',
-        'mma': 'octagon cage with canvas floor, corner posts, referee area, fighter corners, subtle scoreboard, cage door, clean floor with NO FLOOR LOGOS',
-        'boxing': 'boxing ring with canvas floor, ropes, corner posts, referee area, fighter corners, ring bell, scoreboard, clean floor with NO FLOOR LOGOS',
-        'racing': 'race track with start/finish line, pit lane, grandstands, victory lane, timing tower, safety barriers, clean track with NO FLOOR LOGOS',
-        'generic': 'playing surface with appropriate markings, seating areas, scoreboard, team areas, clean surface with NO FLOOR LOGOS'
-    }
-    return details.get(sport, details['generic'])
-
-def resize_to_custom_dimensions(image, width=1920, height=1080):
-    """
-    Resize image to custom dimensions without distortion.
-    Uses smart cropping to preserve important content (like player's head and feet).
-    """
-    current_width, current_height = image.size
-    target_ratio = width / height
-    current_ratio = current_width / current_height
+def reference_candidates(style_name, detected_sport=None):
+    """List (directory key, filename) reference candidates for a style, best first."""
+    candidates = []
     
-    # If image is already close to target ratio (within 5%), just resize
-    if abs(current_ratio - target_ratio) <= 0.05:
-        return image.resize((width, height), Image.Resampling.LANCZOS)
+    # First try to get sport-specific reference
+    if detected_sport:
+        reference_filename = get_sport_specific_reference(style_name, detected_sport)
+        if reference_filename:
+            candidates.append(('builtin', reference_filename))
     
-    # Smart cropping to preserve important content
-    if current_ratio > target_ratio:
-        # Image is too wide, crop width (center crop)
-        new_width = int(current_height * target_ratio)
-        new_height = current_height
-        left = (current_width - new_width) // 2
-        cropped_image = image.crop((left, 0, left + new_width, new_height))
-    else:
-        # Image is too tall, crop height (smart crop to preserve head and feet)
-        new_width = current_width
-        new_height = int(current_width / target_ratio)
-        
-        # For player images, try to preserve the center portion (where the player is)
-        # This helps avoid cutting off heads or feet
-        if current_height > new_height:
-            # Calculate crop position to center the important content
-            crop_margin = (current_height - new_height) // 2
-            
-            # For very tall images, bias towards showing more of the top (head area)
-            # This prevents cutting off the player's head
-            if current_height > new_height * 1.5:
-                # Bias towards top to preserve head
-                top = crop_margin // 2
-            else:
-                # Standard center crop
-                top = crop_margin
-                
-            cropped_image = image.crop((0, top, new_width, top + new_height))
-        else:
-            cropped_image = image
+    # Built-in styles: the STYLE_REFERENCES file located at startup (any spelling of the style)
+    reference_path = get_style_reference_path(style_name)
+    if reference_path:
+        directory, filename = os.path.split(reference_path)
+        key = REFERENCE_DIR_KEYS.get(os.path.realpath(directory))
+        if key:
+            candidates.append((key, filename))
     
-    # Resize to exact target dimensions
-    return cropped_image.resize((width, height), Image.Resampling.LANCZOS)
+    # Fallback to generic style reference
+    for ext in ['.jpg', '.jpeg', '.png']:
+        candidates.append(('builtin', f'{style_name}{ext}'))
+    
+    return candidates
 
-def get_composition_instructions(content_type, section='Wide', width=None, height=None):
-    """
-    Get composition instructions based on content type and section.
-    Images with padding need full-frame edge-to-edge composition.
-    """
-    if section == 'Wide':
-        # Wide images now have vertical padding too
-        if content_type == 'action':
-            return "COMPOSITION: Position the main action and player in the RIGHT 1/4 OF THE FRAME. FILL THE ENTIRE FRAME edge-to-edge vertically and horizontally. Extend stadium/field environment, crowd, and atmospheric effects to cover all edges. No black bars or empty space."
-        else:
-            return "COMPOSITION: Slightly right-aligned composition. FILL THE ENTIRE FRAME edge-to-edge. Extend the environment and background elements to cover all edges completely. No letterboxing or pillarboxing."
-    else:  # Tall
-        # Tall images have both horizontal and vertical padding
-        if width and width > 1280:
-            return "COMPOSITION: FILL THE ENTIRE FRAME WIDTH AND HEIGHT edge-to-edge. Extend the background, stadium/court/field elements, crowd, and atmospheric effects across the full width and height. Center the main subject but ensure the scene extends to all edges. No black bars, letterboxing, or pillarboxing - complete edge-to-edge coverage."
-        else:
-            return "COMPOSITION: Centered vertical composition, full frame coverage."
+# Reference image directories; 'bundled' and 'builtin' are style_prompts.STYLE_REFERENCE_DIRS
+REFERENCE_DIRS = {
+    'builtin': os.path.join(BASE_DIR, '..', 'style_references'),
+    'bundled': os.path.join(BASE_DIR, 'style_references'),
+    'custom': os.path.join(BASE_DIR, 'references')
+}
+REFERENCE_DIR_KEYS = {os.path.realpath(path): key for key, path in REFERENCE_DIRS.items()}
 
-def get_enhanced_color_instructions(content_type, team_colors):
-    """Get enhanced color instructions based on content type."""
-    if not team_colors:
-        return ""
-    
-    primary = team_colors.get('primary_color', '')
-    secondary = team_colors.get('secondary_color', '')
-    accent = team_colors.get('accent_color', '')
-    text = team_colors.get('text_color', '')
-    
-    if content_type == 'stadium':
-        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as DOMINANT COLOR OVERLAYS across the entire stadium. Use {primary} as a STRONG COLOR FILTER on major architectural elements, lighting, seating, and sky. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows, atmospheric effects, and background elements. Use {accent} for DRAMATIC COLOR ACCENTS and highlights. OVERLAY team colors on ALL surfaces - walls, seats, field, sky, lighting. Make team colors the PRIMARY VISUAL ELEMENT that OVERWHELMS the natural colors. Apply color grading and colorization effects to ensure team colors are the MOST PROMINENT feature visible from any distance."
-    elif content_type == 'action':
-        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as INTENSE COLOR OVERLAYS on uniforms, equipment, and background. Use {primary} as a STRONG COLOR FILTER on jerseys, helmets, and gear. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows, motion blur, and background elements. Use {accent} for DRAMATIC COLOR ACCENTS and motion effects. OVERLAY team colors on ALL elements - player, equipment, background, lighting. Make team colors the DOMINANT visual feature through aggressive colorization and color grading."
-    elif content_type == 'closeup':
-        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as VIBRANT COLOR OVERLAYS on all equipment surfaces and details. Use {primary} as a STRONG COLOR FILTER on equipment surfaces. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows and background. Use {accent} for highlights and {text} for contrast details. OVERLAY team colors on ALL equipment elements - helmets, jerseys, gear, surfaces. Make team colors the PRIMARY feature through intense colorization and color grading effects."
-    else:  # player
-        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as INTENSE COLOR OVERLAYS on uniforms, gear, and background. Use {primary} as a STRONG COLOR FILTER on jerseys and equipment. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows and background elements. Use {accent} for highlights and {text} for contrast. OVERLAY team colors on ALL elements - player, uniform, equipment, background, lighting. Make team colors the DOMINANT visual feature through aggressive colorization and color grading."
-
-def get_matchup_visualization_style(team1, team2, sport, style_preference='auto'):
-    """Get creative matchup visualization style based on teams and sport."""
-    import random
-    
-    # Define matchup styles based on sport
-    matchup_styles = {
-        'basketball': [
-            "Face-off at center court with both teams in action poses, dramatic lighting highlighting the rivalry",
-            "Tunnel entrance shot with both teams emerging simultaneously, fans in opposing colors",
-            "Mid-game action sequence showing both teams in dynamic play, court divided by team colors",
-            "Championship-style presentation with both teams in spotlight, trophy in background",
-            "Locker room tunnel confrontation with both teams in pre-game intensity"
-        ],
-        'football': [
-            "Coin toss ceremony with both team captains at midfield, dramatic stadium lighting",
-            "Tunnel entrance with both teams emerging in formation, fans creating color contrast",
-            "Mid-field face-off with both teams in formation, stadium packed with opposing fans",
-            "Goal line stand scenario with both teams in action, dramatic tension",
-            "Championship presentation with both teams in spotlight, confetti and celebration"
-        ],
-        'baseball': [
-            "Home plate meeting with both team captains, umpire in center, dramatic field lighting",
-            "Dugout confrontation with both teams in their respective areas, fans in team colors",
-            "Pitcher's mound showdown with both teams' aces, dramatic stadium atmosphere",
-            "Championship celebration with both teams in spotlight, trophy presentation",
-            "Tunnel entrance with both teams emerging, fans creating visual contrast"
-        ],
-        'hockey': [
-            "Center ice face-off with both teams in formation, dramatic arena lighting",
-            "Tunnel entrance with both teams emerging, fans in opposing colors",
-            "Mid-game action with both teams in play, ice divided by team colors",
-            "Championship presentation with both teams in spotlight, Stanley Cup in background",
-            "Locker room tunnel confrontation with both teams in pre-game intensity"
-        ],
-        'soccer': [
-            "Center circle meeting with both team captains, dramatic stadium lighting",
-            "Tunnel entrance with both teams emerging in formation, fans creating color contrast",
-            "Mid-field action with both teams in play, pitch divided by team colors",
-            "Championship celebration with both teams in spotlight, trophy presentation",
-            "Pre-game handshake with both teams in formation, dramatic tension"
-        ]
-    }
-    
-    # Get sport-specific styles or use generic ones
-    styles = matchup_styles.get(sport, [
-        "Face-off with both teams in action poses, dramatic lighting highlighting the rivalry",
-        "Tunnel entrance with both teams emerging, fans in opposing colors",
-        "Mid-game action sequence with both teams in play, dramatic tension",
-        "Championship presentation with both teams in spotlight, trophy in background"
-    ])
-    
-    # Handle specific style preferences
-    if style_preference == 'faceoff':
-        return "Face-off confrontation with both teams in action poses, dramatic lighting highlighting the rivalry"
-    elif style_preference == 'tunnel':
-        return "Tunnel entrance with both teams emerging simultaneously, fans in opposing colors"
-    elif style_preference == 'action':
-        return "Mid-game action sequence with both teams in dynamic play, dramatic tension"
-    elif style_preference == 'championship':
-        return "Championship presentation with both teams in spotlight, trophy in background"
-    elif style_preference == 'rivalry':
-        return f"Classic rivalry showdown - {team1} vs {team2} - the ultimate sports battle"
-    else:
-        # Return a random style for variety (auto mode)
-        return random.choice(styles)
-
-def get_matchup_theme(team1, team2):
-    """Get thematic matchup description based on team names."""
-    # Classic rivalries
-    classic_rivalries = [
-        ("Lakers", "Celtics", "Historic NBA rivalry - the ultimate basketball showdown"),
-        ("Yankees", "Red Sox", "Baseball's greatest rivalry - the ultimate baseball showdown"),
-        ("Cowboys", "Eagles", "NFC East rivalry - the ultimate football showdown"),
-        ("Canadiens", "Maple Leafs", "Original Six rivalry - the ultimate hockey showdown"),
-        ("Real Madrid", "Barcelona", "El Clásico - the ultimate soccer showdown")
-    ]
-    
-    # Check for classic rivalries
-    for team_a, team_b, description in classic_rivalries:
-        if (team_a.lower() in team1.lower() and team_b.lower() in team2.lower()) or \
-           (team_b.lower() in team1.lower() and team_a.lower() in team2.lower()):
-            return description
-    
-    # Geographic rivalries
-    if any(city in team1.lower() for city in ['new york', 'ny']) and \
-       any(city in team2.lower() for city in ['boston', 'philadelphia', 'washington']):
-        return "East Coast rivalry - regional pride on the line"
-    
-    if any(city in team1.lower() for city in ['los angeles', 'la']) and \
-       any(city in team2.lower() for city in ['san francisco', 'oakland', 'sacramento']):
-        return "California rivalry - state supremacy battle"
-    
-    if any(city in team1.lower() for city in ['chicago', 'detroit']) and \
-       any(city in team2.lower() for city in ['chicago', 'detroit']):
-        return "Midwest rivalry - industrial city showdown"
-    
-    # Conference rivalries
-    if any(conf in team1.lower() for conf in ['east', 'eastern']) and \
-       any(conf in team2.lower() for conf in ['west', 'western']):
-        return "Conference championship - East vs West showdown"
-    
-    # Default matchup theme
-    return f"Epic showdown - {team1} vs {team2} - the ultimate sports battle"
+# Reference images are decoded once (first lookup or warmup); requests only read from memory
+REFERENCE_ASSETS = ReferenceAssetManager(REFERENCE_DIRS, resolver=reference_candidates)
+
+# Custom styles are kept in memory and reloaded only when custom_styles.json changes
+STYLE_REGISTRY = get_registry(os.path.join(BASE_DIR, 'custom_styles.json'))
 
 def load_reference_image(style_name, detected_sport=None):
-    """Load the reference image for a given style."""
-    try:
-        # Skip reference image if it might cause subject conflicts
-        if should_skip_reference_image(style_name):
-            print(f"Skipping reference image for {style_name} to preserve input subject matter")
-            return None
-        
-        # First try to get sport-specific reference
-        if detected_sport:
-            reference_filename = get_sport_specific_reference(style_name, detected_sport)
-            if reference_filename:
-                reference_path = os.path.join(BASE_DIR, '..', 'style_references', reference_filename)
-                if os.path.exists(reference_path):
-                    print(f"Loading sport-specific reference: {reference_path} (sport: {detected_sport})")
-                    with open(reference_path, 'rb') as f:
-                        return f.read()
-        
-        # Fallback to generic style reference
-        reference_filename = get_style_reference_filename(style_name)
-        if reference_filename:
-            reference_path = os.path.join(BASE_DIR, '..', 'style_references', reference_filename)
-            if os.path.exists(reference_path):
-                print(f"Loading generic reference: {reference_path}")
-                with open(reference_path, 'rb') as f:
-                    return f.read()
-        
-        print(f"No reference image available for {style_name}")
-        return None
-            
-    except Exception as e:
-        print(f"Error loading reference image for {style_name}: {e}")
+    """
+    Get the model-ready reference image for a given style.
+    
+    Returns:
+        RGB PIL Image (shared, do not modify) or None
+    """
+    # Skip reference image if it might cause subject conflicts
+    if should_skip_reference_image(style_name):
+        print(f"Skipping reference image for {style_name} to preserve input subject matter")
         return None
+    
+    asset = REFERENCE_ASSETS.for_style(style_name, detected_sport)
+    if asset:
+        print(f"Using reference: {asset.filename} (sport: {detected_sport})")
+        return asset.image
+    
+    print(f"No reference image available for {style_name}")
+    return None
 
 def create_blended_style_prompt(styles, weights, metadata, league=None, team=None, team_colors=None, width=1920, height=1080):
     """Create a blended style prompt combining multiple styles with weights."""
     
-    # Create blended style description
-    style_descriptions = []
-    for i, (style, weight) in enumerate(zip(styles, weights)):
-        if style and weight > 0:
-            style_prompt = get_optimized_style_prompt(style.lower())
-            style_descriptions.append(f"({style_prompt}:{round(weight/100, 2)})")
-    
-    blended_style_prompt = " ".join(style_descriptions)
-    
-    # Add team colors if available
-    team_colors_text = ""
-    if team_colors and league and team:
-        primary = team_colors.get('primary_color', '')
-        secondary = team_colors.get('secondary_color', '')
-        team_colors_text = f", team colors: {primary} and {secondary}"
-    
-    # Add aspect ratio and composition instructions
-    aspect_ratio = f"{width}:{height}"
-    composition_instruction = "maintain full body framing, ensure head and feet are visible"
+    # Resolved style descriptions with their weights
+    weighted_prompts = tuple(
+        (get_optimized_style_prompt(style.lower()), weight)
+        for style, weight in zip(styles, weights)
+        if style and weight > 0
+    )
     
     # Add brightness if specified
-    brightness_text = ""
+    brightness = 'neutral'
     if metadata:
         try:
             meta = json.loads(metadata) if isinstance(metadata, str) else metadata
             brightness = meta.get('brightness', 'neutral')
-            if brightness == 'darker':
-                brightness_text = ", darker moody lighting, low-key atmosphere"
-            elif brightness == 'lighter':
-                brightness_text = ", bright cheerful lighting, high-key atmosphere"
         except:
             pass
     
-    # Concise final prompt focused on style application only
-    # Allow authentic team branding and logos while restricting distracting floor/field logos
-    final_prompt = f"Apply visual style: {blended_style_prompt}{team_colors_text}{brightness_text}. Keep same subject matter, only change visual rendering style. Maintain {aspect_ratio} aspect ratio with {composition_instruction}. Allow authentic team logos, jersey numbers, and branding on uniforms and equipment. Restrict only floor logos, court logos, and field text to keep focus on subject."
-    return final_prompt
+    # Team colors only apply when the request names a league and team
+    colors = color_tuple(team_colors) if league and team else None
+    return build_blended_style_prompt(weighted_prompts, colors, brightness, width, height)
 
 def create_style_prompt(style, metadata, league=None, team=None, team_colors=None, width=1920, height=1080, with_alpha=False):
     """Create a concise, transformation-focused prompt based on the selected style and metadata."""
@@ -609,48 +397,21 @@ def create_style_prompt(style, metadata, league=None, team=None, team_colors=Non
     # Get the base style prompt
     base_prompt = get_optimized_style_prompt(style.lower())
     
-    # Add team colors if available
-    team_colors_text = ""
-    if team_colors and league and team:
-        primary = team_colors.get('primary_color', '')
-        secondary = team_colors.get('secondary_color', '')
-        team_colors_text = f", team colors: {primary} and {secondary}"
-    
     # Add mood and brightness if specified
-    mood_text = ""
-    brightness_text = ""
+    mood = 'neutral'
+    brightness = 'neutral'
     if metadata:
         try:
             meta = json.loads(metadata) if isinstance(metadata, str) else metadata
-            if meta.get('styleParameters', {}).get('overallMood', 'neutral') != 'neutral':
-                mood_text = f", {meta['styleParameters']['overallMood']} mood"
-            
-            # Handle brightness setting
+            mood = meta.get('styleParameters', {}).get('overallMood', 'neutral')
             brightness = meta.get('brightness', 'neutral')
-            if brightness == 'darker':
-                brightness_text = ", darker moody lighting, low-key atmosphere"
-            elif brightness == 'lighter':
-                brightness_text = ", bright cheerful lighting, high-key atmosphere"
         except Exception as e:
             print(f"Error parsing metadata: {e}")
             pass
     
-    # Add aspect ratio and composition instructions
-    aspect_ratio = f"{width}:{height}"
-    if width > height:
-        composition_instruction = "maintain full body framing, ensure head and feet are visible"
-    elif height > width:
-        composition_instruction = "maintain full body framing, ensure head and feet are visible"
-    else:
-        composition_instruction = "maintain full body framing, ensure head and feet are visible"
-    
-    # No special background needed - rembg handles complex backgrounds
-    transparency_instruction = ""
-    
-    # Concise final prompt focused on style application only
-    # Allow authentic team branding and logos while restricting distracting floor/field logos
-    final_prompt = f"Apply visual style: {base_prompt}{team_colors_text}{mood_text}{brightness_text}. Keep same subject matter, only change visual rendering style{transparency_instruction}. Maintain {aspect_ratio} aspect ratio with {composition_instruction}. Allow authentic team logos, jersey numbers, and branding on uniforms and equipment. Restrict only floor logos, court logos, and field text to keep focus on subject."
-    return final_prompt
+    # Team colors only apply when the request names a league and team
+    colors = color_tuple(team_colors) if league and team else None
+    return build_style_prompt(base_prompt, colors, mood, brightness, width, height)
 
 @app.route('/generate', methods=['POST'])
 def generate_images():
@@ -680,27 +441,13 @@ def generate_images():
         
         # Process the image
         try:
-            image = Image.open(image_file)
-            print(f"Loaded image: {image.format}, mode: {image.mode}, size: {image.size}")
-            
-            # Handle different image modes properly
-            if image.mode == 'RGBA':
-                # PNG with transparency - convert to RGB with white background
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1])  # Use alpha channel as mask
-                image = background
-                print("Converted RGBA PNG to RGB with white background")
-            elif image.mode == 'P':
-                # Palette mode (common in PNG) - convert to RGB
-                image = image.convert('RGB')
-                print("Converted palette PNG to RGB")
-            elif image.mode != 'RGB':
-                # Any other mode - convert to RGB
-                image = image.convert('RGB')
-                print(f"Converted {image.mode} to RGB")
+            # Decode at roughly the working size; transparency is flattened onto white
+            max_size = 1024
+            image = ingest_image(image_file, target=(max_size, max_size), fit='contain',
+                                 mode='RGB', background=(255, 255, 255))
+            print(f"Loaded image: mode: {image.mode}, size: {image.size}")
                 
             # Resize if too large (optional, to save processing time)
-            max_size = 1024
             if image.width > max_size or image.height > max_size:
                 image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
                 print(f"Resized image to: {image.size}")
@@ -709,6 +456,9 @@ def generate_images():
             detected_sport = detect_sport_from_input(image)
             print(f"Detected sport: {detected_sport}")
                 
+        except UploadRejected as e:
+            print(f"Rejected upload: {str(e)}")
+            return jsonify({'error': str(e)}), e.status_code
         except Exception as e:
             print(f"Error processing image: {str(e)}")
             return jsonify({'error': f'Invalid image file. Supported formats: PNG, JPG, JPEG. Error: {str(e)}'}), 400
@@ -754,22 +504,13 @@ def generate_images():
             primary_style_index = blended_weights.index(max(blended_weights))
             primary_style = blended_styles[primary_style_index]
             print(f"Using reference image from primary style: {primary_style}")
-            reference_image_data = load_reference_image(primary_style, detected_sport)
+            reference_image = load_reference_image(primary_style, detected_sport)
         else:
-            reference_image_data = load_reference_image(style, detected_sport)
+            reference_image = load_reference_image(style, detected_sport)
             
-        if reference_image_data:
+        if reference_image:
             style_name = primary_style if use_blended_generation else style
-            print(f"Loaded reference image for {style_name}")
-            try:
-                reference_image = Image.open(io.BytesIO(reference_image_data))
-                # Convert to RGB if necessary
-                if reference_image.mode != 'RGB':
-                    reference_image = reference_image.convert('RGB')
-                print(f"Reference image loaded: {reference_image.size}")
-            except Exception as e:
-                print(f"Error processing reference image: {e}")
-                reference_image = None
+            print(f"Reference image loaded for {style_name}: {reference_image.size}")
         else:
             style_name = primary_style if use_blended_generation else style
             print(f"No reference image found for {style_name}")
@@ -947,11 +688,7 @@ def generate_bulk_images():
                     image_data = image_data.split(',')[1]
                 
                 image_bytes = base64.b64decode(image_data)
-                image = Image.open(io.BytesIO(image_bytes))
-                
-                # Convert to RGB if necessary
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
+                image = ingest_image(image_bytes)
                 
                 # Detect league and team from file path
                 league, team = None, None
@@ -969,16 +706,7 @@ def generate_bulk_images():
                 prompt = create_style_prompt(style, metadata, league, team, team_colors)
                 
                 # Load reference image if available
-                reference_image_data = load_reference_image(style)
-                reference_image = None
-                if reference_image_data:
-                    try:
-                        reference_image = Image.open(io.BytesIO(reference_image_data))
-                        if reference_image.mode != 'RGB':
-                            reference_image = reference_image.convert('RGB')
-                    except Exception as e:
-                        print(f"Error processing reference image: {e}")
-                        reference_image = None
+                reference_image = load_reference_image(style)
                 
                 # Generate image using Gemini
                 model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
@@ -1005,6 +733,9 @@ def generate_bulk_images():
                 else:
                     return jsonify({'error': 'No image generated'}), 500
                     
+            except UploadRejected as e:
+                print(f"Rejected image {i}: {e}")
+                return jsonify({'error': f'Image {i}: {str(e)}'}), e.status_code
             except Exception as e:
                 print(f"Error processing image {i}: {e}")
                 return jsonify({'error': f'Error processing image {i}: {str(e)}'}), 500
@@ -1022,30 +753,31 @@ def generate_bulk_images():
         print(f"Error in generate_bulk_images: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route(x27/healthx27)
+@app.route('/health')
 def health_check():
     """Health check endpoint for monitoring."""
-    return jsonify({x27statusx27: x27okx27, x27servicex27: x27fubo-thumbnail-generatorx27}), 200
+    return jsonify({'status': 'ok', 'service': 'fubo-thumbnail-generator'}), 200
+
+@app.route('/startup_report', methods=['GET'])
+def startup_report():
+    """Startup/warmup phase timings for this worker and which heavy modules are loaded."""
+    return jsonify({'success': True, 'preload': preload_enabled(), **STARTUP.report()})
 
 @app.route('/')
 def serve_index():
     """Serve the main HTML file (v6.0 with sidebar UX)."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'index_v6.html'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/html'}
-    except FileNotFoundError:
-        return "HTML file not found", 404
+        response = serve_frontend_file('index_v6.html')
+        return response if response else ("HTML file not found", 404)
+    except Exception as e:
+        return f"Error loading HTML: {str(e)}", 500
 
 @app.route('/v5')
 def serve_v5():
     """Serve the v5.0 legacy UI (backup)."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'index_v5.html'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/html'}
-    except FileNotFoundError:
-        return "v5 HTML file not found", 404
+        response = serve_frontend_file('index_v5.html')
+        return response if response else ("v5 HTML file not found", 404)
     except Exception as e:
         return f"Error loading HTML: {str(e)}", 500
 
@@ -1053,11 +785,8 @@ def serve_v5():
 def serve_v4():
     """Serve the v4.0 interface."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'index_v2.html'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/html'}
-    except FileNotFoundError:
-        return "HTML file not found", 404
+        response = serve_frontend_file('index_v2.html')
+        return response if response else ("HTML file not found", 404)
     except Exception as e:
         return f"Error loading HTML: {str(e)}", 500
 
@@ -1065,11 +794,8 @@ def serve_v4():
 def serve_css():
     """Serve the CSS file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'styles_v2.css'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/css'}
-    except FileNotFoundError:
-        return "CSS file not found", 404
+        response = serve_frontend_file('styles_v2.css')
+        return response if response else ("CSS file not found", 404)
     except Exception as e:
         return f"Error loading CSS: {str(e)}", 500
 
@@ -1077,11 +803,8 @@ def serve_css():
 def serve_fubo_css():
     """Serve the FUBO branded CSS file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'styles_fubo.css'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/css'}
-    except FileNotFoundError:
-        return "FUBO CSS file not found", 404
+        response = serve_frontend_file('styles_fubo.css')
+        return response if response else ("FUBO CSS file not found", 404)
     except Exception as e:
         return f"Error loading FUBO CSS: {str(e)}", 500
 
@@ -1089,11 +812,8 @@ def serve_fubo_css():
 def serve_js():
     """Serve the JavaScript file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'app_v2.js'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'application/javascript'}
-    except FileNotFoundError:
-        return "JavaScript file not found", 404
+        response = serve_frontend_file('app_v2.js')
+        return response if response else ("JavaScript file not found", 404)
     except Exception as e:
         return f"Error loading JavaScript: {str(e)}", 500
 
@@ -1101,11 +821,8 @@ def serve_js():
 def serve_v5_js():
     """Serve the v5.0 JavaScript file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'app_v5.js'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'application/javascript'}
-    except FileNotFoundError:
-        return "JavaScript file not found", 404
+        response = serve_frontend_file('app_v5.js')
+        return response if response else ("JavaScript file not found", 404)
     except Exception as e:
         return f"Error loading JavaScript: {str(e)}", 500
 
@@ -1113,11 +830,8 @@ def serve_v5_js():
 def serve_v6_js():
     """Serve the v6.0 JavaScript file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'app_v6.js'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'application/javascript'}
-    except FileNotFoundError:
-        return "v6 JavaScript file not found", 404
+        response = serve_frontend_file('app_v6.js')
+        return response if response else ("v6 JavaScript file not found", 404)
     except Exception as e:
         return f"Error loading v6 JavaScript: {str(e)}", 500
 
@@ -1125,11 +839,8 @@ def serve_v6_js():
 def serve_favicon():
     """Serve the favicon file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'favicon.svg'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'image/svg+xml'}
-    except FileNotFoundError:
-        return "Favicon not found", 404
+        response = serve_frontend_file('favicon.svg')
+        return response if response else ("Favicon not found", 404)
     except Exception as e:
         return f"Error loading favicon: {str(e)}", 500
 
@@ -1195,13 +906,8 @@ def get_style_prompt_endpoint(style_name):
 
 def get_style_reference_filename(style_name):
     """Get the reference image filename for a given style."""
-    # Try different file extensions
-    extensions = ['.jpg', '.jpeg', '.png']
-    for ext in extensions:
-        filename = f'{style_name}{ext}'
-        if os.path.exists(os.path.join(BASE_DIR, '..', 'style_references', filename)):
-            return filename
-    return None
+    asset = REFERENCE_ASSETS.find('builtin', style_name)
+    return asset.filename if asset else None
 
 @app.route('/get_subject_prompt/<subject_type>')
 def get_subject_prompt(subject_type):
@@ -1252,41 +958,14 @@ def get_subject_details(subject_type):
 
 @app.route('/get_teams/<league>')
 def get_teams(league):
-    """Get teams for a specific league from the CSV file."""
+    """Get teams for a specific league (pre-encoded per league, revalidated by ETag)."""
     try:
-        import csv
-        import os
-        
-        # Read the team colors CSV file
-        csv_path = os.path.join(BASE_DIR, '..', 'team_colors.csv')
-        teams = []
-        
-        # Map league names from frontend to CSV names
-        league_mapping = {
-            'Premier League': 'EPL',
-            'PremiereLeague': 'EPL'  # Handle both spellings
-        }
+        body, etag = TEAM_CATALOG.teams_response(league)
+        if not TEAM_CATALOG.available:
+            raise FileNotFoundError('Team colors CSV not found')
         
-        csv_league = league_mapping.get(league, league)
-        
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row['sport'] == csv_league:
-                    teams.append({
-                        'team_name': row['team_name'],
-                        'team_id': row['team_name'].replace(' ', '_').upper()[:3],  # Generate team_id from name
-                        'primary_color': row['primary_color_hex'],
-                        'secondary_color': row['secondary_color_hex'],
-                        'accent_color': row['tertiary_color_hex'],
-                        'text_color': row['text_color_hex']
-                    })
-        
-        return jsonify({
-            'success': True,
-            'league': league,
-            'teams': teams
-        })
+        # Revalidated rather than cached outright: the CSV can change
+        return conditional_response(body, 'application/json', etag, versioned=False)
         
     except Exception as e:
         print(f"Error getting teams for {league}: {e}")
@@ -1296,32 +975,13 @@ def get_teams(league):
 def get_style_reference(style_name):
     """Get the reference image for a given style."""
     try:
-        # Try different file extensions and paths
-        reference_paths = [
-            os.path.join(BASE_DIR, '..', 'style_references', f'{style_name}.jpg'),
-            os.path.join(BASE_DIR, '..', 'style_references', f'{style_name}.jpeg'),
-            os.path.join(BASE_DIR, '..', 'style_references', f'{style_name}.png'),
-        ]
+        asset = REFERENCE_ASSETS.find('builtin', style_name)
         
-        reference_image = None
-        for path in reference_paths:
-            print(f"Checking path: {path}")
-            if os.path.exists(path):
-                print(f"Found reference image at: {path}")
-                with open(path, 'rb') as f:
-                    reference_image = f.read()
-                break
-            else:
-                print(f"Path does not exist: {path}")
-        
-        if reference_image:
-            # Convert to base64
-            import base64
-            image_b64 = base64.b64encode(reference_image).decode('utf-8')
+        if asset:
             return jsonify({
                 'success': True,
                 'style': style_name,
-                'image': f"data:image/jpeg;base64,{image_b64}"
+                'image': asset.source_data_uri
             })
         else:
             return jsonify({
@@ -1336,11 +996,12 @@ def get_style_reference(style_name):
 def serve_team_colors():
     """Serve the team colors CSV file."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'team_colors.csv'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/csv'}
-    except FileNotFoundError:
-        return "Team colors CSV not found", 404
+        TEAM_CATALOG.refresh()
+        if not TEAM_CATALOG.available:
+            return "Team colors CSV not found", 404
+        
+        # Hot-reloaded, so never immutable whatever ?v= says
+        return conditional_response(TEAM_CATALOG.csv_data, 'text/csv', TEAM_CATALOG.csv_etag, versioned=False)
     except Exception as e:
         return f"Error loading team colors: {str(e)}", 500
 
@@ -1367,15 +1028,13 @@ def generate_base_image():
             
             print(f"Processing uploaded base image for {team} ({league})")
             
-            # Load and process the uploaded image
-            base_image = Image.open(base_image_file)
-            if base_image.mode != 'RGB':
-                base_image = base_image.convert('RGB')
-            
             # Get custom dimensions from request
             width = int(request.form.get('output_width', 1920))
             height = int(request.form.get('output_height', 1080))
             
+            # Load the uploaded image, decoded no larger than the output needs
+            base_image = ingest_image(base_image_file, target=(width, height))
+            
             # Resize to custom dimensions without distortion
             base_image = resize_to_custom_dimensions(base_image, width, height)
             print(f"Base image resized to: {base_image.size}")
@@ -1409,34 +1068,13 @@ def generate_base_image():
             # Check if this is a matchup
             is_matchup = data.get('is_matchup', False)
             
-            # Create sport-specific content prompts using a concise, keyword-driven approach
-            if is_matchup:
-                # Extract team names from the combined string
-                teams = team.split(' vs ')
-                team1 = teams[0] if len(teams) > 0 else team
-                team2 = teams[1] if len(teams) > 1 else 'opponent'
-                print(f"Matchup teams: team1='{team1}', team2='{team2}'")
-                
-                content_prompts = {
-                    'player': f"photorealistic sports matchup, {get_matchup_theme(team1, team2)}, {get_matchup_visualization_style(team1, team2, sport, metadata.get('matchup_style', 'auto'))}, professional {sport} players from {team1} and {team2}, authentic uniforms with visible team logos and jersey numbers, DOMINANT team colors as COLOR OVERLAYS, posed rivalry, dramatic lighting with team color grading, stadium environment, professional sports photography, high-detail, intense competition, sharp focus, allow team branding on uniforms",
-                    'action': f"photorealistic sports matchup action, {get_matchup_theme(team1, team2)}, {get_matchup_visualization_style(team1, team2, sport, metadata.get('matchup_style', 'auto'))}, professional {sport} players from {team1} and {team2} in dynamic action, {get_sport_action_context(sport)}, authentic uniforms with team logos and numbers, DOMINANT team colors as COLOR OVERLAYS, rivalry and competition, dramatic lighting with team color grading, stadium environment, professional sports photography, high-detail, motion blur, intense energy, allow authentic team branding",
-                    'stadium': f"photorealistic stadium matchup, {get_matchup_visualization_style(team1, team2, sport, metadata.get('matchup_style', 'auto'))}, above angle 3/4 shot of a {get_venue_type(sport)} venue, {get_stadium_specific_details(sport)}, DOMINANT team colors from both teams as COLOR OVERLAYS and FILTERS on lighting, seating, architectural elements, and atmospheric effects, VIBRANT color contrast between teams, dramatic lighting with team color reflections and shadows, professional architectural photography, high-detail, cinematic composition, impressive scale, focus on architectural beauty with MAXIMUM team color visibility and impact, clean playing surface (restrict floor/court logos), allow stadium branding and signage",
-                    'closeup': f"photorealistic sports equipment close-up matchup, {get_matchup_theme(team1, team2)}, {get_matchup_visualization_style(team1, team2, sport, metadata.get('matchup_style', 'auto'))}, professional {sport} equipment from both teams with authentic team logos, {get_sport_closeup_details(sport)}, DOMINANT team colors as COLOR OVERLAYS throughout equipment details, macro photography, extreme detail, texture focus, professional product photography with team color grading, sharp focus, competitive arrangement, allow equipment branding",
-                }
-            else:
-                # Extract team name only (without city) for jersey text - SPELL IT LETTER BY LETTER
-                team_name_only = team.split()[-1].upper() if team else ''
-                letter_by_letter = ' - '.join(list(team_name_only))  # e.g., "C - E - L - T - I - C - S"
-                
-                # Generate safe jersey numbers < 40 (avoid most active roster conflicts)
-                safe_number_range = "numbers below 40 that are uncommon like 02, 03, 07, 09, 14, 17, 19, 21, 26, 27, 29, 31, 37, 38, 39"
-                
-                content_prompts = {
-                    'player': f"photorealistic sports player, professional {sport} player, {team}, full body shot with head and feet visible, posed shot, authentic team uniform with visible team logos and jersey numbers, 🚨 JERSEY TEXT CRITICAL - SPELL LETTER-BY-LETTER: {letter_by_letter} = '{team_name_only}' (ZERO misspellings allowed), use jersey number BELOW 40 preferably from {safe_number_range}, DOMINANT {team_colors.get('primary_color', '')} and {team_colors.get('secondary_color', '')} team colors as COLOR OVERLAYS throughout uniform and background, {team_colors.get('accent_color', '')} accent details, professional sports photography, stadium background with team color grading, centered composition, high-detail, dramatic lighting with team color filters, sharp focus, allow team branding on uniforms",
-                    'action': f"photorealistic sports action shot, professional {sport} player, {team}, {get_sport_action_context(sport)}, full body shot with head and feet visible, dynamic action pose, authentic team uniform with team logos and numbers, 🚨 JERSEY TEXT CRITICAL - SPELL LETTER-BY-LETTER: {letter_by_letter} = '{team_name_only}' (ZERO misspellings allowed), use jersey number BELOW 40 preferably from {safe_number_range}, DOMINANT {team_colors.get('primary_color', '')} and {team_colors.get('secondary_color', '')} team colors as COLOR OVERLAYS throughout uniform and background, {team_colors.get('accent_color', '')} accent details, professional sports photography, stadium background with team color grading, centered composition, high-detail, dramatic lighting with team color filters, sharp focus, motion blur, allow authentic team branding",
-                    'stadium': f"photorealistic stadium, {get_venue_type(sport)} venue, above angle 3/4 shot, distinctive architecture, {get_stadium_specific_details(sport)}, DOMINANT {team_colors.get('primary_color', '')} and {team_colors.get('secondary_color', '')} team colors as COLOR OVERLAYS and FILTERS on lighting, seating, architectural elements, and atmospheric effects, {team_colors.get('accent_color', '')} accent lighting creating dramatic color contrast, VIBRANT team color reflections and shadows, dramatic lighting with team color grading, professional architectural photography, clean playing surface (restrict floor/court logos), high-detail, wide angle view, impressive scale, cinematic composition, focus on architectural beauty with MAXIMUM team color visibility and impact, allow stadium branding and signage",
-                    'closeup': f"photorealistic sports equipment close-up, {get_sport_closeup_details(sport)}, professional {sport} equipment from {team} with authentic team logos, DOMINANT {team_colors.get('primary_color', '')} and {team_colors.get('secondary_color', '')} team colors as COLOR OVERLAYS throughout equipment details, {team_colors.get('accent_color', '')} accent highlights, macro photography, extreme detail, texture focus, professional product photography with team color grading, sharp focus, allow equipment branding",
-                }
+            # Get custom dimensions and section from request
+            width = int(data.get('output_width', 1920))
+            height = int(data.get('output_height', 1080))
+            section = data.get('section', 'Wide')  # Get section for composition
+            with_alpha = data.get('with_alpha', False)  # Check if transparency is requested
+            
+            colors = color_tuple(team_colors)
             
             # Check for custom subject prompt
             custom_subject_prompt = request.form.get('custom_subject_prompt')
@@ -1444,52 +1082,32 @@ def generate_base_image():
                 # Use custom subject prompt
                 content_prompt = custom_subject_prompt
                 print(f"Using custom subject prompt for {content_type}")
+            elif is_matchup:
+                # Extract team names from the combined string
+                teams = team.split(' vs ')
+                team1 = teams[0] if len(teams) > 0 else team
+                team2 = teams[1] if len(teams) > 1 else 'opponent'
+                print(f"Matchup teams: team1='{team1}', team2='{team2}'")
+                
+                # Picked here, outside the prompt cache, so 'auto' still varies between requests
+                visualization = get_matchup_visualization_style(team1, team2, sport, metadata.get('matchup_style', 'auto'))
+                content_prompt = build_content_prompt(content_type, sport, team, colors, (team1, team2, visualization))
             else:
-                # Use default content prompt
-                content_prompt = content_prompts.get(content_type, content_prompts['player'])
-
-            # Add enhanced color instructions
-            enhanced_colors = get_enhanced_color_instructions(content_type, team_colors)
-
-            # Get custom dimensions and section from request
-            width = int(data.get('output_width', 1920))
-            height = int(data.get('output_height', 1080))
-            section = data.get('section', 'Wide')  # Get section for composition
-            with_alpha = data.get('with_alpha', False)  # Check if transparency is requested
-            
-            # Calculate aspect ratio for prompt
-            aspect_ratio = f"{width}:{height}"
-            
-            # Get composition instructions based on content type and section (pass dimensions for padding detection)
-            composition_instruction = get_composition_instructions(content_type, section, width=width, height=height)
+                # Sport-specific content prompt using a concise, keyword-driven approach
+                content_prompt = build_content_prompt(content_type, sport, team, colors)
             
-            # No special background needed - rembg handles complex backgrounds
-            transparency_instruction = ""
+            # Add technical details, color instructions and a focused negative prompt (allow team branding, restrict floor logos)
+            prompt_additions = generation_prompt_suffix(content_type, team, colors, width, height, section)
             
-            # Get team name for text accuracy - letter by letter spelling
-            team_name_only = team.split()[-1].upper() if team else ''
-            letter_by_letter = ' - '.join(list(team_name_only))  # e.g., "C - E - L - T - I - C - S"
-            
-            # Add technical details and a focused negative prompt (allow team branding, restrict floor logos)
-            prompt_additions = f""", {aspect_ratio} aspect ratio, {composition_instruction}{transparency_instruction}, 8k, photorealistic, high resolution, sharp focus, professional photography.
-{enhanced_colors}
-🚨 CRITICAL SPELLING REQUIREMENT - TEAM NAME MUST BE EXACT 🚨
-If jersey text is visible, spell the team name LETTER-BY-LETTER correctly:
-{letter_by_letter}
-Complete word: {team_name_only}
-ZERO tolerance for misspellings. DO NOT create variations like: DOLTICS, CELITCS, BCELTICS, LKAERS, WARIORS, PAKCERS, etc.
-Every single letter must be in the correct position. Verify each letter matches the requirement above.
-Jersey numbers: Use ONLY these safe numbers: 00, 02, 03, 07, 09, 14, 17, 19, 21, 26, 27, 29, 31, 37, 38, 39, 88, 97, 99 (all below 40).
-CRITICAL: Generate ONLY {content_type} content as specified. Do not generate any other content type.
-Allow authentic team logos, jersey numbers, and branding on uniforms and equipment. Restrict only distracting floor logos, court text, and field text to maintain focus on subject.
---no floor logos, court logos, field logos, ice logos, distracting text on playing surfaces, no misspelled team names, no gibberish text, no incorrect letters in team names"""
-
             full_prompt = content_prompt + prompt_additions
             
             print(f"Generating base image for {team} - {content_type}")
             print(f"Sport detected: {sport}")
             print(f"Final prompt (preview): {full_prompt[:500]}")
             
+            # Key for caches of generated output (same model, prompt and size -> same request)
+            base_prompt_hash = prompt_hash('gemini-2.5-flash-image-preview', full_prompt, width, height)
+            
             # Generate the base image
             model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
             response = model.generate_content([full_prompt])
@@ -1508,11 +1126,7 @@ Allow authentic team logos, jersey numbers, and branding on uniforms and equipme
                                     if img.mode != 'RGB':
                                         img = img.convert('RGB')
                                     
-                                    # Get custom dimensions from request
-                                    width = int(request.form.get('output_width', 1920))
-                                    height = int(request.form.get('output_height', 1080))
-                                    
-                                    # Resize to custom dimensions without distortion
+                                    # Resize to the dimensions parsed from the JSON body above
                                     img = resize_to_custom_dimensions(img, width, height)
                                     print(f"Styled image resized to: {img.size}")
                                     
@@ -1527,7 +1141,8 @@ Allow authentic team logos, jersey numbers, and branding on uniforms and equipme
                                         'success': True,
                                         'message': 'Base image generated successfully',
                                         'image': f"data:image/jpeg;base64,{image_b64}",
-                                        'metadata': metadata
+                                        'metadata': metadata,
+                                        'prompt_hash': base_prompt_hash
                                     })
                                 except Exception as img_error:
                                     print(f"Error processing generated image: {img_error}")
@@ -1537,11 +1152,15 @@ Allow authentic team logos, jersey numbers, and branding on uniforms and equipme
                                         'success': True,
                                         'message': 'Base image generated (raw)',
                                         'image': f"data:image/jpeg;base64,{image_b64}",
-                                        'metadata': metadata
+                                        'metadata': metadata,
+                                        'prompt_hash': base_prompt_hash
                                     })
             
             return jsonify({'error': 'Failed to generate base image'}), 500
         
+    except UploadRejected as e:
+        print(f"Rejected upload: {e}")
+        return jsonify({'error': str(e)}), e.status_code
     except Exception as e:
         print(f"Error processing base image: {e}")
         return jsonify({'error': str(e)}), 500
@@ -1591,18 +1210,17 @@ def apply_style():
         print(f"Style type: {type(style)}")
         print(f"Team colors for style: {team_colors}")
         
-        # Load and process the base image
-        base_image = Image.open(base_image_file)
-        if base_image.mode != 'RGB':
-            base_image = base_image.convert('RGB')
-        
         # Get custom dimensions from request
         width = int(request.form.get('output_width', 1920))
         height = int(request.form.get('output_height', 1080))
         with_alpha = request.form.get('with_alpha', 'false').lower() == 'true'  # Check if transparency is requested
         
-        # Resize to custom dimensions without distortion
-        base_image = resize_to_custom_dimensions(base_image, width, height)
+        # Load the base image, decoded no larger than the output needs
+        base_image = ingest_image(base_image_file, target=(width, height))
+        
+        # Crop to the target aspect ratio only; the model output is resized to the
+        # exact dimensions afterwards, so upscaling the input here is wasted work
+        base_image = resize_to_custom_dimensions(base_image, width, height, allow_upscale=False)
         
         # Create style prompt - either single or blended
         if blended_styles and len(blended_styles) > 1:
@@ -1623,25 +1241,12 @@ def apply_style():
         # Load reference image for the style (use custom if provided)
         reference_image = None
         if custom_reference_image:
-            try:
-                reference_image = Image.open(custom_reference_image)
-                if reference_image.mode != 'RGB':
-                    reference_image = reference_image.convert('RGB')
-                print("Using custom reference image")
-            except Exception as e:
-                print(f"Error processing custom reference image: {e}")
-                reference_image = None
+            # Same byte/pixel limits as the base image; a rejected upload fails the request
+            reference_image = ingest_image(custom_reference_image, mode='RGB')
+            print("Using custom reference image")
         else:
-            reference_image_data = load_reference_image(style)
-            print(f"Reference image loaded: {reference_image_data is not None}")
-            if reference_image_data:
-                try:
-                    reference_image = Image.open(io.BytesIO(reference_image_data))
-                    if reference_image.mode != 'RGB':
-                        reference_image = reference_image.convert('RGB')
-                except Exception as e:
-                    print(f"Error processing reference image: {e}")
-                    reference_image = None
+            reference_image = load_reference_image(style)
+            print(f"Reference image loaded: {reference_image is not None}")
         
         # Generate the styled image
         model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
@@ -1708,10 +1313,6 @@ def apply_style():
                                 if img.mode != 'RGB':
                                     img = img.convert('RGB')
                                 
-                                # Get custom dimensions from request
-                                width = int(request.form.get('output_width', 1920))
-                                height = int(request.form.get('output_height', 1080))
-                                
                                 # Resize to custom dimensions without distortion
                                 img = resize_to_custom_dimensions(img, width, height)
                                 
@@ -1764,10 +1365,6 @@ def apply_style():
                                             img = Image.open(io.BytesIO(image_data))
                                             if img.mode != 'RGB':
                                                 img = img.convert('RGB')
-                                            # Get custom dimensions from request
-                                            width = int(request.form.get('output_width', 1920))
-                                            height = int(request.form.get('output_height', 1080))
-                                            
                                             # Resize to custom dimensions without distortion
                                             img = resize_to_custom_dimensions(img, width, height)
                                             buffer = io.BytesIO()
@@ -1787,9 +1384,10 @@ def apply_style():
             if not generated_images:
                 print(f"All attempts failed for style: {style}. Returning base image as fallback.")
                 try:
-                    # Convert base image to base64 as fallback
+                    # Convert base image to base64 as fallback (input was only cropped, so size it now)
+                    fallback_image = resize_to_custom_dimensions(base_image, width, height)
                     buffer = io.BytesIO()
-                    base_image.save(buffer, format='JPEG', quality=95)
+                    fallback_image.save(buffer, format='JPEG', quality=95)
                     image_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
                     generated_images.append({
                         'data': f"data:image/jpeg;base64,{image_b64}",
@@ -1808,9 +1406,13 @@ def apply_style():
             'style': style,
             'metadata': json.loads(metadata),
             'image': generated_images[0]['data'],
-            'generated_images': generated_images
+            'generated_images': generated_images,
+            'prompt_hash': prompt_hash('gemini-2.5-flash-image-preview', style_prompt, width, height)
         })
         
+    except UploadRejected as e:
+        print(f"Rejected upload: {e}")
+        return jsonify({'error': str(e)}), e.status_code
     except Exception as e:
         print(f"Error applying style: {e}")
         return jsonify({'error': str(e)}), 500
@@ -1819,7 +1421,8 @@ def apply_style():
 def run_qa():
     """
     Run QA checks on an image.
-    Accepts image data and returns QA scores.
+    Accepts image data and returns QA scores. Visual (Gemini) checks follow
+    QA_POLICY: skipped once the status is decided, except mandatory ones.
     """
     try:
         data = request.get_json()
@@ -1835,147 +1438,217 @@ def run_qa():
         
         import base64
         image_bytes = base64.b64decode(image_data_url)
-        image = Image.open(io.BytesIO(image_bytes))
+        image = ingest_image(image_bytes, mode=None)
         
         # Get parameters
         expected_aspect_ratio = data.get('aspect_ratio', '16:9')
         expected_sport = data.get('sport', 'generic')
         content_type = data.get('content_type', 'player')
         expected_team_name = data.get('team_name', None)  # For text accuracy check
+        qa_sampling = data.get('qa_sampling')  # 'full', 'tiles' or 'auto' for technical QA
+        if qa_sampling not in (None, 'full', 'tiles', 'auto'):
+            return jsonify({'error': f'Invalid qa_sampling: {qa_sampling}'}), 400
         
-        # Import QA modules
-        from qa_technical import run_technical_qa
-        from qa_visual import run_visual_integrity_qa
+        short_circuit = data.get('short_circuit')  # Override QA_POLICY['short_circuit']
         
-        # Run technical QA
-        technical_results = run_technical_qa(image, expected_aspect_ratio)
+        # Local checks first; Gemini checks only while they can change the outcome
+        from qa_policy import run_policy_qa
+        results = run_policy_qa(image, image_bytes, expected_aspect_ratio, expected_sport, content_type,
+                                api_key, expected_team_name, qa_sampling, short_circuit)
         
-        # Run visual integrity QA (if API key available)
-        visual_results = None
-        try:
-            visual_results = run_visual_integrity_qa(image, expected_sport, content_type, api_key, expected_team_name)
-        except Exception as e:
-            print(f"Visual QA error: {e}")
-            # Visual QA is optional, continue without it
+        return jsonify({'success': True, **results})
         
-        # Check player integrity for transparent images
-        player_integrity_results = None
-        if image.mode == 'RGBA':
+    except UploadRejected as e:
+        print(f"Rejected upload: {e}")
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error in QA: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/qa_parse_stats', methods=['GET'])
+def qa_parse_stats():
+    """Per-check Gemini QA counters: requests, early stops, parse failures, latency."""
+    from qa_visual import parse_stats
+    return jsonify({'success': True, **parse_stats()})
+
+@app.route('/run_qa_batch', methods=['POST'])
+def run_qa_batch_endpoint():
+    """
+    Run technical QA on many images across all cores.
+    
+    Accepts any mix of 'images' (data URLs, or {'id', 'image'} objects),
+    'source_ids' (editor images cached by /apply_overlay), 'paths' and
+    'folders' (scanned recursively; both must be inside the export or import
+    roots, see file_access.py). Streams one NDJSON line per image as it
+    finishes; the last line is the summary bucketed by QA_THRESHOLDS. The
+    summary is also saved in QA_BATCH['summary_dir'] when folders are given
+    or 'write_summary' is true.
+    """
+    try:
+        from qa_batch import run_qa_batch, find_images, new_summary_path, BatchSummary
+        from compositing import SOURCE_IMAGES
+        from config import QA_BATCH
+        from file_access import is_allowed, resolve_path
+        
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON object required'}), 400
+        aspect_ratio = data.get('aspect_ratio', '16:9')  # or 'auto' per image
+        qa_sampling = data.get('qa_sampling')
+        
+        if qa_sampling not in (None, 'full', 'tiles', 'auto'):
+            return jsonify({'error': f'Invalid qa_sampling: {qa_sampling}'}), 400
+        if 'summary_path' in data:
+            return jsonify({'error': "summary_path is not accepted; summaries are saved in QA_BATCH['summary_dir']"}), 400
+        
+        # Resolve every input up front so bad requests fail before streaming
+        def list_param(name):
+            values = data.get(name) or []
+            if not isinstance(values, list):
+                raise InvalidParameter(f"'{name}' must be a list")
+            return values
+        
+        items = []
+        for i, entry in enumerate(list_param('images')):
+            if isinstance(entry, dict):
+                image_id, image_data = entry.get('id', f'image-{i}'), entry.get('image')
+            else:
+                image_id, image_data = f'image-{i}', entry
+            if not isinstance(image_data, str) or not image_data:
+                raise InvalidParameter(f"images[{i}] must be a data URL or an object with an 'image' data URL")
+            if ',' in image_data:
+                image_data = image_data.split(',')[1]
             try:
-                from qa_visual import check_player_integrity
-                player_integrity_results = check_player_integrity(image)
-                print(f"Player Integrity: {player_integrity_results['score']}% ({player_integrity_results['issue']})")
-            except Exception as e:
-                print(f"Player integrity QA error: {e}")
-        
-        # Calculate combined score with player integrity
-        if visual_results and player_integrity_results:
-            combined_score = int(
-                technical_results['technical_qa_score'] * 0.30 +
-                visual_results['visual_integrity_score'] * 0.60 +
-                player_integrity_results['score'] * 0.10
-            )
-        elif visual_results:
-            combined_score = int(
-                technical_results['technical_qa_score'] * 0.60 +
-                visual_results['visual_integrity_score'] * 0.40
-            )
-        else:
-            combined_score = technical_results['technical_qa_score']
-        
-        # Determine status
-        if combined_score >= 85:
-            status = 'pass'
-            status_label = 'Pass'
-            badge_color = 'green'
-        elif combined_score >= 70:
-            status = 'review'
-            status_label = 'Needs Review'
-            badge_color = 'yellow'
-        else:
-            status = 'fail'
-            status_label = 'Fail'
-            badge_color = 'red'
+                items.append({'id': str(image_id), 'data': base64.b64decode(image_data)})
+            except binascii.Error:
+                raise InvalidParameter(f'images[{i}] is not valid base64')
+        
+        for source_id in list_param('source_ids'):
+            image = SOURCE_IMAGES.get(source_id)
+            if image is None:
+                return jsonify({'error': f'Unknown or expired source_id: {source_id}'}), 400
+            items.append({'id': source_id, 'raw': (image.mode, image.size, image.tobytes())})
+        
+        for path in list_param('paths'):
+            items.append({'id': path, 'path': resolve_path(path, 'file')})
+        
+        folders = list_param('folders')
+        for folder in folders:
+            # Symlinked files inside a root may still point elsewhere
+            items.extend({'id': path, 'path': path} for path in find_images(resolve_path(folder, 'folder'))
+                         if is_allowed(path))
+        
+        if not items:
+            return jsonify({'error': 'No images provided'}), 400
+        if len(items) > QA_BATCH['max_images']:
+            return jsonify({'error': f"Too many images ({len(items)}), limit is {QA_BATCH['max_images']}"}), 413
         
-        return jsonify({
-            'success': True,
-            'combined_qa_score': combined_score,
-            'status': status,
-            'status_label': status_label,
-            'badge_color': badge_color,
-            'technical_qa': technical_results,
-            'visual_integrity_qa': visual_results,
-            'player_integrity_qa': player_integrity_results
-        })
+        for item in items:
+            item['aspect_ratio'] = item.get('aspect_ratio', aspect_ratio)
+            item['sampling'] = qa_sampling
+        
+        summary_path = new_summary_path() if data.get('write_summary', bool(folders)) else None
+        
+        print(f"Batch QA: {len(items)} images")
         
+        def generate():
+            summary = BatchSummary()
+            for result in run_qa_batch(items):
+                summary.add(result)
+                yield json.dumps(result) + '\n'
+            
+            totals = summary.write(summary_path) if summary_path else summary.to_dict()
+            print(f"Batch QA done: {totals['counts']}, {totals['error_count']} errors")
+            yield json.dumps({'summary': totals, 'summary_path': summary_path}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except PathNotAllowed as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except InvalidParameter as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        print(f"Error in QA: {e}")
+        print(f"Error in batch QA: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/apply_overlay', methods=['POST'])
-def apply_overlay():
+def shift_param(value, name):
+    """Optional overlay shift in pixels (no further than an image can be wide)."""
+    return int_param(value, name, -INGEST_CONFIG['max_dimension'], INGEST_CONFIG['max_dimension'])
+
+def resolve_overlay(section, with_alpha):
     """
-    Apply PNG overlay to a generated image.
-    Automatically loads appropriate overlay based on section and transparency.
+    Pick the overlay file and compositing mode for a section/transparency combo.
     
     Rules:
     - Wide with transparency OFF: WideOverlay.png on TOP (over generated image)
     - Wide with transparency ON: WideOverlay.png UNDER (generated image with alpha on top)
     - Tall with transparency OFF: TallOverlay.png on TOP
     - Tall with transparency ON: TallUnderlay.png UNDER (generated image with alpha on top)
+    
+    Returns:
+        Tuple (overlay_path, mode)
+    """
+    folder = '16x9' if section == 'Wide' else '2x3'
+    
+    if with_alpha:
+        # Transparency: underlay UNDER the transparent subject
+        return os.path.join(BASE_DIR, '..', 'overlays', folder, 'underlay.png'), 'over'
+    
+    # No transparency: overlay ON TOP (generated image UNDER the overlay)
+    return os.path.join(BASE_DIR, '..', 'overlays', folder, 'overlay.png'), 'under'
+
+@app.route('/apply_overlay', methods=['POST'])
+def apply_overlay():
+    """
+    Apply PNG overlay to a generated image.
+    Automatically loads appropriate overlay based on section and transparency
+    (see resolve_overlay). Accepts either the generated image itself or the
+    `source_id` returned by a previous call, so repeated nudges skip the decode.
+    Source ids work on every worker until COMPOSITING_CONFIG['source_max_age'];
+    after a 404 "Unknown or expired source_id", resend `generated_image`.
     """
     try:
         data = request.get_json()
         
         # Get parameters
         generated_image_data = data.get('generated_image')
+        source_id = data.get('source_id')
         section = data.get('section', 'Wide')  # 'Wide' or 'Tall'
         with_alpha = data.get('with_alpha', False)  # Transparency checkbox
-        shift_x = data.get('shift_x')  # Optional custom horizontal shift
-        shift_y = data.get('shift_y')  # Optional custom vertical shift
+        shift_x = shift_param(data.get('shift_x'), 'shift_x')  # Optional custom horizontal shift
+        shift_y = shift_param(data.get('shift_y'), 'shift_y')  # Optional custom vertical shift
         
-        if not generated_image_data:
+        if not generated_image_data and not source_id:
             return jsonify({'error': 'Generated image required'}), 400
         
         # Import compositing module
-        from compositing import composite_overlay, base64_to_image, image_to_base64
+        from compositing import composite_overlay, image_to_base64, load_prepared_overlay, SOURCE_IMAGES
         
-        # Convert base64 to PIL image
-        generated_img = base64_to_image(generated_image_data)
+        # Decode once per editor session
+        if generated_image_data:
+            source_id, generated_img = SOURCE_IMAGES.put(generated_image_data)
+        else:
+            generated_img = SOURCE_IMAGES.get(source_id)
+            if generated_img is None:
+                return jsonify({'error': 'Unknown or expired source_id, resend generated_image'}), 404
         
         # Determine which overlay to use and what mode
-        if section == 'Wide':
-            if with_alpha:
-                # Wide with transparency: use WideUnderlay.png UNDER the transparent subject
-                overlay_path = os.path.join(BASE_DIR, '..', 'overlays', '16x9', 'underlay.png')
-                mode = 'over'  # Generated transparent image OVER the underlay
-            else:
-                # Wide without transparency: use WideOverlay.png ON TOP
-                overlay_path = os.path.join(BASE_DIR, '..', 'overlays', '16x9', 'overlay.png')
-                mode = 'under'  # Generated image UNDER the overlay (overlay on top)
-        else:  # Tall
-            if with_alpha:
-                # Tall with transparency: use TallUnderlay.png UNDER the transparent subject
-                overlay_path = os.path.join(BASE_DIR, '..', 'overlays', '2x3', 'underlay.png')
-                mode = 'over'  # Generated transparent image OVER the underlay
-            else:
-                # Tall without transparency: use TallOverlay.png ON TOP
-                overlay_path = os.path.join(BASE_DIR, '..', 'overlays', '2x3', 'overlay.png')
-                mode = 'under'  # Generated image UNDER the overlay (overlay on top)
+        overlay_path, mode = resolve_overlay(section, with_alpha)
         
         # Load overlay image
         if not os.path.exists(overlay_path):
             print(f"Overlay not found: {overlay_path}")
             return jsonify({'error': f'Overlay file not found: {overlay_path}'}), 404
         
-        overlay_img = Image.open(overlay_path)
+        # Decoded once and cached with its precomputed tile regions
+        overlay = load_prepared_overlay(overlay_path)
         
         # Apply compositing with optional custom shifts (X and Y)
-        result_img = composite_overlay(generated_img, overlay_img, mode=mode, shift_x=shift_x, shift_y=shift_y)
+        result_img = composite_overlay(generated_img, overlay, mode=mode, shift_x=shift_x, shift_y=shift_y)
         
         print(f"✅ Composited successfully:")
         print(f"   Generated size: {generated_img.size}, mode: {generated_img.mode}")
-        print(f"   Overlay size: {overlay_img.size}, mode: {overlay_img.mode}")
+        print(f"   Overlay size: {overlay.size}, regions: {len(overlay.regions['opaque'])} opaque / {len(overlay.regions['partial'])} partial")
         print(f"   Result size: {result_img.size}, mode: {result_img.mode}")
         
         # Convert back to base64
@@ -1991,15 +1664,102 @@ def apply_overlay():
             'success': True,
             'image': f'data:image/png;base64,{result_base64}',
             'mode': mode,
-            'overlay_used': os.path.basename(overlay_path)
+            'overlay_used': os.path.basename(overlay_path),
+            'source_id': source_id
         })
         
+    except (InvalidParameter, UploadRejected) as e:
+        return jsonify({'error': str(e)}), getattr(e, 'status_code', 400)
     except Exception as e:
         print(f"Error applying overlay: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/apply_overlay_variants', methods=['POST'])
+def apply_overlay_variants():
+    """
+    Render low-res previews of one source image against many overlay variants.
+    
+    Expects JSON with `generated_image` (or `source_id`) and `variants`, a list of
+    {section, with_alpha, shift_x, shift_y}, and optionally `preview_max_size`
+    (snapped to COMPOSITING_CONFIG['preview_sizes']). The source is decoded
+    once and all variants are composited in parallel at preview scale. Fetch the full-res
+    output for a chosen variant from /apply_overlay with the returned `source_id`.
+    """
+    try:
+        data = request.get_json()
+        
+        generated_image_data = data.get('generated_image')
+        source_id = data.get('source_id')
+        variants = data.get('variants') or []
+        preview_max_size = int_param(data.get('preview_max_size'), 'preview_max_size', 1, INGEST_CONFIG['max_dimension'])
+        
+        if not generated_image_data and not source_id:
+            return jsonify({'error': 'Generated image required'}), 400
+        if not variants:
+            return jsonify({'error': 'At least one variant required'}), 400
+        if not isinstance(variants, list) or not all(isinstance(variant, dict) for variant in variants):
+            return jsonify({'error': 'variants must be a list of objects'}), 400
+        
+        from config import COMPOSITING_CONFIG
+        from compositing import render_overlay_variants, SOURCE_IMAGES
+        
+        if len(variants) > COMPOSITING_CONFIG['max_variants']:
+            return jsonify({'error': f"Too many variants (max {COMPOSITING_CONFIG['max_variants']})"}), 400
+        
+        if generated_image_data:
+            source_id, source_img = SOURCE_IMAGES.put(generated_image_data)
+        else:
+            source_img = SOURCE_IMAGES.get(source_id)
+            if source_img is None:
+                return jsonify({'error': 'Unknown or expired source_id, resend generated_image'}), 404
+        
+        # Resolve overlay/mode per variant up front
+        jobs = []
+        for variant in variants:
+            section = variant.get('section', 'Wide')
+            with_alpha = variant.get('with_alpha', False)
+            shift_x = shift_param(variant.get('shift_x'), 'shift_x')
+            shift_y = shift_param(variant.get('shift_y'), 'shift_y')
+            overlay_path, mode = resolve_overlay(section, with_alpha)
+            if not os.path.exists(overlay_path):
+                return jsonify({'error': f'Overlay file not found: {overlay_path}'}), 404
+            jobs.append({
+                'section': section,
+                'with_alpha': with_alpha,
+                'overlay_path': overlay_path,
+                'mode': mode,
+                'shift_x': shift_x,
+                'shift_y': shift_y
+            })
+        
+        rendered = render_overlay_variants(source_img, jobs, preview_max_size=preview_max_size)
+        
+        results = []
+        for job, output in zip(jobs, rendered):
+            output.update({
+                'section': job['section'],
+                'with_alpha': job['with_alpha'],
+                'mode': job['mode'],
+                'overlay_used': os.path.basename(job['overlay_path'])
+            })
+            results.append(output)
+        
+        print(f"Rendered {len(results)} overlay variant previews for source {source_id[:10]}")
+        
+        return jsonify({
+            'success': True,
+            'source_id': source_id,
+            'variants': results
+        })
+        
+    except (InvalidParameter, UploadRejected) as e:
+        return jsonify({'error': str(e)}), getattr(e, 'status_code', 400)
+    except Exception as e:
+        print(f"Error rendering overlay variants: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/upload_overlay', methods=['POST'])
 def upload_overlay():
     """Upload a custom overlay image."""
@@ -2166,25 +1926,24 @@ def get_overlay_preview():
                 'preview': 'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
             })
         
-        # Load and create thumbnail
-        from PIL import Image
-        import base64
-        from io import BytesIO
-        
-        img = Image.open(overlay_path)
-        
-        # Create thumbnail (max 200x120)
-        img.thumbnail((200, 120), Image.Resampling.LANCZOS)
+        def build_preview():
+            img = Image.open(overlay_path)
+            
+            # Create thumbnail (max 200x120)
+            img.thumbnail((200, 120), Image.Resampling.LANCZOS)
+            
+            # Convert to base64
+            buffer = io.BytesIO()
+            img.save(buffer, format='PNG')
+            img_str = base64.b64encode(buffer.getvalue()).decode()
+            return json.dumps({
+                'success': True,
+                'preview': f'data:image/png;base64,{img_str}'
+            }).encode('utf-8')
         
-        # Convert to base64
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        
-        return jsonify({
-            'success': True,
-            'preview': f'data:image/png;base64,{img_str}'
-        })
+        # Built once per overlay file version; uploads change the file and invalidate it
+        body, etag = STATIC_FILES.derived(f'overlay-preview:{overlay_type}', overlay_path, build_preview)
+        return conditional_response(body, 'application/json', etag, versioned=False)
         
     except Exception as e:
         print(f"Error getting overlay preview: {e}")
@@ -2194,23 +1953,7 @@ def get_overlay_preview():
 def get_custom_styles():
     """Get custom style definitions."""
     try:
-        custom_styles_path = os.path.join(BASE_DIR, 'custom_styles.json')
-        
-        if not os.path.exists(custom_styles_path):
-            # Create default file
-            default_styles = {
-                'custom-1': {'name': 'Custom 1', 'prompt': '', 'has_reference': False},
-                'custom-2': {'name': 'Custom 2', 'prompt': '', 'has_reference': False}
-            }
-            with open(custom_styles_path, 'w') as f:
-                json.dump(default_styles, f, indent=2)
-            
-            return jsonify({'success': True, 'styles': default_styles})
-        
-        with open(custom_styles_path, 'r') as f:
-            styles = json.load(f)
-        
-        return jsonify({'success': True, 'styles': styles})
+        return jsonify({'success': True, 'styles': STYLE_REGISTRY.all()})
         
     except Exception as e:
         print(f"Error loading custom styles: {e}")
@@ -2218,39 +1961,26 @@ def get_custom_styles():
 
 @app.route('/save_custom_style', methods=['POST'])
 def save_custom_style():
-    """Save custom style definition."""
+    """Save custom style definition (creates the style if it is new)."""
     try:
         data = request.get_json()
         style_id = data.get('style_id')
         prompt = data.get('prompt', '')
         
-        if style_id not in ['custom-1', 'custom-2']:
+        if not is_custom_style_id(style_id):
             return jsonify({'error': 'Invalid style ID'}), 400
         
-        custom_styles_path = os.path.join(BASE_DIR, 'custom_styles.json')
-        
-        # Load current styles
-        if os.path.exists(custom_styles_path):
-            with open(custom_styles_path, 'r') as f:
-                styles = json.load(f)
-        else:
-            styles = {
-                'custom-1': {'name': 'Custom 1', 'prompt': '', 'has_reference': False},
-                'custom-2': {'name': 'Custom 2', 'prompt': '', 'has_reference': False}
-            }
-        
-        # Update style
-        styles[style_id]['prompt'] = prompt
-        
-        # Save to file
-        with open(custom_styles_path, 'w') as f:
-            json.dump(styles, f, indent=2)
+        fields = {'prompt': prompt}
+        if data.get('name'):
+            fields['name'] = data['name']
+        style = STYLE_REGISTRY.update(style_id, **fields)
         
         print(f"Saved custom style: {style_id}")
         
         return jsonify({
             'success': True,
-            'message': f'{style_id} saved successfully'
+            'message': f'{style_id} saved successfully',
+            'style': style
         })
         
     except Exception as e:
@@ -2264,30 +1994,19 @@ def delete_custom_style():
         data = request.get_json()
         style_id = data.get('style_id')
         
-        if style_id not in ['custom-1', 'custom-2']:
+        if not is_custom_style_id(style_id):
             return jsonify({'error': 'Invalid style ID'}), 400
         
-        custom_styles_path = os.path.join(BASE_DIR, 'custom_styles.json')
-        
-        # Load current styles
-        if os.path.exists(custom_styles_path):
-            with open(custom_styles_path, 'r') as f:
-                styles = json.load(f)
-        else:
-            return jsonify({'error': 'Custom styles file not found'}), 404
-        
-        # Clear style
-        styles[style_id] = {'name': f'Custom {style_id[-1]}', 'prompt': '', 'has_reference': False}
-        
-        # Save to file
-        with open(custom_styles_path, 'w') as f:
-            json.dump(styles, f, indent=2)
+        # Default slots are cleared, other styles removed
+        if not STYLE_REGISTRY.remove(style_id):
+            return jsonify({'error': f'Custom style {style_id} not found'}), 404
         
         # Remove reference image if exists
         reference_path = os.path.join(BASE_DIR, 'references', f'{style_id}.jpg')
         if os.path.exists(reference_path):
             os.remove(reference_path)
             print(f"Removed reference image for {style_id}")
+        REFERENCE_ASSETS.refresh('custom', f'{style_id}.jpg')
         
         print(f"Cleared custom style: {style_id}")
         
@@ -2310,7 +2029,7 @@ def upload_style_reference():
         file = request.files['reference_image']
         style_id = request.form.get('style_id')
         
-        if style_id not in ['custom-1', 'custom-2']:
+        if not is_custom_style_id(style_id):
             return jsonify({'error': 'Invalid style ID'}), 400
         
         if file.filename == '':
@@ -2322,16 +2041,9 @@ def upload_style_reference():
         
         reference_path = os.path.join(references_dir, f'{style_id}.jpg')
         file.save(reference_path)
+        REFERENCE_ASSETS.refresh('custom', f'{style_id}.jpg')
         
-        # Update custom styles JSON
-        custom_styles_path = os.path.join(BASE_DIR, 'custom_styles.json')
-        with open(custom_styles_path, 'r') as f:
-            styles = json.load(f)
-        
-        styles[style_id]['has_reference'] = True
-        
-        with open(custom_styles_path, 'w') as f:
-            json.dump(styles, f, indent=2)
+        STYLE_REGISTRY.update(style_id, has_reference=True)
         
         print(f"Uploaded reference for {style_id}")
         
@@ -2351,23 +2063,17 @@ def remove_style_reference():
         data = request.get_json()
         style_id = data.get('style_id')
         
-        if style_id not in ['custom-1', 'custom-2']:
+        if not is_custom_style_id(style_id):
             return jsonify({'error': 'Invalid style ID'}), 400
         
         # Remove reference file
         reference_path = os.path.join(BASE_DIR, 'references', f'{style_id}.jpg')
         if os.path.exists(reference_path):
             os.remove(reference_path)
+        REFERENCE_ASSETS.refresh('custom', f'{style_id}.jpg')
         
-        # Update custom styles JSON
-        custom_styles_path = os.path.join(BASE_DIR, 'custom_styles.json')
-        with open(custom_styles_path, 'r') as f:
-            styles = json.load(f)
-        
-        styles[style_id]['has_reference'] = False
-        
-        with open(custom_styles_path, 'w') as f:
-            json.dump(styles, f, indent=2)
+        if STYLE_REGISTRY.get(style_id):
+            STYLE_REGISTRY.update(style_id, has_reference=False)
         
         print(f"Removed reference for {style_id}")
         
@@ -2386,32 +2092,21 @@ def get_style_reference_preview():
     try:
         style = request.args.get('style', '')
         
-        reference_path = os.path.join(BASE_DIR, 'references', f'{style}.jpg')
+        asset = REFERENCE_ASSETS.get('custom', f'{style}.jpg')
         
-        if not os.path.exists(reference_path):
+        if not asset:
             return jsonify({
                 'success': True,
                 'has_reference': False
             })
         
-        # Load and create thumbnail
-        from PIL import Image
-        import base64
-        from io import BytesIO
-        
-        img = Image.open(reference_path)
-        img.thumbnail((200, 200), Image.Resampling.LANCZOS)
-        
-        buffer = BytesIO()
-        img.save(buffer, format='JPEG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        
-        return jsonify({
+        body = json.dumps({
             'success': True,
             'has_reference': True,
-            'preview': f'data:image/jpeg;base64,{img_str}',
+            'preview': asset.preview_data_uri,
             'filename': f'{style}.jpg'
-        })
+        }).encode('utf-8')
+        return conditional_response(body, 'application/json', strong_etag(body), versioned=False)
         
     except Exception as e:
         print(f"Error getting style reference preview: {e}")
@@ -2432,19 +2127,9 @@ def get_builtin_style_prompt():
         # Get reference preview if available
         reference_preview = None
         if has_reference:
-            reference_path = os.path.join(BASE_DIR, 'references', reference_filename)
-            if os.path.exists(reference_path):
-                from PIL import Image
-                import base64
-                from io import BytesIO
-                
-                img = Image.open(reference_path)
-                img.thumbnail((200, 200), Image.Resampling.LANCZOS)
-                
-                buffer = BytesIO()
-                img.save(buffer, format='JPEG')
-                img_str = base64.b64encode(buffer.getvalue()).decode()
-                reference_preview = f'data:image/jpeg;base64,{img_str}'
+            asset = REFERENCE_ASSETS.get('custom', reference_filename)
+            if asset:
+                reference_preview = asset.preview_data_uri
         
         return jsonify({
             'success': True,
@@ -2526,7 +2211,12 @@ def bulk_sampling():
 
 @app.route('/export_image', methods=['POST'])
 def export_image_endpoint():
-    """Export a single image to organized folder structure."""
+    """
+    Export a single image to organized folder structure.
+    
+    Optional 'renditions' (a set name such as 'cms', or a list of rendition
+    names from EXPORT_RENDITIONS) are written next to the master JPEG.
+    """
     try:
         from export_manager import ExportManager
         
@@ -2541,7 +2231,8 @@ def export_image_endpoint():
             style=data['style'],
             metadata=data.get('metadata'),
             export_metadata=data.get('export_metadata', False),
-            custom_suffix=data.get('custom_suffix')
+            custom_suffix=data.get('custom_suffix'),
+            renditions=data.get('renditions')
         )
         
         return jsonify(result)
@@ -2552,28 +2243,123 @@ def export_image_endpoint():
 
 @app.route('/batch_export', methods=['POST'])
 def batch_export_endpoint():
-    """Export multiple images in batch."""
+    """
+    Export multiple images in batch.
+    
+    With 'stream': true the response is NDJSON: one line per image as it is
+    written (completion order), then {'summary': ...} with the batch result.
+    'renditions' applies to every image unless an image sets its own.
+    """
     try:
         from export_manager import ExportManager
+        import queue
+        import threading
         
         data = request.get_json()
         images = data.get('images', [])
         export_metadata = data.get('export_metadata', False)
+        renditions = data.get('renditions')
         
         export_mgr = ExportManager()
-        result = export_mgr.batch_export(images, export_metadata)
+        if not data.get('stream'):
+            return jsonify(export_mgr.batch_export(images, export_metadata, renditions=renditions))
         
-        return jsonify(result)
+        events = queue.Queue()
+        
+        def run():
+            try:
+                summary = export_mgr.batch_export(images, export_metadata, progress=events.put,
+                                                  renditions=renditions)
+            except Exception as e:
+                print(f"Error in batch export: {e}")
+                summary = {'success': False, 'error': str(e)}
+            events.put({'summary': summary})
+        
+        threading.Thread(target=run, daemon=True).start()
+        
+        def generate():
+            while True:
+                event = events.get()
+                if 'summary' in event:
+                    # Per-image results were already streamed
+                    event['summary'].pop('results', None)
+                    yield json.dumps(event) + '\n'
+                    return
+                yield json.dumps(event) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
     except Exception as e:
         print(f"Error in batch export: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/search_exports', methods=['GET'])
+def search_exports():
+    """
+    Filtered, paginated listing of exports from the export catalog.
+    
+    Query parameters: league, team, content, style, since/until (ISO date or
+    date-time), min_qa, max_qa (exclusive), qa_status, sha256, batch, order
+    (newest, oldest, qa_asc, qa_desc, largest), offset, limit; facets=1 adds
+    per-league/team, content and style counts.
+    """
+    try:
+        from export_manager import ExportManager
+        
+        args = request.args
+        filters = {key: args.get(key) for key in
+                   ('league', 'team', 'content', 'style', 'since', 'until', 'qa_status', 'sha256', 'batch')}
+        # A malformed number is a 400, not a silently dropped filter
+        filters.update({key: int_param(args.get(key), key) for key in ('min_qa', 'max_qa')})
+        filters.update({key: int_param(args.get(key), key, minimum=0) for key in ('offset', 'limit')})
+        
+        export_mgr = ExportManager()
+        result = export_mgr.search_exports(order=args.get('order', 'newest'), **filters)
+        if args.get('facets') in ('1', 'true'):
+            result['facets'] = export_mgr.catalog.facets()
+        
+        return jsonify({'success': True, **result})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error searching exports: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/record_export_qa', methods=['POST'])
+def record_export_qa():
+    """Attach QA results ('qa', a /run_qa response) to an earlier export ('export_id')."""
+    try:
+        from export_manager import ExportManager
+        
+        data = request.get_json()
+        export_mgr = ExportManager()
+        if not data.get('export_id') or export_mgr.get_export(data['export_id']) is None:
+            return jsonify({'success': False, 'error': 'Unknown export_id'}), 404
+        
+        qa = export_mgr.record_qa(data['export_id'], data.get('qa') or {})
+        if qa is None:
+            return jsonify({'success': False, 'error': 'qa must include combined_qa_score'}), 400
+        
+        return jsonify({'success': True, 'export_id': data['export_id'], 'qa': qa})
+        
+    except Exception as e:
+        print(f"Error recording export QA: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/import_folder', methods=['POST'])
 def import_folder_endpoint():
-    """Import images from a folder."""
+    """
+    List a page of the images in a folder.
+    
+    Accepts 'folder_path' (inside the export or import roots, see
+    file_access.py), optional 'offset'/'limit' (see IMPORT_BROWSER) and
+    'run_qa'. Items carry thumbnail/image URLs instead of image data; with
+    run_qa the response includes a 'qa_job' id to poll at /import_qa/<job_id>.
+    """
     try:
         from export_manager import ExportManager
+        from file_access import resolve_path
         
         data = request.get_json()
         folder_path = data.get('folder_path')
@@ -2581,16 +2367,114 @@ def import_folder_endpoint():
         
         if not folder_path:
             return jsonify({'success': False, 'error': 'Folder path required'}), 400
+        folder_path = resolve_path(folder_path, 'folder')
         
         export_mgr = ExportManager()
-        result = export_mgr.import_images_from_folder(folder_path, run_qa)
+        result = export_mgr.import_images_from_folder(
+            folder_path, run_qa, offset=data.get('offset', 0), limit=data.get('limit')
+        )
         
         return jsonify(result)
         
+    except PathNotAllowed as e:
+        return jsonify({'success': False, 'error': str(e)}), e.status_code
     except Exception as e:
         print(f"Error in import: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/import_thumbnail/<image_id>', methods=['GET'])
+def import_thumbnail(image_id):
+    """Thumbnail of an imported image (made on first request, then cached)."""
+    try:
+        from import_browser import THUMBNAILS, image_path
+        from static_assets import conditional_response
+        
+        path = image_path(image_id)
+        cached = THUMBNAILS.get(path) if path else None
+        if cached is None:
+            return jsonify({'error': 'Image not found'}), 404
+        
+        data, etag = cached
+        return conditional_response(data, 'image/jpeg', etag, versioned=False)
+        
+    except Exception as e:
+        print(f"Error creating thumbnail: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/import_image/<image_id>', methods=['GET'])
+def import_image(image_id):
+    """Full imported image, streamed from disk (supports ETag and Range requests)."""
+    from flask import send_file
+    from import_browser import image_mimetype, image_path
+    
+    path = image_path(image_id)
+    if path is None:
+        return jsonify({'error': 'Image not found'}), 404
+    return send_file(path, mimetype=image_mimetype(path), conditional=True, etag=True)
+
+@app.route('/import_qa/<job_id>', methods=['GET'])
+def import_qa_status(job_id):
+    """Progress and results of a background import QA job (?since=N skips results already received)."""
+    from import_browser import QA_JOBS
+    
+    job = QA_JOBS.get(job_id, request.args.get('since', 0, type=int))
+    if job is None:
+        return jsonify({'error': 'Unknown or expired QA job'}), 404
+    return jsonify(job)
+
+@app.route('/find_near_duplicates', methods=['POST'])
+def find_near_duplicates_endpoint():
+    """
+    Find exported thumbnails that look like a candidate image.
+    
+    Accepts 'image' (data URL), optional 'max_distance' (Hamming bits, see
+    PHASH_CONFIG), 'league', 'team' and 'limit'. Matches come from the
+    perceptual hash index kept up to date by the export endpoints.
+    """
+    try:
+        from export_manager import ExportManager
+        from phash_index import get_index
+        
+        data = request.get_json()
+        image_data_url = data.get('image')
+        if not image_data_url:
+            return jsonify({'error': 'No image provided'}), 400
+        
+        max_distance = data.get('max_distance')
+        if max_distance is not None and (not isinstance(max_distance, int) or max_distance < 0):
+            return jsonify({'error': f'Invalid max_distance: {max_distance}'}), 400
+        
+        if ',' in image_data_url:
+            image_data_url = image_data_url.split(',')[1]
+        image = ingest_image(base64.b64decode(image_data_url), mode=None)
+        
+        # League/team are indexed by their export folder names
+        export_mgr = ExportManager()
+        league = data.get('league')
+        team = data.get('team')
+        
+        index = get_index(export_mgr.base_export_path)
+        result = index.find_near_duplicates(
+            image, max_distance,
+            league=export_mgr._sanitize_filename(league) if league else None,
+            team=export_mgr._sanitize_filename(team) if team else None,
+            limit=data.get('limit', 50)
+        )
+        
+        return jsonify({
+            'success': True,
+            'duplicate_found': bool(result['matches']),
+            'indexed_images': index.count(),
+            **result
+        })
+        
+    except UploadRejected as e:
+        print(f"Rejected upload: {e}")
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error finding near-duplicates: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/extract_alpha', methods=['POST'])
 def extract_alpha_endpoint():
     """
@@ -2609,20 +2493,22 @@ def extract_alpha_endpoint():
             image_data_url = image_data_url.split(',')[1]
         
         image_bytes = base64.b64decode(image_data_url)
-        image = Image.open(io.BytesIO(image_bytes))
+        image = ingest_image(image_bytes, mode=None)
         
         # Get parameters
         content_type = data.get('content_type', 'player')
         preserve_elements = data.get('preserve_elements', ['player', 'equipment'])
         
         # Import alpha extraction module
-        from alpha_extraction import extract_player_with_alpha, image_to_png_base64, validate_alpha_channel, create_preview_with_checkerboard
+        from alpha_extraction import extract_player_with_report, image_to_png_base64, validate_alpha_channel, create_preview_with_checkerboard
+        from qa_visual import check_player_integrity
         
-        # Extract with alpha
-        alpha_image = extract_player_with_alpha(image, api_key, preserve_elements)
+        # Extract with alpha (heavier models only if player integrity fails)
+        alpha_image, extraction = extract_player_with_report(image, api_key, preserve_elements)
         
-        # Validate alpha channel
+        # Validate alpha channel and subject topology of the final cutout
         validation = validate_alpha_channel(alpha_image)
+        player_integrity = check_player_integrity(alpha_image)
         
         # Create preview with checkerboard
         preview_image = create_preview_with_checkerboard(alpha_image)
@@ -2636,9 +2522,14 @@ def extract_alpha_endpoint():
             'alpha_image': f'data:image/png;base64,{alpha_base64}',
             'preview_image': f'data:image/png;base64,{preview_base64}',
             'validation': validation,
+            'player_integrity': player_integrity,
+            'extraction': extraction,
             'message': 'Background removed successfully' if validation['valid'] else 'Background removal may be incomplete'
         })
         
+    except UploadRejected as e:
+        print(f"Rejected upload: {e}")
+        return jsonify({'error': str(e)}), e.status_code
     except Exception as e:
         print(f"Error in alpha extraction: {e}")
         return jsonify({'error': str(e)}), 500
@@ -2647,13 +2538,58 @@ def extract_alpha_endpoint():
 def serve_bulk_interface():
     """Serve the bulk upload interface."""
     try:
-        with open(os.path.join(BASE_DIR, '..', 'bulk_upload_interface.html'), 'r') as file:
-            content = file.read()
-        return content, 200, {'Content-Type': 'text/html'}
-    except FileNotFoundError:
-        return "Bulk upload interface not found", 404
+        response = serve_frontend_file('bulk_upload_interface.html')
+        return response if response else ("Bulk upload interface not found", 404)
     except Exception as e:
         return f"Error loading bulk interface: {str(e)}", 500
 
+def warm_modules():
+    from config import LIFECYCLE
+    return import_modules(LIFECYCLE['preload_modules'])
+
+def warm_team_catalog():
+    TEAM_CATALOG.refresh()
+    return f"{len(TEAM_CATALOG.colors_by_key)} teams"
+
+def warm_static_files():
+    paths = ((os.path.join(FRONTEND_DIR, name), mimetype) for name, mimetype in FRONTEND_FILES.items())
+    return f"{STATIC_FILES.preload(paths)} static files"
+
+def warm_reference_images():
+    return f"{REFERENCE_ASSETS.ensure_loaded()} reference images"
+
+def warm_overlays():
+    from compositing import load_prepared_overlay
+    
+    count = 0
+    overlays_dir = os.path.join(BASE_DIR, '..', 'overlays')
+    for folder in sorted(os.listdir(overlays_dir)) if os.path.isdir(overlays_dir) else []:
+        for filename in ('overlay.png', 'underlay.png'):
+            path = os.path.join(overlays_dir, folder, filename)
+            if os.path.exists(path):
+                load_prepared_overlay(path)
+                count += 1
+    return f"{count} overlays"
+
+def warm_rembg():
+    from alpha_extraction import preload_rembg_sessions
+    from config import LIFECYCLE
+    return preload_rembg_sessions(LIFECYCLE['rembg_sessions'])
+
+# Warmup (FUBO_PRELOAD=1): fork-safe work in the importing process (the
+# gunicorn master with --preload), onnxruntime sessions in each worker
+register_warmup('modules', warm_modules)
+register_warmup('team catalog', warm_team_catalog)
+register_warmup('static files', warm_static_files)
+register_warmup('reference images', warm_reference_images)
+register_warmup('overlays', warm_overlays)
+register_warmup('rembg sessions', warm_rembg, stage='worker')
+
+STARTUP.record('import app', (time.perf_counter() - _import_start) * 1000)
+if preload_enabled():
+    run_warmup('preload')
+
 if __name__ == '__main__':
+    if preload_enabled():
+        run_warmup('worker')
     app.run(debug=True, port=5001)
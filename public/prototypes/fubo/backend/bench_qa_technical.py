@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark technical QA: per-image time and peak memory at 1080p and 4K.
+
+Compares the fused analyze_image() pass against the previous approach
+(PIL HSV conversion + ImageStat, grayscale + scipy.ndimage.laplace).
+
+Usage:
+    python bench_qa_technical.py [image paths...]
+
+Peak memory is measured with tracemalloc, which sees NumPy allocations but
+not Pillow's internal image buffers.
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageStat
+
+from qa_technical import run_technical_qa
+
+SIZES = {
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160)
+}
+
+RUNS = 5
+
+
+def legacy_pixel_checks(image: Image.Image):
+    """The pre-fusion saturation and noise computations."""
+    from scipy import ndimage
+    rgb = image.convert('RGB') if image.mode != 'RGB' else image
+    saturation = ImageStat.Stat(rgb.convert('HSV')).mean[1]
+    gray = np.array(image.convert('L'))
+    noise = ndimage.laplace(gray).var()
+    return saturation, noise
+
+
+def synthetic_image(width: int, height: int) -> Image.Image:
+    """Gradient plus noise, roughly the statistics of a generated thumbnail."""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    y = np.linspace(0, 128, height, dtype=np.float32)[:, None, None]
+    pixels = x * np.array([1.0, 0.6, 0.2], dtype=np.float32) + y
+    pixels = pixels + rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def measure(func, image: Image.Image):
+    """Best-of-RUNS wall time (ms) and peak traced memory (MB)."""
+    func(image)  # warm up imports and caches
+
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func(image)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(image)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(times) * 1000, peak / 1e6
+
+
+def main():
+    images = {label: synthetic_image(*size) for label, size in SIZES.items()}
+    for path in sys.argv[1:]:
+        images[path] = Image.open(path)
+        images[path].load()
+
+    print(f"{'image':<24} {'size':>11} {'legacy ms':>10} {'legacy MB':>10} {'fused ms':>9} {'fused MB':>9}")
+    for label, image in images.items():
+        legacy_ms, legacy_mb = measure(legacy_pixel_checks, image)
+        fused_ms, fused_mb = measure(run_technical_qa, image)
+        size = f"{image.width}x{image.height}"
+        print(f"{label:<24} {size:>11} {legacy_ms:>10.1f} {legacy_mb:>10.1f} {fused_ms:>9.1f} {fused_mb:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
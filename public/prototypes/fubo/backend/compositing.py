@@ -6,8 +6,218 @@ Handles layering PNG overlays over AI-generated images with support for both mod
 """
 
 from PIL import Image, ImageChops
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import hashlib
+import threading
+import time
 import io
+import os
+import re
 import base64
+import binascii
+
+from config import COMPOSITING_CONFIG
+from image_ingest import UploadRejected, ingest_image
+
+
+# Tile edge (pixels) used when classifying alpha coverage
+TILE_SIZE = 32
+
+# Coverage classes for a tile of the alpha channel
+TRANSPARENT = 0
+OPAQUE = 1
+PARTIAL = 2
+
+
+class PreparedOverlay:
+    """
+    Overlay decoded once, with its alpha coverage classified into tile regions.
+    
+    Compositing only has to copy the opaque regions and blend the partial ones;
+    fully transparent regions are skipped entirely.
+    """
+    
+    def __init__(self, image, tile_size=TILE_SIZE):
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        
+        self.image = image
+        self.size = image.size
+        self.pixels = np.asarray(image)  # Read-only view, shared between requests
+        self.regions = classify_alpha_regions(self.pixels[:, :, 3], tile_size)
+
+
+# Prepared overlays keyed by (path, scale), LRU-bounded, invalidated when the file changes on disk
+_PREPARED_OVERLAYS = OrderedDict()
+_PREPARED_OVERLAYS_LOCK = threading.Lock()
+
+
+def preview_size(requested=None):
+    """
+    Snap a requested preview edge to one of COMPOSITING_CONFIG['preview_sizes'].
+    
+    Previews are cached per scale, so only a few sizes may exist: the smallest
+    configured size at least as large as the request, else the largest one.
+    """
+    sizes = sorted(COMPOSITING_CONFIG['preview_sizes'])
+    if requested is None:
+        return COMPOSITING_CONFIG['preview_max_size']
+    requested = float(requested)
+    return next((size for size in sizes if size >= requested), sizes[-1])
+
+
+def load_prepared_overlay(overlay_path, scale=1.0):
+    """
+    Load an overlay PNG and precompute its tile regions, caching the result.
+    
+    The cache entry is reused until the file's mtime or size changes, so
+    /upload_overlay, /remove_overlay and /restore_default_overlay are picked up
+    on the next composite. At most COMPOSITING_CONFIG['overlay_cache_size']
+    entries are kept (least recently used dropped first).
+    
+    Args:
+        overlay_path: Path to PNG overlay file
+        scale: Optional downscale factor (< 1.0) for low-res preview compositing
+    
+    Returns:
+        PreparedOverlay object
+    """
+    stat = os.stat(overlay_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cache_key = (overlay_path, scale)
+    
+    with _PREPARED_OVERLAYS_LOCK:
+        cached = _PREPARED_OVERLAYS.get(cache_key)
+        if cached and cached[0] == signature:
+            _PREPARED_OVERLAYS.move_to_end(cache_key)
+            return cached[1]
+    
+    with Image.open(overlay_path) as overlay:
+        overlay = overlay.convert('RGBA')
+    
+    if scale < 1.0:
+        scaled_size = (max(1, round(overlay.width * scale)), max(1, round(overlay.height * scale)))
+        overlay = overlay.resize(scaled_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    
+    prepared = PreparedOverlay(overlay)
+    with _PREPARED_OVERLAYS_LOCK:
+        _PREPARED_OVERLAYS[cache_key] = (signature, prepared)
+        _PREPARED_OVERLAYS.move_to_end(cache_key)
+        while len(_PREPARED_OVERLAYS) > COMPOSITING_CONFIG['overlay_cache_size']:
+            _PREPARED_OVERLAYS.popitem(last=False)
+    return prepared
+
+
+def classify_alpha_regions(alpha, tile_size=TILE_SIZE):
+    """
+    Classify an alpha channel into opaque / partial tile regions.
+    
+    Tiles are classified with a single vectorized min/max reduction, then
+    horizontally adjacent tiles of the same class are merged into one box so
+    the blend loop touches as few slices as possible. Fully transparent tiles
+    are not returned because they never change the base image.
+    
+    Args:
+        alpha: 2D uint8 NumPy array (height x width)
+        tile_size: Tile edge in pixels
+    
+    Returns:
+        Dict with 'opaque' and 'partial' lists of (left, top, right, bottom) boxes
+    """
+    height, width = alpha.shape
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    
+    # Pad with edge values so the padding never changes a tile's min/max
+    padded = np.pad(alpha, ((0, rows * tile_size - height), (0, cols * tile_size - width)), mode='edge')
+    tiles = padded.reshape(rows, tile_size, cols, tile_size)
+    tile_min = tiles.min(axis=(1, 3))
+    tile_max = tiles.max(axis=(1, 3))
+    
+    kinds = np.full((rows, cols), PARTIAL, dtype=np.uint8)
+    kinds[tile_max == 0] = TRANSPARENT
+    kinds[tile_min == 255] = OPAQUE
+    
+    regions = {'opaque': [], 'partial': []}
+    for row in range(rows):
+        row_kinds = kinds[row]
+        # Start index of every run of identical tile classes in this row
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(row_kinds)) + 1))
+        run_ends = np.append(run_starts[1:], cols)
+        
+        top = row * tile_size
+        bottom = min(top + tile_size, height)
+        for start, end in zip(run_starts, run_ends):
+            kind = row_kinds[start]
+            if kind == TRANSPARENT:
+                continue
+            box = (int(start) * tile_size, top, min(int(end) * tile_size, width), bottom)
+            regions['opaque' if kind == OPAQUE else 'partial'].append(box)
+    
+    return regions
+
+
+def blend_regions(base, top, regions):
+    """
+    Composite `top` over `base` in place, touching only the given regions.
+    
+    Opaque regions are copied straight through; partial regions are blended
+    with the Porter-Duff "over" operator using premultiplied alpha, so
+    semi-transparent pixels over transparent canvas keep their true color.
+    
+    Args:
+        base: Writable HxWx4 uint8 NumPy array (modified in place)
+        top: HxWx4 uint8 NumPy array with the same shape
+        regions: Dict from classify_alpha_regions() describing `top`'s alpha
+    """
+    for left, upper, right, lower in regions['opaque']:
+        base[upper:lower, left:right] = top[upper:lower, left:right]
+    
+    for left, upper, right, lower in regions['partial']:
+        dst = base[upper:lower, left:right]
+        src = top[upper:lower, left:right]
+        
+        src_alpha = src[:, :, 3:4].astype(np.float32) * (1.0 / 255.0)
+        dst_alpha = dst[:, :, 3:4].astype(np.float32) * (1.0 / 255.0)
+        dst_weight = dst_alpha * (1.0 - src_alpha)
+        out_alpha = src_alpha + dst_weight
+        
+        premultiplied = src[:, :, :3] * src_alpha + dst[:, :, :3] * dst_weight
+        # Un-premultiply; pixels with zero coverage stay black/transparent
+        out_rgb = np.divide(premultiplied, out_alpha, out=np.zeros_like(premultiplied), where=out_alpha > 0)
+        
+        dst[:, :, :3] = np.clip(out_rgb + 0.5, 0, 255).astype(np.uint8)
+        dst[:, :, 3:4] = np.clip(out_alpha * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+
+def resolve_shift(overlay_size, shift_x=None, shift_y=None):
+    """
+    Fill in the default shift for an overlay size.
+    
+    Args:
+        overlay_size: (width, height) of the overlay
+        shift_x: Optional custom horizontal shift in pixels
+        shift_y: Optional custom vertical shift in pixels
+    
+    Returns:
+        Tuple (shift_x, shift_y)
+    """
+    overlay_width, overlay_height = overlay_size
+    
+    # Determine shift based on overlay dimensions (Wide vs Tall)
+    if shift_x is None:
+        if overlay_width > overlay_height:  # Wide format
+            shift_x = 250  # Shift Wide images to the right
+        else:  # Tall format
+            shift_x = 0   # No shift for Tall images
+    
+    # Default vertical shift is 0 (centered)
+    if shift_y is None:
+        shift_y = 0
+    
+    return shift_x, shift_y
 
 
 def composite_overlay(generated_image, overlay_image, mode='under', shift_x=None, shift_y=None, crop_to_overlay_size=True):
@@ -16,123 +226,234 @@ def composite_overlay(generated_image, overlay_image, mode='under', shift_x=None
     
     Args:
         generated_image: PIL Image object (the AI-generated image)
-        overlay_image: PIL Image object (the PNG overlay with transparency)
+        overlay_image: PIL Image object or PreparedOverlay (the PNG overlay with transparency)
         mode: 'under' (generated under overlay) or 'over' (generated over overlay)
         shift_x: Optional custom horizontal shift in pixels (overrides default)
         shift_y: Optional custom vertical shift in pixels (overrides default 0)
-        crop_to_overlay_size: If True, crop result to overlay dimensions (for images with padding)
+        crop_to_overlay_size: Kept for compatibility; the result is always built at overlay size
     
     Returns:
         PIL Image object (composited result)
     """
-    # Ensure both images are in RGBA mode for transparency support
+    if mode not in ('under', 'over'):
+        raise ValueError(f"Invalid mode: {mode}. Must be 'under' or 'over'")
+    
+    # Prepare the overlay (decode + tile regions) unless the caller already has
+    if not isinstance(overlay_image, PreparedOverlay):
+        overlay_image = PreparedOverlay(overlay_image)
+    
+    # Ensure generated image is in RGBA mode for transparency support
     if generated_image.mode != 'RGBA':
         generated_image = generated_image.convert('RGBA')
     
-    if overlay_image.mode != 'RGBA':
-        overlay_image = overlay_image.convert('RGBA')
-    
     # Store original overlay size - NEVER resize the overlay
     overlay_width, overlay_height = overlay_image.size
     gen_width, gen_height = generated_image.size
     
-    # Check if we need to crop after compositing (generated image has padding)
-    needs_crop = gen_width > overlay_width or gen_height > overlay_height
+    shift_x, shift_y = resolve_shift(overlay_image.size, shift_x, shift_y)
+    
+    # Calculate where to paste the generated image (centered + shift)
+    paste_x = (overlay_width - gen_width) // 2 + shift_x
+    paste_y = (overlay_height - gen_height) // 2 + shift_y
+    
+    # Place the generated image on a canvas at OVERLAY size (final dimensions)
+    placed = Image.new('RGBA', (overlay_width, overlay_height))
+    placed.paste(generated_image, (paste_x, paste_y))
     
     if mode == 'under':
-        # Generated image UNDER overlay (overlay on top)
-        # Determine shift based on overlay dimensions (Wide vs Tall)
-        if shift_x is None:
-            if overlay_width > overlay_height:  # Wide format
-                shift_x = 250  # Shift Wide images to the right
-            else:  # Tall format
-                shift_x = 0   # No shift for Tall images
-        
-        # Default vertical shift is 0 (centered)
-        if shift_y is None:
-            shift_y = 0
-        
-        # Create result canvas at OVERLAY size (final dimensions)
-        result = Image.new('RGBA', (overlay_width, overlay_height))
-        
-        # Calculate where to paste the generated image (centered + shift)
-        paste_x = (overlay_width - gen_width) // 2 + shift_x
-        paste_y = (overlay_height - gen_height) // 2 + shift_y
-        
-        # Paste generated image at calculated position
-        result.paste(generated_image, (paste_x, paste_y))
-        
-        # Paste overlay on top at (0,0) - IMMOVABLE
-        result.paste(overlay_image, (0, 0), overlay_image)  # Use overlay's alpha channel as mask
-        
-        # No need to crop - result is already at overlay size
-        if crop_to_overlay_size and result.size != overlay_image.size:
-            # Center crop to overlay dimensions
-            final_width, final_height = overlay_image.size
-            gen_width, gen_height = result.size
-            
-            # Calculate crop box to get the visible area
-            left = (gen_width - final_width) // 2
-            top = 0
-            right = left + final_width
-            bottom = final_height
-            
-            result = result.crop((left, top, right, bottom))
-        
-        return result
+        # Generated image UNDER overlay: overlay is the top layer, IMMOVABLE at (0,0)
+        result = np.array(placed)
+        blend_regions(result, overlay_image.pixels, overlay_image.regions)
+    else:
+        # Generated image ON TOP of overlay: its own alpha decides coverage,
+        # so its regions are classified per call
+        top = np.asarray(placed)
+        result = np.array(overlay_image.pixels)
+        blend_regions(result, top, classify_alpha_regions(top[:, :, 3]))
     
-    elif mode == 'over':
-        # Generated image ON TOP of overlay (generated over overlay)
-        # Create result canvas at OVERLAY size (final dimensions)
-        result = Image.new('RGBA', (overlay_width, overlay_height))
-        
-        # Paste overlay at (0,0) - IMMOVABLE
-        result.paste(overlay_image, (0, 0))
-        
-        # Ensure generated image is in RGBA mode for proper alpha handling
-        if generated_image.mode != 'RGBA':
-            generated_image = generated_image.convert('RGBA')
+    return Image.fromarray(result, 'RGBA')
+
+
+class SourceImageCache:
+    """
+    Small LRU of decoded source images keyed by a content hash.
+    
+    Lets an editor session decode the generated image once and then refer to
+    it by `source_id` for every shift nudge and full-res render. The encoded
+    upload is also written to a directory shared by all worker processes
+    (COMPOSITING_CONFIG['source_dir']), so a follow-up request that lands on
+    another worker decodes it from there instead of failing. Files older than
+    COMPOSITING_CONFIG['source_max_age'] are removed as new sources arrive.
+    """
+    
+    SOURCE_ID = re.compile(r'^[0-9a-f]{40}$')
+    
+    def __init__(self, max_entries=COMPOSITING_CONFIG['source_cache_size'],
+                 shared_dir=COMPOSITING_CONFIG['source_dir'], max_age=COMPOSITING_CONFIG['source_max_age']):
+        self.max_entries = max_entries
+        self.shared_dir = shared_dir
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def put(self, base64_string):
+        """
+        Decode a base64 image (once) and cache it.
         
-        # Determine shift based on overlay dimensions (Wide vs Tall)
-        if shift_x is None:
-            if overlay_width > overlay_height:  # Wide format
-                shift_x = 250  # Shift Wide images to the right
-            else:  # Tall format
-                shift_x = 0   # No shift for Tall images
+        Args:
+            base64_string: Base64 encoded image string (may include data URI prefix)
         
-        # Default vertical shift is 0 (centered)
-        if shift_y is None:
-            shift_y = 0
+        Returns:
+            Tuple (source_id, PIL Image in RGBA mode)
         
-        # Calculate where to paste the generated image (centered + shift)
-        paste_x = (overlay_width - gen_width) // 2 + shift_x
-        paste_y = (overlay_height - gen_height) // 2 + shift_y
+        Raises:
+            UploadRejected: Invalid base64, unreadable image or over the upload limits
+        """
+        if ',' in base64_string:
+            base64_string = base64_string.split(',')[1]
         
-        # Use the alpha channel of the generated image as the mask
-        alpha_channel = generated_image.split()[-1]  # Get the alpha channel
-        result.paste(generated_image, (paste_x, paste_y), alpha_channel)
+        source_id = hashlib.sha1(base64_string.encode('ascii')).hexdigest()
+        cached = self._cached(source_id)
+        if cached is None:
+            try:
+                data = base64.b64decode(base64_string)
+            except binascii.Error as e:
+                raise UploadRejected(f'Invalid base64 image data: {e}')
+            cached = self._decode(source_id, data)
+        else:
+            data = None
         
-        print(f"DEBUG 'over' mode:")
-        print(f"  Generated image mode: {generated_image.mode}")
-        print(f"  Generated image size: {generated_image.size}")
-        print(f"  Overlay image size: {overlay_image.size}")
-        print(f"  Result image size: {result.size}")
-        print(f"  Shift applied: {shift_x}px (Wide={overlay_image.size[0] > overlay_image.size[1]})")
-        print(f"  Alpha channel mode: {alpha_channel.mode}")
-        print(f"  Alpha channel size: {alpha_channel.size}")
+        self._share(source_id, data)
+        return source_id, cached
+    
+    def get(self, source_id):
+        """Return the image for `source_id` (from memory or the shared directory), or None if it expired."""
+        cached = self._cached(source_id)
+        if cached is not None or not self.SOURCE_ID.match(source_id or ''):
+            return cached
         
-        # Check alpha channel transparency
-        alpha_pixels = list(alpha_channel.getdata())
-        transparent_count = sum(1 for p in alpha_pixels if p < 128)
-        total_pixels = len(alpha_pixels)
-        transparency_percent = (transparent_count / total_pixels) * 100
-        print(f"  Alpha transparency: {transparency_percent:.1f}% ({transparent_count}/{total_pixels} pixels)")
-        print(f"  Result already at overlay size: {result.size}")
+        try:
+            with open(self._shared_path(source_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return self._decode(source_id, data)
+    
+    def _cached(self, source_id):
+        with self._lock:
+            image = self._entries.get(source_id)
+            if image is not None:
+                self._entries.move_to_end(source_id)
+            return image
+    
+    def _decode(self, source_id, data):
+        # Same byte/pixel limits as any upload (raises UploadRejected)
+        image = ingest_image(data, mode='RGBA')
         
-        return result
+        with self._lock:
+            self._entries[source_id] = image
+            self._entries.move_to_end(source_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return image
+    
+    def _shared_path(self, source_id):
+        return os.path.join(self.shared_dir, f'{source_id}.img')
+    
+    def _share(self, source_id, data):
+        """Write the encoded source for other workers, or refresh its age if it is already there."""
+        path = self._shared_path(source_id)
+        try:
+            if os.path.exists(path):
+                os.utime(path)
+                return
+            if data is None:
+                return
+            os.makedirs(self.shared_dir, exist_ok=True)
+            self._prune()
+            temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Could not share source image {source_id[:10]}: {e}")
+    
+    def _prune(self):
+        cutoff = time.time() - self.max_age
+        with os.scandir(self.shared_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+# Shared by /apply_overlay and /apply_overlay_variants
+SOURCE_IMAGES = SourceImageCache()
+
+
+def render_overlay_variants(source_image, variants, preview_max_size=None, max_workers=None):
+    """
+    Composite one source image against several overlay variants in parallel.
     
-    else:
-        raise ValueError(f"Invalid mode: {mode}. Must be 'under' or 'over'")
+    Each variant is rendered at preview scale: the source and the overlay are
+    downscaled once (overlays are cached per scale), and shifts are scaled to
+    match, so a preview costs a fraction of a full-res composite.
+    
+    Args:
+        source_image: PIL Image in RGBA mode (decoded once by the caller)
+        variants: List of dicts with 'overlay_path', 'mode', 'shift_x', 'shift_y'
+        preview_max_size: Longest preview edge in pixels, snapped to
+                          COMPOSITING_CONFIG['preview_sizes'] (default preview_max_size)
+        max_workers: Thread pool size (default: one per variant, capped at CPU count)
+    
+    Returns:
+        List of dicts (same order as `variants`) with 'preview', 'size',
+        'shift_x', 'shift_y', or 'error' if that variant failed
+    """
+    preview_max_size = preview_size(preview_max_size)
+    if not variants:
+        return []
+    
+    scaled_sources = {}
+    scaled_lock = threading.Lock()
+    
+    def scaled_source(scale):
+        # Downscale the source once per distinct preview scale
+        with scaled_lock:
+            if scale not in scaled_sources:
+                if scale >= 1.0:
+                    scaled_sources[scale] = source_image
+                else:
+                    size = (max(1, round(source_image.width * scale)), max(1, round(source_image.height * scale)))
+                    scaled_sources[scale] = source_image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+            return scaled_sources[scale]
+    
+    def render(variant):
+        try:
+            full_overlay = load_prepared_overlay(variant['overlay_path'])
+            shift_x, shift_y = resolve_shift(full_overlay.size, variant.get('shift_x'), variant.get('shift_y'))
+            
+            scale = min(1.0, preview_max_size / max(full_overlay.size))
+            overlay = load_prepared_overlay(variant['overlay_path'], scale=scale) if scale < 1.0 else full_overlay
+            
+            preview = composite_overlay(
+                scaled_source(scale), overlay, mode=variant['mode'],
+                shift_x=round(shift_x * scale), shift_y=round(shift_y * scale)
+            )
+            return {
+                'preview': f'data:image/png;base64,{image_to_base64(preview, format="PNG")}',
+                'size': list(full_overlay.size),
+                'shift_x': shift_x,
+                'shift_y': shift_y
+            }
+        except Exception as e:
+            return {'error': str(e)}
+    
+    workers = max_workers or min(len(variants), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render, variants))
 
 
 def create_alpha_channel_output(image, remove_background=False):
@@ -240,8 +561,6 @@ def get_aspect_ratio_overlay(aspect_ratio='16:9'):
     Returns:
         Path to overlay file or None if not found
     """
-    import os
-    
     # Map aspect ratios to overlay directories
     overlay_map = {
         '16:9': 'overlays/16x9/default.png',
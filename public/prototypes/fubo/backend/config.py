@@ -4,6 +4,7 @@ Centralized configuration for the thumbnail generation system.
 """
 
 import os
+import tempfile
 from typing import Dict
 
 # API Configuration
@@ -39,7 +40,12 @@ QA_WEIGHTS = {
         'aspect_ratio': 0.35,
         'color_saturation': 0.25,
         'noise_artifacts': 0.25,
-        'resolution': 0.15
+        'resolution': 0.15,
+        'blockiness': 0.10,
+        'banding': 0.10,
+        'clipping': 0.10,
+        'letterbox': 0.25,
+        'edge_halo': 0.15
     },
     'visual': {
         'sports_equipment': 0.35,
@@ -49,9 +55,51 @@ QA_WEIGHTS = {
     'combined': {
         'technical': 0.60,
         'visual': 0.40
+    },
+    'combined_with_player': {       # Transparent images (player integrity available)
+        'technical': 0.30,
+        'visual': 0.60,
+        'player_integrity': 0.10
     }
 }
 
+# QA Policy (see qa_policy.py)
+QA_POLICY = {
+    'short_circuit': True,           # Stop calling Gemini once the QA_THRESHOLDS bucket is decided
+    'visual_check_order': [          # Heaviest checks first so the bucket is decided sooner
+        'text_accuracy',
+        'sports_equipment',
+        'human_pose',
+        'context_validation'
+    ],
+    'mandatory_checks': {            # Visual checks that always run for a content_type
+        'default': [],
+        'player': ['text_accuracy'],
+        'action': ['human_pose'],
+        'closeup': ['human_pose', 'text_accuracy'],
+        'stadium': []
+    },
+    'pass_cache_size': 1024          # Passed results remembered by image hash
+}
+
+# Technical QA Sampling (see qa_technical.analyze_image)
+QA_SAMPLING = {
+    'default_mode': 'full',          # 'full', 'tiles' or 'auto'
+    'auto_min_pixels': 4_000_000,    # 'auto' samples images at least this large
+    'grid': 8,                       # grid x grid strata, one tile each
+    'tile_size': 64,                 # Tile edge (pixels)
+    'profile_size': 256,             # Shorter edge of the reduced image used for letterbox rows/columns
+    'seed': 0                        # Fixed so repeated QA of an image is stable
+}
+
+# Batch Technical QA (see qa_batch.py)
+QA_BATCH = {
+    'max_workers': None,       # Worker processes; None uses every core
+    'queue_per_worker': 2,     # Items queued per worker (bounds memory held by a stream)
+    'max_images': 10_000,      # Upper bound on images per /run_qa_batch request
+    'summary_dir': './QA'      # /run_qa_batch summaries are written here (relative to backend/), never to client paths
+}
+
 # Color Saturation Thresholds
 SATURATION_THRESHOLDS = {
     'optimal_min': 30,
@@ -77,6 +125,35 @@ NOISE_THRESHOLDS = {
     'noisy_max': 2000
 }
 
+# Local Artifact Detection Thresholds (see qa_technical.py)
+ARTIFACT_THRESHOLDS = {
+    'blockiness': {
+        'mild_step': 1.0,           # Extra luma step at 8x8 block boundaries (levels)
+        'visible_step': 3.0,
+        'visible_ratio': 2.0        # Boundary/interior step ratio that makes a mild step visible
+    },
+    'banding': {
+        'percentile': 0.01,         # Ignore the darkest/brightest 1% when finding the used range
+        'acceptable_gap_ratio': 0.15,   # Share of luma levels in the used range that are empty
+        'posterized_gap_ratio': 0.40
+    },
+    'clipping': {
+        'shadow_level': 3,          # Luma at or below counts as crushed
+        'highlight_level': 252,     # Luma at or above counts as blown
+        'acceptable_ratio': 0.02,
+        'fail_ratio': 0.08
+    },
+    'letterbox': {
+        'dark_level': 24,           # Row/column maximum luma at or below counts as a black bar
+        'min_bar_ratio': 0.01       # Bars thinner than this share of the frame are ignored
+    },
+    'edge_halo': {
+        'edge_width': 2,            # Pixels of cutout rim compared with the interior band inside it
+        'acceptable_delta': 18,     # Mean luma difference rim vs interior band
+        'visible_delta': 40
+    }
+}
+
 # Export Configuration
 EXPORT_CONFIG = {
     'base_path': './Exports',
@@ -86,6 +163,161 @@ EXPORT_CONFIG = {
     'create_metadata': False
 }
 
+# Export renditions (see renditions.py), written next to the master JPEG
+EXPORT_RENDITIONS = {
+    'renditions': {
+        'wide': {'size': (1920, 1080), 'format': 'webp', 'quality': 85},                        # 16:9
+        'tall': {'size': (1280, 1920), 'format': 'webp', 'quality': 85},                        # 2:3
+        'wide_avif': {'size': (1920, 1080), 'format': 'avif', 'fallback': 'webp', 'quality': 60},
+        'tall_avif': {'size': (1280, 1920), 'format': 'avif', 'fallback': 'webp', 'quality': 60},
+        'preview': {'max_size': 480, 'format': 'webp', 'quality': 75},                          # CMS previews
+        'preview_jpg': {'max_size': 480, 'format': 'jpeg', 'quality': 80}
+    },
+    'sets': {
+        'cms': ['wide', 'tall', 'preview'],
+        'cms_avif': ['wide_avif', 'tall_avif', 'preview']
+    },
+    'max_workers': None             # Encoder threads per image; None uses one per rendition (capped at cores)
+}
+
+# Export manifest (see export_manifest.py)
+EXPORT_MANIFEST = {
+    'filename': 'manifest.jsonl',   # Append-only, one line per export, in the export root
+    'fsync': True                   # fsync after each append (one per export or batch)
+}
+
+# Export catalog (see export_catalog.py)
+EXPORT_CATALOG = {
+    'db_filename': 'export_catalog.sqlite3',  # Created in the export root
+    'page_size': 100,               # Rows per /search_exports page by default
+    'max_page_size': 1000           # Largest page a request may ask for
+}
+
+# Request path access (see file_access.py)
+FILE_ACCESS = {
+    'import_roots': [],                  # Folders besides the export root that paths/folders may point into
+    'import_roots_env': 'FUBO_IMPORT_ROOTS'  # Env var with more roots, separated by os.pathsep
+}
+
+# Import browsing (see import_browser.py)
+IMPORT_BROWSER = {
+    'page_size': 100,               # Images per /import_folder page by default
+    'max_page_size': 500,           # Largest page a request may ask for
+    'thumbnail_size': 256,          # Longest edge of import thumbnails
+    'thumbnail_quality': 80,        # JPEG quality of thumbnails
+    'thumbnail_cache_size': 1024,   # Thumbnails kept in memory (~15-25KB each)
+    'qa_jobs_dir': './QA/import_jobs',  # One JSONL progress file per background QA job (shared by workers, relative to backend/)
+    'qa_job_max_age': 86_400        # Seconds a job file is kept for polling
+}
+
+# Batch export pipeline (see ExportManager.batch_export)
+EXPORT_PIPELINE = {
+    'io_workers': 4,             # Threads writing encoded files
+    'queue_per_worker': 4,       # Encoded files waiting per writer (bounds memory)
+    'min_parallel_items': 4,     # Smaller batches are encoded in-process (no pool round trip)
+    'fsync': True,               # fsync each file and, once per batch, each export folder
+    'batch_index_dir': 'batches',  # Batch index files, below the export root
+    'batch_index_keep': 100        # Newest batch indexes kept (0: keep all)
+}
+
+# Player Integrity (see qa_visual.check_player_integrity)
+PLAYER_INTEGRITY = {
+    'analysis_size': 256,           # Alpha mask is reduced to this longest edge before labelling
+    'alpha_threshold': 128,         # Alpha above this counts as subject
+    'min_fragment_ratio': 0.001,    # Components smaller than this share of the frame are specks, not fragments
+    'largest_ratio_ok': 0.90,       # Largest component's share of the subject
+    'largest_ratio_min': 0.75,
+    'max_fragments': 3,             # Detached pieces tolerated (ball, stick, ...)
+    'hole_ratio_ok': 0.05,          # Enclosed transparent area relative to the subject
+    'hole_ratio_max': 0.15,
+    'pass_threshold': 75
+}
+
+# Alpha Extraction (see alpha_extraction.extract_player_with_report)
+ALPHA_EXTRACTION = {
+    'models': [                     # Tried in order; the next one only runs if player integrity fails
+        ('u2net_human_seg', 'Human Segmentation (optimized for people)'),
+        ('isnet-general-use', 'ISNet (newer, higher quality)'),
+        ('u2net', 'U2-Net (general purpose)')
+    ],
+    'min_transparency': 30          # Below this (percent) rembg is considered failed
+}
+
+# Application lifecycle (see lifecycle.py)
+LIFECYCLE = {
+    'preload': False,               # Run warmup when the app is imported; FUBO_PRELOAD env var overrides
+    'gc_freeze': True,              # gc.freeze() after preload so forked workers keep sharing those pages
+    'preload_modules': [            # Imported during preload (numpy/scipy, QA stack, Gemini SDK)
+        'numpy', 'scipy.fft', 'scipy.ndimage', 'compositing', 'qa_technical',
+        'qa_visual', 'alpha_extraction', 'phash_index', 'google.generativeai'
+    ],
+    'rembg_sessions': 1             # First N ALPHA_EXTRACTION models loaded in each worker at start (0: on first use)
+}
+
+# Gemini Vision Upload Sizes (see vision_payloads.py)
+VISION_PAYLOADS = {
+    'default': {'max_size': 768, 'quality': 85},
+    'sport_detection': {'max_size': 384, 'quality': 80},
+    'context_validation': {'max_size': 512, 'quality': 80},
+    'sports_equipment': {'max_size': 768, 'quality': 85},
+    'human_pose': {'max_size': 768, 'quality': 85},
+    'text_accuracy': {
+        'max_size': 1280,
+        'quality': 90,
+        'crop': 'jersey',           # Torso crop from the alpha mask (full frame for opaque images)
+        'jersey_top': 0.15,         # Crop rows as fractions of the subject's height
+        'jersey_bottom': 0.65,
+        'jersey_padding': 0.05      # Horizontal padding as a fraction of the subject's width
+    }
+}
+
+# Perceptual Hash Index (see phash_index.py)
+PHASH_CONFIG = {
+    'db_filename': 'phash_index.sqlite3',  # Created in the export root
+    'hash_size': 8,                 # 8x8 DCT frequencies -> 64-bit hash
+    'highfreq_factor': 4,           # Hash computed from a (8*4)x(8*4) thumbnail
+    'default_max_distance': 6,      # Hamming radius treated as a near-duplicate
+    'max_distance_limit': 11,       # Largest radius served by the 4-chunk index (chunk radius 2)
+    'check_on_export': True         # Report near-duplicates in export results
+}
+
+# Static Assets (see static_assets.py)
+STATIC_ASSETS = {
+    'immutable_max_age': 31_536_000,   # Seconds; for URLs whose ?v= is the file's content version
+    'version_length': 12,              # Hex digits of the content hash used as ?v=
+    'revalidate': 'no-cache',          # Unversioned URLs: cache, but revalidate with ETag
+    'min_compress_size': 1024,         # Smaller files are served uncompressed
+    'compress_types': [                # Compressed in addition to text/*
+        'application/javascript',
+        'application/json',
+        'image/svg+xml'
+    ],
+    'gzip_level': 9,
+    'brotli_quality': 11               # Only used if the brotli package is installed
+}
+
+# Team Catalog (see team_catalog.py)
+TEAM_CATALOG = {
+    'league_aliases': {        # Requested league name -> league in team_colors.csv
+        'Premier League': 'EPL',
+        'PremiereLeague': 'EPL'
+    },
+    'fuzzy_cutoff': 0.8,       # difflib ratio for misspelled path-derived full team names
+    'nickname_fuzzy_cutoff': 0.9   # Stricter ratio for nicknames ('lakers' vs 'bakers' is 0.83)
+}
+
+# Custom Styles (see style_registry.py)
+STYLE_REGISTRY = {
+    'filename': 'custom_styles.json',                  # Next to the backend modules
+    'default_ids': ['custom-1', 'custom-2'],           # Slots that always exist
+    'id_pattern': r'^custom-[a-z0-9][a-z0-9_-]{0,47}$' # Also used to name reference files
+}
+
+# Prompt Assembly (see prompt_templates.py)
+PROMPT_TEMPLATES = {
+    'cache_size': 512          # Rendered prompts memoized per builder
+}
+
 # Image Processing
 IMAGE_PROCESSING = {
     'max_input_size': 1024,  # Max size for input images before processing
@@ -96,6 +328,30 @@ IMAGE_PROCESSING = {
     }
 }
 
+# Style Reference Images (decoded once at startup, see reference_assets.py)
+REFERENCE_CONFIG = {
+    'model_max_size': 1024,  # Longest edge of the reference sent to the model
+    'preview_size': 200,     # Preview thumbnail bounding box (pixels)
+    'resolved_cache_size': 256  # Style/sport -> reference resolutions remembered (LRU)
+}
+
+# Upload Ingest (checked from the image header, before any pixels are decoded)
+INGEST_CONFIG = {
+    'max_pixels': 64_000_000,  # Larger uploads are rejected with 413
+    'max_dimension': 16384     # Longest edge limit (pixels)
+}
+
+# Overlay Compositing
+COMPOSITING_CONFIG = {
+    'source_cache_size': 16,   # Decoded source images kept for editor sessions
+    'source_dir': os.path.join(tempfile.gettempdir(), 'fubo_overlay_sources'),  # Encoded sources shared by workers
+    'source_max_age': 6 * 3600,  # Seconds an unused shared source is kept
+    'preview_max_size': 480,   # Longest edge of variant previews (pixels)
+    'preview_sizes': [240, 480, 960],  # Allowed preview edges; requests snap to one (one cached overlay each)
+    'overlay_cache_size': 24,  # Prepared overlays kept (per file and preview scale)
+    'max_variants': 32         # Upper bound on variants per /apply_overlay_variants call
+}
+
 # Generation Settings
 GENERATION_CONFIG = {
     'temperature': 0.7,
@@ -136,6 +392,10 @@ def get_base_dir():
     """Get the base directory of the application."""
     return os.path.dirname(os.path.abspath(__file__))
 
+def resolve_app_path(path: str) -> str:
+    """Absolute path for a configured path; relative paths are anchored on the backend directory, not the working directory."""
+    return os.path.normpath(os.path.join(get_base_dir(), path))
+
 def get_overlay_path(aspect_ratio: str) -> str:
     """Get overlay directory path for specific aspect ratio."""
     base_dir = get_base_dir()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Export Catalog Module
+Searchable SQLite index of an export root:
+- One row per export: league, team, content type, style, export time,
+  dimensions, file size, sha256, pHash, QA score/status and batch index
+- Kept current by ExportManager (same entries as the manifest); the manifest
+  stays the source of truth and can rebuild the catalog at any time
+- Filtered, paginated listing ("NBA Highlights below QA 70 since Monday")
+  answered from indexes instead of walking Exports/{league}/{team}/
+
+Usage:
+    python export_catalog.py ../Exports                    # rebuild from manifest.jsonl
+    python export_catalog.py ../Exports --league NBA --content Highlights --max-qa 70
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from config import EXPORT_CATALOG
+
+
+COLUMNS = ('id', 'path', 'league', 'team', 'content', 'style', 'exported_at', 'width', 'height',
+           'size', 'sha256', 'phash', 'qa_score', 'qa_status', 'batch')
+
+SORT_ORDERS = {
+    'newest': 'exported_at DESC, id DESC',
+    'oldest': 'exported_at ASC, id ASC',
+    'qa_asc': 'qa_score IS NULL, qa_score ASC, exported_at DESC',
+    'qa_desc': 'qa_score IS NULL, qa_score DESC, exported_at DESC',
+    'largest': 'size DESC, exported_at DESC'
+}
+
+_CATALOGS: Dict[str, 'ExportCatalog'] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def catalog_row(entry: Dict) -> Dict:
+    """Catalog columns for a manifest entry (missing keys are None)."""
+    row = {column: entry.get(column) for column in COLUMNS}
+    qa = entry.get('qa')
+    if isinstance(qa, dict):
+        row['qa_score'] = qa.get('combined_qa_score')
+        row['qa_status'] = qa.get('status')
+    return row
+
+
+class ExportCatalog:
+    """
+    SQLite catalog of exports with filtered, paginated queries.
+
+    Rows are upserted: an entry that only carries some fields (e.g. a QA
+    score recorded later) updates those and keeps the rest.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS exports ('
+                ' id TEXT PRIMARY KEY,'
+                ' path TEXT,'
+                ' league TEXT COLLATE NOCASE, team TEXT COLLATE NOCASE,'
+                ' content TEXT COLLATE NOCASE, style TEXT COLLATE NOCASE,'
+                ' exported_at TEXT,'
+                ' width INTEGER, height INTEGER, size INTEGER,'
+                ' sha256 TEXT, phash TEXT,'
+                ' qa_score INTEGER, qa_status TEXT,'
+                ' batch TEXT)'
+            )
+            for name, columns in (('league_team', 'league, team, exported_at'),
+                                  ('content', 'content, exported_at'),
+                                  ('style', 'style, exported_at'),
+                                  ('exported_at', 'exported_at'),
+                                  ('qa_score', 'qa_score'),
+                                  ('sha256', 'sha256')):
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS exports_{name} ON exports ({columns})')
+
+    def upsert(self, entries: Iterable[Dict]) -> int:
+        """
+        Add or update exports from manifest entries, in one transaction.
+
+        Returns:
+            Number of entries written
+        """
+        rows = [catalog_row(entry) for entry in entries if entry.get('id')]
+        if not rows:
+            return 0
+
+        assignments = ', '.join(f'{column} = COALESCE(excluded.{column}, {column})' for column in COLUMNS[1:])
+        sql = (f"INSERT INTO exports ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)})"
+               f' ON CONFLICT(id) DO UPDATE SET {assignments}')
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+        return len(rows)
+
+    def set_batch(self, export_ids: Iterable[str], batch: str) -> int:
+        """Record the batch index file that lists these exports."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany('UPDATE exports SET batch = ? WHERE id = ?',
+                                            [(batch, export_id) for export_id in export_ids])
+        return cursor.rowcount
+
+    def remove(self, export_id: str) -> bool:
+        """Drop an export. Returns True if it was catalogued."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM exports WHERE id = ?', (export_id,))
+        return cursor.rowcount > 0
+
+    def get(self, export_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM exports WHERE id = ?', (export_id,)).fetchone()
+        return dict(row) if row else None
+
+    def query(self, league: str = None, team: str = None, content: str = None, style: str = None,
+              since: str = None, until: str = None, min_qa: int = None, max_qa: int = None,
+              qa_status: str = None, sha256: str = None, batch: str = None, order: str = 'newest',
+              offset: int = 0, limit: int = None) -> Dict:
+        """
+        Filtered, paginated listing.
+
+        Args:
+            league, team, content, style: Exact matches (case-insensitive)
+            since: Exported at or after this ISO date/time ('2026-10-12', '2026-10-12T08:00')
+            until: Exported before this ISO date/time
+            min_qa: QA score >= (exports without a QA score are excluded)
+            max_qa: QA score < (as in "below QA 70")
+            qa_status: 'pass', 'review' or 'fail'
+            sha256: Exact content hash
+            batch: Batch index filename
+            order: Key of SORT_ORDERS
+            offset: Rows to skip
+            limit: Page size (default/maximum in EXPORT_CATALOG)
+
+        Returns:
+            Dict with 'total' (matches across all pages), 'offset', 'limit',
+            'next_offset' (None on the last page) and 'exports'
+        """
+        if order not in SORT_ORDERS:
+            raise ValueError(f"Unknown order '{order}', expected one of {sorted(SORT_ORDERS)}")
+        offset = max(int(offset or 0), 0)
+        limit = min(max(int(limit or EXPORT_CATALOG['page_size']), 1), EXPORT_CATALOG['max_page_size'])
+
+        clauses = []
+        params = []
+        for column, value in (('league', league), ('team', team), ('content', content), ('style', style),
+                              ('qa_status', qa_status), ('sha256', sha256), ('batch', batch)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        for clause, value in (('exported_at >= ?', since), ('exported_at < ?', until),
+                              ('qa_score >= ?', min_qa), ('qa_score < ?', max_qa)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM exports{where}', params).fetchone()[0]
+            rows = self._conn.execute(
+                f'SELECT * FROM exports{where} ORDER BY {SORT_ORDERS[order]} LIMIT ? OFFSET ?',
+                params + [limit, offset]
+            ).fetchall()
+
+        return {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'next_offset': offset + limit if offset + limit < total else None,
+            'exports': [dict(row) for row in rows]
+        }
+
+    def facets(self) -> Dict[str, List[Dict]]:
+        """Export counts per league/team, content type and style (for dashboard filters)."""
+        facets = {}
+        with self._lock:
+            for name, columns in (('league_team', 'league, team'), ('content', 'content'), ('style', 'style')):
+                rows = self._conn.execute(
+                    f'SELECT {columns}, COUNT(*) AS count FROM exports GROUP BY {columns} ORDER BY {columns}'
+                ).fetchall()
+                facets[name] = [dict(row) for row in rows]
+        return facets
+
+    def rebuild(self, entries: Iterable[Dict]) -> int:
+        """Replace the catalog with the given manifest entries."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM exports')
+        return self.upsert(entries)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM exports').fetchone()[0]
+
+
+def get_catalog(export_root: str) -> ExportCatalog:
+    """Shared catalog for an export root, opened on first use."""
+    db_path = os.path.abspath(os.path.join(export_root, EXPORT_CATALOG['db_filename']))
+    with _CATALOGS_LOCK:
+        if db_path not in _CATALOGS:
+            _CATALOGS[db_path] = ExportCatalog(db_path)
+        return _CATALOGS[db_path]
+
+
+def main():
+    from export_manifest import get_manifest
+
+    parser = argparse.ArgumentParser(description='Rebuild or query the export catalog of an export root.')
+    parser.add_argument('export_root', help='Export root (e.g. ../Exports)')
+    parser.add_argument('--league', default=None)
+    parser.add_argument('--team', default=None)
+    parser.add_argument('--content', default=None)
+    parser.add_argument('--style', default=None)
+    parser.add_argument('--since', default=None, help='ISO date/time')
+    parser.add_argument('--max-qa', type=int, default=None, help='QA score below this')
+    parser.add_argument('--limit', type=int, default=None)
+    args = parser.parse_args()
+
+    catalog = get_catalog(args.export_root)
+    filters = {key: value for key, value in (('league', args.league), ('team', args.team),
+                                             ('content', args.content), ('style', args.style),
+                                             ('since', args.since), ('max_qa', args.max_qa))
+               if value is not None}
+
+    if not filters:
+        count = catalog.rebuild(get_manifest(args.export_root).entries())
+        print(f"Catalogued {count} exports: {catalog.db_path}")
+        return 0
+
+    result = catalog.query(limit=args.limit, **filters)
+    for export in result['exports']:
+        qa = '-' if export['qa_score'] is None else export['qa_score']
+        print(f"{export['exported_at']}  {qa:>3}  {export['path']}")
+    print(f"{len(result['exports'])} of {result['total']} matches")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
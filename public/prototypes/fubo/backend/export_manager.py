@@ -4,36 +4,164 @@ Handles organized export and import of generated thumbnails with:
 - League/Team folder structure
 - Consistent filename naming schema
 - Metadata JSON sidecars
-- Batch export functionality
+- Collision-free names ({...}_{date}_{time}_{ULID}) and an append-only
+  manifest per export root (see export_manifest.py)
+- Batch export functionality: JPEG encoding on the shared process pool,
+  writes on a bounded I/O thread pool, one fsync per directory
+- Renditions (sizes/formats from one decode) next to the master (see renditions.py)
+- SQLite export catalog for filtered search (see export_catalog.py)
+- Paginated folder import (ids, thumbnail and image URLs; see import_browser.py)
 """
 
 import os
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from PIL import Image
 import io
 import base64
+import hashlib
+
+from config import EXPORT_CONFIG, EXPORT_PIPELINE, resolve_app_path
+from export_catalog import get_catalog
+from export_manifest import find_manifest_root, get_manifest, new_export_id, export_id_time, qa_summary
+from renditions import render_renditions, rendition_filename, resolve_renditions
+
+
+def decode_base64_image(base64_string: str) -> Image.Image:
+    """
+    Convert base64 string to PIL Image.
+    
+    Args:
+        base64_string: Base64 encoded image (may include data URI prefix)
+    
+    Returns:
+        PIL Image object
+    """
+    # Remove data URI prefix if present
+    if ',' in base64_string:
+        base64_string = base64_string.split(',')[1]
+    
+    image_data = base64.b64decode(base64_string)
+    return Image.open(io.BytesIO(image_data))
+
+
+def flatten_for_jpeg(image: Image.Image) -> Image.Image:
+    """Composite RGBA onto white (JPEG has no alpha)."""
+    if image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    return image
+
+
+def encode_export_item(item: Dict) -> Dict:
+    """
+    Decode, flatten and JPEG-encode one batch item (runs in a worker process).
+    
+    Args:
+        item: Dict with 'index', 'image_data' (base64, may be a data URI) and
+              optionally 'renditions' (names, rendered from the same decode)
+    
+    Returns:
+        Dict with 'index', 'jpeg' (bytes), 'phash', 'size' (width, height) and
+        'renditions' (render_renditions() results), or 'index' and 'error'
+    """
+    from phash_index import compute_phash
+    
+    try:
+        image = flatten_for_jpeg(decode_base64_image(item['image_data']))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=EXPORT_CONFIG['jpeg_quality'])
+        return {'index': item['index'], 'jpeg': buffer.getvalue(), 'phash': compute_phash(image),
+                'size': image.size,
+                # The pool already runs one item per core: render this item's renditions inline
+                'renditions': render_renditions(image, item.get('renditions', []), max_workers=1)}
+    except Exception as e:
+        return {'index': item['index'], 'error': str(e)}
+
+
+def write_renditions(master_filepath: str, rendered: List[Dict], fsync: bool = False) -> tuple:
+    """
+    Write renditions next to their master file.
+    
+    Args:
+        master_filepath: Path of the master JPEG
+        rendered: render_renditions() results
+        fsync: fsync each file
+    
+    Returns:
+        (per-rendition results for the response, {name: entry} for the manifest)
+    """
+    directory, master_filename = os.path.split(master_filepath)
+    results = []
+    entries = {}
+    for rendition in rendered:
+        if 'error' in rendition:
+            results.append({'name': rendition['name'], 'success': False, 'error': rendition['error']})
+            continue
+        filename = rendition_filename(master_filename, rendition)
+        filepath = os.path.join(directory, filename)
+        try:
+            with open(filepath, 'xb') as f:
+                f.write(rendition['data'])
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            results.append({'name': rendition['name'], 'success': False, 'error': str(e)})
+            continue
+        
+        entry = {key: rendition[key] for key in ('format', 'width', 'height', 'quality')}
+        entry.update({'filename': filename, 'size': len(rendition['data'])})
+        entries[rendition['name']] = entry
+        results.append({'name': rendition['name'], 'success': True, 'filepath': filepath, **entry})
+    return results, entries
+
+
+def fsync_directory(path: str):
+    """Persist a directory's entries (new file names) to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 class ExportManager:
     """Manages export and import of thumbnail images with organized folder structure."""
     
-    def __init__(self, base_export_path: str = './Exports'):
+    def __init__(self, base_export_path: str = None):
         """
         Initialize export manager.
         
         Args:
-            base_export_path: Base directory for exports (default: ./Exports)
+            base_export_path: Base directory for exports (default: EXPORT_CONFIG['base_path'],
+                              ./Exports next to the backend modules, as file_access allows)
         """
-        self.base_export_path = base_export_path
+        self.base_export_path = base_export_path or resolve_app_path(EXPORT_CONFIG['base_path'])
         # Updated pattern to handle multi-word teams (e.g., Dallas_Cowboys)
-        # Matches: league_team_content_style_YYYYMMDD_HHMMSS
+        # Matches: league_team_content_style_YYYYMMDD_HHMMSS[_ULID]
         self.filename_pattern = re.compile(
             r'(?P<league>[^_]+)_(?P<team>.+?)_(?P<content>TeamNews|Highlights)_(?P<style>[^_]+)_(?P<date>\d{8})_(?P<time>\d{6})'
+            r'(?:_(?P<export_id>[0-9A-HJKMNP-TV-Z]{26}))?'
+            r'(?:_[^@]+)?'  # custom_suffix; '@' only appears in rendition names
         )
     
+    @property
+    def manifest(self):
+        """Manifest of this export root (see export_manifest.py)."""
+        return get_manifest(self.base_export_path)
+    
+    @property
+    def catalog(self):
+        """Search catalog of this export root (see export_catalog.py)."""
+        return get_catalog(self.base_export_path)
+    
     def create_export_path(self, league: str, team: str, create_dirs: bool = True) -> str:
         """
         Create export path following structure: /Exports/{league}/{team}/
@@ -64,10 +192,14 @@ class ExportManager:
         content_type: str,
         style: str,
         extension: str = 'jpg',
-        custom_suffix: str = None
+        custom_suffix: str = None,
+        export_id: str = None
     ) -> str:
         """
-        Generate filename following schema: {league}_{team}_{content}_{style}_{date}_{time}.jpg
+        Generate filename following schema: {league}_{team}_{content}_{style}_{date}_{time}_{export_id}.jpg
+        
+        The export id (a ULID) makes names unique even for exports in the
+        same second, and sorts in export order.
         
         Args:
             league: League name
@@ -76,6 +208,7 @@ class ExportManager:
             style: Style name
             extension: File extension (default: 'jpg')
             custom_suffix: Optional custom suffix
+            export_id: Id from new_export_id() (a new one if omitted)
         
         Returns:
             Generated filename
@@ -86,13 +219,14 @@ class ExportManager:
         safe_content = self._sanitize_filename(content_type)
         safe_style = self._sanitize_filename(style)
         
-        # Get current timestamp
-        now = datetime.now()
-        date_str = now.strftime('%Y%m%d')
-        time_str = now.strftime('%H%M%S')
+        # Timestamp comes from the export id so the two always agree
+        export_id = export_id or new_export_id()
+        exported_at = export_id_time(export_id)
+        date_str = exported_at.strftime('%Y%m%d')
+        time_str = exported_at.strftime('%H%M%S')
         
         # Build filename
-        filename = f"{safe_league}_{safe_team}_{safe_content}_{safe_style}_{date_str}_{time_str}"
+        filename = f"{safe_league}_{safe_team}_{safe_content}_{safe_style}_{date_str}_{time_str}_{export_id}"
         
         if custom_suffix:
             filename += f"_{custom_suffix}"
@@ -110,11 +244,15 @@ class ExportManager:
         style: str,
         metadata: Optional[Dict] = None,
         export_metadata: bool = False,
-        custom_suffix: str = None
+        custom_suffix: str = None,
+        renditions=None
     ) -> Dict:
         """
         Export a single image with optional metadata.
         
+        The master JPEG is written first; renditions are then derived from
+        the same decoded image and written next to it.
+        
         Args:
             image_data: Base64 encoded image data
             league: League name
@@ -124,39 +262,50 @@ class ExportManager:
             metadata: Optional metadata dict
             export_metadata: Whether to export JSON sidecar
             custom_suffix: Optional custom filename suffix
+            renditions: Rendition set or names (see renditions.resolve_renditions)
         
         Returns:
-            Dict with 'success', 'filepath', 'metadata_filepath' (if applicable)
+            Dict with 'success', 'export_id', 'filepath', 'metadata_filepath' (if applicable)
+            and 'renditions' (if requested)
         """
         try:
+            rendition_names = resolve_renditions(renditions)
+            
             # Create export path
             export_path = self.create_export_path(league, team, create_dirs=True)
             
             # Generate filename
+            export_id = new_export_id()
             filename = self.generate_filename(
                 league, team, content_type, style, 
-                extension='jpg', custom_suffix=custom_suffix
+                extension='jpg', custom_suffix=custom_suffix, export_id=export_id
             )
             
             filepath = os.path.join(export_path, filename)
             
-            # Decode and save image
-            image = self._base64_to_image(image_data)
+            # Decode and encode image (RGBA flattened onto white for JPEG)
+            image = flatten_for_jpeg(self._base64_to_image(image_data))
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=EXPORT_CONFIG['jpeg_quality'])
+            jpeg = buffer.getvalue()
             
-            # Convert to RGB if needed (for JPEG)
-            if image.mode == 'RGBA':
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1])
-                image = background
-            
-            image.save(filepath, format='JPEG', quality=95)
+            # 'x': never replace an existing file
+            with open(filepath, 'xb') as f:
+                f.write(jpeg)
             
             result = {
                 'success': True,
+                'export_id': export_id,
                 'filepath': filepath,
                 'filename': filename
             }
             
+            # Keep the perceptual hash index current (never fails the export)
+            try:
+                result.update(self._index_export(filepath, image, league, team))
+            except Exception as e:
+                print(f"Error indexing export {filepath}: {e}")
+            
             # Export metadata if requested
             if export_metadata and metadata:
                 metadata_filename = filename.replace('.jpg', '.json')
@@ -167,6 +316,17 @@ class ExportManager:
                 
                 result['metadata_filepath'] = metadata_filepath
             
+            rendition_entries = None
+            if rendition_names:
+                result['renditions'], rendition_entries = write_renditions(
+                    filepath, render_renditions(image, rendition_names)
+                )
+            
+            self._record_exports([self._manifest_entry(
+                export_id, filepath, league, team, content_type, style, jpeg, image.size,
+                result.get('phash'), metadata, result.get('metadata_filepath'), rendition_entries
+            )])
+            
             return result
             
         except Exception as e:
@@ -178,91 +338,256 @@ class ExportManager:
     def batch_export(
         self,
         images: List[Dict],
-        export_metadata: bool = False
+        export_metadata: bool = False,
+        progress: Optional[Callable[[Dict], None]] = None,
+        renditions=None
     ) -> Dict:
         """
         Export multiple images in batch.
         
+        Decoding and JPEG encoding run on the shared process pool while
+        finished files are written by a bounded thread pool, so a large batch
+        is limited by disk bandwidth rather than one core. Export folders are
+        created once per league/team and fsynced once at the end.
+        
         Args:
             images: List of dicts with {image_data, league, team, content_type, style, metadata}
             export_metadata: Whether to export JSON sidecars
+            progress: Called with each item's result as it completes (any order)
+            renditions: Rendition set or names for every item (an item's own
+                        'renditions' key overrides it)
         
         Returns:
             Dict with 'success', 'exported_count', 'failed_count', 'results'
+            (in input order), 'batch_index' (index file in the export root's
+            EXPORT_PIPELINE['batch_index_dir']) and 'elapsed_ms'
         """
-        results = []
-        exported_count = 0
-        failed_count = 0
-        
-        for img_data in images:
-            result = self.export_image(
-                image_data=img_data['image_data'],
-                league=img_data['league'],
-                team=img_data['team'],
-                content_type=img_data['content_type'],
-                style=img_data['style'],
-                metadata=img_data.get('metadata'),
-                export_metadata=export_metadata
+        start = time.perf_counter()
+        results: List[Optional[Dict]] = [None] * len(images)
+        plans = self._plan_batch(images, results, renditions)
+        
+        def finish(index: int, result: Dict):
+            result['index'] = index
+            results[index] = result
+            if progress:
+                progress(result)
+        
+        for index, result in enumerate(results):
+            if result is not None:
+                finish(index, result)
+        
+        items = [{'index': index, 'image_data': images[index]['image_data'], 'renditions': plan['renditions']}
+                 for index, plan in plans.items()]
+        lock = threading.Lock()
+        
+        entries = []
+        
+        def write(encoded: Dict) -> tuple:
+            plan = plans[encoded['index']]
+            return self._write_export(plan, encoded, images[encoded['index']], export_metadata, lock)
+        
+        def written(index: int, result: Dict, entry: Optional[Dict]):
+            if entry:
+                entries.append(entry)
+            finish(index, result)
+        
+        with ThreadPoolExecutor(max_workers=EXPORT_PIPELINE['io_workers']) as writers:
+            writing = set()
+            for encoded in self._encode_items(items):
+                if 'error' in encoded:
+                    finish(encoded['index'], {'success': False, 'error': encoded['error']})
+                    continue
+                writing.add(writers.submit(write, encoded))
+                # Bound the encoded JPEGs waiting in memory for a writer
+                while len(writing) >= EXPORT_PIPELINE['io_workers'] * EXPORT_PIPELINE['queue_per_worker']:
+                    done, writing = wait(writing, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        written(*future.result())
+            for future in writing:
+                written(*future.result())
+        
+        if EXPORT_PIPELINE['fsync']:
+            for directory in {plan['export_path'] for plan in plans.values()}:
+                try:
+                    fsync_directory(directory)
+                except OSError as e:
+                    print(f"Error syncing {directory}: {e}")
+        
+        # One manifest append (and fsync) for the whole batch, in export id order
+        self._record_exports(sorted(entries, key=lambda entry: entry['id']))
+        
+        exported = [result for result in results if result['success']]
+        batch_index = None
+        if exported:
+            batch_index = self.create_batch_index(
+                os.path.join(self.base_export_path, EXPORT_PIPELINE['batch_index_dir']),
+                [{key: result[key] for key in ('export_id', 'filepath', 'filename', 'phash') if key in result}
+                 for result in exported],
+                filename=f"batch_index_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
             )
-            
-            if result['success']:
-                exported_count += 1
-            else:
-                failed_count += 1
-            
-            results.append(result)
         
         return {
             'success': True,
-            'exported_count': exported_count,
-            'failed_count': failed_count,
-            'results': results
+            'exported_count': len(exported),
+            'failed_count': len(results) - len(exported),
+            'results': results,
+            'batch_index': batch_index,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1)
         }
     
+    def _plan_batch(self, images: List[Dict], results: List[Optional[Dict]], renditions=None) -> Dict[int, Dict]:
+        """
+        Pick the folder, export id and filename for every item, creating each folder once.
+        
+        Items that cannot be planned get their error result filled in.
+        
+        Returns:
+            Dict of input index -> {'export_id', 'export_path', 'filename', 'filepath', 'league', 'team',
+            'renditions'}
+        """
+        plans = {}
+        folders = {}
+        for index, img_data in enumerate(images):
+            try:
+                league, team = img_data['league'], img_data['team']
+                if (league, team) not in folders:
+                    folders[(league, team)] = self.create_export_path(league, team, create_dirs=True)
+                export_path = folders[(league, team)]
+                
+                # Ids are taken in input order, so the manifest sorts like the request
+                export_id = new_export_id()
+                filename = self.generate_filename(league, team, img_data['content_type'], img_data['style'],
+                                                  export_id=export_id)
+                plans[index] = {'export_id': export_id, 'export_path': export_path, 'filename': filename,
+                                'filepath': os.path.join(export_path, filename), 'league': league, 'team': team,
+                                'renditions': resolve_renditions(img_data.get('renditions', renditions))}
+            except Exception as e:
+                results[index] = {'success': False, 'error': str(e)}
+        return plans
+    
+    def _encode_items(self, items: List[Dict]):
+        """
+        Yield encode_export_item() results as they finish.
+        
+        Small batches are encoded in-process; larger ones go through the shared
+        process pool with a bounded number of items in flight.
+        """
+        if len(items) < EXPORT_PIPELINE['min_parallel_items']:
+            for item in items:
+                yield encode_export_item(item)
+            return
+        
+        from qa_batch import run_parallel
+        yield from run_parallel(encode_export_item, items)
+    
+    def _write_export(self, plan: Dict, encoded: Dict, img_data: Dict, export_metadata: bool,
+                      lock: threading.Lock) -> tuple:
+        """
+        Write one encoded export (runs on an I/O thread).
+        
+        Returns:
+            (index, result, manifest entry or None)
+        """
+        try:
+            with open(plan['filepath'], 'xb') as f:
+                f.write(encoded['jpeg'])
+                if EXPORT_PIPELINE['fsync']:
+                    f.flush()
+                    os.fsync(f.fileno())
+            
+            result = {
+                'success': True,
+                'export_id': plan['export_id'],
+                'filepath': plan['filepath'],
+                'filename': plan['filename'],
+                'phash': f"{encoded['phash']:016x}"
+            }
+            
+            metadata = img_data.get('metadata')
+            if export_metadata and metadata:
+                metadata_filepath = os.path.splitext(plan['filepath'])[0] + '.json'
+                with open(metadata_filepath, 'w') as f:
+                    json.dump(metadata, f, indent=2)
+                result['metadata_filepath'] = metadata_filepath
+            
+            rendition_entries = None
+            if encoded['renditions']:
+                result['renditions'], rendition_entries = write_renditions(
+                    plan['filepath'], encoded['renditions'], fsync=EXPORT_PIPELINE['fsync']
+                )
+            
+            # Keep the perceptual hash index current (never fails the export)
+            try:
+                with lock:
+                    result.update(self._index_export(plan['filepath'], None, plan['league'], plan['team'],
+                                                     phash=encoded['phash']))
+            except Exception as e:
+                print(f"Error indexing export {plan['filepath']}: {e}")
+            
+            entry = self._manifest_entry(
+                plan['export_id'], plan['filepath'], plan['league'], plan['team'], img_data['content_type'],
+                img_data['style'], encoded['jpeg'], encoded['size'], result['phash'], metadata,
+                result.get('metadata_filepath'), rendition_entries
+            )
+            return encoded['index'], result, entry
+        except Exception as e:
+            return encoded['index'], {'success': False, 'error': str(e)}, None
+    
     def import_images_from_folder(
         self,
         folder_path: str,
-        run_qa: bool = False
+        run_qa: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None
     ) -> Dict:
         """
-        Import images from a folder, parsing metadata from filenames.
+        List one page of the images in a folder.
+        
+        Folders inside an export root are read from its manifest, after
+        recording any exports in the folder it does not know yet (written
+        before the manifest existed, or copied in); other folders are
+        scanned and metadata parsed from filenames. Images are not read: each item
+        carries an id with thumbnail and full image URLs (see import_browser).
         
         Args:
             folder_path: Path to folder containing images
-            run_qa: Whether to run QA on imported images
+            run_qa: Start background technical QA for this page (poll /import_qa/<job_id>)
+            offset: Index of the first image to return
+            limit: Page size (default/maximum in IMPORT_BROWSER)
         
         Returns:
-            Dict with 'success', 'imported_count', 'images'
+            Dict with 'success', 'imported_count', 'images', 'total', 'offset',
+            'limit', 'next_offset' (None on the last page) and 'qa_job' if run_qa
         """
-        imported_images = []
+        from import_browser import QA_JOBS, image_entry, page_bounds
         
         try:
-            for filename in os.listdir(folder_path):
-                if not filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+            offset, limit = page_bounds(offset, limit)
+            listed = self._manifest_listing(folder_path)
+            from_manifest = listed is not None
+            if not from_manifest:
+                listed = self._directory_listing(folder_path)
+            
+            imported_images = []
+            for filepath, size, metadata in listed[offset:offset + limit]:
+                # Manifest entries may outlive their files
+                if from_manifest and not os.path.isfile(filepath):
                     continue
-                
-                filepath = os.path.join(folder_path, filename)
-                
-                # Parse filename
-                metadata = self.parse_filename(filename)
-                
-                if metadata:
-                    # Load image
-                    with open(filepath, 'rb') as f:
-                        image_data = base64.b64encode(f.read()).decode('utf-8')
-                    
-                    imported_images.append({
-                        'filename': filename,
-                        'filepath': filepath,
-                        'image_data': f'data:image/jpeg;base64,{image_data}',
-                        'metadata': metadata
-                    })
+                imported_images.append(image_entry(filepath, size, metadata))
             
-            return {
+            next_offset = offset + limit
+            result = {
                 'success': True,
                 'imported_count': len(imported_images),
-                'images': imported_images
+                'images': imported_images,
+                'total': len(listed),
+                'offset': offset,
+                'limit': limit,
+                'next_offset': next_offset if next_offset < len(listed) else None
             }
+            if run_qa and imported_images:
+                result['qa_job'] = QA_JOBS.start([image['filepath'] for image in imported_images])
+            return result
             
         except Exception as e:
             return {
@@ -270,6 +595,91 @@ class ExportManager:
                 'error': str(e)
             }
     
+    def _manifest_listing(self, folder_path: str) -> Optional[List[tuple]]:
+        """(filepath, size, metadata) for a folder's manifest entries in export order, or None if it has none."""
+        from import_browser import scan_folder
+        
+        root = find_manifest_root(folder_path)
+        if root is None:
+            return None
+        manifest = get_manifest(root)
+        manifest.backfill((filepath for filepath, _ in scan_folder(folder_path)), self.parse_filename)
+        entries = manifest.entries(folder=folder_path)
+        if not entries:
+            return None
+        # Backfilled files are appended after newer exports; their ids carry their file times
+        entries.sort(key=lambda entry: entry['id'])
+        
+        listed = []
+        for entry in entries:
+            exported_at = export_id_time(entry['id'])
+            metadata = {key: entry[key] for key in ('league', 'team', 'content', 'style')}
+            metadata.update({
+                'date': exported_at.strftime('%Y%m%d'),
+                'time': exported_at.strftime('%H%M%S'),
+                'export_id': entry['id']
+            })
+            metadata.update({key: entry[key] for key in ('sha256', 'phash', 'qa') if key in entry})
+            listed.append((entry['filepath'], entry.get('size'), metadata))
+        return listed
+    
+    def _directory_listing(self, folder_path: str) -> List[tuple]:
+        """(filepath, size, metadata) for images whose names parse, sorted by name."""
+        from import_browser import scan_folder
+        
+        listed = []
+        for filepath, size in scan_folder(folder_path):
+            # Renditions ('{master}@{name}.webp') belong to their master
+            if '@' in os.path.basename(filepath):
+                continue
+            
+            # Parse filename
+            metadata = self.parse_filename(os.path.basename(filepath))
+            if metadata:
+                listed.append((filepath, size, metadata))
+        return listed
+    
+    def get_export(self, export_id: str) -> Optional[Dict]:
+        """Manifest entry for an export id, or None."""
+        return self.manifest.get(export_id)
+    
+    def find_exports(self, **filters) -> List[Dict]:
+        """Manifest entries matching exact filters (league, team, content, style), oldest first."""
+        return self.manifest.entries(**self._name_filters(filters))
+    
+    def search_exports(self, **filters) -> Dict:
+        """Filtered, paginated catalog listing (see ExportCatalog.query)."""
+        return self.catalog.query(**self._name_filters(filters))
+    
+    def _name_filters(self, filters: Dict) -> Dict:
+        """
+        Drop unset filters and sanitize name filters the way filenames are.
+        
+        Entries store sanitized names ('New_York_Giants'), while callers pass
+        the display names used by /get_teams and the export requests.
+        """
+        return {
+            key: self._sanitize_filename(value) if key in ('league', 'team', 'content', 'style') else value
+            for key, value in filters.items() if value is not None
+        }
+    
+    def record_qa(self, export_id: str, qa_results: Dict) -> Optional[Dict]:
+        """
+        Store QA results for an earlier export in the manifest and catalog.
+        
+        Args:
+            export_id: Export id
+            qa_results: QA response (with 'combined_qa_score' and 'status')
+        
+        Returns:
+            The recorded summary, or None if qa_results has no combined score
+        """
+        qa = qa_summary(qa_results)
+        if qa:
+            self.manifest.update(export_id, qa=qa)
+            self.catalog.upsert([{'id': export_id, 'qa': qa}])
+        return qa
+    
     def parse_filename(self, filename: str) -> Optional[Dict]:
         """
         Parse filename to extract metadata.
@@ -283,8 +693,8 @@ class ExportManager:
         # Remove extension
         name_without_ext = os.path.splitext(filename)[0]
         
-        # Try to match pattern
-        match = self.filename_pattern.match(name_without_ext)
+        # Whole name must match, so renditions ('{master}@{name}') are not taken for masters
+        match = self.filename_pattern.fullmatch(name_without_ext)
         
         if match:
             return match.groupdict()
@@ -294,7 +704,8 @@ class ExportManager:
     def create_batch_index(
         self,
         export_path: str,
-        images: List[Dict]
+        images: List[Dict],
+        filename: str = 'batch_index.json'
     ) -> str:
         """
         Create a batch index JSON file listing all exported images.
@@ -302,6 +713,7 @@ class ExportManager:
         Args:
             export_path: Path where index should be created
             images: List of exported image metadata
+            filename: Index filename
         
         Returns:
             Path to created index file
@@ -312,13 +724,100 @@ class ExportManager:
             'images': images
         }
         
-        index_filepath = os.path.join(export_path, 'batch_index.json')
+        os.makedirs(export_path, exist_ok=True)
+        index_filepath = os.path.join(export_path, filename)
         
         with open(index_filepath, 'w') as f:
             json.dump(index_data, f, indent=2)
         
+        self._prune_batch_indexes(export_path)
+        
+        # Let catalog searches filter by batch
+        export_ids = [image['export_id'] for image in images if image.get('export_id')]
+        if export_ids:
+            try:
+                self.catalog.set_batch(export_ids, filename)
+            except Exception as e:
+                print(f"Error updating export catalog: {e}")
+        
         return index_filepath
     
+    def _prune_batch_indexes(self, export_path: str):
+        """Delete the oldest batch_index_*.json files beyond EXPORT_PIPELINE['batch_index_keep']."""
+        keep = EXPORT_PIPELINE['batch_index_keep']
+        if not keep:
+            return
+        # Timestamped names sort in creation order
+        indexes = sorted(name for name in os.listdir(export_path)
+                         if name.startswith('batch_index_') and name.endswith('.json'))
+        for name in indexes[:-keep]:
+            try:
+                os.remove(os.path.join(export_path, name))
+            except OSError as e:
+                print(f"Error removing old batch index {name}: {e}")
+    
+    def _manifest_entry(self, export_id: str, filepath: str, league: str, team: str, content_type: str,
+                        style: str, jpeg: bytes, dimensions: tuple, phash: Optional[str],
+                        metadata: Optional[Dict], metadata_filepath: Optional[str],
+                        renditions: Optional[Dict] = None) -> Dict:
+        """Manifest line for an export (names sanitized as in the filename)."""
+        return self.manifest.record(
+            export_id, filepath,
+            self._sanitize_filename(league), self._sanitize_filename(team),
+            self._sanitize_filename(content_type), self._sanitize_filename(style),
+            width=dimensions[0],
+            height=dimensions[1],
+            size=len(jpeg),
+            sha256=hashlib.sha256(jpeg).hexdigest(),
+            phash=phash,
+            qa=qa_summary(metadata),
+            metadata_path=os.path.basename(metadata_filepath) if metadata_filepath else None,
+            renditions=renditions or None
+        )
+    
+    def _record_exports(self, entries: List[Dict]):
+        """Append entries to the manifest and the catalog (never fails the export)."""
+        if not entries:
+            return
+        try:
+            self.manifest.append(entries)
+        except Exception as e:
+            print(f"Error updating export manifest: {e}")
+        try:
+            self.catalog.upsert(entries)
+        except Exception as e:
+            print(f"Error updating export catalog: {e}")
+    
+    def _index_export(self, filepath: str, image: Optional[Image.Image], league: str, team: str,
+                      phash: Optional[int] = None) -> Dict:
+        """
+        Add an exported image to the perceptual hash index.
+        
+        Args:
+            filepath: Path the image was written to
+            image: The image as saved (hashed unless phash is given)
+            league: League name
+            team: Team name
+            phash: Precomputed hash (batch exports hash in the encode worker)
+        
+        Returns:
+            Dict with 'phash' and, if enabled, 'near_duplicates' found before indexing
+        """
+        from phash_index import compute_phash, get_index
+        from config import PHASH_CONFIG
+        
+        index = get_index(self.base_export_path)
+        if phash is None:
+            phash = compute_phash(image)
+        
+        result = {'phash': f'{phash:016x}'}
+        if PHASH_CONFIG['check_on_export']:
+            result['near_duplicates'] = index.query(phash)
+        
+        index.add(filepath, phash=phash, league=self._sanitize_filename(league),
+                  team=self._sanitize_filename(team))
+        return result
+    
     def _sanitize_filename(self, name: str) -> str:
         """
         Sanitize filename by removing invalid characters.
@@ -349,10 +848,5 @@ class ExportManager:
         Returns:
             PIL Image object
         """
-        # Remove data URI prefix if present
-        if ',' in base64_string:
-            base64_string = base64_string.split(',')[1]
-        
-        image_data = base64.b64decode(base64_string)
-        return Image.open(io.BytesIO(image_data))
+        return decode_base64_image(base64_string)
 
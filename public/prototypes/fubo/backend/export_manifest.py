@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Export Manifest Module
+Append-only record of everything written under an export root:
+- One JSON line per export in {root}/manifest.jsonl (path, league/team,
+  content, style, size, sha256, pHash, QA scores)
+- Export ids are ULIDs: unique across workers, and sorting by id sorts by
+  export time, so filenames never collide and never need a sequence scan
+- Later lines for the same id update earlier ones (e.g. QA run after export)
+- Readers keep the parsed manifest in memory and only read lines appended
+  since their last look; lookups never list directories
+- Folder imports record files the manifest does not know yet (exported
+  before it existed, or copied in) the first time they see them
+
+Usage:
+    python export_manifest.py ../Exports        # add files exported before the manifest existed
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+from config import EXPORT_MANIFEST
+
+
+CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+_MANIFESTS: Dict[str, 'ExportManifest'] = {}
+_MANIFESTS_LOCK = threading.Lock()
+
+_ULID_LOCK = threading.Lock()
+_last_ulid = (0, 0)
+
+
+def new_export_id(timestamp: Optional[float] = None) -> str:
+    """
+    New ULID: 48-bit millisecond time + 80 random bits, Crockford base32.
+
+    Ids made by this process within the same millisecond increment the random
+    part, so they are strictly increasing.
+
+    Args:
+        timestamp: Unix time to encode (default now)
+    """
+    global _last_ulid
+    millis = int((time.time() if timestamp is None else timestamp) * 1000)
+    with _ULID_LOCK:
+        last_millis, last_random = _last_ulid
+        if millis <= last_millis and timestamp is None:
+            millis, randomness = last_millis, last_random + 1
+        else:
+            randomness = secrets.randbits(80)
+        _last_ulid = (millis, randomness)
+
+    value = (millis << 80) | (randomness & ((1 << 80) - 1))
+    return ''.join(CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+
+def export_id_time(export_id: str) -> datetime:
+    """Local time encoded in an export id."""
+    millis = 0
+    for char in export_id[:10]:
+        millis = (millis << 5) | CROCKFORD.index(char)
+    return datetime.fromtimestamp(millis / 1000)
+
+
+def _exported_time(parsed: Dict, filepath: str) -> float:
+    """Export time from a parsed filename's date and time, else the file's mtime."""
+    try:
+        return datetime.strptime(parsed['date'] + parsed['time'], '%Y%m%d%H%M%S').timestamp()
+    except (KeyError, TypeError, ValueError):
+        return os.path.getmtime(filepath)
+
+
+def qa_summary(metadata: Optional[Dict]) -> Optional[Dict]:
+    """
+    Combined QA score and status from export metadata, if it carries QA results.
+
+    Accepts the /run_qa response shape at the top level or under 'qa' / 'qa_results'.
+    """
+    if not metadata:
+        return None
+    for qa in (metadata, metadata.get('qa'), metadata.get('qa_results')):
+        if isinstance(qa, dict) and 'combined_qa_score' in qa:
+            return {'combined_qa_score': qa['combined_qa_score'], 'status': qa.get('status')}
+    return None
+
+
+class ExportManifest:
+    """
+    In-memory view of an export root's manifest.jsonl.
+
+    The file is only ever appended to, so a refresh reads from the last
+    offset; it is re-read in full only if it was replaced or truncated.
+    Appends take an exclusive flock shared by every worker process.
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Export root (the manifest lives directly inside it)
+        """
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, EXPORT_MANIFEST['filename'])
+        self.lock_path = self.path + '.lock'
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode: Optional[int]):
+        self._inode = inode
+        self._offset = 0
+        self._records: Dict[str, Dict] = {}
+        self._folders: Dict[str, List[str]] = {}
+
+    def record(self, export_id: str, filepath: str, league: str, team: str, content: str, style: str,
+               **fields) -> Dict:
+        """
+        Build a manifest entry for a file below the root.
+
+        Args:
+            export_id: ULID from new_export_id()
+            filepath: Absolute path of the exported file
+            league, team, content, style: Export parameters (as used in the filename)
+            **fields: Extra keys ('size', 'sha256', 'phash', 'qa', 'metadata_path', ...)
+
+        Returns:
+            Entry for append()
+        """
+        entry = {
+            'id': export_id,
+            'path': os.path.relpath(filepath, self.root).replace(os.sep, '/'),
+            'league': league,
+            'team': team,
+            'content': content,
+            'style': style,
+            'exported_at': export_id_time(export_id).isoformat(timespec='milliseconds')
+        }
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        return entry
+
+    def append(self, entries: Iterable[Dict]) -> int:
+        """
+        Append entries in one write (one fsync per call).
+
+        Returns:
+            Number of entries written
+        """
+        lines = [json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries]
+        if not lines:
+            return 0
+        data = ''.join(lines).encode('utf-8')
+
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, self._file_lock():
+            self._write(data)
+        return len(lines)
+
+    def backfill(self, filepaths: Iterable[str], parse_filename: Callable[[str], Optional[Dict]]) -> int:
+        """
+        Record files below the root that the manifest does not know yet.
+
+        The check and the write happen under the file lock, so workers that
+        backfill the same folder at once record each file only once.
+
+        Args:
+            filepaths: Candidate files (renditions and names that do not parse are skipped)
+            parse_filename: ExportManager.parse_filename
+
+        Returns:
+            Number of entries added
+        """
+        candidates = []
+        for filepath in filepaths:
+            name = os.path.basename(filepath)
+            # Renditions ('{master}@{name}.webp') are recorded with their master
+            if '@' in name or not name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                continue
+            parsed = parse_filename(name)
+            if parsed:
+                candidates.append((filepath, os.path.relpath(filepath, self.root).replace(os.sep, '/'), parsed))
+
+        # Usually every file is known already, and no lock is needed
+        known = self.paths()
+        if all(path in known for _, path, _ in candidates):
+            return 0
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            known = {entry['path'] for entry in self._records.values() if 'path' in entry}
+            entries = [
+                self.record(parsed.get('export_id') or new_export_id(_exported_time(parsed, filepath)), filepath,
+                            parsed['league'], parsed['team'], parsed['content'], parsed['style'],
+                            size=os.path.getsize(filepath))
+                for filepath, path, parsed in candidates if path not in known
+            ]
+            if entries:
+                self._write(''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries).encode('utf-8'))
+        return len(entries)
+
+    def _write(self, data: bytes):
+        """Append raw lines (caller holds _lock and the file lock)."""
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if EXPORT_MANIFEST['fsync']:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def update(self, export_id: str, **fields) -> int:
+        """Record new values (e.g. QA scores) for an existing export."""
+        return self.append([{'id': export_id, **fields}])
+
+    def get(self, export_id: str) -> Optional[Dict]:
+        """Entry for an export id (with 'filepath' resolved), or None."""
+        with self._lock:
+            self._refresh()
+            entry = self._records.get(export_id)
+            return self._resolved(entry) if entry else None
+
+    def entries(self, folder: Optional[str] = None, **filters) -> List[Dict]:
+        """
+        Entries in export order.
+
+        Args:
+            folder: Only files directly inside this folder
+            **filters: Exact matches on entry keys (league='NFL', content='TeamNews', ...)
+
+        Returns:
+            List of entries with 'filepath' resolved
+        """
+        with self._lock:
+            self._refresh()
+            if folder is not None:
+                ids = self._folders.get(self._folder_key(folder), [])
+                entries = [self._records[export_id] for export_id in ids]
+            else:
+                entries = list(self._records.values())
+
+        return [self._resolved(entry) for entry in entries
+                if all(entry.get(key) == value for key, value in filters.items())]
+
+    def paths(self) -> set:
+        """Relative paths of every recorded file."""
+        with self._lock:
+            self._refresh()
+            return {entry['path'] for entry in self._records.values() if 'path' in entry}
+
+    def _resolved(self, entry: Dict) -> Dict:
+        entry = dict(entry)
+        if 'path' in entry:
+            entry['filepath'] = os.path.join(self.root, *entry['path'].split('/'))
+        return entry
+
+    def _folder_key(self, folder: str) -> str:
+        relative = os.path.relpath(os.path.abspath(folder), self.root).replace(os.sep, '/')
+        return '' if relative == '.' else relative
+
+    def _refresh(self):
+        """Read lines appended since the last refresh (caller holds _lock)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._inode is not None or self._records:
+                self._reset(None)
+            return
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset(stat.st_ino)
+        if stat.st_size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+
+        # A line still being written has no newline yet; pick it up next time
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                print(f"Skipping bad manifest line in {self.path}: {e}")
+                continue
+            self._apply(entry)
+
+    def _apply(self, entry: Dict):
+        export_id = entry.get('id')
+        if not export_id:
+            return
+        existing = self._records.get(export_id)
+        if existing is None:
+            self._records[export_id] = entry
+            if 'path' in entry:
+                folder = entry['path'].rpartition('/')[0]
+                self._folders.setdefault(folder, []).append(export_id)
+        else:
+            existing.update(entry)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_manifest(export_root: str) -> ExportManifest:
+    """Shared manifest for an export root, created on first use."""
+    root = os.path.abspath(export_root)
+    with _MANIFESTS_LOCK:
+        if root not in _MANIFESTS:
+            _MANIFESTS[root] = ExportManifest(root)
+        return _MANIFESTS[root]
+
+
+def find_manifest_root(folder: str, levels: int = 2) -> Optional[str]:
+    """
+    Export root whose manifest covers a folder (the folder itself or a parent).
+
+    Args:
+        folder: Folder being imported (e.g. Exports/NFL/Giants)
+        levels: Parents to check ({root}/{league}/{team} needs 2)
+
+    Returns:
+        Root path, or None if no manifest is found
+    """
+    path = os.path.abspath(folder)
+    for _ in range(levels + 1):
+        if os.path.isfile(os.path.join(path, EXPORT_MANIFEST['filename'])):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return None
+
+
+def main():
+    from export_manager import ExportManager
+
+    parser = argparse.ArgumentParser(description='Add existing exports to an export root manifest.')
+    parser.add_argument('export_root', help='Export root (e.g. ../Exports)')
+    args = parser.parse_args()
+
+    manifest = get_manifest(args.export_root)
+    export_mgr = ExportManager()
+
+    filepaths = []
+    for directory, dirs, files in os.walk(manifest.root):
+        dirs.sort()
+        filepaths.extend(os.path.join(directory, name) for name in sorted(files))
+
+    added = manifest.backfill(filepaths, export_mgr.parse_filename)
+    print(f"Added {added} exports: {manifest.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
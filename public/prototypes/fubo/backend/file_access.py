@@ -0,0 +1,65 @@
+"""
+File Access Module
+Keeps paths that arrive in requests inside the folders the app works on:
+- Allowed roots: the export root plus FILE_ACCESS['import_roots'] and the
+  folders listed in the FUBO_IMPORT_ROOTS environment variable
+- Relative roots are anchored on the backend directory (resolve_app_path),
+  so the allowed folders do not depend on the working directory
+- Paths are resolved with realpath first, so '..' segments and symlinks
+  cannot step outside a root
+"""
+
+import os
+from typing import List
+
+from config import EXPORT_CONFIG, FILE_ACCESS, resolve_app_path
+
+
+class PathNotAllowed(ValueError):
+    """Raised when a requested path is missing or outside the allowed roots."""
+
+    def __init__(self, message: str, status_code: int = 403):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def allowed_roots() -> List[str]:
+    """Resolved export and import roots that request paths may point into."""
+    roots = [EXPORT_CONFIG['base_path']] + list(FILE_ACCESS['import_roots'])
+    roots += [root for root in os.getenv(FILE_ACCESS['import_roots_env'], '').split(os.pathsep) if root]
+    return [os.path.realpath(resolve_app_path(root)) for root in roots]
+
+
+def is_allowed(path: str) -> bool:
+    """Whether a path resolves to somewhere inside an allowed root."""
+    resolved = os.path.realpath(path)
+    for root in allowed_roots():
+        if resolved == root or resolved.startswith(root.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def resolve_path(path: str, kind: str = 'file') -> str:
+    """
+    Resolve a path from a request and check it may be read.
+
+    Args:
+        path: File or folder path as sent by the client
+        kind: 'file' or 'folder'
+
+    Returns:
+        Resolved absolute path
+
+    Raises:
+        PathNotAllowed: Outside the allowed roots (403) or not found (404)
+    """
+    if not isinstance(path, str) or not path:
+        raise PathNotAllowed(f'Invalid {kind} path', 400)
+    resolved = os.path.realpath(path)
+    if not is_allowed(resolved):
+        raise PathNotAllowed(f'{kind.capitalize()} is outside the export and import folders: {path}')
+
+    exists = os.path.isfile(resolved) if kind == 'file' else os.path.isdir(resolved)
+    if not exists:
+        raise PathNotAllowed(f'{kind.capitalize()} not found: {path}', 404)
+    return resolved
@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration.
+
+    FUBO_PRELOAD=1 gunicorn -c gunicorn.conf.py app:app
+
+When FUBO_PRELOAD is set (or LIFECYCLE['preload'] is on), the app is
+imported once in the master (preload_app), which runs the 'preload' warmup;
+workers are forked from it and share those pages copy-on-write. Each worker
+then runs the 'worker' warmup (onnxruntime sessions, which do not survive
+fork) before serving. Without it, each worker imports the app itself.
+
+Workers are gunicorn's default sync workers, one request at a time, as with
+`gunicorn --workers 2`; scale with FUBO_WORKERS.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lifecycle import preload_enabled  # noqa: E402
+
+bind = os.getenv('FUBO_BIND', '0.0.0.0:5001')
+workers = int(os.getenv('FUBO_WORKERS', '2'))
+timeout = int(os.getenv('FUBO_TIMEOUT', '300'))  # Generation requests wait on Gemini
+preload_app = preload_enabled()
+
+
+def post_fork(server, worker):
+    from lifecycle import run_warmup
+
+    if preload_enabled():
+        run_warmup('worker')
@@ -0,0 +1,155 @@
+"""
+Image Ingest Module
+Decodes uploaded images at the size the pipeline actually needs:
+- Header-only inspection with decompression-bomb limits enforced before decoding
+- JPEG DCT-scaled decoding via Image.draft() to the nearest size >= target
+- Mode normalization (alpha flattening, palette/CMYK/16-bit to RGB)
+"""
+
+import io
+import math
+from PIL import Image, UnidentifiedImageError
+from typing import Optional, Tuple, Union, BinaryIO
+
+from config import INGEST_CONFIG
+
+
+class UploadRejected(ValueError):
+    """Raised when an upload cannot or should not be decoded."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def open_upload(source: Union[bytes, BinaryIO]) -> Image.Image:
+    """
+    Open an upload and validate its header without decoding pixel data.
+
+    Args:
+        source: Raw bytes or a file-like object (e.g. a werkzeug FileStorage)
+
+    Returns:
+        Lazily-loaded PIL Image object
+
+    Raises:
+        UploadRejected: Unreadable image (400) or over the configured limits (413)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    try:
+        image = Image.open(source)
+    except Image.DecompressionBombError as e:
+        raise UploadRejected(f'Image too large: {e}', 413)
+    except UnidentifiedImageError:
+        raise UploadRejected('Unsupported or corrupt image file. Supported formats: PNG, JPG, JPEG, WebP')
+
+    width, height = image.size
+    if width <= 0 or height <= 0:
+        raise UploadRejected('Image has no pixels')
+
+    if max(width, height) > INGEST_CONFIG['max_dimension']:
+        raise UploadRejected(
+            f"Image dimension {max(width, height)}px exceeds the {INGEST_CONFIG['max_dimension']}px limit", 413
+        )
+
+    if width * height > INGEST_CONFIG['max_pixels']:
+        raise UploadRejected(
+            f"Image is {width * height / 1e6:.1f}MP, limit is {INGEST_CONFIG['max_pixels'] / 1e6:.0f}MP", 413
+        )
+
+    return image
+
+
+def draft_scale(size: Tuple[int, int], target: Tuple[int, int], fit: str = 'cover') -> float:
+    """
+    Smallest uniform scale at which the source still covers the target.
+
+    Args:
+        size: Source (width, height)
+        target: Target (width, height), or (max_size, max_size) for 'contain'
+        fit: 'cover' (target is filled after cropping, see resize_to_custom_dimensions)
+             or 'contain' (longest edge reaches max(target), see Image.thumbnail)
+
+    Returns:
+        Scale factor; >= 1.0 means the source is not larger than needed
+    """
+    width, height = size
+    if fit == 'contain':
+        return max(target) / max(width, height)
+    return max(target[0] / width, target[1] / height)
+
+
+def ingest_image(source: Union[bytes, BinaryIO], target: Optional[Tuple[int, int]] = None, fit: str = 'cover',
+                 mode: str = 'RGB', background: Optional[Tuple[int, int, int]] = None) -> Image.Image:
+    """
+    Open, validate and decode an upload, scaled for the given target.
+
+    JPEG sources are DCT-scaled while decoding (1/2, 1/4 or 1/8), so a 24MP
+    phone photo destined for 1920x1080 is never materialized at full size.
+    Other formats decode at native size; the caller resizes as before.
+
+    Args:
+        source: Raw bytes or a file-like object
+        target: Output size the image is headed for, or None to decode at native size
+        fit: How the caller fits the image to target ('cover' or 'contain')
+        mode: Output mode ('RGB', 'RGBA', or None to keep the source mode)
+        background: For mode 'RGB', flatten transparency onto this colour instead of
+                    simply dropping the alpha channel
+
+    Returns:
+        Decoded PIL Image object (at least as large as target when the source allows)
+
+    Raises:
+        UploadRejected: See open_upload()
+    """
+    image = open_upload(source)
+    source_size = image.size
+
+    if target and image.format == 'JPEG':
+        scale = draft_scale(source_size, target, fit)
+        if scale < 1.0:
+            requested = (math.ceil(source_size[0] * scale), math.ceil(source_size[1] * scale))
+            image.draft(image.mode, requested)
+
+    try:
+        image.load()
+    except (OSError, SyntaxError) as e:
+        raise UploadRejected(f'Could not decode image: {e}')
+
+    if image.size != source_size:
+        print(f"Ingested {image.format} {source_size[0]}x{source_size[1]} at {image.size[0]}x{image.size[1]} (draft)")
+
+    return normalize_mode(image, mode, background)
+
+
+def normalize_mode(image: Image.Image, mode: Optional[str] = 'RGB',
+                   background: Optional[Tuple[int, int, int]] = None) -> Image.Image:
+    """
+    Convert an image to the mode the pipeline expects.
+
+    Args:
+        image: PIL Image object
+        mode: Target mode ('RGB', 'RGBA', or None to keep the source mode)
+        background: For 'RGB', colour to flatten transparency onto (None drops alpha)
+
+    Returns:
+        PIL Image object in the requested mode
+    """
+    if mode is None or image.mode == mode:
+        return image
+
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+    if mode == 'RGB' and background is not None and has_alpha:
+        rgba = image.convert('RGBA')
+        flattened = Image.new('RGB', rgba.size, background)
+        flattened.paste(rgba, mask=rgba.getchannel('A'))
+        return flattened
+
+    if image.mode.startswith('I;16'):
+        # 16-bit greyscale PNG: scale down to 8 bits rather than clipping
+        image = image.convert('I').point(lambda v: v * (1 / 256)).convert('L')
+
+    return image.convert(mode)
@@ -0,0 +1,281 @@
+"""
+Import Browser Module
+Pages through an import folder without loading the images:
+- os.scandir listing (names and sizes only), sorted so offsets are stable
+- Stateless image ids (any worker can serve any id); an id only names a
+  path, and only paths inside the export/import roots are served
+- Small JPEG thumbnails made on demand (DCT-scaled decode) and kept in an LRU
+- Background QA jobs on the shared process pool; progress is appended to a
+  JSONL file per job, so a poll can land on any worker
+"""
+
+import base64
+import binascii
+import io
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from config import IMPORT_BROWSER, resolve_app_path
+from file_access import is_allowed
+from static_assets import file_signature, strong_etag
+
+
+IMAGE_MIMETYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp'
+}
+
+
+def image_mimetype(path: str) -> Optional[str]:
+    """Content type for an importable image path, or None for other files."""
+    return IMAGE_MIMETYPES.get(os.path.splitext(path)[1].lower())
+
+
+def image_id(path: str) -> str:
+    """Id for an image file (URL-safe encoding of its absolute path, not a secret)."""
+    encoded = base64.urlsafe_b64encode(os.path.abspath(path).encode('utf-8'))
+    return encoded.decode('ascii').rstrip('=')
+
+
+def image_path(image_id: str) -> Optional[str]:
+    """
+    File behind an image id.
+
+    Returns:
+        Resolved absolute path, or None if the id is malformed, not an image,
+        outside the export/import roots (see file_access.py), or gone
+    """
+    try:
+        path = base64.urlsafe_b64decode(image_id + '=' * (-len(image_id) % 4)).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not os.path.isabs(path):
+        return None
+    path = os.path.realpath(path)
+    if not image_mimetype(path) or not is_allowed(path) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def page_bounds(offset, limit) -> Tuple[int, int]:
+    """Clamp request paging parameters to IMPORT_BROWSER limits."""
+    offset = max(int(offset or 0), 0)
+    limit = int(limit or IMPORT_BROWSER['page_size'])
+    return offset, min(max(limit, 1), IMPORT_BROWSER['max_page_size'])
+
+
+def scan_folder(folder_path: str) -> List[Tuple[str, int]]:
+    """
+    Importable images directly inside a folder, sorted by name.
+
+    Returns:
+        List of (path, size in bytes)
+    """
+    images = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if image_mimetype(entry.name) and entry.is_file():
+                images.append((entry.path, entry.stat().st_size))
+    images.sort()
+    return images
+
+
+def image_entry(path: str, size: int, metadata: Optional[Dict]) -> Dict:
+    """One import listing item: ids and URLs instead of image data."""
+    item_id = image_id(path)
+    return {
+        'id': item_id,
+        'filename': os.path.basename(path),
+        'filepath': path,
+        'mimetype': image_mimetype(path),
+        'size': size,
+        'metadata': metadata,
+        'thumbnail_url': f'/import_thumbnail/{item_id}',
+        'image_url': f'/import_image/{item_id}'
+    }
+
+
+class ThumbnailCache:
+    """
+    LRU of encoded thumbnails keyed by path and file signature.
+
+    An edited or replaced file gets a new signature, so stale thumbnails are
+    never served; they just age out.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Thumbnail for an image file.
+
+        Returns:
+            (JPEG bytes, ETag), or None if the file does not exist
+        """
+        signature = file_signature(path)
+        if signature is None:
+            return None
+        key = (path, signature)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        data = self._build(path)
+        cached = (data, strong_etag(data))
+        with self._lock:
+            self._entries[key] = cached
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    @staticmethod
+    def _build(path: str) -> bytes:
+        from image_ingest import ingest_image
+
+        size = IMPORT_BROWSER['thumbnail_size']
+        with open(path, 'rb') as f:
+            # JPEGs decode DCT-scaled close to the thumbnail size
+            image = ingest_image(f, target=(size, size), fit='contain', mode='RGB', background=(255, 255, 255))
+        image.thumbnail((size, size))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=IMPORT_BROWSER['thumbnail_quality'])
+        return buffer.getvalue()
+
+    def stats(self) -> Dict:
+        return {'size': len(self._entries), 'max_entries': self.max_entries,
+                'hits': self.hits, 'misses': self.misses}
+
+
+class QAJobs:
+    """
+    Technical QA runs started by imports, processed in the background.
+
+    Each job feeds its images through qa_batch.run_parallel on a daemon
+    thread and appends its progress to {jobs_dir}/{job_id}.jsonl: a header
+    line, one line per result, then a final status line. Every worker reads
+    the same files, so a job can be polled through any of them. Job files
+    older than IMPORT_BROWSER['qa_job_max_age'] are removed as new jobs start.
+    """
+
+    JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, jobs_dir: str, max_age: float):
+        self.jobs_dir = jobs_dir
+        self.max_age = max_age
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f'{job_id}.jsonl')
+
+    def start(self, paths: List[str], aspect_ratio: str = 'auto', sampling: Optional[str] = None) -> str:
+        """
+        Queue technical QA for image files.
+
+        Args:
+            paths: Image files (QA results are keyed by image_id(path))
+            aspect_ratio: Expected ratio, or 'auto' for the nearest configured one
+            sampling: Technical QA sampling mode
+
+        Returns:
+            Job id
+        """
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        header = {'job_id': job_id, 'status': 'running', 'total': len(paths), 'started_at': time.time()}
+        job_file = open(self._job_path(job_id), 'a')
+        self._write(job_file, header)
+
+        items = [{'id': image_id(path), 'path': path, 'aspect_ratio': aspect_ratio, 'sampling': sampling}
+                 for path in paths]
+        threading.Thread(target=self._run, args=(job_file, header, items), daemon=True).start()
+        return job_id
+
+    @staticmethod
+    def _write(job_file, record: Dict):
+        # One complete line per write; readers ignore a trailing partial line
+        job_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        job_file.flush()
+
+    def _run(self, job_file, header: Dict, items: List[Dict]):
+        from qa_batch import qa_item, run_parallel
+
+        final = {'status': 'done'}
+        with job_file:
+            try:
+                for result in run_parallel(qa_item, items):
+                    self._write(job_file, {'result': result})
+            except Exception as e:
+                print(f"Error in import QA job {header['job_id']}: {e}")
+                final = {'status': 'error', 'error': str(e)}
+            final['elapsed_ms'] = round((time.time() - header['started_at']) * 1000, 1)
+            self._write(job_file, final)
+
+    def _prune(self):
+        cutoff = time.time() - self.max_age
+        with os.scandir(self.jobs_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.jsonl') and entry.stat().st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+
+    def get(self, job_id: str, since: int = 0) -> Optional[Dict]:
+        """
+        Progress of a job.
+
+        Args:
+            job_id: From start()
+            since: Skip results already seen (number previously received)
+
+        Returns:
+            Dict with 'status', 'total', 'completed', 'results' (new ones only),
+            or None for unknown or expired jobs
+        """
+        if not self.JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._job_path(job_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].splitlines()
+        if not lines:
+            return None
+
+        status = json.loads(lines[0])
+        status['elapsed_ms'] = None
+        results = []
+        for line in lines[1:]:
+            record = json.loads(line)
+            if 'result' in record:
+                results.append(record['result'])
+            else:
+                status.update(record)
+        status.update({'completed': len(results), 'results': results[max(since, 0):]})
+        return status
+
+
+THUMBNAILS = ThumbnailCache(IMPORT_BROWSER['thumbnail_cache_size'])
+QA_JOBS = QAJobs(resolve_app_path(IMPORT_BROWSER['qa_jobs_dir']), IMPORT_BROWSER['qa_job_max_age'])
@@ -0,0 +1,201 @@
+"""
+Application Lifecycle Module
+Keeps worker start-up cheap and predictable:
+- Heavy dependencies (google.generativeai, ...) behind LazyModule proxies,
+  imported on first attribute access instead of at `import app`
+- Gemini configured once per process (configure_gemini), not per call
+- Optional warmup, enabled with FUBO_PRELOAD=1 (or LIFECYCLE['preload']):
+  'preload' tasks run where the app is imported, which under
+  `gunicorn --preload` is the master, so workers fork with the imports and
+  caches already in copy-on-write memory; 'worker' tasks (things that do
+  not survive fork, like onnxruntime sessions) run in each worker after fork
+- Startup phase timings (STARTUP.report(), /startup_report)
+
+Usage:
+    FUBO_PRELOAD=1 gunicorn -c gunicorn.conf.py app:app
+"""
+
+import gc
+import importlib
+import os
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from config import LIFECYCLE
+
+
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    """Named phase durations for the current process, in the order they ran."""
+
+    def __init__(self):
+        self._phases: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, error)
+
+    def record(self, name: str, elapsed_ms: float, error: Optional[str] = None):
+        entry = {'phase': name, 'ms': round(elapsed_ms, 1), 'pid': os.getpid()}
+        if error:
+            entry['error'] = error
+        with self._lock:
+            self._phases.append(entry)
+
+    def report(self) -> Dict:
+        """Phases so far and milliseconds since this module was imported."""
+        with self._lock:
+            phases = list(self._phases)
+        return {
+            'pid': os.getpid(),
+            'uptime_ms': round((time.perf_counter() - PROCESS_START) * 1000, 1),
+            'phases': phases,
+            'lazy_modules': {name: module.loaded for name, module in LAZY_MODULES.items()}
+        }
+
+
+STARTUP = StartupTimer()
+LAZY_MODULES: Dict[str, 'LazyModule'] = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    `genai = LazyModule('google.generativeai')` can be used exactly like
+    `import google.generativeai as genai`; the import (timed in STARTUP)
+    happens when the first request needs it, or during warmup.
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None):
+        super().__init__(name)
+        self.__dict__['_on_load'] = on_load
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+        LAZY_MODULES[name] = self
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def load(self) -> types.ModuleType:
+        module = self.__dict__['_module']
+        if module is not None:
+            return module
+        with self.__dict__['_lock']:
+            if self.__dict__['_module'] is None:
+                with STARTUP.phase(f'import {self.__name__}'):
+                    module = importlib.import_module(self.__name__)
+                    if self.__dict__['_on_load']:
+                        self.__dict__['_on_load'](module)
+                self.__dict__['_module'] = module
+            return self.__dict__['_module']
+
+    def __getattr__(self, attribute: str):
+        return getattr(self.load(), attribute)
+
+
+_GEMINI_LOCK = threading.Lock()
+_gemini_key = None
+
+
+def _configure_from_env(module: types.ModuleType):
+    api_key = os.getenv('GEMINI_API_KEY')
+    if api_key:
+        _configure(module, api_key)
+
+
+def _configure(module: types.ModuleType, api_key: str):
+    global _gemini_key
+    with _GEMINI_LOCK:
+        if api_key != _gemini_key:
+            module.configure(api_key=api_key)
+            _gemini_key = api_key
+
+
+genai = LazyModule('google.generativeai', on_load=_configure_from_env)
+
+
+def configure_gemini(api_key: Optional[str]):
+    """Point the Gemini client at an API key (no-op if it already uses it)."""
+    if api_key and api_key != _gemini_key:
+        _configure(genai.load(), api_key)
+
+
+_WARMUP_TASKS: Dict[str, List] = {'preload': [], 'worker': []}
+
+
+def register_warmup(name: str, task: Callable[[], object], stage: str = 'preload'):
+    """
+    Add a warmup task.
+
+    Args:
+        name: Phase name in the startup report
+        task: Callable; a returned string is printed as its summary
+        stage: 'preload' (fork-safe, runs once where the app is imported) or
+               'worker' (runs in every worker process after fork)
+    """
+    _WARMUP_TASKS[stage].append((name, task))
+
+
+def preload_enabled() -> bool:
+    """Whether warmup is on (FUBO_PRELOAD env var, else LIFECYCLE['preload'])."""
+    flag = os.getenv('FUBO_PRELOAD')
+    if flag is None:
+        return LIFECYCLE['preload']
+    return flag.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def run_warmup(stage: str = 'preload') -> Dict:
+    """
+    Run a stage's warmup tasks, timing each; failures are reported, not raised.
+
+    After the preload stage, objects that exist so far are moved out of the
+    cyclic GC's generations (gc.freeze) so collections in the workers do not
+    write to, and un-share, the preloaded pages.
+
+    Returns:
+        STARTUP.report()
+    """
+    start = time.perf_counter()
+    for name, task in _WARMUP_TASKS[stage]:
+        try:
+            with STARTUP.phase(f'{stage}: {name}'):
+                summary = task()
+            if isinstance(summary, str):
+                print(f"Warmup {name}: {summary}")
+        except Exception as e:
+            print(f"Warmup {name} failed: {e}")
+
+    if stage == 'preload' and LIFECYCLE['gc_freeze'] and hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
+
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Warmup ({stage}) finished in {elapsed:.0f} ms")
+    return STARTUP.report()
+
+
+def import_modules(names: List[str]) -> str:
+    """Warmup task body: import modules (e.g. the QA stack) ahead of the first request."""
+    for name in names:
+        if name in LAZY_MODULES:
+            LAZY_MODULES[name].load()
+        else:
+            with STARTUP.phase(f'import {name}'):
+                importlib.import_module(name)
+    return f"{len(names)} modules"
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Perceptual Hash Index Module
+Finds duplicate and near-duplicate thumbnails among exports:
+- 64-bit DCT perceptual hash (pHash) per image
+- Stored in SQLite next to the exports, one row per exported file
+- Multi-index hashing: the hash is split into four 16-bit chunks, each with
+  its own SQL index, so a Hamming-radius query only reads rows that share a
+  (nearly) identical chunk instead of scanning the table
+
+Usage:
+    python phash_index.py ../Exports            # (re)index an existing tree
+    python phash_index.py ../Exports --query candidate.jpg --distance 6
+"""
+
+import argparse
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from PIL import Image
+from scipy.fft import dctn
+
+from config import PHASH_CONFIG
+
+
+CHUNKS = 4
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+_INDEXES: Dict[str, 'PHashIndex'] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def compute_phash(image: Image.Image) -> int:
+    """
+    64-bit DCT perceptual hash.
+
+    The image is reduced to 32x32 grayscale; each bit of the hash says
+    whether one of the 8x8 lowest DCT frequencies is above their median.
+
+    Args:
+        image: PIL Image object (JPEG sources may still be undecoded)
+
+    Returns:
+        Hash as an unsigned 64-bit integer
+    """
+    size = PHASH_CONFIG['hash_size'] * PHASH_CONFIG['highfreq_factor']
+    # Only a 32x32 thumbnail is needed, so let JPEG decode at reduced scale
+    image.draft('L', (size * 4, size * 4))
+    gray = image.convert('L').resize((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    hash_size = PHASH_CONFIG['hash_size']
+    frequencies = dctn(np.asarray(gray, dtype=np.float32), norm='ortho')[:hash_size, :hash_size]
+    # The DC term only carries overall brightness; leave it out of the median
+    median = np.median(frequencies.ravel()[1:])
+    bits = (frequencies > median).ravel()
+
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def hash_chunks(value: int) -> List[int]:
+    """Split a 64-bit hash into its four 16-bit chunks (most significant first)."""
+    return [(value >> (CHUNK_BITS * (CHUNKS - 1 - i))) & CHUNK_MASK for i in range(CHUNKS)]
+
+
+def to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def chunk_neighbors(chunk: int, radius: int) -> List[int]:
+    """All 16-bit values within `radius` bits of a chunk (including itself)."""
+    values = [chunk]
+    for flips in range(1, radius + 1):
+        for positions in itertools.combinations(range(CHUNK_BITS), flips):
+            value = chunk
+            for position in positions:
+                value ^= 1 << position
+            values.append(value)
+    return values
+
+
+class PHashIndex:
+    """
+    SQLite-backed perceptual hash index with Hamming-radius queries.
+
+    If two hashes are within distance d, at least one of their four chunks
+    is within d // 4 bits (pigeonhole), so candidates come from four indexed
+    IN (...) lookups and are then checked on the full 64 bits.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS phashes ('
+                ' path TEXT PRIMARY KEY,'
+                ' hash INTEGER NOT NULL,'
+                ' c0 INTEGER NOT NULL, c1 INTEGER NOT NULL, c2 INTEGER NOT NULL, c3 INTEGER NOT NULL,'
+                ' league TEXT, team TEXT,'
+                ' indexed_at TEXT NOT NULL)'
+            )
+            for i in range(CHUNKS):
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS phashes_c{i} ON phashes (c{i})')
+
+    def add(self, path: str, image: Optional[Image.Image] = None, phash: Optional[int] = None,
+            league: str = None, team: str = None) -> int:
+        """
+        Index (or re-index) an exported file.
+
+        Args:
+            path: File path, used as the row key
+            image: Image to hash (opened from path if neither image nor phash given)
+            phash: Precomputed hash
+            league: League name, stored for filtering
+            team: Team name, stored for filtering
+
+        Returns:
+            The image hash
+        """
+        if phash is None:
+            if image is None:
+                with Image.open(path) as source:
+                    phash = compute_phash(source)
+            else:
+                phash = compute_phash(image)
+
+        path = os.path.abspath(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO phashes (path, hash, c0, c1, c2, c3, league, team, indexed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (path, to_signed(phash), *hash_chunks(phash), league, team, datetime.now().isoformat())
+            )
+        return phash
+
+    def remove(self, path: str) -> bool:
+        """Drop a file from the index. Returns True if it was indexed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM phashes WHERE path = ?', (os.path.abspath(path),))
+        return cursor.rowcount > 0
+
+    def query(self, phash: int, max_distance: int = None, league: str = None,
+              team: str = None, limit: int = 50) -> List[Dict]:
+        """
+        Find indexed images within a Hamming distance of a hash.
+
+        Args:
+            phash: Candidate hash (see compute_phash)
+            max_distance: Hamming radius (default PHASH_CONFIG['default_max_distance'])
+            league: Only match this league
+            team: Only match this team
+            limit: Maximum matches returned
+
+        Returns:
+            List of {'path', 'distance', 'league', 'team', 'indexed_at'}, closest first
+        """
+        if max_distance is None:
+            max_distance = PHASH_CONFIG['default_max_distance']
+        max_distance = min(max_distance, PHASH_CONFIG['max_distance_limit'])
+
+        chunk_radius = max_distance // CHUNKS
+        clauses = []
+        params = []
+        for i, chunk in enumerate(hash_chunks(phash)):
+            values = chunk_neighbors(chunk, chunk_radius)
+            clauses.append(f"c{i} IN ({','.join('?' * len(values))})")
+            params.extend(values)
+
+        sql = f"SELECT path, hash, league, team, indexed_at FROM phashes WHERE ({' OR '.join(clauses)})"
+        if league:
+            sql += ' AND league = ?'
+            params.append(league)
+        if team:
+            sql += ' AND team = ?'
+            params.append(team)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        matches = []
+        for row in rows:
+            distance = hamming_distance(phash, to_unsigned(row['hash']))
+            if distance <= max_distance:
+                matches.append({
+                    'path': row['path'],
+                    'distance': distance,
+                    'league': row['league'],
+                    'team': row['team'],
+                    'indexed_at': row['indexed_at']
+                })
+        matches.sort(key=lambda match: (match['distance'], match['path']))
+        return matches[:limit]
+
+    def find_near_duplicates(self, image: Image.Image, max_distance: int = None, **filters) -> Dict:
+        """
+        Hash a candidate image and query the index.
+
+        Args:
+            image: Candidate PIL Image
+            max_distance: Hamming radius
+            **filters: league / team / limit, passed to query()
+
+        Returns:
+            Dict with 'phash' (hex), 'matches' and timing in milliseconds
+        """
+        start = time.perf_counter()
+        phash = compute_phash(image)
+        hashed = time.perf_counter()
+        matches = self.query(phash, max_distance, **filters)
+        done = time.perf_counter()
+        return {
+            'phash': f'{phash:016x}',
+            'matches': matches,
+            'hash_ms': round((hashed - start) * 1000, 3),
+            'query_ms': round((done - hashed) * 1000, 3)
+        }
+
+    def index_files(self, paths: Iterable[str], league_team=None) -> Dict:
+        """
+        Index many files, skipping unreadable ones.
+
+        Args:
+            paths: File paths
+            league_team: Function path -> (league, team), or None
+
+        Returns:
+            Dict with 'indexed' and 'errors' counts
+        """
+        indexed = 0
+        errors = 0
+        for path in paths:
+            league, team = league_team(path) if league_team else (None, None)
+            try:
+                self.add(path, league=league, team=team)
+                indexed += 1
+            except Exception as e:
+                print(f"Error indexing {path}: {e}")
+                errors += 1
+        return {'indexed': indexed, 'errors': errors}
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM phashes').fetchone()[0]
+
+
+def get_index(export_root: str) -> PHashIndex:
+    """Shared index for an export root, opened on first use."""
+    db_path = os.path.abspath(os.path.join(export_root, PHASH_CONFIG['db_filename']))
+    with _INDEXES_LOCK:
+        if db_path not in _INDEXES:
+            _INDEXES[db_path] = PHashIndex(db_path)
+        return _INDEXES[db_path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the perceptual hash index of an export tree.')
+    parser.add_argument('export_root', help='Export root (e.g. ../Exports)')
+    parser.add_argument('--query', default=None, help='Find near-duplicates of this image instead of indexing')
+    parser.add_argument('--distance', type=int, default=None, help='Hamming radius for --query')
+    args = parser.parse_args()
+
+    index = get_index(args.export_root)
+
+    if args.query:
+        with Image.open(args.query) as image:
+            result = index.find_near_duplicates(image, args.distance)
+        for match in result['matches']:
+            print(f"{match['distance']:>2}  {match['path']}")
+        print(f"{len(result['matches'])} matches (hash {result['hash_ms']} ms, query {result['query_ms']} ms)")
+        return 0
+
+    root = os.path.abspath(args.export_root)
+    paths = []
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        paths.extend(os.path.join(directory, name) for name in sorted(files)
+                     if name.lower().endswith(IMAGE_EXTENSIONS))
+
+    def league_team(path):
+        # Exports/{league}/{team}/file.jpg
+        parts = os.path.relpath(path, root).split(os.sep)
+        return (parts[0], parts[1]) if len(parts) == 3 else (None, None)
+
+    start = time.perf_counter()
+    totals = index.index_files(paths, league_team)
+    print(f"Indexed {totals['indexed']} images ({totals['errors']} errors) in {time.perf_counter() - start:.1f}s")
+    print(f"Index now holds {index.count()} images: {index.db_path}")
+    return 0 if not totals['errors'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
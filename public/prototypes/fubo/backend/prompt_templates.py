@@ -0,0 +1,516 @@
+"""
+Prompt Templates Module
+Builds the text prompts sent to the image model:
+- Content, style and generation prompts kept as str.format templates whose
+  field names are parsed once at import
+- Only the selected template is rendered, and only the fields it uses are computed
+- Rendered prompts memoized on their inputs (see PROMPT_TEMPLATES in config)
+- prompt_hash() gives downstream caches a stable key for a prompt
+"""
+
+import hashlib
+import string
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Optional, Tuple, Union
+
+from config import PROMPT_TEMPLATES
+
+
+# Single-team content prompts, by content_type
+TEAM_CONTENT_TEMPLATES = {
+    'player': (
+        "photorealistic sports player, professional {sport} player, {team}, full body shot with head and feet visible, posed shot, authentic team uniform with visible team logos and jersey numbers, 🚨 JERSEY TEXT CRITICAL - SPELL LETTER-BY-LETTER: {letter_by_letter} = '{team_name_only}' (ZERO misspellings allowed), use jersey number BELOW 40 preferably from {safe_number_range}, DOMINANT {primary} and {secondary} team colors as COLOR OVERLAYS throughout uniform and background, {accent} accent details, professional sports photography, stadium background with team color grading, centered composition, high-detail, dramatic lighting with team color filters, sharp focus, allow team branding on uniforms"
+    ),
+    'action': (
+        "photorealistic sports action shot, professional {sport} player, {team}, {action_context}, full body shot with head and feet visible, dynamic action pose, authentic team uniform with team logos and numbers, 🚨 JERSEY TEXT CRITICAL - SPELL LETTER-BY-LETTER: {letter_by_letter} = '{team_name_only}' (ZERO misspellings allowed), use jersey number BELOW 40 preferably from {safe_number_range}, DOMINANT {primary} and {secondary} team colors as COLOR OVERLAYS throughout uniform and background, {accent} accent details, professional sports photography, stadium background with team color grading, centered composition, high-detail, dramatic lighting with team color filters, sharp focus, motion blur, allow authentic team branding"
+    ),
+    'stadium': (
+        "photorealistic stadium, {venue_type} venue, above angle 3/4 shot, distinctive architecture, {stadium_details}, DOMINANT {primary} and {secondary} team colors as COLOR OVERLAYS and FILTERS on lighting, seating, architectural elements, and atmospheric effects, {accent} accent lighting creating dramatic color contrast, VIBRANT team color reflections and shadows, dramatic lighting with team color grading, professional architectural photography, clean playing surface (restrict floor/court logos), high-detail, wide angle view, impressive scale, cinematic composition, focus on architectural beauty with MAXIMUM team color visibility and impact, allow stadium branding and signage"
+    ),
+    'closeup': (
+        "photorealistic sports equipment close-up, {closeup_details}, professional {sport} equipment from {team} with authentic team logos, DOMINANT {primary} and {secondary} team colors as COLOR OVERLAYS throughout equipment details, {accent} accent highlights, macro photography, extreme detail, texture focus, professional product photography with team color grading, sharp focus, allow equipment branding"
+    ),
+}
+
+# Matchup ("Team A vs Team B") content prompts, by content_type
+MATCHUP_CONTENT_TEMPLATES = {
+    'player': (
+        "photorealistic sports matchup, {theme}, {visualization}, professional {sport} players from {team1} and {team2}, authentic uniforms with visible team logos and jersey numbers, DOMINANT team colors as COLOR OVERLAYS, posed rivalry, dramatic lighting with team color grading, stadium environment, professional sports photography, high-detail, intense competition, sharp focus, allow team branding on uniforms"
+    ),
+    'action': (
+        "photorealistic sports matchup action, {theme}, {visualization}, professional {sport} players from {team1} and {team2} in dynamic action, {action_context}, authentic uniforms with team logos and numbers, DOMINANT team colors as COLOR OVERLAYS, rivalry and competition, dramatic lighting with team color grading, stadium environment, professional sports photography, high-detail, motion blur, intense energy, allow authentic team branding"
+    ),
+    'stadium': (
+        "photorealistic stadium matchup, {visualization}, above angle 3/4 shot of a {venue_type} venue, {stadium_details}, DOMINANT team colors from both teams as COLOR OVERLAYS and FILTERS on lighting, seating, architectural elements, and atmospheric effects, VIBRANT color contrast between teams, dramatic lighting with team color reflections and shadows, professional architectural photography, high-detail, cinematic composition, impressive scale, focus on architectural beauty with MAXIMUM team color visibility and impact, clean playing surface (restrict floor/court logos), allow stadium branding and signage"
+    ),
+    'closeup': (
+        "photorealistic sports equipment close-up matchup, {theme}, {visualization}, professional {sport} equipment from both teams with authentic team logos, {closeup_details}, DOMINANT team colors as COLOR OVERLAYS throughout equipment details, macro photography, extreme detail, texture focus, professional product photography with team color grading, sharp focus, competitive arrangement, allow equipment branding"
+    ),
+}
+
+# Technical details and spelling rules appended to every generated base image prompt
+GENERATION_SUFFIX_TEMPLATE = """, {aspect_ratio} aspect ratio, {composition_instruction}, 8k, photorealistic, high resolution, sharp focus, professional photography.
+{enhanced_colors}
+🚨 CRITICAL SPELLING REQUIREMENT - TEAM NAME MUST BE EXACT 🚨
+If jersey text is visible, spell the team name LETTER-BY-LETTER correctly:
+{letter_by_letter}
+Complete word: {team_name_only}
+ZERO tolerance for misspellings. DO NOT create variations like: DOLTICS, CELITCS, BCELTICS, LKAERS, WARIORS, PAKCERS, etc.
+Every single letter must be in the correct position. Verify each letter matches the requirement above.
+Jersey numbers: Use ONLY these safe numbers: 00, 02, 03, 07, 09, 14, 17, 19, 21, 26, 27, 29, 31, 37, 38, 39, 88, 97, 99 (all below 40).
+CRITICAL: Generate ONLY {content_type} content as specified. Do not generate any other content type.
+Allow authentic team logos, jersey numbers, and branding on uniforms and equipment. Restrict only distracting floor logos, court text, and field text to maintain focus on subject.
+--no floor logos, court logos, field logos, ice logos, distracting text on playing surfaces, no misspelled team names, no gibberish text, no incorrect letters in team names"""
+
+STYLE_PROMPT_TEMPLATE = (
+    "Apply visual style: {base_prompt}{team_colors_text}{mood_text}{brightness_text}. Keep same subject matter, only change visual rendering style. Maintain {aspect_ratio} aspect ratio with {composition_instruction}. Allow authentic team logos, jersey numbers, and branding on uniforms and equipment. Restrict only floor logos, court logos, and field text to keep focus on subject."
+)
+
+BLENDED_STYLE_PROMPT_TEMPLATE = (
+    "Apply visual style: {blended_style_prompt}{team_colors_text}{brightness_text}. Keep same subject matter, only change visual rendering style. Maintain {aspect_ratio} aspect ratio with {composition_instruction}. Allow authentic team logos, jersey numbers, and branding on uniforms and equipment. Restrict only floor logos, court logos, and field text to keep focus on subject."
+)
+
+# Safe jersey numbers < 40 (avoid most active roster conflicts)
+SAFE_NUMBER_RANGE = "numbers below 40 that are uncommon like 02, 03, 07, 09, 14, 17, 19, 21, 26, 27, 29, 31, 37, 38, 39"
+
+BRIGHTNESS_TEXT = {
+    'darker': ", darker moody lighting, low-key atmosphere",
+    'lighter': ", bright cheerful lighting, high-key atmosphere"
+}
+
+COMPOSITION_TEXT = "maintain full body framing, ensure head and feet are visible"
+
+
+def template_fields(template: str) -> FrozenSet[str]:
+    """Names of the replacement fields in a str.format template."""
+    return frozenset(name for _, name, _, _ in string.Formatter().parse(template) if name)
+
+
+TEMPLATE_FIELDS = {
+    template: template_fields(template)
+    for template in [
+        *TEAM_CONTENT_TEMPLATES.values(),
+        *MATCHUP_CONTENT_TEMPLATES.values(),
+        GENERATION_SUFFIX_TEMPLATE,
+        STYLE_PROMPT_TEMPLATE,
+        BLENDED_STYLE_PROMPT_TEMPLATE
+    ]
+}
+
+
+def render(template: str, **fields: Union[str, Callable[[], str]]) -> str:
+    """
+    Fill a template, evaluating only the fields it actually uses.
+
+    Args:
+        template: One of the module templates
+        **fields: Values, or zero-argument callables producing them
+
+    Returns:
+        Rendered prompt
+    """
+    names = TEMPLATE_FIELDS.get(template) or template_fields(template)
+    values = {}
+    for name in names:
+        value = fields[name]
+        values[name] = value() if callable(value) else value
+    return template.format(**values)
+
+
+def prompt_hash(*parts) -> str:
+    """
+    Stable key for a prompt plus whatever else determines the output
+    (model name, reference image, dimensions, ...).
+
+    Returns:
+        16 hex characters of a SHA-256 over the parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def get_sport_action_context(sport):
+    """Get sport-specific action context for prompts with authentic game plays."""
+    contexts = {
+        'basketball': 'Slam dunk attempt, blocked shot, three-point shot, driving layup, or mid-air rebound',
+        'football': 'Throwing touchdown pass, making a catch, rushing for touchdown, or defensive interception',
+        'baseball': 'Pitching a fastball, hitting a home run, sliding into base, or making a diving catch',
+        'hockey': 'Taking a slap shot, making a save, checking opponent, or scoring a goal',
+        'soccer': 'Taking a penalty kick, heading the ball, making a slide tackle, or celebrating a goal',
+        'tennis': 'Serving an ace, hitting a forehand winner, making a volley, or diving for a shot',
+        'golf': 'Driving off the tee, putting for birdie, chipping from the rough, or celebrating a hole-in-one',
+        'mma': 'Throwing a knockout punch, executing a takedown, applying a submission hold, or defending strikes',
+        'boxing': 'Throwing a combination, dodging punches, landing a knockout blow, or cornering opponent',
+        'racing': 'Overtaking on the track, celebrating victory, pit stop action, or starting grid position',
+        'generic': 'Dynamic athletic pose in action'
+    }
+    return contexts.get(sport, contexts['generic'])
+
+def get_sport_closeup_details(sport):
+    """Get sport-specific close-up details for equipment and gear."""
+    details = {
+        'basketball': 'Basketball texture and grip pattern, jersey mesh fabric, shoe sole traction, wristband details, equipment materials and construction',
+        'football': 'Football helmet with facemask details, jersey fabric texture, shoulder pad construction, cleat sole pattern, glove grip texture, equipment stitching and materials',
+        'baseball': 'Baseball glove leather texture, bat grain and grip tape, helmet cage details, jersey fabric, cleat spikes, equipment wear patterns',
+        'hockey': 'Hockey helmet cage and padding, stick blade texture, glove leather and padding, skate blade details, jersey fabric, equipment construction',
+        'soccer': 'Soccer ball texture and panel details, cleat stud pattern, shin guard construction, jersey fabric, glove details, equipment materials',
+        'tennis': 'Tennis racquet string pattern, ball felt texture, shoe sole traction, wristband details, equipment materials and construction',
+        'golf': 'Golf club grip texture, ball dimple pattern, glove leather details, shoe spikes, equipment materials and wear patterns',
+        'mma': 'MMA glove padding details, mouthguard texture, equipment materials, protective gear construction, training equipment textures',
+        'boxing': 'Boxing glove leather texture, hand wrap details, mouthguard, equipment materials, protective gear construction',
+        'racing': 'Racing helmet visor details, glove grip texture, suit fabric, equipment materials, safety gear construction',
+        'generic': 'Equipment texture details, material construction, wear patterns, grip surfaces, fabric weaves, hardware details'
+    }
+    return details.get(sport, details['generic'])
+
+def get_venue_type(sport):
+    """Get the appropriate venue type for a sport."""
+    venues = {
+        'basketball': 'basketball arena with hardwood court',
+        'football': 'football stadium with field and goalposts',
+        'baseball': 'baseball ballpark with diamond and outfield',
+        'hockey': 'hockey arena with ice rink and boards',
+        'soccer': 'soccer stadium with field and goals',
+        'tennis': 'tennis center with courts and net',
+        'golf': 'golf course with fairways and greens',
+        'mma': 'MMA arena with octagon cage',
+        'boxing': 'boxing arena with ring and ropes',
+        'racing': 'race track with pit lane and grandstands',
+        'generic': 'sports venue with playing surface'
+    }
+    return venues.get(sport, venues['generic'])
+
+
+def get_stadium_specific_details(sport):
+    """Get sport-specific stadium details for better prompts."""
+    details = {
+        'basketball': 'basketball court with three-point lines, free throw lines, hardwood floor, basketball hoops, team banners, subtle scoreboard, clean court surface with NO FLOOR LOGOS',
+        'football': 'football field with yard lines, end zones, goalposts, sideline, team benches, scoreboard, field goal posts, clean field surface with NO FLOOR LOGOS',
+        'baseball': 'baseball diamond with pitcher\'s mound, home plate, bases, foul lines, outfield wall, bullpen, dugouts, scoreboard, clean field surface with NO FLOOR LOGOS',
+        'hockey': 'hockey rink with blue lines, red lines, face-off circles, goal nets, boards, penalty boxes, subtle scoreboard, clean ice surface with NO FLOOR LOGOS',
+        'soccer': 'soccer field with center circle, penalty areas, goal boxes, corner flags, goal nets, team benches, scoreboard, clean grass field with NO FLOOR LOGOS',
+        'tennis': 'tennis court with net, service lines, baseline, center service line, doubles alleys, umpire chair, scoreboard, clean court surface with NO FLOOR LOGOS',
+        'golf': 'golf course with fairways, greens, bunkers, tee boxes, flagsticks, water hazards, clubhouse, scoreboard',
+        'mma': 'octagon cage with canvas floor, corner posts, referee area, fighter corners, subtle scoreboard, cage door, clean floor with NO FLOOR LOGOS',
+        'boxing': 'boxing ring with canvas floor, ropes, corner posts, referee area, fighter corners, ring bell, scoreboard, clean floor with NO FLOOR LOGOS',
+        'racing': 'race track with start/finish line, pit lane, grandstands, victory lane, timing tower, safety barriers, clean track with NO FLOOR LOGOS',
+        'generic': 'playing surface with appropriate markings, seating areas, scoreboard, team areas, clean surface with NO FLOOR LOGOS'
+    }
+    return details.get(sport, details['generic'])
+
+def get_composition_instructions(content_type, section='Wide', width=None, height=None):
+    """
+    Get composition instructions based on content type and section.
+    Images with padding need full-frame edge-to-edge composition.
+    """
+    if section == 'Wide':
+        # Wide images now have vertical padding too
+        if content_type == 'action':
+            return "COMPOSITION: Position the main action and player in the RIGHT 1/4 OF THE FRAME. FILL THE ENTIRE FRAME edge-to-edge vertically and horizontally. Extend stadium/field environment, crowd, and atmospheric effects to cover all edges. No black bars or empty space."
+        else:
+            return "COMPOSITION: Slightly right-aligned composition. FILL THE ENTIRE FRAME edge-to-edge. Extend the environment and background elements to cover all edges completely. No letterboxing or pillarboxing."
+    else:  # Tall
+        # Tall images have both horizontal and vertical padding
+        if width and width > 1280:
+            return "COMPOSITION: FILL THE ENTIRE FRAME WIDTH AND HEIGHT edge-to-edge. Extend the background, stadium/court/field elements, crowd, and atmospheric effects across the full width and height. Center the main subject but ensure the scene extends to all edges. No black bars, letterboxing, or pillarboxing - complete edge-to-edge coverage."
+        else:
+            return "COMPOSITION: Centered vertical composition, full frame coverage."
+
+def get_enhanced_color_instructions(content_type, team_colors):
+    """Get enhanced color instructions based on content type."""
+    if not team_colors:
+        return ""
+    
+    primary = team_colors.get('primary_color', '')
+    secondary = team_colors.get('secondary_color', '')
+    accent = team_colors.get('accent_color', '')
+    text = team_colors.get('text_color', '')
+    
+    if content_type == 'stadium':
+        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as DOMINANT COLOR OVERLAYS across the entire stadium. Use {primary} as a STRONG COLOR FILTER on major architectural elements, lighting, seating, and sky. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows, atmospheric effects, and background elements. Use {accent} for DRAMATIC COLOR ACCENTS and highlights. OVERLAY team colors on ALL surfaces - walls, seats, field, sky, lighting. Make team colors the PRIMARY VISUAL ELEMENT that OVERWHELMS the natural colors. Apply color grading and colorization effects to ensure team colors are the MOST PROMINENT feature visible from any distance."
+    elif content_type == 'action':
+        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as INTENSE COLOR OVERLAYS on uniforms, equipment, and background. Use {primary} as a STRONG COLOR FILTER on jerseys, helmets, and gear. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows, motion blur, and background elements. Use {accent} for DRAMATIC COLOR ACCENTS and motion effects. OVERLAY team colors on ALL elements - player, equipment, background, lighting. Make team colors the DOMINANT visual feature through aggressive colorization and color grading."
+    elif content_type == 'closeup':
+        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as VIBRANT COLOR OVERLAYS on all equipment surfaces and details. Use {primary} as a STRONG COLOR FILTER on equipment surfaces. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows and background. Use {accent} for highlights and {text} for contrast details. OVERLAY team colors on ALL equipment elements - helmets, jerseys, gear, surfaces. Make team colors the PRIMARY feature through intense colorization and color grading effects."
+    else:  # player
+        return f"CRITICAL COLOR OVERLAY REQUIREMENTS: Apply {primary} and {secondary} team colors as INTENSE COLOR OVERLAYS on uniforms, gear, and background. Use {primary} as a STRONG COLOR FILTER on jerseys and equipment. Use {secondary} as a COMPLEMENTARY COLOR WASH on shadows and background elements. Use {accent} for highlights and {text} for contrast. OVERLAY team colors on ALL elements - player, uniform, equipment, background, lighting. Make team colors the DOMINANT visual feature through aggressive colorization and color grading."
+
+def get_matchup_visualization_style(team1, team2, sport, style_preference='auto'):
+    """Get creative matchup visualization style based on teams and sport."""
+    import random
+    
+    # Define matchup styles based on sport
+    matchup_styles = {
+        'basketball': [
+            "Face-off at center court with both teams in action poses, dramatic lighting highlighting the rivalry",
+            "Tunnel entrance shot with both teams emerging simultaneously, fans in opposing colors",
+            "Mid-game action sequence showing both teams in dynamic play, court divided by team colors",
+            "Championship-style presentation with both teams in spotlight, trophy in background",
+            "Locker room tunnel confrontation with both teams in pre-game intensity"
+        ],
+        'football': [
+            "Coin toss ceremony with both team captains at midfield, dramatic stadium lighting",
+            "Tunnel entrance with both teams emerging in formation, fans creating color contrast",
+            "Mid-field face-off with both teams in formation, stadium packed with opposing fans",
+            "Goal line stand scenario with both teams in action, dramatic tension",
+            "Championship presentation with both teams in spotlight, confetti and celebration"
+        ],
+        'baseball': [
+            "Home plate meeting with both team captains, umpire in center, dramatic field lighting",
+            "Dugout confrontation with both teams in their respective areas, fans in team colors",
+            "Pitcher's mound showdown with both teams' aces, dramatic stadium atmosphere",
+            "Championship celebration with both teams in spotlight, trophy presentation",
+            "Tunnel entrance with both teams emerging, fans creating visual contrast"
+        ],
+        'hockey': [
+            "Center ice face-off with both teams in formation, dramatic arena lighting",
+            "Tunnel entrance with both teams emerging, fans in opposing colors",
+            "Mid-game action with both teams in play, ice divided by team colors",
+            "Championship presentation with both teams in spotlight, Stanley Cup in background",
+            "Locker room tunnel confrontation with both teams in pre-game intensity"
+        ],
+        'soccer': [
+            "Center circle meeting with both team captains, dramatic stadium lighting",
+            "Tunnel entrance with both teams emerging in formation, fans creating color contrast",
+            "Mid-field action with both teams in play, pitch divided by team colors",
+            "Championship celebration with both teams in spotlight, trophy presentation",
+            "Pre-game handshake with both teams in formation, dramatic tension"
+        ]
+    }
+    
+    # Get sport-specific styles or use generic ones
+    styles = matchup_styles.get(sport, [
+        "Face-off with both teams in action poses, dramatic lighting highlighting the rivalry",
+        "Tunnel entrance with both teams emerging, fans in opposing colors",
+        "Mid-game action sequence with both teams in play, dramatic tension",
+        "Championship presentation with both teams in spotlight, trophy in background"
+    ])
+    
+    # Handle specific style preferences
+    if style_preference == 'faceoff':
+        return "Face-off confrontation with both teams in action poses, dramatic lighting highlighting the rivalry"
+    elif style_preference == 'tunnel':
+        return "Tunnel entrance with both teams emerging simultaneously, fans in opposing colors"
+    elif style_preference == 'action':
+        return "Mid-game action sequence with both teams in dynamic play, dramatic tension"
+    elif style_preference == 'championship':
+        return "Championship presentation with both teams in spotlight, trophy in background"
+    elif style_preference == 'rivalry':
+        return f"Classic rivalry showdown - {team1} vs {team2} - the ultimate sports battle"
+    else:
+        # Return a random style for variety (auto mode)
+        return random.choice(styles)
+
+def get_matchup_theme(team1, team2):
+    """Get thematic matchup description based on team names."""
+    # Classic rivalries
+    classic_rivalries = [
+        ("Lakers", "Celtics", "Historic NBA rivalry - the ultimate basketball showdown"),
+        ("Yankees", "Red Sox", "Baseball's greatest rivalry - the ultimate baseball showdown"),
+        ("Cowboys", "Eagles", "NFC East rivalry - the ultimate football showdown"),
+        ("Canadiens", "Maple Leafs", "Original Six rivalry - the ultimate hockey showdown"),
+        ("Real Madrid", "Barcelona", "El Clásico - the ultimate soccer showdown")
+    ]
+    
+    # Check for classic rivalries
+    for team_a, team_b, description in classic_rivalries:
+        if (team_a.lower() in team1.lower() and team_b.lower() in team2.lower()) or \
+           (team_b.lower() in team1.lower() and team_a.lower() in team2.lower()):
+            return description
+    
+    # Geographic rivalries
+    if any(city in team1.lower() for city in ['new york', 'ny']) and \
+       any(city in team2.lower() for city in ['boston', 'philadelphia', 'washington']):
+        return "East Coast rivalry - regional pride on the line"
+    
+    if any(city in team1.lower() for city in ['los angeles', 'la']) and \
+       any(city in team2.lower() for city in ['san francisco', 'oakland', 'sacramento']):
+        return "California rivalry - state supremacy battle"
+    
+    if any(city in team1.lower() for city in ['chicago', 'detroit']) and \
+       any(city in team2.lower() for city in ['chicago', 'detroit']):
+        return "Midwest rivalry - industrial city showdown"
+    
+    # Conference rivalries
+    if any(conf in team1.lower() for conf in ['east', 'eastern']) and \
+       any(conf in team2.lower() for conf in ['west', 'western']):
+        return "Conference championship - East vs West showdown"
+    
+    # Default matchup theme
+    return f"Epic showdown - {team1} vs {team2} - the ultimate sports battle"
+
+
+ColorTuple = Tuple[str, str, str, str]
+
+
+def color_tuple(team_colors: Optional[Dict]) -> Optional[ColorTuple]:
+    """Hashable (primary, secondary, accent, text) colors for the memoized builders, or None."""
+    if not team_colors:
+        return None
+    return (
+        team_colors.get('primary_color', ''),
+        team_colors.get('secondary_color', ''),
+        team_colors.get('accent_color', ''),
+        team_colors.get('text_color', '')
+    )
+
+
+def color_dict(colors: Optional[ColorTuple]) -> Dict:
+    """Inverse of color_tuple()."""
+    if colors is None:
+        return {}
+    return dict(zip(('primary_color', 'secondary_color', 'accent_color', 'text_color'), colors))
+
+
+@lru_cache(maxsize=PROMPT_TEMPLATES['cache_size'])
+def content_prompt(content_type: str, sport: str, team: str, colors: Optional[ColorTuple],
+                   matchup: Optional[Tuple[str, str, str]] = None) -> str:
+    """
+    Subject prompt for a generated base image.
+
+    Args:
+        content_type: 'player', 'action', 'stadium' or 'closeup' (unknown types use 'player')
+        sport: Sport name
+        team: Team name
+        colors: color_tuple() of the team colors
+        matchup: (team1, team2, visualization) for matchups; the visualization is
+                 picked by the caller so a random choice is not frozen in the cache
+
+    Returns:
+        Prompt text
+    """
+    primary, secondary, accent, _ = colors or ('', '', '', '')
+    # Extract team name only (without city) for jersey text - SPELL IT LETTER BY LETTER
+    team_name_only = team.split()[-1].upper() if team else ''
+
+    if matchup:
+        team1, team2, visualization = matchup
+        templates = MATCHUP_CONTENT_TEMPLATES
+    else:
+        team1 = team2 = visualization = None
+        templates = TEAM_CONTENT_TEMPLATES
+
+    return render(
+        templates.get(content_type, templates['player']),
+        sport=sport,
+        team=team,
+        team1=team1,
+        team2=team2,
+        visualization=visualization,
+        theme=lambda: get_matchup_theme(team1, team2),
+        primary=primary,
+        secondary=secondary,
+        accent=accent,
+        team_name_only=team_name_only,
+        letter_by_letter=lambda: ' - '.join(list(team_name_only)),  # e.g., "C - E - L - T - I - C - S"
+        safe_number_range=SAFE_NUMBER_RANGE,
+        action_context=lambda: get_sport_action_context(sport),
+        venue_type=lambda: get_venue_type(sport),
+        stadium_details=lambda: get_stadium_specific_details(sport),
+        closeup_details=lambda: get_sport_closeup_details(sport)
+    )
+
+
+@lru_cache(maxsize=PROMPT_TEMPLATES['cache_size'])
+def generation_prompt_suffix(content_type: str, team: str, colors: Optional[ColorTuple],
+                             width: int, height: int, section: str = 'Wide') -> str:
+    """
+    Technical details, color instructions and spelling rules for a base image.
+
+    Args:
+        content_type: Content type
+        team: Team name
+        colors: color_tuple() of the team colors
+        width: Output width
+        height: Output height
+        section: 'Wide' or 'Tall' (composition)
+
+    Returns:
+        Text appended to the content prompt
+    """
+    # Get team name for text accuracy - letter by letter spelling
+    team_name_only = team.split()[-1].upper() if team else ''
+    return render(
+        GENERATION_SUFFIX_TEMPLATE,
+        aspect_ratio=f"{width}:{height}",
+        composition_instruction=lambda: get_composition_instructions(content_type, section, width=width, height=height),
+        enhanced_colors=lambda: get_enhanced_color_instructions(content_type, color_dict(colors)),
+        letter_by_letter=' - '.join(list(team_name_only)),
+        team_name_only=team_name_only,
+        content_type=content_type
+    )
+
+
+def _team_colors_text(colors: Optional[ColorTuple]) -> str:
+    if not colors:
+        return ""
+    return f", team colors: {colors[0]} and {colors[1]}"
+
+
+@lru_cache(maxsize=PROMPT_TEMPLATES['cache_size'])
+def style_prompt(base_prompt: str, colors: Optional[ColorTuple] = None, mood: str = 'neutral',
+                 brightness: str = 'neutral', width: int = 1920, height: int = 1080) -> str:
+    """
+    Style transfer prompt.
+
+    Keyed on the resolved style text rather than the style name, so edits to
+    custom styles are never served from a stale entry.
+
+    Args:
+        base_prompt: Style description (see style_prompts.get_style_prompt)
+        colors: color_tuple() when team colors apply, else None
+        mood: Overall mood ('neutral' adds nothing)
+        brightness: 'darker', 'lighter' or 'neutral'
+        width: Output width
+        height: Output height
+
+    Returns:
+        Prompt text
+    """
+    return render(
+        STYLE_PROMPT_TEMPLATE,
+        base_prompt=base_prompt,
+        team_colors_text=_team_colors_text(colors),
+        mood_text=f", {mood} mood" if mood != 'neutral' else "",
+        brightness_text=BRIGHTNESS_TEXT.get(brightness, ""),
+        aspect_ratio=f"{width}:{height}",
+        composition_instruction=COMPOSITION_TEXT
+    )
+
+
+@lru_cache(maxsize=PROMPT_TEMPLATES['cache_size'])
+def blended_style_prompt(weighted_prompts: Tuple[Tuple[str, float], ...], colors: Optional[ColorTuple] = None,
+                         brightness: str = 'neutral', width: int = 1920, height: int = 1080) -> str:
+    """
+    Prompt blending several styles by weight.
+
+    Args:
+        weighted_prompts: ((style description, weight percent), ...) with weight > 0
+        colors: color_tuple() when team colors apply, else None
+        brightness: 'darker', 'lighter' or 'neutral'
+        width: Output width
+        height: Output height
+
+    Returns:
+        Prompt text
+    """
+    blended = " ".join(f"({prompt}:{round(weight / 100, 2)})" for prompt, weight in weighted_prompts)
+    return render(
+        BLENDED_STYLE_PROMPT_TEMPLATE,
+        blended_style_prompt=blended,
+        team_colors_text=_team_colors_text(colors),
+        brightness_text=BRIGHTNESS_TEXT.get(brightness, ""),
+        aspect_ratio=f"{width}:{height}",
+        composition_instruction=COMPOSITION_TEXT
+    )
+
+
+def cache_stats() -> Dict:
+    """lru_cache hit/miss counts of the memoized prompt builders."""
+    return {
+        func.__name__: func.cache_info()._asdict()
+        for func in (content_prompt, generation_prompt_suffix, style_prompt, blended_style_prompt)
+    }
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Batch Technical QA Module
+Runs run_technical_qa across many images on a process pool:
+- Inputs: encoded image bytes, in-memory images, file paths or whole folders
+- Results are yielded as each image finishes (for streaming responses)
+- Summary bucketed by QA_THRESHOLDS, optionally written to JSON
+- Command line entry point for re-QA of an Exports/ tree
+
+Usage:
+    python qa_batch.py ../Exports --aspect-ratio auto --sampling auto
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import ASPECT_RATIOS, QA_BATCH, QA_THRESHOLDS, resolve_app_path
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def pool_size() -> int:
+    """Worker count for the shared pool: QA_BATCH['max_workers'] or all cores."""
+    return QA_BATCH['max_workers'] or os.cpu_count() or 1
+
+
+def create_process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Create a QA process pool.
+
+    Workers are spawned rather than forked: the web server is multi-threaded
+    and forking it can copy held locks into the children.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared QA process pool, created on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = create_process_pool(pool_size())
+        return _POOL
+
+
+def find_images(folder: str) -> List[str]:
+    """
+    Recursively list image files below a folder, in a stable order.
+
+    Args:
+        folder: Root directory (e.g. an Exports/ tree)
+
+    Returns:
+        List of file paths
+    """
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, filename))
+    return paths
+
+
+def nearest_aspect_ratio(width: int, height: int) -> str:
+    """Pick the configured aspect ratio (see ASPECT_RATIOS) closest to the image."""
+    ratios = [entry['ratio'] for entry in ASPECT_RATIOS.values()]
+
+    def distance(ratio):
+        w, h = ratio.split(':')
+        return abs(width / height - int(w) / int(h))
+
+    return min(ratios, key=distance)
+
+
+def qa_item(item: Dict) -> Dict:
+    """
+    Run technical QA on one batch item (executed in a worker process).
+
+    Args:
+        item: Dict with 'id' and one of 'path', 'data' (encoded image bytes) or
+              'raw' ((mode, size, pixel bytes)); plus 'aspect_ratio' ('auto'
+              picks the nearest configured ratio) and 'sampling'
+
+    Returns:
+        Dict with 'id' and the run_technical_qa() fields, or 'error'
+    """
+    from PIL import Image
+    from image_ingest import ingest_image
+    from qa_technical import run_technical_qa
+
+    start = time.perf_counter()
+    try:
+        if 'raw' in item:
+            mode, size, pixels = item['raw']
+            image = Image.frombytes(mode, tuple(size), pixels)
+        elif 'path' in item:
+            with open(item['path'], 'rb') as f:
+                image = ingest_image(f, mode=None)
+        else:
+            image = ingest_image(item['data'], mode=None)
+
+        aspect_ratio = item.get('aspect_ratio') or '16:9'
+        if aspect_ratio == 'auto':
+            aspect_ratio = nearest_aspect_ratio(*image.size)
+
+        result = run_technical_qa(image, aspect_ratio, item.get('sampling'))
+        result['id'] = item['id']
+        result['aspect_ratio'] = aspect_ratio
+    except Exception as e:
+        result = {'id': item['id'], 'error': str(e)}
+
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def run_parallel(func: Callable[[Dict], Dict], items: Iterable[Dict],
+                 max_workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Run a module-level function over many items on the process pool,
+    yielding results as they finish.
+
+    Submissions are windowed so at most a few items per worker are queued
+    (and held in memory) at any time.
+
+    Args:
+        func: Picklable function taking one item
+        items: Iterable of func() inputs (may be a lazy generator)
+        max_workers: Use a private pool of this size instead of the shared one
+
+    Yields:
+        func() results, in completion order
+    """
+    pool = create_process_pool(max_workers) if max_workers else get_process_pool()
+    window = (max_workers or pool_size()) * QA_BATCH['queue_per_worker']
+
+    try:
+        pending = set()
+        for item in items:
+            pending.add(pool.submit(func, item))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        if max_workers:
+            pool.shutdown(cancel_futures=True)
+
+
+def run_qa_batch(items: Iterable[Dict], max_workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Run qa_item over many items in parallel, yielding results as they finish.
+
+    Args:
+        items: Iterable of qa_item() inputs (may be a lazy generator)
+        max_workers: Use a private pool of this size instead of the shared one
+
+    Yields:
+        qa_item() results, in completion order
+    """
+    return run_parallel(qa_item, items, max_workers)
+
+
+def bucket_for_score(score: int) -> str:
+    """Map a score to its QA_THRESHOLDS bucket ('pass', 'review' or 'fail')."""
+    if score >= QA_THRESHOLDS['pass']:
+        return 'pass'
+    if score >= QA_THRESHOLDS['review']:
+        return 'review'
+    return 'fail'
+
+
+def new_summary_path() -> str:
+    """Unique summary file in QA_BATCH['summary_dir'] for one batch run."""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(resolve_app_path(QA_BATCH['summary_dir']), f'qa_summary_{stamp}_{uuid.uuid4().hex[:8]}.json')
+
+
+class BatchSummary:
+    """Running tally of batch results by QA_THRESHOLDS bucket."""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.buckets = {'pass': [], 'review': [], 'fail': []}
+        self.errors = []
+        self.scores = []
+
+    def add(self, result: Dict):
+        if 'error' in result:
+            self.errors.append({'id': result['id'], 'error': result['error']})
+            return
+        score = result['technical_qa_score']
+        self.scores.append(score)
+        self.buckets[bucket_for_score(score)].append(result['id'])
+
+    def to_dict(self) -> Dict:
+        total = len(self.scores) + len(self.errors)
+        return {
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'total': total,
+            'thresholds': QA_THRESHOLDS,
+            'counts': {name: len(ids) for name, ids in self.buckets.items()},
+            'error_count': len(self.errors),
+            'mean_score': round(sum(self.scores) / len(self.scores), 1) if self.scores else None,
+            'buckets': self.buckets,
+            'errors': self.errors
+        }
+
+    def write(self, path: str) -> Dict:
+        """Write the summary as JSON and return it."""
+        summary = self.to_dict()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run technical QA over image folders on all cores.')
+    parser.add_argument('folders', nargs='+', help='Folders to scan recursively (e.g. ../Exports)')
+    parser.add_argument('--aspect-ratio', default='auto', help="Expected ratio such as 16:9, or 'auto'")
+    parser.add_argument('--sampling', default=None, choices=['full', 'tiles', 'auto'])
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--summary', default=None, help='Summary JSON path (default: <first folder>/qa_summary.json)')
+    parser.add_argument('--results', default=None, help='Also write per-image results as NDJSON')
+    args = parser.parse_args()
+
+    paths = [path for folder in args.folders for path in find_images(folder)]
+    print(f"Running technical QA on {len(paths)} images")
+
+    items = ({'id': path, 'path': path, 'aspect_ratio': args.aspect_ratio, 'sampling': args.sampling}
+             for path in paths)
+
+    summary = BatchSummary()
+    results_file = open(args.results, 'w') if args.results else None
+    start = time.perf_counter()
+    try:
+        for done, result in enumerate(run_qa_batch(items, args.workers), 1):
+            summary.add(result)
+            if results_file:
+                results_file.write(json.dumps(result) + '\n')
+            if 'error' in result:
+                print(f"[{done}/{len(paths)}] {result['id']}: ERROR {result['error']}")
+            else:
+                print(f"[{done}/{len(paths)}] {result['id']}: {result['technical_qa_score']} ({result['status']})")
+    finally:
+        if results_file:
+            results_file.close()
+
+    summary_path = args.summary or os.path.join(args.folders[0], 'qa_summary.json')
+    totals = summary.write(summary_path)
+    print(f"Done in {time.perf_counter() - start:.1f}s: {totals['counts']}, {totals['error_count']} errors")
+    print(f"Summary written to {summary_path}")
+    return 0 if not totals['error_count'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+QA Policy Module
+Decides how much QA an image needs before spending Gemini calls:
+- Local checks first (technical QA, player integrity for transparent images)
+- Gemini visual checks one at a time, stopping once the combined score can
+  no longer leave its QA_THRESHOLDS bucket
+- Per-content_type mandatory checks that always run (see QA_POLICY)
+- Byte-identical images that already passed are answered from memory
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from config import QA_POLICY, QA_THRESHOLDS, QA_WEIGHTS
+from vision_payloads import VisionPayloads
+
+
+STATUS_LABELS = {
+    'pass': ('Pass', 'green'),
+    'review': ('Needs Review', 'yellow'),
+    'fail': ('Fail', 'red')
+}
+
+
+def status_for_score(score: int) -> str:
+    """Map a combined score to its QA_THRESHOLDS bucket."""
+    if score >= QA_THRESHOLDS['pass']:
+        return 'pass'
+    if score >= QA_THRESHOLDS['review']:
+        return 'review'
+    return 'fail'
+
+
+def combined_score(technical_score: int, visual_score: Optional[int], player_score: Optional[int]) -> int:
+    """
+    Combine the individual QA scores.
+
+    Args:
+        technical_score: technical_qa_score
+        visual_score: visual_integrity_score, or None if visual QA did not run
+        player_score: Player integrity score, or None for opaque images
+
+    Returns:
+        Combined score (0-100)
+    """
+    if visual_score is not None and player_score is not None:
+        weights = QA_WEIGHTS['combined_with_player']
+        return int(
+            technical_score * weights['technical'] +
+            visual_score * weights['visual'] +
+            player_score * weights['player_integrity']
+        )
+    if visual_score is not None:
+        weights = QA_WEIGHTS['combined']
+        return int(technical_score * weights['technical'] + visual_score * weights['visual'])
+    return technical_score
+
+
+def score_bounds(technical_score: int, player_score: Optional[int],
+                 done: List[Dict], pending: List[str]) -> Tuple[int, int]:
+    """
+    Lowest and highest combined score still reachable.
+
+    Pending visual checks are assumed to score 0 (lower bound) or 100 (upper
+    bound); both go through the same scoring as the real results.
+
+    Args:
+        technical_score: technical_qa_score
+        player_score: Player integrity score, or None
+        done: Visual check results so far
+        pending: Names of visual checks still to run
+
+    Returns:
+        (lowest, highest) combined score
+    """
+    from qa_visual import calculate_visual_integrity_score
+
+    if not done and not pending:
+        score = combined_score(technical_score, None, player_score)
+        return score, score
+
+    bounds = []
+    for assumed in (0, 100):
+        checks = done + [{'check': name, 'score': assumed} for name in pending]
+        visual = calculate_visual_integrity_score(checks)
+        bounds.append(combined_score(technical_score, visual, player_score))
+    return bounds[0], bounds[1]
+
+
+def visual_check_plan(content_type: str, expected_team_name: Optional[str]) -> Tuple[List[str], List[str]]:
+    """
+    Visual checks to run for a request, in QA_POLICY order.
+
+    Args:
+        content_type: Content type ('player', 'action', etc.)
+        expected_team_name: Team name, or None (text accuracy needs one)
+
+    Returns:
+        (ordered check names, names of the mandatory ones)
+    """
+    order = [name for name in QA_POLICY['visual_check_order']
+             if name != 'text_accuracy' or expected_team_name]
+    mandatory_config = QA_POLICY['mandatory_checks']
+    mandatory = mandatory_config.get(content_type, mandatory_config.get('default', []))
+    return order, [name for name in order if name in mandatory]
+
+
+def visual_check_runners(image: VisionPayloads, expected_sport: str, content_type: str,
+                         api_key: str, expected_team_name: Optional[str]) -> Dict[str, Callable[[], Dict]]:
+    """Bind each Gemini visual check to this request's arguments."""
+    from qa_visual import (check_sports_equipment, check_human_pose,
+                           check_context_validation, check_text_accuracy)
+
+    return {
+        'sports_equipment': lambda: check_sports_equipment(image, expected_sport, api_key),
+        'human_pose': lambda: check_human_pose(image, api_key),
+        'context_validation': lambda: check_context_validation(image, expected_sport, content_type, api_key),
+        'text_accuracy': lambda: check_text_accuracy(image, expected_team_name, api_key)
+    }
+
+
+class PassCache:
+    """LRU of passed QA results keyed by image content hash and QA parameters."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(image_bytes: bytes, params: Tuple) -> str:
+        digest = hashlib.sha256(image_bytes)
+        digest.update(repr(params).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._results[key] = copy.deepcopy(result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def stats(self) -> Dict:
+        return {'size': len(self._results), 'max_size': self.max_size,
+                'hits': self.hits, 'misses': self.misses}
+
+
+PASS_CACHE = PassCache(QA_POLICY['pass_cache_size'])
+
+
+def run_policy_qa(image: Image.Image, image_bytes: Optional[bytes] = None,
+                  expected_aspect_ratio: str = '16:9', expected_sport: str = 'generic',
+                  content_type: str = 'player', api_key: Optional[str] = None,
+                  expected_team_name: Optional[str] = None, sampling: Optional[str] = None,
+                  short_circuit: Optional[bool] = None) -> Dict:
+    """
+    Run technical, player integrity and visual QA under the QA policy.
+
+    Args:
+        image: PIL Image object
+        image_bytes: Encoded upload, used to recognise images that already passed
+        expected_aspect_ratio: Expected aspect ratio
+        expected_sport: Sport name
+        content_type: Content type ('player', 'action', etc.)
+        api_key: Gemini API key
+        expected_team_name: Team name for text verification
+        sampling: Technical QA sampling mode ('full', 'tiles', 'auto' or None)
+        short_circuit: Override QA_POLICY['short_circuit']
+
+    Returns:
+        Dict with combined score, status, the individual QA results and a
+        'policy' entry describing which visual checks ran, were skipped, and why
+    """
+    from qa_technical import run_technical_qa
+    from qa_visual import check_player_integrity, summarize_visual_checks
+
+    if short_circuit is None:
+        short_circuit = QA_POLICY['short_circuit']
+
+    cache_key = None
+    if image_bytes is not None:
+        params = (expected_aspect_ratio, expected_sport, content_type, expected_team_name, sampling)
+        cache_key = PassCache.key(image_bytes, params)
+        cached = PASS_CACHE.get(cache_key)
+        if cached:
+            cached['policy']['cached'] = True
+            return cached
+
+    # Local checks first: they are free and bound the combined score
+    technical_results = run_technical_qa(image, expected_aspect_ratio, sampling)
+    technical_score = technical_results['technical_qa_score']
+
+    player_integrity_results = None
+    if image.mode == 'RGBA':
+        player_integrity_results = check_player_integrity(image)
+        print(f"Player Integrity: {player_integrity_results['score']}% ({player_integrity_results['issue']})")
+    player_score = player_integrity_results['score'] if player_integrity_results else None
+
+    order, mandatory = visual_check_plan(content_type, expected_team_name)
+    payloads = VisionPayloads(image)
+    runners = visual_check_runners(payloads, expected_sport, content_type, api_key, expected_team_name)
+
+    checks = []
+    ran = []
+    skipped = []
+    decided_after = None
+    pending = list(order)
+    while pending:
+        if short_circuit and decided_after is None:
+            low, high = score_bounds(technical_score, player_score, checks, pending)
+            if status_for_score(low) == status_for_score(high):
+                decided_after = ran[-1] if ran else 'local'
+                print(f"QA bucket '{status_for_score(low)}' decided after {decided_after} ({low}-{high})")
+
+        name = pending.pop(0)
+        if decided_after is not None and name not in mandatory:
+            skipped.append(name)
+            continue
+
+        try:
+            result = runners[name]()
+        except Exception as e:
+            print(f"Visual QA error in {name}: {e}")
+            result = None
+        ran.append(name)
+        if result:
+            checks.append(result)
+
+    visual_results = summarize_visual_checks(checks) if checks else None
+    visual_score = visual_results['visual_integrity_score'] if visual_results else None
+    score = combined_score(technical_score, visual_score, player_score)
+    status = status_for_score(score)
+    status_label, badge_color = STATUS_LABELS[status]
+
+    results = {
+        'combined_qa_score': score,
+        'status': status,
+        'status_label': status_label,
+        'badge_color': badge_color,
+        'technical_qa': technical_results,
+        'visual_integrity_qa': visual_results,
+        'player_integrity_qa': player_integrity_results,
+        'policy': {
+            'content_type': content_type,
+            'visual_checks_run': ran,
+            'visual_checks_skipped': skipped,
+            'mandatory_checks': mandatory,
+            'decided_after': decided_after,
+            'vision_payloads': payloads.summary(),
+            'cached': False
+        }
+    }
+
+    if cache_key and status == 'pass':
+        PASS_CACHE.put(cache_key, results)
+
+    return results
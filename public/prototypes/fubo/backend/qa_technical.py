@@ -5,11 +5,419 @@ Performs automated technical quality checks on generated images including:
 - Color saturation analysis
 - Noise and artifact detection
 - Resolution validation
+- JPEG blockiness, banding/posterization, clipped highlights/shadows
+- Letterbox (black bar) detection and cutout edge halos on RGBA outputs
+
+Pixel statistics come from a single fused pass (analyze_image) over the
+decoded uint8 array, processed in row strips so temporaries stay small, or
+estimated from a stratified tile sample for large images and bulk runs.
+On transparent images only opaque pixels (alpha >= OPAQUE_ALPHA) are
+measured, so the empty area around a cutout is not read as black.
 """
 
-from PIL import Image, ImageStat
+from PIL import Image
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from config import ARTIFACT_THRESHOLDS, QA_SAMPLING, QA_WEIGHTS
+
+
+# Rows processed per strip in analyze_image (bounds temporary memory)
+STRIP_ROWS = 64
+
+# Alpha at or above which a pixel counts as part of the image (same cut as detect_edge_halo)
+OPAQUE_ALPHA = 128
+
+# Saturation lookup indexed by max(r,g,b) * 256 + (max - min), matching
+# PIL's RGB->HSV conversion: S = floor(255 * (max - min) / max)
+_MAX = np.arange(256, dtype=np.uint32)[:, None]
+_DELTA = np.arange(256, dtype=np.uint32)[None, :]
+SATURATION_LUT = np.where(
+    (_MAX > 0) & (_DELTA <= _MAX), (_DELTA * 255) // np.maximum(_MAX, 1), 0
+).astype(np.uint8).ravel()
+del _MAX, _DELTA
+
+
+class ImageAnalysis:
+    """
+    Shared per-image statistics consumed by the individual checks.
+
+    Holds 256-bin histograms rather than full-frame arrays, so it is cheap
+    to keep around and to send between processes.
+    """
+
+    def __init__(self, width: int, height: int, saturation_hist: np.ndarray,
+                 luminance_hist: np.ndarray, laplacian_hist: np.ndarray):
+        self.width = width
+        self.height = height
+        self.pixel_count = width * height
+        self.saturation_hist = saturation_hist
+        self.luminance_hist = luminance_hist
+        self.laplacian_hist = laplacian_hist
+        # Neighbour luma differences across/inside the 8x8 grid, per axis:
+        # [[boundary_sum, boundary_count, interior_sum, interior_count], ...]
+        self.grid_diffs = np.zeros((2, 4), dtype=np.int64)
+        # Per-row / per-column maximum luma (each entry covers profile_scale pixels)
+        self.row_max = None
+        self.col_max = None
+        self.profile_scale = 1
+        # None for exact analyses, otherwise sample description and standard errors
+        self.sampling = None
+
+    @property
+    def saturation_mean(self) -> float:
+        return histogram_stats(self.saturation_hist)[0]
+
+    @property
+    def saturation_stddev(self) -> float:
+        return histogram_stats(self.saturation_hist)[1]
+
+    @property
+    def luminance_mean(self) -> float:
+        return histogram_stats(self.luminance_hist)[0]
+
+    @property
+    def laplacian_variance(self) -> float:
+        return histogram_stats(self.laplacian_hist)[1] ** 2
+
+    @property
+    def block_steps(self) -> Tuple[float, float]:
+        """Mean luma step across 8x8 block boundaries and inside blocks (both axes)."""
+        boundary_sum, boundary_count, interior_sum, interior_count = self.grid_diffs.sum(axis=0)
+        return (float(boundary_sum) / max(1, boundary_count), float(interior_sum) / max(1, interior_count))
+
+
+def histogram_stats(hist: np.ndarray) -> Tuple[float, float]:
+    """
+    Mean and (population) standard deviation of a 256-bin value histogram.
+
+    Args:
+        hist: Counts for values 0..255
+
+    Returns:
+        (mean, stddev)
+    """
+    total = hist.sum()
+    if total == 0:
+        return 0.0, 0.0
+    values = np.arange(len(hist), dtype=np.float64)
+    mean = float((hist * values).sum() / total)
+    variance = float((hist * (values - mean) ** 2).sum() / total)
+    return mean, variance ** 0.5
+
+
+def _luminance(rgb: np.ndarray) -> np.ndarray:
+    """ITU-R 601-2 luma with PIL's fixed-point rounding (identical to convert('L'))."""
+    r = rgb[..., 0].astype(np.uint32)
+    g = rgb[..., 1].astype(np.uint32)
+    b = rgb[..., 2].astype(np.uint32)
+    return ((r * 19595 + g * 38470 + b * 7471 + 0x8000) >> 16).astype(np.uint8)
+
+
+def _saturation(rgb: np.ndarray) -> np.ndarray:
+    """HSV saturation channel (identical to convert('HSV'))."""
+    # Channel-wise maximum/minimum; reducing over the length-3 axis is far slower
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    high = np.maximum(np.maximum(r, g), b)
+    low = np.minimum(np.minimum(r, g), b)
+    index = high.astype(np.uint16) << 8
+    index |= high - low
+    return SATURATION_LUT[index]
+
+
+def _pad_edges(block: np.ndarray, pad: Tuple[bool, bool, bool, bool]) -> np.ndarray:
+    """Repeat the edge row/column on each side flagged in pad (top, bottom, left, right)."""
+    pad_top, pad_bottom, pad_left, pad_right = pad
+    if pad_top or pad_bottom:
+        block = np.concatenate([block[:1]] * pad_top + [block] + [block[-1:]] * pad_bottom)
+    if pad_left or pad_right:
+        block = np.concatenate([block[:, :1]] * pad_left + [block] + [block[:, -1:]] * pad_right, axis=1)
+    return block
+
+
+def _laplacian(gray: np.ndarray, pad: Tuple[bool, bool, bool, bool]) -> np.ndarray:
+    """
+    4-neighbour Laplacian of the inner region of a grayscale block.
+
+    Matches scipy.ndimage.laplace(mode='reflect') on the whole image: each
+    side either carries a one-pixel halo from the neighbouring pixels, or sits
+    on the image border and repeats its edge row/column.
+
+    Args:
+        gray: uint8 block, with a one-pixel halo on every side not in pad
+        pad: (top, bottom, left, right) flags for sides on the image border
+
+    Returns:
+        int16 Laplacian of the inner region (range -1020..1020)
+    """
+    g = _pad_edges(gray.astype(np.int16), pad)
+
+    lap = g[:-2, 1:-1] + g[2:, 1:-1]
+    lap += g[1:-1, :-2]
+    lap += g[1:-1, 2:]
+    lap -= g[1:-1, 1:-1] * 4
+    return lap
+
+
+def _laplacian_support(opaque: np.ndarray, pad: Tuple[bool, bool, bool, bool]) -> np.ndarray:
+    """Inner-region pixels that are opaque together with their 4 neighbours (same layout as _laplacian)."""
+    o = _pad_edges(opaque, pad)
+    return o[1:-1, 1:-1] & o[:-2, 1:-1] & o[2:, 1:-1] & o[1:-1, :-2] & o[1:-1, 2:]
+
+
+def _grid_diffs(gray: np.ndarray, origin: int, start: int, stop: int, limit: int, axis: int,
+                opaque: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Sum absolute luma steps between neighbours, split by the 8x8 grid.
+
+    Covers pairs (i, i + 1) along axis for absolute positions i in
+    [start, min(stop, limit - 1)), where gray begins at absolute position origin.
+    With an opaque mask (same shape as gray), only pairs of opaque pixels count.
+
+    Returns:
+        [boundary_sum, boundary_count, interior_sum, interior_count]
+    """
+    stop = min(stop, limit - 1)
+    if stop <= start:
+        return np.zeros(4, dtype=np.int64)
+
+    positions = np.arange(start - origin, stop - origin + 1)
+    window = gray.take(positions, axis=axis).astype(np.int16)
+    steps = np.abs(np.diff(window, axis=axis))
+    if opaque is None:
+        counts = np.full(stop - start, gray.shape[1 - axis], dtype=np.int64)
+    else:
+        mask = opaque.take(positions, axis=axis)
+        pairs = (mask[:-1] & mask[1:]) if axis == 0 else (mask[:, :-1] & mask[:, 1:])
+        steps = steps * pairs
+        counts = pairs.sum(axis=1 - axis, dtype=np.int64)
+    steps = steps.sum(axis=1 - axis, dtype=np.int64)
+
+    # A step from position 7 to 8 (mod 8) crosses a JPEG block boundary
+    boundary = (np.arange(start, stop) % 8) == 7
+    return np.array([
+        steps[boundary].sum(), counts[boundary].sum(),
+        steps[~boundary].sum(), counts[~boundary].sum()
+    ], dtype=np.int64)
+
+
+def _analyze_block(rgb: Image.Image, box: Tuple[int, int, int, int],
+                   alpha: Optional[Image.Image] = None) -> Tuple[np.ndarray, ...]:
+    """
+    Pixel statistics for one region.
+
+    Args:
+        rgb: RGB PIL Image object
+        box: (left, top, right, bottom) region
+        alpha: Alpha channel of a transparent image; only opaque pixels are
+               measured, and transparent ones read as white in the edge profiles
+
+    Returns:
+        Tuple of:
+        - (3, 256) int64 saturation, luminance and Laplacian histograms
+        - (2, 4) int64 horizontal/vertical grid step sums (see ImageAnalysis.grid_diffs)
+        - per-row maximum luma of the region
+        - per-column maximum luma of the region
+    """
+    width, height = rgb.size
+    x0, y0, x1, y1 = box
+
+    # Region plus the halo the Laplacian needs, clipped to the image
+    left, top = max(0, x0 - 1), max(0, y0 - 1)
+    right, bottom = min(width, x1 + 1), min(height, y1 + 1)
+    pixels = np.asarray(rgb.crop((left, top, right, bottom)))
+    inner_rows, inner_cols = slice(y0 - top, y1 - top), slice(x0 - left, x1 - left)
+    inner = (inner_rows, inner_cols)
+
+    gray = _luminance(pixels)
+    region = gray[inner]
+    pad = (y0 == 0, y1 == height, x0 == 0, x1 == width)
+
+    # ndimage.laplace on a uint8 array wraps to uint8; the existing noise
+    # thresholds were tuned on that value, so keep the wrap
+    lap = _laplacian(gray, pad).astype(np.uint8)
+    saturation = _saturation(pixels[inner])
+
+    opaque = None
+    if alpha is not None:
+        opaque = np.asarray(alpha.crop((left, top, right, bottom))) >= OPAQUE_ALPHA
+        lap = lap[_laplacian_support(opaque, pad)]
+        saturation = saturation[opaque[inner]]
+        profile = np.where(opaque[inner], region, 255)
+        region = region[opaque[inner]]
+    else:
+        profile = region
+
+    hist = np.stack([
+        np.bincount(saturation.ravel(), minlength=256),
+        np.bincount(region.ravel(), minlength=256),
+        np.bincount(lap.ravel(), minlength=256)
+    ])
+    grid = np.stack([
+        _grid_diffs(gray[inner_rows], left, x0, x1, width, axis=1,
+                    opaque=None if opaque is None else opaque[inner_rows]),
+        _grid_diffs(gray[:, inner_cols], top, y0, y1, height, axis=0,
+                    opaque=None if opaque is None else opaque[:, inner_cols])
+    ])
+    return hist, grid, profile.max(axis=1), profile.max(axis=0)
+
+
+def sample_tiles(width: int, height: int, grid: int, tile_size: int, seed: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Stratified tile sample: one tile at a random position in each grid cell.
+
+    Tile origins are multiples of 8 so tiles stay aligned with JPEG blocks.
+
+    Args:
+        width: Image width
+        height: Image height
+        grid: Cells per side (grid * grid tiles)
+        tile_size: Tile edge in pixels
+        seed: Random seed (fixed, so repeated QA of one image is reproducible)
+
+    Returns:
+        List of (left, top, right, bottom) boxes, or [] if the image is too
+        small for the cells to hold a tile
+    """
+    cell_w = width // grid
+    cell_h = height // grid
+    if cell_w < tile_size or cell_h < tile_size:
+        return []
+
+    rng = np.random.default_rng(seed)
+    boxes = []
+    for row in range(grid):
+        for col in range(grid):
+            origin = []
+            for start, cell in ((col * cell_w, cell_w), (row * cell_h, cell_h)):
+                # 8-aligned positions that keep the tile inside the cell
+                first = -(-start // 8) * 8
+                last = (start + cell - tile_size) // 8 * 8
+                origin.append(first + int(rng.integers(0, (last - first) // 8 + 1)) * 8 if last >= first else start)
+            x, y = origin
+            boxes.append((x, y, x + tile_size, y + tile_size))
+    return boxes
+
+
+def _tile_standard_error(tile_values: np.ndarray, coverage: float) -> float:
+    """Standard error of the mean of per-tile values, with finite population correction."""
+    if len(tile_values) < 2:
+        return 0.0
+    return float(tile_values.std(ddof=1) / np.sqrt(len(tile_values)) * np.sqrt(max(0.0, 1.0 - coverage)))
+
+
+def analyze_image(image: Image.Image, sampling: str = 'full', strip_rows: int = STRIP_ROWS) -> ImageAnalysis:
+    """
+    Compute every pixel statistic the technical checks need in one pass.
+
+    The image is converted to RGB once and read back as uint8 blocks (a
+    full-frame np.asarray would hold two frame-sized copies). For images
+    with transparency only opaque pixels enter the histograms and grid
+    steps, and transparent pixels count as white in the letterbox profiles,
+    so a cutout's empty surround is neither black bars nor crushed shadows.
+    Saturation,
+    luminance and the Laplacian are derived per block from shared
+    intermediates with integer math and accumulated into histograms, so peak
+    memory follows the block size rather than the frame size.
+
+    Sampling modes:
+        'full'  - every pixel, in row strips (exact)
+        'tiles' - QA_SAMPLING['grid']^2 stratified tiles of QA_SAMPLING['tile_size']
+                  pixels; cost is constant in the image size. Means are unbiased;
+                  the returned analysis carries standard errors for the
+                  saturation mean and Laplacian variance. They use the
+                  simple-random-sample formula, which overstates the error of a
+                  stratified sample, so the full-resolution value lies within
+                  2 standard errors of the estimate well over 95% of the time
+        'auto'  - 'tiles' at or above QA_SAMPLING['auto_min_pixels'], else 'full'
+
+    Images too small to hold the tile grid are always analyzed in full.
+
+    Args:
+        image: PIL Image object
+        sampling: 'full', 'tiles' or 'auto'
+        strip_rows: Rows per strip in full mode
+
+    Returns:
+        ImageAnalysis
+    """
+    if sampling not in ('full', 'tiles', 'auto'):
+        raise ValueError(f"Unknown QA sampling mode: {sampling}")
+
+    alpha = None
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        alpha = image.getchannel('A')
+        if alpha.getextrema()[0] >= OPAQUE_ALPHA:
+            alpha = None
+
+    rgb = image if image.mode == 'RGB' else image.convert('RGB')
+    width, height = rgb.size
+
+    if sampling == 'auto':
+        sampling = 'tiles' if width * height >= QA_SAMPLING['auto_min_pixels'] else 'full'
+
+    tiles = []
+    if sampling == 'tiles':
+        tiles = sample_tiles(width, height, QA_SAMPLING['grid'], QA_SAMPLING['tile_size'], QA_SAMPLING['seed'])
+
+    if not tiles:
+        hist = np.zeros((3, 256), dtype=np.int64)
+        grid = np.zeros((2, 4), dtype=np.int64)
+        row_max = []
+        col_max = np.zeros(width, dtype=np.uint8)
+        for y0 in range(0, height, strip_rows):
+            block = _analyze_block(rgb, (0, y0, width, min(height, y0 + strip_rows)), alpha)
+            hist += block[0]
+            grid += block[1]
+            row_max.append(block[2])
+            np.maximum(col_max, block[3], out=col_max)
+
+        analysis = ImageAnalysis(width, height, *hist)
+        analysis.grid_diffs = grid
+        analysis.row_max = np.concatenate(row_max)
+        analysis.col_max = col_max
+        return analysis
+
+    blocks = [_analyze_block(rgb, box, alpha) for box in tiles]
+    tile_hists = np.stack([block[0] for block in blocks])
+    hist = tile_hists.sum(axis=0)
+    analysis = ImageAnalysis(width, height, *hist)
+    analysis.grid_diffs = sum(block[1] for block in blocks)
+
+    # Edge profiles (letterbox detection) need whole rows and columns; take
+    # them from a block-averaged luma image instead of the tiles
+    scale = max(1, min(width, height) // QA_SAMPLING['profile_size'])
+    luma = rgb.convert('L')
+    if alpha is not None:
+        luma.paste(255, mask=alpha.point(lambda a: 255 if a < OPAQUE_ALPHA else 0))
+    profile = np.asarray(luma.reduce(scale))
+    analysis.row_max = profile.max(axis=1)
+    analysis.col_max = profile.max(axis=0)
+    analysis.profile_scale = scale
+
+    # Per-tile contributions to each estimate, for the standard errors
+    values = np.arange(256, dtype=np.float64)
+    # (tiles entirely outside a cutout contribute nothing)
+    measured = tile_hists[:, 0].sum(axis=1) > 0
+    tile_hists = tile_hists[measured]
+    tile_pixels = tile_hists[:, 0].sum(axis=1)
+    tile_saturation = (tile_hists[:, 0] * values).sum(axis=1) / tile_pixels
+    lap_mean = histogram_stats(hist[2])[0]
+    tile_lap_pixels = np.maximum(tile_hists[:, 2].sum(axis=1), 1)
+    tile_lap_spread = (tile_hists[:, 2] * (values - lap_mean) ** 2).sum(axis=1) / tile_lap_pixels
+
+    population = width * height if alpha is None else int(np.count_nonzero(np.asarray(alpha) >= OPAQUE_ALPHA))
+    coverage = float(tile_pixels.sum()) / max(1, population)
+    analysis.sampling = {
+        'mode': 'tiles',
+        'tiles': len(tiles),
+        'tile_size': QA_SAMPLING['tile_size'],
+        'coverage': coverage,
+        'saturation_mean_se': _tile_standard_error(tile_saturation, coverage),
+        'laplacian_variance_se': _tile_standard_error(tile_lap_spread, coverage)
+    }
+    return analysis
 
 
 def calculate_aspect_ratio(width: int, height: int) -> Tuple[int, int]:
@@ -67,26 +475,22 @@ def verify_aspect_ratio(image: Image.Image, expected_ratio: str) -> Dict:
     }
 
 
-def check_color_saturation(image: Image.Image) -> Dict:
+def check_color_saturation(image: Image.Image, analysis: Optional[ImageAnalysis] = None) -> Dict:
     """
     Check color saturation levels.
     
     Args:
         image: PIL Image object
+        analysis: Precomputed analyze_image() result (computed if omitted)
     
     Returns:
         Dict with 'pass', 'score', 'saturation_level'
     """
-    # Convert to HSV to analyze saturation
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-    
-    hsv_image = image.convert('HSV')
-    stat = ImageStat.Stat(hsv_image)
+    if analysis is None:
+        analysis = analyze_image(image)
     
-    # Get saturation channel (index 1 in HSV)
-    saturation_mean = stat.mean[1]
-    saturation_stddev = stat.stddev[1]
+    # HSV saturation channel statistics (0-255)
+    saturation_mean = analysis.saturation_mean
     
     # Normalize saturation (0-255 range)
     saturation_percentage = (saturation_mean / 255) * 100
@@ -112,7 +516,7 @@ def check_color_saturation(image: Image.Image) -> Dict:
         passes = False
         status = 'too high (oversaturated)'
     
-    return {
+    result = {
         'check': 'color_saturation',
         'pass': passes,
         'score': score,
@@ -120,31 +524,31 @@ def check_color_saturation(image: Image.Image) -> Dict:
         'status': status,
         'details': f"Saturation: {saturation_percentage:.1f}% ({status})"
     }
+    
+    if analysis.sampling:
+        # Standard error in the same percentage units as saturation_level
+        result['standard_error'] = analysis.sampling['saturation_mean_se'] / 255 * 100
+        result['details'] += f" [sampled, ±{2 * result['standard_error']:.1f}%]"
+    
+    return result
 
 
-def detect_noise_artifacts(image: Image.Image) -> Dict:
+def detect_noise_artifacts(image: Image.Image, analysis: Optional[ImageAnalysis] = None) -> Dict:
     """
     Detect noise and compression artifacts.
     
     Args:
         image: PIL Image object
+        analysis: Precomputed analyze_image() result (computed if omitted)
     
     Returns:
         Dict with 'pass', 'score', 'noise_level'
     """
-    # Convert to grayscale for noise analysis
-    if image.mode != 'L':
-        gray = image.convert('L')
-    else:
-        gray = image
+    if analysis is None:
+        analysis = analyze_image(image)
     
-    # Calculate variance (higher variance = more noise)
-    img_array = np.array(gray)
-    
-    # Use Laplacian variance as noise metric
-    from scipy import ndimage
-    laplacian = ndimage.laplace(img_array)
-    variance = laplacian.var()
+    # Use Laplacian variance as noise metric (higher variance = more noise)
+    variance = analysis.laplacian_variance
     
     # Normalize variance to 0-100 scale (empirical thresholds)
     # Low variance (<100): Smooth, possibly over-processed
@@ -172,7 +576,7 @@ def detect_noise_artifacts(image: Image.Image) -> Dict:
         passes = False
         status = 'very noisy'
     
-    return {
+    result = {
         'check': 'noise_artifacts',
         'pass': passes,
         'score': score,
@@ -180,6 +584,306 @@ def detect_noise_artifacts(image: Image.Image) -> Dict:
         'status': status,
         'details': f"Noise variance: {variance:.0f} ({status})"
     }
+    
+    if analysis.sampling:
+        result['standard_error'] = analysis.sampling['laplacian_variance_se']
+        result['details'] += f" [sampled, ±{2 * result['standard_error']:.0f}]"
+    
+    return result
+
+
+def detect_blockiness(image: Image.Image, analysis: Optional[ImageAnalysis] = None) -> Dict:
+    """
+    Detect JPEG block artifacts (a visible 8x8 grid).
+    
+    Compares the mean luma step across 8-pixel block boundaries with the mean
+    step inside blocks; compression blocking makes boundary steps larger.
+    Steps below about one luma level are invisible and ignored.
+    
+    Args:
+        image: PIL Image object
+        analysis: Precomputed analyze_image() result (computed if omitted)
+    
+    Returns:
+        Dict with 'pass', 'score', 'blockiness'
+    """
+    if analysis is None:
+        analysis = analyze_image(image)
+    
+    thresholds = ARTIFACT_THRESHOLDS['blockiness']
+    boundary_step, interior_step = analysis.block_steps
+    
+    # Extra luma change at block boundaries; the ratio separates real blocking
+    # in flattened blocks from ordinary texture
+    excess = max(0.0, boundary_step - interior_step)
+    ratio = boundary_step / interior_step if interior_step > 0 else (float('inf') if boundary_step else 1.0)
+    
+    if excess >= thresholds['visible_step'] or (excess >= thresholds['mild_step'] and ratio >= thresholds['visible_ratio']):
+        score = 60
+        passes = False
+        status = 'visible JPEG blocking'
+    elif excess >= thresholds['mild_step']:
+        score = 85
+        passes = True
+        status = 'mild compression blocking'
+    else:
+        score = 100
+        passes = True
+        status = 'no visible block grid'
+    
+    return {
+        'check': 'blockiness',
+        'pass': passes,
+        'score': score,
+        'blockiness': excess,
+        'boundary_ratio': min(ratio, 999.0),
+        'status': status,
+        'details': f"Block boundary excess step: {excess:.2f} luma levels ({status})"
+    }
+
+
+def detect_banding(image: Image.Image, analysis: Optional[ImageAnalysis] = None) -> Dict:
+    """
+    Detect banding/posterization from gaps in the luminance histogram.
+    
+    Smooth tonal ranges use every luma level between the darkest and
+    brightest tones; posterized or badly quantized images leave empty levels.
+    
+    Args:
+        image: PIL Image object
+        analysis: Precomputed analyze_image() result (computed if omitted)
+    
+    Returns:
+        Dict with 'pass', 'score', 'gap_ratio'
+    """
+    if analysis is None:
+        analysis = analyze_image(image)
+    
+    thresholds = ARTIFACT_THRESHOLDS['banding']
+    hist = analysis.luminance_hist
+    cdf = np.cumsum(hist) / max(1, hist.sum())
+    
+    # Used tonal range, ignoring the extreme tails
+    low = int(np.searchsorted(cdf, thresholds['percentile']))
+    high = int(np.searchsorted(cdf, 1 - thresholds['percentile']))
+    levels = high - low + 1
+    
+    if levels < 16:
+        # Near-flat image: too few levels for gaps to mean anything
+        gap_ratio = 0.0
+    else:
+        gap_ratio = float((hist[low:high + 1] == 0).sum()) / levels
+    
+    if gap_ratio <= thresholds['acceptable_gap_ratio']:
+        score = 100
+        passes = True
+        status = 'smooth tonal range'
+    elif gap_ratio <= thresholds['posterized_gap_ratio']:
+        score = 80
+        passes = True
+        status = 'some banding'
+    else:
+        score = 60
+        passes = False
+        status = 'posterized'
+    
+    return {
+        'check': 'banding',
+        'pass': passes,
+        'score': score,
+        'gap_ratio': gap_ratio,
+        'tonal_levels': levels,
+        'status': status,
+        'details': f"Empty luma levels: {gap_ratio * 100:.0f}% of {levels} ({status})"
+    }
+
+
+def check_clipping(image: Image.Image, analysis: Optional[ImageAnalysis] = None) -> Dict:
+    """
+    Check for crushed shadows and blown highlights.
+    
+    Args:
+        image: PIL Image object
+        analysis: Precomputed analyze_image() result (computed if omitted)
+    
+    Returns:
+        Dict with 'pass', 'score', 'shadow_ratio', 'highlight_ratio'
+    """
+    if analysis is None:
+        analysis = analyze_image(image)
+    
+    thresholds = ARTIFACT_THRESHOLDS['clipping']
+    hist = analysis.luminance_hist
+    total = max(1, hist.sum())
+    shadow_ratio = float(hist[:thresholds['shadow_level'] + 1].sum()) / total
+    highlight_ratio = float(hist[thresholds['highlight_level']:].sum()) / total
+    clipped = shadow_ratio + highlight_ratio
+    
+    if clipped <= thresholds['acceptable_ratio']:
+        score = 100
+        passes = True
+        status = 'full tonal detail'
+    elif clipped <= thresholds['fail_ratio']:
+        score = 85
+        passes = True
+        status = 'some clipping'
+    else:
+        score = 65
+        passes = False
+        status = 'heavy clipping'
+    
+    return {
+        'check': 'clipping',
+        'pass': passes,
+        'score': score,
+        'shadow_ratio': shadow_ratio,
+        'highlight_ratio': highlight_ratio,
+        'status': status,
+        'details': f"Clipped shadows: {shadow_ratio * 100:.1f}%, highlights: {highlight_ratio * 100:.1f}% ({status})"
+    }
+
+
+def _dark_run(profile: np.ndarray, dark_level: int) -> int:
+    """Length of the leading run of entries at or below dark_level."""
+    bright = np.flatnonzero(profile > dark_level)
+    return int(bright[0]) if len(bright) else len(profile)
+
+
+def detect_letterbox(image: Image.Image, analysis: Optional[ImageAnalysis] = None) -> Dict:
+    """
+    Detect black bars (letterboxing/pillarboxing) along the frame edges.
+    
+    A bar is a run of edge rows or columns whose brightest pixel is still
+    near-black. The composition prompts forbid black bars, so any bar wider
+    than a sliver fails.
+    
+    Args:
+        image: PIL Image object
+        analysis: Precomputed analyze_image() result (computed if omitted)
+    
+    Returns:
+        Dict with 'pass', 'score', 'bars' (pixels per side)
+    """
+    if analysis is None:
+        analysis = analyze_image(image)
+    
+    thresholds = ARTIFACT_THRESHOLDS['letterbox']
+    dark = thresholds['dark_level']
+    scale = analysis.profile_scale
+    rows, cols = analysis.row_max, analysis.col_max
+    
+    bars = {
+        'top': _dark_run(rows, dark) * scale,
+        'bottom': _dark_run(rows[::-1], dark) * scale,
+        'left': _dark_run(cols, dark) * scale,
+        'right': _dark_run(cols[::-1], dark) * scale
+    }
+    
+    if bars['top'] >= analysis.height or bars['left'] >= analysis.width:
+        score = 0
+        passes = False
+        status = 'black frame'
+        bars = {side: 0 for side in bars}
+    else:
+        min_rows = thresholds['min_bar_ratio'] * analysis.height
+        min_cols = thresholds['min_bar_ratio'] * analysis.width
+        found = [side for side in ('top', 'bottom') if bars[side] >= max(1, min_rows)] + \
+                [side for side in ('left', 'right') if bars[side] >= max(1, min_cols)]
+        if found:
+            score = 40
+            passes = False
+            status = f"black bars ({', '.join(found)})"
+        else:
+            score = 100
+            passes = True
+            status = 'no black bars'
+    
+    return {
+        'check': 'letterbox',
+        'pass': passes,
+        'score': score,
+        'bars': bars,
+        'status': status,
+        'details': f"Letterbox: {status}"
+    }
+
+
+def detect_edge_halo(image: Image.Image) -> Optional[Dict]:
+    """
+    Detect halos (light or dark fringes) around a transparent cutout.
+    
+    Compares each pixel on the rim of the opaque subject with the average of
+    the interior band just inside it; leftover background from extraction
+    shows up as a rim that is consistently brighter or darker.
+    
+    Args:
+        image: PIL Image object (only RGBA images with a cutout are checked)
+    
+    Returns:
+        Dict with 'pass', 'score', 'halo_delta', or None if not applicable
+    """
+    if image.mode != 'RGBA':
+        return None
+    
+    from scipy import ndimage
+    
+    thresholds = ARTIFACT_THRESHOLDS['edge_halo']
+    width = thresholds['edge_width']
+    
+    alpha = np.asarray(image.getchannel('A'))
+    subject = alpha >= 128
+    if subject.all() or not subject.any():
+        return None
+    
+    # Work inside the subject's bounding box (plus margin) only
+    ys, xs = np.nonzero(subject)
+    margin = 4 * width + 2
+    y0, y1 = max(0, ys.min() - margin), min(alpha.shape[0], ys.max() + margin + 1)
+    x0, x1 = max(0, xs.min() - margin), min(alpha.shape[1], xs.max() + margin + 1)
+    subject = subject[y0:y1, x0:x1]
+    
+    interior = ndimage.binary_erosion(subject, iterations=width)
+    rim = subject & ~interior
+    band = interior & ~ndimage.binary_erosion(interior, iterations=width)
+    if not band.any():
+        return None
+    
+    luma = _luminance(np.asarray(image.crop((x0, y0, x1, y1)).convert('RGB'))).astype(np.float32)
+    
+    # Local mean of the interior band around every pixel
+    size = 2 * (2 * width) + 1
+    band_f = band.astype(np.float32)
+    band_sum = ndimage.uniform_filter(luma * band_f, size=size)
+    band_count = ndimage.uniform_filter(band_f, size=size)
+    compared = rim & (band_count > 0)
+    if not compared.any():
+        return None
+    
+    differences = luma[compared] - band_sum[compared] / band_count[compared]
+    halo_delta = float(np.abs(differences).mean())
+    fringe = 'light' if differences.mean() > 0 else 'dark'
+    
+    if halo_delta <= thresholds['acceptable_delta']:
+        score = 100
+        passes = True
+        status = 'clean edges'
+    elif halo_delta <= thresholds['visible_delta']:
+        score = 80
+        passes = True
+        status = f'slight {fringe} fringe'
+    else:
+        score = 55
+        passes = False
+        status = f'visible {fringe} halo'
+    
+    return {
+        'check': 'edge_halo',
+        'pass': passes,
+        'score': score,
+        'halo_delta': halo_delta,
+        'status': status,
+        'details': f"Edge rim vs interior luma: {halo_delta:.1f} ({status})"
+    }
 
 
 def check_resolution_quality(image: Image.Image) -> Dict:
@@ -245,13 +949,8 @@ def calculate_technical_qa_score(checks: list) -> int:
     if not checks:
         return 0
     
-    # Weighted average
-    weights = {
-        'aspect_ratio': 0.35,  # Most important
-        'color_saturation': 0.25,
-        'noise_artifacts': 0.25,
-        'resolution': 0.15
-    }
+    # Weighted average (aspect ratio and letterbox weigh the most)
+    weights = QA_WEIGHTS['technical']
     
     total_score = 0
     total_weight = 0
@@ -268,24 +967,38 @@ def calculate_technical_qa_score(checks: list) -> int:
         return 0
 
 
-def run_technical_qa(image: Image.Image, expected_aspect_ratio: str = '16:9') -> Dict:
+def run_technical_qa(image: Image.Image, expected_aspect_ratio: str = '16:9', sampling: Optional[str] = None) -> Dict:
     """
     Run complete technical QA suite on an image.
     
     Args:
         image: PIL Image object
         expected_aspect_ratio: Expected aspect ratio (e.g., '16:9', '3:2')
+        sampling: 'full', 'tiles' or 'auto' (see analyze_image); defaults to
+                  QA_SAMPLING['default_mode']
     
     Returns:
         Dict with overall score and individual check results
     """
     checks = []
     
+    # Decode and gather pixel statistics once for all checks
+    analysis = analyze_image(image, sampling or QA_SAMPLING['default_mode'])
+    
     # Run all checks
     checks.append(verify_aspect_ratio(image, expected_aspect_ratio))
-    checks.append(check_color_saturation(image))
-    checks.append(detect_noise_artifacts(image))
+    checks.append(check_color_saturation(image, analysis))
+    checks.append(detect_noise_artifacts(image, analysis))
     checks.append(check_resolution_quality(image))
+    checks.append(detect_blockiness(image, analysis))
+    checks.append(detect_banding(image, analysis))
+    checks.append(check_clipping(image, analysis))
+    checks.append(detect_letterbox(image, analysis))
+    
+    # Cutout edges only exist on transparent outputs
+    halo = detect_edge_halo(image)
+    if halo:
+        checks.append(halo)
     
     # Calculate overall score
     overall_score = calculate_technical_qa_score(checks)
@@ -308,6 +1021,7 @@ def run_technical_qa(image: Image.Image, expected_aspect_ratio: str = '16:9') ->
         'status_label': status_label,
         'checks': checks,
         'pass_count': sum(1 for c in checks if c['pass']),
-        'total_checks': len(checks)
+        'total_checks': len(checks),
+        'sampling': analysis.sampling or {'mode': 'full'}
     }
 
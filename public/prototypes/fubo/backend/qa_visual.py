@@ -5,20 +5,310 @@ Uses AI (Gemini Vision API) to detect visual integrity issues including:
 - Human pose validation (no extra limbs, realistic poses)
 - Context validation (appropriate venue/setting)
 - Anomaly detection (visual artifacts, impossible scenes)
+
+Checks ask for JSON verdicts (JSON mode when the SDK supports it), parse the
+response as it streams, stop reading once the verdict fields are known, and
+validate the fields against VERDICT_SCHEMAS before grading.
 """
 
-import google.generativeai as genai
 from PIL import Image
-from typing import Dict
+from typing import Dict, List, Union
 import io
+import json
+import re
+import threading
+import time
+
+from config import PLAYER_INTEGRITY
+from lifecycle import configure_gemini, genai
+from vision_payloads import VisionPayloads, payloads_for
+
+
+# Expected JSON fields per check. 'verdict' fields are what grading needs;
+# 'details' explain a failing verdict. Once the verdict is complete, and the
+# details too unless the verdict matches 'passing', the rest of the stream
+# is not read. 'final' maps a field value that settles the verdict on its own.
+VERDICT_SCHEMAS = {
+    'sports_equipment': {
+        'properties': {
+            'sport_detected': ('string',),
+            'appropriate': ('boolean',),
+            'equipment_found': ('array',),
+            'issues': ('array',)
+        },
+        'required': ['sport_detected', 'appropriate'],
+        'verdict': ['sport_detected', 'appropriate', 'equipment_found'],
+        'details': ['issues'],
+        'passing': {'appropriate': True}
+    },
+    'human_pose': {
+        'properties': {
+            'anatomy_correct': ('boolean',),
+            'issues': ('array',)
+        },
+        'required': ['anatomy_correct'],
+        'verdict': ['anatomy_correct'],
+        'details': ['issues'],
+        'final': {'anatomy_correct': True}
+    },
+    'context_validation': {
+        'properties': {
+            'sport_detected': ('string',),
+            'context_match': ('boolean',),
+            'explanation': ('string',)
+        },
+        'required': ['sport_detected', 'context_match'],
+        'verdict': ['sport_detected', 'context_match']
+    },
+    'text_accuracy': {
+        'properties': {
+            'text_visible': ('boolean',),
+            'team_name': ('string', 'null'),
+            'jersey_number': ('string', 'integer', 'null'),
+            'correct': ('boolean', 'null'),
+            'number_valid': ('boolean', 'null'),
+            'issues': ('array',)
+        },
+        'required': ['text_visible'],
+        'verdict': ['text_visible', 'team_name', 'jersey_number', 'correct', 'number_valid'],
+        'final': {'text_visible': False}
+    }
+}
+
+JSON_TYPES = {
+    'string': str,
+    'boolean': bool,
+    'array': list,
+    'integer': int,
+    'null': type(None)
+}
+
+# None until the first request tells us whether the model accepts JSON mode
+_JSON_MODE_SUPPORTED = None
+
+_PARSE_STATS = {}
+_PARSE_STATS_LOCK = threading.Lock()
+
+
+class VerdictParseError(ValueError):
+    """The model's response did not contain a valid verdict."""
+
+
+class StreamingVerdictParser:
+    """
+    Picks top-level fields out of a JSON response while it streams in.
+    
+    Values are decoded as soon as they are complete, so a verdict can be
+    read before the model has finished writing its explanation. Tolerates
+    markdown code fences around the JSON.
+    """
+    
+    def __init__(self, schema: Dict):
+        self.schema = schema
+        self.buffer = ''
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+        self._patterns = {name: re.compile(r'"%s"\s*:\s*' % re.escape(name)) for name in schema['properties']}
+    
+    def feed(self, text: str) -> bool:
+        """
+        Add a streamed chunk.
+        
+        Returns:
+            True once the verdict (and the details of a failing one) is known,
+            or a 'final' value settled it
+        """
+        self.buffer += text
+        for name, pattern in self._patterns.items():
+            if name in self.fields:
+                continue
+            match = pattern.search(self.buffer)
+            if not match:
+                continue
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, match.end())
+            except ValueError:
+                continue  # Value still streaming
+            # A number at the very end of the buffer may have more digits coming
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and end == len(self.buffer):
+                continue
+            self.fields[name] = value
+        return self.ready()
+    
+    def ready(self) -> bool:
+        for name, value in self.schema.get('final', {}).items():
+            if name in self.fields and self.fields[name] == value:
+                return True
+        if not all(name in self.fields for name in self.schema['verdict']):
+            return False
+        passing = self.schema.get('passing')
+        if passing and all(self.fields[name] == value for name, value in passing.items()):
+            return True
+        return all(name in self.fields for name in self.schema.get('details', []))
+    
+    def result(self) -> Dict:
+        """Fields of the complete response (falls back to those found while streaming)."""
+        start = self.buffer.find('{')
+        end = self.buffer.rfind('}')
+        if start != -1 and end > start:
+            try:
+                parsed = json.loads(self.buffer[start:end + 1])
+                if isinstance(parsed, dict):
+                    return parsed
+            except ValueError:
+                pass
+        return dict(self.fields)
+
+
+def validate_verdict(schema: Dict, fields: Dict) -> List[str]:
+    """
+    Check parsed fields against a VERDICT_SCHEMAS entry.
+    
+    Returns:
+        List of problems (empty when valid)
+    """
+    errors = []
+    for name in schema['required']:
+        if name not in fields:
+            errors.append(f"missing '{name}'")
+    for name, types in schema['properties'].items():
+        if name in fields and not isinstance(fields[name], tuple(JSON_TYPES[t] for t in types)):
+            errors.append(f"'{name}' should be {'/'.join(types)}")
+    return errors
+
+
+def _record_parse(check: str, **counts):
+    with _PARSE_STATS_LOCK:
+        stats = _PARSE_STATS.setdefault(check, {
+            'requests': 0, 'json_mode': 0, 'parsed': 0, 'early_stops': 0,
+            'schema_failures': 0, 'errors': 0, 'total_ms': 0.0
+        })
+        for key, value in counts.items():
+            stats[key] += value
+
+
+def parse_stats() -> Dict:
+    """Per-check request, early-stop and parse-failure counters."""
+    with _PARSE_STATS_LOCK:
+        report = {}
+        for check, stats in _PARSE_STATS.items():
+            requests = stats['requests'] or 1
+            report[check] = dict(
+                stats,
+                total_ms=round(stats['total_ms'], 1),
+                mean_ms=round(stats['total_ms'] / requests, 1),
+                parse_failure_rate=round(stats['schema_failures'] / requests, 3),
+                early_stop_rate=round(stats['early_stops'] / requests, 3)
+            )
+        return {'json_mode_supported': _JSON_MODE_SUPPORTED, 'checks': report}
+
+
+def _json_generation_config():
+    """GenerationConfig asking for a JSON response, or None if not available."""
+    if _JSON_MODE_SUPPORTED is False:
+        return None
+    try:
+        return genai.GenerationConfig(response_mime_type='application/json')
+    except (TypeError, AttributeError):
+        return None
+
+
+def _json_mode_rejected(error: Exception) -> bool:
+    """
+    Whether a failed request shows JSON mode itself was refused.
+    
+    The SDK raises TypeError for a GenerationConfig field it does not know;
+    the API answers InvalidArgument naming the mime type or config. Anything
+    else (timeouts, rate limits) says nothing about JSON mode support.
+    """
+    if isinstance(error, TypeError):
+        return True
+    try:
+        from google.api_core.exceptions import InvalidArgument
+    except ImportError:
+        return False
+    message = str(error).lower()
+    return isinstance(error, InvalidArgument) and any(
+        term in message for term in ('response_mime_type', 'mime type', 'generation_config', 'generationconfig'))
+
+
+def _stream_verdict(model, prompt: str, image_part: Dict, parser: StreamingVerdictParser,
+                    generation_config) -> bool:
+    """Stream a response into the parser. Returns True if it stopped early."""
+    response = model.generate_content([prompt, image_part], generation_config=generation_config, stream=True)
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # Chunk without text parts (e.g. finish reason only)
+        if parser.feed(text):
+            return True
+    return False
+
+
+def request_verdict(check: str, prompt: str, image: Union[Image.Image, VisionPayloads], gemini_api_key: str) -> Dict:
+    """
+    Ask Gemini for a JSON verdict and return its validated fields.
+    
+    Args:
+        check: VERDICT_SCHEMAS key
+        prompt: Prompt describing the expected JSON
+        image: PIL Image, or VisionPayloads shared between checks (the
+               upload is sized for this check, see VISION_PAYLOADS)
+        gemini_api_key: Gemini API key
+    
+    Returns:
+        Dict of response fields
+    
+    Raises:
+        VerdictParseError: If the response does not match the schema
+    """
+    global _JSON_MODE_SUPPORTED
+    
+    schema = VERDICT_SCHEMAS[check]
+    start = time.perf_counter()
+    configure_gemini(gemini_api_key)
+    model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
+    
+    image_part = payloads_for(image).part(check)
+    generation_config = _json_generation_config()
+    parser = StreamingVerdictParser(schema)
+    try:
+        try:
+            early = _stream_verdict(model, prompt, image_part, parser, generation_config)
+            if generation_config is not None:
+                _JSON_MODE_SUPPORTED = True
+        except Exception as e:
+            if generation_config is None or _JSON_MODE_SUPPORTED or not _json_mode_rejected(e):
+                raise
+            # The model does not accept JSON mode; the prompt alone asks for JSON
+            print(f"JSON mode request failed for {check} ({e}), retrying without it")
+            generation_config = None
+            parser = StreamingVerdictParser(schema)
+            early = _stream_verdict(model, prompt, image_part, parser, None)
+            _JSON_MODE_SUPPORTED = False
+    except Exception:
+        _record_parse(check, requests=1, errors=1, total_ms=(time.perf_counter() - start) * 1000)
+        raise
+    
+    fields = parser.fields if early else parser.result()
+    errors = validate_verdict(schema, fields)
+    _record_parse(
+        check, requests=1, json_mode=int(generation_config is not None),
+        parsed=int(not errors), early_stops=int(early), schema_failures=int(bool(errors)),
+        total_ms=(time.perf_counter() - start) * 1000
+    )
+    if errors:
+        raise VerdictParseError(f"{check} response invalid ({', '.join(errors)}): {parser.buffer[:200]!r}")
+    return fields
 
 
-def check_sports_equipment(image: Image.Image, expected_sport: str, gemini_api_key: str) -> Dict:
+def check_sports_equipment(image: Union[Image.Image, VisionPayloads], expected_sport: str, gemini_api_key: str) -> Dict:
     """
     Verify correct sports equipment is present and appropriate.
     
     Args:
-        image: PIL Image object
+        image: PIL Image object (or VisionPayloads shared between checks)
         expected_sport: Sport name (e.g., 'basketball', 'football')
         gemini_api_key: Gemini API key
     
@@ -26,54 +316,40 @@ def check_sports_equipment(image: Image.Image, expected_sport: str, gemini_api_k
         Dict with 'pass', 'score', 'detected_objects', 'issues'
     """
     try:
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        
         prompt = f"""
 Analyze this sports image for {expected_sport} and identify:
-1. What sports equipment is visible (ball, bat, stick, etc.)
-2. Is the equipment appropriate for {expected_sport}?
-3. Are there any wrong/mismatched equipment items?
+1. Which sport the image shows
+2. Is the visible equipment appropriate for {expected_sport}?
+3. What sports equipment is visible (ball, bat, stick, etc.) and any wrong/mismatched items
 
-Respond in JSON format:
+Respond with JSON only, keys in this order:
 {{
     "sport_detected": "sport name",
-    "equipment_found": ["list", "of", "equipment"],
     "appropriate": true/false,
-    "issues": ["list of any issues found"],
-    "confidence": 0-100
+    "equipment_found": ["list", "of", "equipment"],
+    "issues": ["list of any issues found"]
 }}
 """
         
-        response = model.generate_content([prompt, image])
+        verdict = request_verdict('sports_equipment', prompt, image, gemini_api_key)
         
-        # Parse response (simplified - in production would use proper JSON parsing)
-        if response and response.text:
-            text = response.text.strip()
-            
-            # Extract confidence and issues
-            # This is a simplified parsing - real implementation would parse JSON properly
-            if "appropriate" in text.lower() and ("true" in text.lower() or "correct" in text.lower()):
-                score = 95
-                passes = True
-                issues = []
-            elif "issue" in text.lower() or "wrong" in text.lower():
-                score = 70
-                passes = False
-                issues = ["Detected equipment issues"]
-            else:
-                score = 85
-                passes = True
-                issues = []
-            
-            return {
-                'check': 'sports_equipment',
-                'pass': passes,
-                'score': score,
-                'detected_objects': text[:200],  # Truncated for summary
-                'issues': issues,
-                'details': f"Equipment check for {expected_sport}"
-            }
+        if verdict['appropriate']:
+            score = 95
+            passes = True
+            issues = []
+        else:
+            score = 70
+            passes = False
+            issues = verdict.get('issues') or ["Detected equipment issues"]
+        
+        return {
+            'check': 'sports_equipment',
+            'pass': passes,
+            'score': score,
+            'detected_objects': ', '.join(str(item) for item in verdict.get('equipment_found', [])) or verdict['sport_detected'],
+            'issues': issues,
+            'details': f"Equipment check for {expected_sport} (detected {verdict['sport_detected']})"
+        }
         
     except Exception as e:
         print(f"Error in equipment check: {e}")
@@ -88,21 +364,18 @@ Respond in JSON format:
         }
 
 
-def check_human_pose(image: Image.Image, gemini_api_key: str) -> Dict:
+def check_human_pose(image: Union[Image.Image, VisionPayloads], gemini_api_key: str) -> Dict:
     """
     Validate human poses are realistic (no extra limbs, correct anatomy).
     
     Args:
-        image: PIL Image object
+        image: PIL Image object (or VisionPayloads shared between checks)
         gemini_api_key: Gemini API key
     
     Returns:
         Dict with 'pass', 'score', 'pose_issues'
     """
     try:
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        
         prompt = """
 Analyze the human figures in this sports image for anatomical correctness:
 1. Do all people have correct number of limbs (2 arms, 2 legs)?
@@ -110,36 +383,31 @@ Analyze the human figures in this sports image for anatomical correctness:
 3. Are there any duplicated or extra body parts?
 4. Are proportions correct?
 
-Respond with:
-- "PASS" if all poses are realistic and correct
-- "ISSUES" followed by description if there are problems
+Respond with JSON only, keys in this order:
+{
+    "anatomy_correct": true if all poses are realistic and correct, otherwise false,
+    "issues": ["description of each problem"]
+}
 """
         
-        response = model.generate_content([prompt, image])
+        verdict = request_verdict('human_pose', prompt, image, gemini_api_key)
         
-        if response and response.text:
-            text = response.text.strip().upper()
-            
-            if "PASS" in text and "ISSUE" not in text:
-                score = 100
-                passes = True
-                issues = []
-            elif "ISSUE" in text:
-                score = 60
-                passes = False
-                issues = ["Pose or anatomy issues detected"]
-            else:
-                score = 85
-                passes = True
-                issues = []
-            
-            return {
-                'check': 'human_pose',
-                'pass': passes,
-                'score': score,
-                'pose_issues': issues,
-                'details': text[:200]
-            }
+        if verdict['anatomy_correct']:
+            score = 100
+            passes = True
+            issues = []
+        else:
+            score = 60
+            passes = False
+            issues = verdict.get('issues') or ["Pose or anatomy issues detected"]
+        
+        return {
+            'check': 'human_pose',
+            'pass': passes,
+            'score': score,
+            'pose_issues': issues,
+            'details': '; '.join(str(issue) for issue in issues) or 'Poses realistic'
+        }
         
     except Exception as e:
         print(f"Error in pose check: {e}")
@@ -152,14 +420,14 @@ Respond with:
         }
 
 
-def check_text_accuracy(image: Image.Image, expected_team_name: str, gemini_api_key: str) -> Dict:
+def check_text_accuracy(image: Union[Image.Image, VisionPayloads], expected_team_name: str, gemini_api_key: str) -> Dict:
     """
     Check if text on jersey/uniform matches expected team name.
     Catches misspellings like "DOLTICS" instead of "CELTICS".
     Also validates jersey numbers aren't likely active roster numbers.
     
     Args:
-        image: PIL Image object
+        image: PIL Image object (or VisionPayloads; cutouts are cropped to the jersey)
         expected_team_name: Full team name (e.g., "Boston Celtics")
         gemini_api_key: Gemini API key
     
@@ -167,9 +435,6 @@ def check_text_accuracy(image: Image.Image, expected_team_name: str, gemini_api_
         Dict with 'pass', 'score', 'detected_text', 'issues'
     """
     try:
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        
         # Extract just the team name (not city)
         team_name_only = expected_team_name.split()[-1].upper()  # e.g., "CELTICS", "LAKERS"
         
@@ -189,94 +454,83 @@ Check for:
    - Risky: Numbers ≥ 40 OR very common numbers (0, 1, 3, 10, 11, 13, 23, 24, 30, 32, 33, 34)
    - Rule violation: Any number 40 or higher
 
-Respond in this format:
-TEAM NAME: [team name you see]
-JERSEY NUMBER: [number you see, or NONE]
-CORRECT: YES/NO
-NUMBER VALID: YES (if < 40 and uncommon) / NO (if ≥ 40 or too common)
-ISSUES: [list any problems found]
-
-If no text visible, respond: NO_TEXT
+Respond with JSON only, keys in this order:
+{{
+    "text_visible": true/false (false if no text is visible on the jersey),
+    "team_name": "team name you see" or null,
+    "jersey_number": "number you see" or null,
+    "correct": true/false (team name spelled exactly right) or null,
+    "number_valid": true (< 40 and uncommon) / false (≥ 40 or too common) or null,
+    "issues": ["list any problems found"]
+}}
 """
         
-        response = model.generate_content([prompt, image])
+        verdict = request_verdict('text_accuracy', prompt, image, gemini_api_key)
         
-        if response and response.text:
-            text = response.text.strip().upper()
-            
-            # Parse response
-            detected_team_name = ""
-            detected_number = ""
-            issues = []
-            
-            if "TEAM NAME:" in text:
-                detected_team_name = text.split("TEAM NAME:")[1].split("\n")[0].strip()
-            
-            if "JERSEY NUMBER:" in text:
-                detected_number = text.split("JERSEY NUMBER:")[1].split("\n")[0].strip()
-            
-            # Check jersey number validity (must be < 40)
-            number_valid = True
-            if detected_number and detected_number != "NONE":
-                # Parse number if possible
-                try:
-                    num = int(detected_number.replace('O', '0'))  # Handle OCR errors
-                    if num >= 40:
-                        issues.append(f"Jersey #{num} is ≥40 (must be <40)")
-                        number_valid = False
-                except:
-                    pass
-                
-                # Also check Gemini's assessment
-                if "NUMBER VALID: NO" in text:
-                    if "≥ 40" in text or "40 OR HIGHER" in text.upper():
-                        issues.append(f"Jersey #{detected_number} is 40 or higher (rule violation)")
-                    else:
-                        issues.append(f"Jersey #{detected_number} may be active roster number")
+        detected_team_name = (verdict.get('team_name') or '').strip().upper()
+        detected_number = str(verdict.get('jersey_number') or '').strip().upper()
+        issues = []
+        
+        # Check jersey number validity (must be < 40)
+        number_valid = True
+        if detected_number and detected_number != "NONE":
+            # Parse number if possible
+            try:
+                num = int(detected_number.replace('O', '0'))  # Handle OCR errors
+                if num >= 40:
+                    issues.append(f"Jersey #{num} is ≥40 (must be <40)")
                     number_valid = False
+            except ValueError:
+                num = None
             
-            # Check if correct
-            if "NO_TEXT" in text:
-                score = 50
-                passes = False
-                issues.append("No text detected on jersey")
-                status = 'no_text'
-            elif "CORRECT: YES" in text and number_valid:
-                # Text matches expected and number is valid
-                score = 100
-                passes = True
-                status = 'correct'
-            elif "CORRECT: YES" in text and not number_valid:
-                # Text correct but invalid number
-                score = 60
-                passes = False
-                status = 'correct_invalid_number'
-            elif "CORRECT: NO" in text:
-                # Text has errors - FAIL HARD on misspellings
-                score = 0  # Changed from 30 to 0 - zero tolerance
-                passes = False
-                if detected_team_name:
-                    issues.append(f"🚨 SPELLING ERROR: Expected '{team_name_only}', detected '{detected_team_name}'")
-                else:
-                    issues.append(f"🚨 MISSPELLED TEAM NAME - Regenerate required")
-                status = 'incorrect'
+            # Also check Gemini's assessment
+            if verdict.get('number_valid') is False:
+                if num is None or num < 40:
+                    issues.append(f"Jersey #{detected_number} may be active roster number")
+                number_valid = False
+        
+        # Check if correct
+        if not verdict['text_visible']:
+            score = 50
+            passes = False
+            issues.append("No text detected on jersey")
+            status = 'no_text'
+        elif verdict.get('correct') is True and number_valid:
+            # Text matches expected and number is valid
+            score = 100
+            passes = True
+            status = 'correct'
+        elif verdict.get('correct') is True and not number_valid:
+            # Text correct but invalid number
+            score = 60
+            passes = False
+            status = 'correct_invalid_number'
+        elif verdict.get('correct') is False:
+            # Text has errors - FAIL HARD on misspellings
+            score = 0  # Changed from 30 to 0 - zero tolerance
+            passes = False
+            if detected_team_name:
+                issues.append(f"🚨 SPELLING ERROR: Expected '{team_name_only}', detected '{detected_team_name}'")
             else:
-                # Unclear response - default to passing with lower score
-                score = 75
-                passes = True
-                status = 'unclear'
-            
-            return {
-                'check': 'text_accuracy',
-                'pass': passes,
-                'score': score,
-                'detected_text': detected_team_name,
-                'detected_number': detected_number,
-                'expected_text': team_name_only,
-                'issues': issues,
-                'status': status,
-                'details': f"Text: {status}, Number: {detected_number if detected_number else 'none'}"
-            }
+                issues.append(f"🚨 MISSPELLED TEAM NAME - Regenerate required")
+            status = 'incorrect'
+        else:
+            # Text visible but no spelling verdict - default to passing with lower score
+            score = 75
+            passes = True
+            status = 'unclear'
+        
+        return {
+            'check': 'text_accuracy',
+            'pass': passes,
+            'score': score,
+            'detected_text': detected_team_name,
+            'detected_number': detected_number,
+            'expected_text': team_name_only,
+            'issues': issues,
+            'status': status,
+            'details': f"Text: {status}, Number: {detected_number if detected_number else 'none'}"
+        }
         
     except Exception as e:
         print(f"Error in text accuracy check: {e}")
@@ -291,12 +545,12 @@ If no text visible, respond: NO_TEXT
         }
 
 
-def check_context_validation(image: Image.Image, expected_sport: str, content_type: str, gemini_api_key: str) -> Dict:
+def check_context_validation(image: Union[Image.Image, VisionPayloads], expected_sport: str, content_type: str, gemini_api_key: str) -> Dict:
     """
     Validate context matches expected sport and content type.
     
     Args:
-        image: PIL Image object
+        image: PIL Image object (or VisionPayloads shared between checks)
         expected_sport: Sport name
         content_type: 'player', 'action', 'stadium', 'closeup'
         gemini_api_key: Gemini API key
@@ -305,9 +559,6 @@ def check_context_validation(image: Image.Image, expected_sport: str, content_ty
         Dict with 'pass', 'score', 'context_match'
     """
     try:
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-image-preview')
-        
         venue_map = {
             'basketball': 'basketball court/arena',
             'football': 'football field/stadium',
@@ -324,34 +575,32 @@ Verify this image matches expected context:
 - Expected venue: {expected_venue}
 
 Does the image show the correct sport and appropriate setting?
-Respond with "CORRECT" if it matches, or "MISMATCH" with explanation if not.
+Respond with JSON only, keys in this order:
+{{
+    "sport_detected": "sport name",
+    "context_match": true if sport and setting match, otherwise false,
+    "explanation": "short reason if they do not match"
+}}
 """
         
-        response = model.generate_content([prompt, image])
+        verdict = request_verdict('context_validation', prompt, image, gemini_api_key)
         
-        if response and response.text:
-            text = response.text.strip().upper()
-            
-            if "CORRECT" in text or "MATCH" in text and "MISMATCH" not in text:
-                score = 95
-                passes = True
-                context_match = True
-            elif "MISMATCH" in text or "WRONG" in text:
-                score = 65
-                passes = False
-                context_match = False
-            else:
-                score = 85
-                passes = True
-                context_match = True
-            
-            return {
-                'check': 'context_validation',
-                'pass': passes,
-                'score': score,
-                'context_match': context_match,
-                'details': f"Context check for {expected_sport} {content_type}"
-            }
+        if verdict['context_match']:
+            score = 95
+            passes = True
+            context_match = True
+        else:
+            score = 65
+            passes = False
+            context_match = False
+        
+        return {
+            'check': 'context_validation',
+            'pass': passes,
+            'score': score,
+            'context_match': context_match,
+            'details': f"Context check for {expected_sport} {content_type} (detected {verdict['sport_detected']})"
+        }
         
     except Exception as e:
         print(f"Error in context check: {e}")
@@ -415,6 +664,8 @@ def run_visual_integrity_qa(image: Image.Image, expected_sport: str, content_typ
         Dict with overall score and individual check results
     """
     checks = []
+    # Each upload size is encoded once and shared by the checks
+    image = payloads_for(image)
     
     # Run checks (can be run in parallel for better performance)
     try:
@@ -438,6 +689,19 @@ def run_visual_integrity_qa(image: Image.Image, expected_sport: str, content_typ
             'error': str(e)
         }
     
+    return summarize_visual_checks(checks)
+
+
+def summarize_visual_checks(checks: list) -> Dict:
+    """
+    Build the visual integrity result for a list of completed checks.
+    
+    Args:
+        checks: List of check result dicts
+    
+    Returns:
+        Dict with overall score, status and the individual check results
+    """
     # Calculate overall score
     overall_score = calculate_visual_integrity_score(checks)
     
@@ -513,85 +777,125 @@ def run_combined_qa(image: Image.Image, expected_aspect_ratio: str, expected_spo
 def check_player_integrity(transparent_image: Image.Image) -> Dict:
     """
     Verify that transparency removed background, NOT the player.
-    Validates that the subject is still present and intact.
+    Validates that the subject is still present, in one piece and intact.
+    
+    The alpha mask is reduced to PLAYER_INTEGRITY['analysis_size'] and
+    labelled into connected components, which exposes detached limbs,
+    floating fragments and holes punched through the subject.
     
     Args:
         transparent_image: Image after background removal (RGBA)
     
     Returns:
-        Dict with integrity score, opaque percentage, and validation details
+        Dict with integrity score, opaque percentage, topology metrics and validation details
     """
     import numpy as np
+    from scipy import ndimage
+    
+    limits = PLAYER_INTEGRITY
     
     try:
-        # Ensure RGBA mode
+        # Only the alpha band is needed, at analysis resolution
         if transparent_image.mode != 'RGBA':
             transparent_image = transparent_image.convert('RGBA')
-        
-        # Convert to array and get alpha channel
-        img_array = np.array(transparent_image)
-        alpha = img_array[:, :, 3]
+        alpha_band = transparent_image.getchannel('A')
+        scale = limits['analysis_size'] / max(alpha_band.size)
+        if scale < 1:
+            size = (max(1, round(alpha_band.width * scale)), max(1, round(alpha_band.height * scale)))
+            alpha_band = alpha_band.resize(size, Image.Resampling.BOX)
+        mask = np.asarray(alpha_band) > limits['alpha_threshold']
         
         # Calculate opaque region (subject)
-        opaque_pixels = np.sum(alpha > 128)
-        total_pixels = alpha.size
+        opaque_pixels = int(np.count_nonzero(mask))
+        total_pixels = mask.size
         opaque_percent = (opaque_pixels / total_pixels) * 100
         
+        # Connected components (8-connected, so diagonal strokes stay joined)
+        labels, count = ndimage.label(mask, structure=np.ones((3, 3), dtype=bool))
+        areas = np.bincount(labels.ravel())[1:]
+        largest = int(areas.argmax()) + 1 if count else 0
+        largest_ratio = float(areas.max() / opaque_pixels) if count else 0.0
+        min_fragment = limits['min_fragment_ratio'] * total_pixels
+        fragment_count = int(np.count_nonzero(areas >= min_fragment)) - 1 if count else 0
+        
+        # Holes: transparent areas fully enclosed by the main subject
+        hole_ratio = 0.0
+        if count:
+            body = labels == largest
+            hole_area = np.count_nonzero(ndimage.binary_fill_holes(body)) - areas[largest - 1]
+            hole_ratio = float(hole_area / areas[largest - 1])
+        
+        # Centroid of the opaque pixels, relative to frame size
+        centroid = None
+        if opaque_pixels:
+            rows, cols = np.nonzero(mask)
+            centroid = (float(cols.mean() + 0.5) / mask.shape[1], float(rows.mean() + 0.5) / mask.shape[0])
+        
         # Check if opaque region is reasonable for sports images
         # Expected: 15-50% (player + equipment)
         # Too low (<15%) = removed player
         # Too high (>80%) = didn't remove background
-        
+        issues = []
         if opaque_percent < 15:
             score = 30
-            issue = "Player may have been removed - too little remains"
+            issues.append("Player may have been removed - too little remains")
         elif opaque_percent > 80:
             score = 40
-            issue = "Background not removed - too much remains"
+            issues.append("Background not removed - too much remains")
         elif opaque_percent < 25:
             score = 60
-            issue = "Significant player loss detected"
+            issues.append("Significant player loss detected")
         elif opaque_percent > 65:
             score = 70
-            issue = "Incomplete background removal"
+            issues.append("Incomplete background removal")
         else:
-            # Check if opaque region is centrally located
-            # (Player should be centered in sports images)
-            opaque_rows = np.any(alpha > 128, axis=1)
-            opaque_cols = np.any(alpha > 128, axis=0)
+            # Player should be centered in sports images
+            row_deviation = abs(centroid[1] - 0.5)
+            col_deviation = abs(centroid[0] - 0.5)
             
-            if np.any(opaque_rows) and np.any(opaque_cols):
-                center_mass_row = np.average(np.where(opaque_rows)[0])
-                center_mass_col = np.average(np.where(opaque_cols)[0])
-                
-                height, width = alpha.shape
-                expected_center_row = height / 2
-                expected_center_col = width / 2
-                
-                # Calculate deviation from center
-                row_deviation = abs(center_mass_row - expected_center_row) / height
-                col_deviation = abs(center_mass_col - expected_center_col) / width
-                
-                # Good if within 30% of center
-                if row_deviation < 0.3 and col_deviation < 0.3:
-                    score = 95
-                    issue = "Player integrity excellent"
-                elif row_deviation < 0.4 and col_deviation < 0.4:
-                    score = 85
-                    issue = "Player integrity good"
-                else:
-                    score = 75
-                    issue = "Player slightly off-center"
+            # Good if within 30% of center
+            if row_deviation < 0.3 and col_deviation < 0.3:
+                score = 95
+            elif row_deviation < 0.4 and col_deviation < 0.4:
+                score = 85
             else:
-                score = 50
-                issue = "Unable to detect subject center"
+                score = 75
+                issues.append("Player slightly off-center")
+        
+        # Topology penalties
+        if count and largest_ratio < limits['largest_ratio_min']:
+            score -= 25
+            issues.append(f"Subject split apart - main body holds {largest_ratio:.0%} of it")
+        elif count and largest_ratio < limits['largest_ratio_ok']:
+            score -= 10
+            issues.append(f"Detached parts - main body holds {largest_ratio:.0%} of subject")
+        if fragment_count > limits['max_fragments']:
+            score -= 10
+            issues.append(f"{fragment_count} floating fragments")
+        if hole_ratio > limits['hole_ratio_max']:
+            score -= 20
+            issues.append(f"Holes cut through subject ({hole_ratio:.0%} of its area)")
+        elif hole_ratio > limits['hole_ratio_ok']:
+            score -= 10
+            issues.append(f"Holes in subject ({hole_ratio:.0%} of its area)")
+        score = max(score, 0)
+        
+        if not issues:
+            issue = "Player integrity excellent" if score >= 95 else "Player integrity good"
+        else:
+            issue = '; '.join(issues)
         
         return {
             'score': score,
             'opaque_percent': round(opaque_percent, 1),
             'issue': issue,
-            'pass_threshold': 75,
-            'passed': score >= 75
+            'issues': issues,
+            'largest_component_ratio': round(largest_ratio, 3),
+            'fragment_count': max(fragment_count, 0),
+            'hole_ratio': round(hole_ratio, 3),
+            'centroid': [round(c, 3) for c in centroid] if centroid else None,
+            'pass_threshold': limits['pass_threshold'],
+            'passed': score >= limits['pass_threshold']
         }
         
     except Exception as e:
@@ -600,7 +904,6 @@ def check_player_integrity(transparent_image: Image.Image) -> Dict:
             'score': 50,
             'opaque_percent': 0,
             'issue': f'Error: {str(e)}',
-            'pass_threshold': 75,
+            'pass_threshold': limits['pass_threshold'],
             'passed': False
         }
-
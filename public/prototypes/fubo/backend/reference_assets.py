@@ -0,0 +1,250 @@
+"""
+Reference Asset Module
+Keeps every style reference image decoded in memory:
+- Loaded once, on first lookup or during warmup, from the reference directories
+- Model-ready RGB variant (bounded size) for generation requests
+- Preview thumbnail and original bytes pre-encoded as data URIs
+- Per-file refresh when a reference is uploaded or removed, and stat-based
+  revalidation on lookup so every worker sees uploads/removals made by others
+"""
+
+import base64
+import io
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import REFERENCE_CONFIG
+from static_assets import file_signature
+
+
+# Files picked up when scanning a reference directory
+REFERENCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp'
+}
+
+
+class ReferenceAsset:
+    """A single reference image with its pre-computed variants."""
+
+    def __init__(self, path: str, model_max_size: int, preview_size: int):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.signature = file_signature(path)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        # /get_style_reference serves the original file
+        mime = MIME_TYPES.get(os.path.splitext(self.filename)[1].lower(), 'image/jpeg')
+        self.source_data_uri = f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+
+        image = Image.open(io.BytesIO(data))
+        image.draft('RGB', (model_max_size, model_max_size))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        # Model input: bounded so every request sends the same, modest payload
+        if max(image.size) > model_max_size:
+            image.thumbnail((model_max_size, model_max_size), Image.Resampling.LANCZOS)
+        self.image = image
+
+        preview = image.copy()
+        preview.thumbnail((preview_size, preview_size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        preview.save(buffer, format='JPEG')
+        self.preview_data_uri = f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+class ReferenceAssetManager:
+    """
+    In-memory store of reference images, grouped by directory.
+
+    Images are decoded in load_all() (called by the first lookup if warmup
+    did not) and refresh(). After that a lookup costs a stat of each
+    directory and of the file returned, so changes made by another worker
+    are picked up: a directory whose (mtime_ns, size, inode) changed is
+    rescanned (files added or removed), and a file whose signature changed
+    is decoded again (overwritten in place).
+    """
+
+    def __init__(self, directories: Dict[str, str],
+                 resolver: Optional[Callable[[str, Optional[str]], Iterable[Tuple[str, str]]]] = None,
+                 model_max_size: int = None, preview_size: int = None):
+        """
+        Args:
+            directories: Mapping of directory key (e.g. 'builtin') to path
+            resolver: Function (style_name, sport) -> candidate (directory key, filename)
+                      pairs in priority order, used by for_style()
+            model_max_size: Longest edge of the model-ready variant
+            preview_size: Bounding box of the preview thumbnail
+        """
+        self.directories = directories
+        self.resolver = resolver
+        self.model_max_size = model_max_size or REFERENCE_CONFIG['model_max_size']
+        self.preview_size = preview_size or REFERENCE_CONFIG['preview_size']
+        self._assets: Dict[str, Dict[str, ReferenceAsset]] = {key: {} for key in directories}
+        self._signatures: Dict[str, Optional[Tuple]] = {key: None for key in directories}
+        # Keyed by client-supplied style names, so LRU-bounded
+        self._resolved = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loaded = False
+
+    def ensure_loaded(self) -> int:
+        """Load all assets if that has not happened yet. Returns the number loaded."""
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    self.load_all()
+        return sum(len(group) for group in self._assets.values())
+
+    def load_all(self) -> int:
+        """
+        Decode every reference image in the configured directories.
+
+        Returns:
+            Number of assets loaded
+        """
+        scanned = {key: self._scan(key, {}) for key in self.directories}
+
+        with self._lock:
+            for key, (signature, group) in scanned.items():
+                self._signatures[key] = signature
+                self._assets[key] = group
+            self._resolved.clear()
+            self.loaded = True
+
+        return sum(len(group) for group in self._assets.values())
+
+    def _scan(self, key: str, known: Dict[str, ReferenceAsset]) -> Tuple[Optional[Tuple], Dict[str, ReferenceAsset]]:
+        """Directory signature and its assets, reusing known ones whose files are unchanged."""
+        directory = self.directories[key]
+        signature = file_signature(directory)
+        group = {}
+        if signature is None or not os.path.isdir(directory):
+            return signature, group
+
+        for filename in sorted(os.listdir(directory)):
+            if not filename.lower().endswith(REFERENCE_EXTENSIONS):
+                continue
+            path = os.path.join(directory, filename)
+            asset = known.get(filename)
+            if asset is None or asset.signature != file_signature(path):
+                asset = self._load(path)
+            if asset:
+                group[filename] = asset
+        return signature, group
+
+    def _revalidate(self):
+        """Rescan directories whose signature changed since they were last read."""
+        self.ensure_loaded()
+        for key, directory in self.directories.items():
+            if file_signature(directory) == self._signatures[key]:
+                continue
+            signature, group = self._scan(key, self._assets[key])
+            with self._lock:
+                self._signatures[key] = signature
+                self._assets[key] = group
+                self._resolved.clear()
+
+    def _current(self, key: str, asset: Optional[ReferenceAsset]) -> Optional[ReferenceAsset]:
+        """The asset if its file is unchanged, else the reloaded asset (or None if it is gone)."""
+        if asset is None or file_signature(asset.path) == asset.signature:
+            return asset
+        return self.refresh(key, asset.filename)
+
+    def refresh(self, key: str, filename: str) -> Optional[ReferenceAsset]:
+        """
+        Reload (or drop) a single reference after it was written or removed.
+
+        Args:
+            key: Directory key
+            filename: File name inside that directory
+
+        Returns:
+            The new asset, or None if the file no longer exists
+        """
+        self.ensure_loaded()
+        path = os.path.join(self.directories[key], filename)
+        asset = self._load(path) if os.path.exists(path) else None
+
+        with self._lock:
+            group = dict(self._assets[key])
+            if asset:
+                group[filename] = asset
+            else:
+                group.pop(filename, None)
+            self._assets[key] = group
+            # Style/sport resolutions may now point elsewhere
+            self._resolved.clear()
+
+        return asset
+
+    def get(self, key: str, filename: str) -> Optional[ReferenceAsset]:
+        """Get a loaded asset by directory key and file name."""
+        self._revalidate()
+        return self._current(key, self._assets.get(key, {}).get(filename))
+
+    def find(self, key: str, stem: str, extensions: Iterable[str] = ('.jpg', '.jpeg', '.png')) -> Optional[ReferenceAsset]:
+        """Get the first loaded asset named stem + one of the extensions."""
+        self._revalidate()
+        group = self._assets.get(key, {})
+        for ext in extensions:
+            asset = self._current(key, group.get(f'{stem}{ext}'))
+            if asset:
+                return asset
+        return None
+
+    def for_style(self, style_name: str, sport: Optional[str] = None) -> Optional[ReferenceAsset]:
+        """
+        Resolve the reference for a style (and optional sport) via the resolver.
+
+        Args:
+            style_name: Style name as received from the client
+            sport: Detected sport, or None
+
+        Returns:
+            ReferenceAsset or None if no candidate is loaded
+        """
+        self._revalidate()
+        cache_key = (style_name, sport)
+        with self._lock:
+            cached = cache_key in self._resolved
+            if cached:
+                self._resolved.move_to_end(cache_key)
+                resolved = self._resolved[cache_key]
+        if cached and (resolved is None or file_signature(resolved.path) == resolved.signature):
+            return resolved
+
+        asset = None
+        for key, filename in self.resolver(style_name, sport) if self.resolver else []:
+            asset = self.get(key, filename)
+            if asset:
+                break
+
+        with self._lock:
+            self._resolved[cache_key] = asset
+            self._resolved.move_to_end(cache_key)
+            while len(self._resolved) > REFERENCE_CONFIG['resolved_cache_size']:
+                self._resolved.popitem(last=False)
+        return asset
+
+    def stats(self) -> Dict[str, List[str]]:
+        """File names currently loaded, per directory key."""
+        self._revalidate()
+        return {key: sorted(group) for key, group in self._assets.items()}
+
+    def _load(self, path: str) -> Optional[ReferenceAsset]:
+        try:
+            return ReferenceAsset(path, self.model_max_size, self.preview_size)
+        except Exception as e:
+            print(f"Error loading reference image {path}: {e}")
+            return None
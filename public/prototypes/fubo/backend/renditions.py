@@ -0,0 +1,202 @@
+"""
+Renditions Module
+Derives every configured export size/format from one decoded image:
+- Rendition sets in EXPORT_RENDITIONS (crop-to-fill sizes or fit-within previews)
+- JPEG, WebP and AVIF encoders, falling back per rendition when this Pillow
+  build lacks one
+- Shared downscale pyramid: each 2x box reduction is computed once and every
+  rendition resamples from the smallest level that keeps the final LANCZOS
+  pass at REDUCING_GAP (same quality rule as resampling.py)
+- Renditions resized and encoded on threads (Pillow releases the GIL in
+  resize and in its encoders)
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from PIL import Image, features
+
+from config import EXPORT_RENDITIONS
+from resampling import REDUCING_GAP, compute_crop_box
+
+
+# Pillow format name, file extension and save() options per encoder
+ENCODERS = {
+    'jpeg': ('JPEG', 'jpg', {'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', {'method': 4}),
+    'avif': ('AVIF', 'avif', {'speed': 6})
+}
+
+SUPPORTED_FORMATS = {
+    'jpeg': True,
+    'webp': features.check('webp'),
+    'avif': features.check('avif')
+}
+
+
+def encoder_for(spec: Dict) -> str:
+    """Encoder for a rendition: its format, else its fallback, else JPEG."""
+    for fmt in (spec['format'], spec.get('fallback'), 'jpeg'):
+        if fmt and SUPPORTED_FORMATS.get(fmt):
+            return fmt
+    return 'jpeg'
+
+
+def resolve_renditions(requested: Union[None, str, List[str]]) -> List[str]:
+    """
+    Rendition names for a request.
+
+    Args:
+        requested: None/empty (no renditions), a set name from
+                   EXPORT_RENDITIONS['sets'], a rendition name, or a list of
+                   rendition names
+
+    Returns:
+        Rendition names, without duplicates
+
+    Raises:
+        ValueError: Unknown set or rendition name
+    """
+    if not requested:
+        return []
+    if isinstance(requested, str):
+        requested = EXPORT_RENDITIONS['sets'].get(requested, [requested])
+
+    names = []
+    for name in requested:
+        if name not in EXPORT_RENDITIONS['renditions']:
+            raise ValueError(f"Unknown rendition '{name}', expected one of "
+                             f"{sorted(EXPORT_RENDITIONS['renditions'])} or a set in {sorted(EXPORT_RENDITIONS['sets'])}")
+        if name not in names:
+            names.append(name)
+    return names
+
+
+class DownscalePyramid:
+    """
+    Lazily built 1/2, 1/4, ... reductions of one image, shared by all renditions.
+
+    Level n is reduce(2) of level n-1, so a 4K master feeding a 1080p, a
+    720p and a 320px preview reduces the full-size pixels only once.
+    """
+
+    def __init__(self, image: Image.Image):
+        self.source = image
+        self._levels = {1: image}
+        self._lock = threading.Lock()
+
+    def _level(self, factor: int) -> Image.Image:
+        with self._lock:
+            current = max(f for f in self._levels if f <= factor)
+            while current < factor:
+                self._levels[current * 2] = self._levels[current].reduce(2)
+                current *= 2
+            return self._levels[factor]
+
+    def resize(self, box: Tuple[float, float, float, float], size: Tuple[int, int]) -> Image.Image:
+        """
+        Resample a source region to a size.
+
+        Args:
+            box: (left, top, right, bottom) in source coordinates
+            size: Output (width, height)
+
+        Returns:
+            PIL Image object of exactly `size`
+        """
+        scale = max(size[0] / (box[2] - box[0]), size[1] / (box[3] - box[1]))
+
+        # Deepest level at which the box is still REDUCING_GAP times the output
+        factor = 1
+        while scale * factor * 2 * REDUCING_GAP <= 1:
+            factor *= 2
+        if factor == 1:
+            return self.source.resize(size, Image.Resampling.LANCZOS, box=box)
+
+        level = self._level(factor)
+        ratio_x = level.width / self.source.width
+        ratio_y = level.height / self.source.height
+        box = (box[0] * ratio_x, box[1] * ratio_y, box[2] * ratio_x, box[3] * ratio_y)
+        return level.resize(size, Image.Resampling.LANCZOS, box=box)
+
+
+def rendition_geometry(image: Image.Image, spec: Dict) -> Tuple[Tuple[float, float, float, float], Tuple[int, int]]:
+    """
+    Source box and output size for a rendition.
+
+    'size' renditions crop to the target aspect ratio (compute_crop_box) and
+    fill it; 'max_size' renditions keep the whole frame and never upscale.
+    """
+    if 'size' in spec:
+        width, height = spec['size']
+        return compute_crop_box(image, width, height, spec.get('anchor', 'auto')), (width, height)
+
+    scale = min(1.0, spec['max_size'] / max(image.size))
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return (0, 0, image.width, image.height), size
+
+
+def render_rendition(pyramid: DownscalePyramid, name: str) -> Dict:
+    """
+    Resize and encode one rendition.
+
+    Returns:
+        Dict with 'name', 'data' (encoded bytes), 'format', 'extension',
+        'width', 'height', 'quality', or 'name' and 'error'
+    """
+    spec = EXPORT_RENDITIONS['renditions'][name]
+    try:
+        box, size = rendition_geometry(pyramid.source, spec)
+        if box == (0, 0, pyramid.source.width, pyramid.source.height) and size == pyramid.source.size:
+            image = pyramid.source
+        else:
+            image = pyramid.resize(box, size)
+
+        fmt = encoder_for(spec)
+        pil_format, extension, options = ENCODERS[fmt]
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, quality=spec['quality'], **options)
+        return {
+            'name': name,
+            'data': buffer.getvalue(),
+            'format': fmt,
+            'extension': extension,
+            'width': size[0],
+            'height': size[1],
+            'quality': spec['quality']
+        }
+    except Exception as e:
+        return {'name': name, 'error': str(e)}
+
+
+def render_renditions(image: Image.Image, names: List[str], max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Render several renditions of one decoded image.
+
+    Args:
+        image: Source (already flattened/converted for encoding)
+        names: Rendition names (see resolve_renditions)
+        max_workers: Encoder threads (default EXPORT_RENDITIONS['max_workers'] or
+                     one per rendition, capped at CPU count; 1 renders inline,
+                     e.g. inside a process pool worker)
+
+    Returns:
+        render_rendition() results, in `names` order
+    """
+    if not names:
+        return []
+    pyramid = DownscalePyramid(image)
+    workers = max_workers or EXPORT_RENDITIONS['max_workers'] or min(len(names), os.cpu_count() or 1)
+    if workers <= 1 or len(names) == 1:
+        return [render_rendition(pyramid, name) for name in names]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda name: render_rendition(pyramid, name), names))
+
+
+def rendition_filename(master_filename: str, rendition: Dict) -> str:
+    """Filename of a rendition written next to its master ('{master stem}@{name}.{ext}')."""
+    return f"{os.path.splitext(master_filename)[0]}@{rendition['name']}.{rendition['extension']}"
@@ -0,0 +1,198 @@
+"""
+Static Asset Module
+Serves the frontend files (HTML, JS, CSS, favicon) from memory:
+- Each file read once, with a strong ETag and Last-Modified computed at load
+- gzip (and brotli, if installed) variants precompressed at load
+- Conditional GET: If-None-Match / If-Modified-Since answered with 304
+- URLs whose ?v= is the file's content version cached as immutable;
+  everything else (including hand-bumped ?v=10 numbers) revalidates
+- Reloaded when the file's mtime/size changes, so edits show up without a restart
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from config import STATIC_ASSETS
+
+
+def strong_etag(data: bytes) -> str:
+    """ETag value for a response body (content hash, so identical across workers)."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def content_version(etag: str) -> str:
+    """Short content hash used as ?v= for immutable URLs."""
+    return etag[:STATIC_ASSETS['version_length']]
+
+
+def cache_control(versioned: bool) -> str:
+    """Cache-Control for a response: immutable for content-versioned URLs, revalidate otherwise."""
+    if versioned:
+        return f"public, max-age={STATIC_ASSETS['immutable_max_age']}, immutable"
+    return STATIC_ASSETS['revalidate']
+
+
+def conditional_response(body: bytes, mimetype: str, etag: str, last_modified: Optional[float] = None,
+                         versioned: bool = False, encoding: Optional[str] = None) -> Response:
+    """
+    Response with validators that answers conditional requests with 304.
+
+    Args:
+        body: Encoded body
+        mimetype: Content type
+        etag: Strong ETag value (without quotes)
+        last_modified: Unix time for Last-Modified, if the body comes from a file
+        versioned: Immutable caching (only when the URL names this exact content)
+        encoding: Content-Encoding of body ('gzip', 'br'), or None
+
+    Returns:
+        Flask Response (status 304 with an empty body when the client copy is current)
+    """
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = cache_control(versioned)
+    response.vary.add('Accept-Encoding')
+    return response.make_conditional(request)
+
+
+class StaticAsset:
+    """One file with its validators and precompressed variants."""
+
+    def __init__(self, path: str, mimetype: str):
+        self.path = path
+        self.mimetype = mimetype
+        self.signature = file_signature(path)
+
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        self.etag = strong_etag(self.data)
+        self.version = content_version(self.etag)
+        self.last_modified = self.signature[0] / 1e9
+
+        # Variants keyed by Content-Encoding; each gets its own ETag
+        self.variants: Dict[str, bytes] = {}
+        if self._compressible():
+            self.variants['gzip'] = gzip.compress(self.data, compresslevel=STATIC_ASSETS['gzip_level'], mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(self.data, quality=STATIC_ASSETS['brotli_quality'])
+
+    def _compressible(self) -> bool:
+        return (len(self.data) >= STATIC_ASSETS['min_compress_size'] and
+                (self.mimetype.startswith('text/') or self.mimetype in STATIC_ASSETS['compress_types']))
+
+    def select(self, accept_encoding: str) -> Tuple[bytes, Optional[str], str]:
+        """
+        Best representation for a request's Accept-Encoding.
+
+        Returns:
+            (body, Content-Encoding or None, ETag)
+        """
+        accepted = {token.split(';')[0].strip() for token in accept_encoding.lower().split(',')}
+        for encoding in ('br', 'gzip'):
+            variant = self.variants.get(encoding)
+            if variant is not None and encoding in accepted and len(variant) < len(self.data):
+                return variant, encoding, f"{self.etag}-{encoding}"
+        return self.data, None, self.etag
+
+
+class StaticAssetCache:
+    """
+    In-memory store of frontend files, keyed by path.
+
+    A request costs one stat() to notice edits; the file is only re-read
+    (and recompressed) when it changed.
+    """
+
+    def __init__(self):
+        self._assets: Dict[str, StaticAsset] = {}
+        self._derived: Dict[str, Tuple[Tuple, bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def preload(self, files: Iterable[Tuple[str, str]]) -> int:
+        """
+        Load files at startup.
+
+        Args:
+            files: (path, mimetype) pairs; missing files are skipped
+
+        Returns:
+            Number of files loaded
+        """
+        return sum(1 for path, mimetype in files if self.get(path, mimetype))
+
+    def get(self, path: str, mimetype: str) -> Optional[StaticAsset]:
+        """Current version of a file, or None if it does not exist."""
+        path = os.path.abspath(path)
+        signature = file_signature(path)
+        asset = self._assets.get(path)
+        if asset and asset.signature == signature:
+            return asset
+
+        with self._lock:
+            if signature is None:
+                self._assets.pop(path, None)
+                return None
+            asset = StaticAsset(path, mimetype)
+            self._assets[path] = asset
+            return asset
+
+    def serve(self, path: str, mimetype: str) -> Optional[Response]:
+        """
+        Response for a file (honouring Accept-Encoding and conditional headers).
+
+        Returns:
+            Flask Response, or None if the file does not exist
+        """
+        asset = self.get(path, mimetype)
+        if asset is None:
+            return None
+        body, encoding, etag = asset.select(request.headers.get('Accept-Encoding', ''))
+        # A stale or hand-picked ?v= must not pin an old copy for a year
+        versioned = request.args.get('v') == asset.version
+        return conditional_response(body, asset.mimetype, etag, asset.last_modified, versioned, encoding)
+
+    def derived(self, key: str, path: str, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        """
+        Bytes derived from a file (e.g. a preview), rebuilt only when the file changes.
+
+        Args:
+            key: Cache key for the derived output
+            path: Source file whose signature invalidates the output
+            build: Function producing the output
+
+        Returns:
+            (data, ETag)
+        """
+        signature = file_signature(path)
+        cached = self._derived.get(key)
+        if cached and cached[0] == signature:
+            return cached[1], cached[2]
+
+        data = build()
+        etag = strong_etag(data)
+        with self._lock:
+            self._derived[key] = (signature, data, etag)
+        return data, etag
@@ -1,5 +1,15 @@
 # Master style prompts optimized for Gemini 2.5 Flash Image (Banana Nano)
 # PRD-aligned 5 Core Style Packs for Fubo Thumbnail Generation
+#
+# Styles are keyed by canonical id ('photo-real'). Every accepted spelling
+# ('Photo Real', 'photo-real ', ...) is indexed once at import, so a lookup is
+# one dict hit and aliases share the canonical prompt string.
+
+import os
+import sys
+from typing import Dict, NamedTuple, Optional
+
+from style_registry import get_registry, is_custom_style_id
 
 STYLE_PROMPTS = {
     # PRD Style Pack 1: Photo Real - Clean, realistic, team-colored (Team channels)
@@ -24,120 +34,118 @@ STYLE_PROMPTS = {
     'ink-splatter': 'TRANSFORM into Japanese Sumi-e ink wash painting: BOLD team color ink splashes and drips, DRAMATIC colored splatters using team colors, VIBRANT team color emphasis throughout, energetic team color ink splatters, minimalist approach with team color focus, calligraphy brush strokes in team colors',
     'layered-papercraft': 'TRANSFORM INTO LAYERED PAPERCRAFT DIORAMA: Construct a 3D sports papercraft diorama built from multiple layers of thick cardstock with VIBRANT team colors, tangible sense of depth, visible soft drop shadows between each layer, dimensional macro photography lighting',
     'risograph': 'Apply Risograph style: VIBRANT team color palette, BOLD halftone patterns using team colors, INTENSE color saturation, vintage poster rendering with BRILLIANT team color emphasis, halftone grain with team color overlays',
-    
-    # Aliases for compatibility
-    'photo real': 'Transform into photorealistic sports imagery: pristine professional photography, authentic team uniforms with visible logos and branding, clean realistic lighting, sharp focus, high-detail textures, team colors naturally integrated through jerseys and equipment, professional sports photography aesthetic, stadium environment in background, 8k quality, natural color grading emphasizing team identity, allow authentic team logos, jersey numbers, and identifying marks, authentic branding visible',
-    'video game': 'Apply AAA game cover art: epic cinematic lighting, dramatic lens flares, cosmic nebula background, glowing particle effects, hyper-realistic character render, intense action pose, Madden NFL style, dynamic composition, professional game cover aesthetic, team logos visible',
-    'comic book': 'Apply American superhero comic book art: bold thick black ink outlines, vibrant cel-shaded colors, Ben-Day dot halftone patterns, dynamic action lines and motion streaks, pop art aesthetics, graphic novel art style, dramatic lighting and shadows, high contrast colors, team logos stylized in comic book style',
-    'ink splatter': 'TRANSFORM into Japanese Sumi-e ink wash painting: BOLD team color ink splashes and drips, DRAMATIC colored splatters using team colors, VIBRANT team color emphasis throughout, energetic team color ink splatters, minimalist approach with team color focus, calligraphy brush strokes in team colors',
 }
 
 # Style reference image mapping (matching actual files in style_references/)
+# Keyed by canonical style id; hyphen/space spellings resolve through STYLE_CATALOG
 STYLE_REFERENCES = {
     # PRD Core Styles - Unique references (no duplicates)
     'photo-real': 'photoreals.webp',  # Photorealistic sports imagery
-    'photo real': 'photoreals.webp',
     'bold-posterized': 'hi-contrast.jpeg',  # High contrast poster style
-    'bold posterized': 'hi-contrast.jpeg',
     'studio-lighting': 'spotlight.jpeg',  # Clean studio lighting reference
-    'studio lighting': 'spotlight.jpeg',
     'cinematic-grain': 'sportgrain.jpg',  # Cinematic film grain sports reference
-    'cinematic grain': 'sportgrain.jpg',
     'halftone-retro': 'comic-book.jpeg',  # Vintage halftone/comic print style
-    'halftone retro': 'comic-book.jpeg',
     
     # Legacy style references (maintained for compatibility)
     'video-game': 'video-game.jpeg',
-    'video game': 'video-game.jpeg',
     'gradient': 'gradient.jpg',
     'comic-book': 'comic-book.jpeg',
-    'comic book': 'comic-book.jpeg',
     'ink-splatter': 'ink-splatter.jpeg',
-    'ink splatter': 'ink-splatter.jpeg',
     'layered-papercraft': 'layered-papercraft.jpg',
     'risograph': 'risograph.jpeg',
 }
 
+# Reference images are looked up in these directories, first match wins
+STYLE_REFERENCE_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'style_references'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'style_references')
+]
+
+
+class CatalogStyle(NamedTuple):
+    """A built-in style resolved at import."""
+    style_id: str
+    prompt: str
+    reference: Optional[str]        # Reference filename (see STYLE_REFERENCES)
+    reference_path: Optional[str]   # Absolute path, or None if the file is missing
+
+
+def style_key(style_name: str) -> str:
+    """Lookup key shared by every spelling of a style: lowercase, trimmed, hyphens as spaces."""
+    return style_name.lower().strip().replace('-', ' ')
+
+
+def _find_reference(filename: Optional[str]) -> Optional[str]:
+    if not filename:
+        return None
+    for directory in STYLE_REFERENCE_DIRS:
+        path = os.path.abspath(os.path.join(directory, filename))
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _build_catalog():
+    catalog: Dict[str, CatalogStyle] = {}
+    aliases: Dict[str, str] = {}
+    for style_id, prompt in STYLE_PROMPTS.items():
+        reference = STYLE_REFERENCES.get(style_id)
+        catalog[style_id] = CatalogStyle(style_id, sys.intern(prompt), reference, _find_reference(reference))
+        aliases[style_key(style_id)] = style_id
+    return catalog, aliases
+
+
+STYLE_CATALOG, STYLE_ALIAS_INDEX = _build_catalog()
+
+_missing_references = sorted(style.reference for style in STYLE_CATALOG.values()
+                             if style.reference and not style.reference_path)
+if _missing_references:
+    print(f"Style references not found: {', '.join(_missing_references)}")
+
+
+def resolve_style_id(style_name: str) -> Optional[str]:
+    """Canonical id of a built-in style, or None if the name is not recognised."""
+    return STYLE_ALIAS_INDEX.get(style_key(style_name))
+
+
 def get_style_prompt(style_name):
     """Get the optimized style prompt for a given style."""
-    # Normalize style name
     normalized = style_name.lower().strip()
-    print(f"[get_style_prompt] Input: '{style_name}', Normalized: '{normalized}'")
     
-    # Check for custom styles
-    if normalized in ['custom-1', 'custom-2']:
-        import os
-        import json
-        
-        # Load from custom_styles.json
-        custom_styles_path = os.path.join(os.path.dirname(__file__), 'custom_styles.json')
-        if os.path.exists(custom_styles_path):
-            try:
-                with open(custom_styles_path, 'r') as f:
-                    custom_styles = json.load(f)
-                
-                if normalized in custom_styles and custom_styles[normalized]['prompt']:
-                    return custom_styles[normalized]['prompt']
-            except Exception as e:
-                print(f"Error loading custom style {normalized}: {e}")
+    # Check for custom styles (held in memory by the style registry)
+    if is_custom_style_id(normalized):
+        custom_prompt = get_registry().prompt(normalized)
+        if custom_prompt:
+            return custom_prompt
         
         # Fallback if custom style not defined
         return f"Apply artistic style transformation"
     
-    # Check for exact match
-    if normalized in STYLE_PROMPTS:
-        return STYLE_PROMPTS[normalized]
-    
-    # Check with hyphens replaced by spaces
-    with_spaces = normalized.replace('-', ' ')
-    if with_spaces in STYLE_PROMPTS:
-        return STYLE_PROMPTS[with_spaces]
-    
-    # Check with spaces replaced by hyphens
-    with_hyphens = normalized.replace(' ', '-')
-    if with_hyphens in STYLE_PROMPTS:
-        return STYLE_PROMPTS[with_hyphens]
+    style_id = STYLE_ALIAS_INDEX.get(normalized.replace('-', ' '))
+    if style_id:
+        return STYLE_CATALOG[style_id].prompt
     
     # Default fallback
     return f"artistic {style_name} style transformation"
 
 def get_style_reference(style_name):
     """Get the reference image filename for a given style."""
-    # Normalize style name
     normalized = style_name.lower().strip()
     
     # Check for custom styles
-    if normalized in ['custom-1', 'custom-2']:
-        import os
-        import json
-        
-        # Check if custom reference exists
-        custom_styles_path = os.path.join(os.path.dirname(__file__), 'custom_styles.json')
-        if os.path.exists(custom_styles_path):
-            try:
-                with open(custom_styles_path, 'r') as f:
-                    custom_styles = json.load(f)
-                
-                if normalized in custom_styles and custom_styles[normalized].get('has_reference'):
-                    return f'{normalized}.jpg'
-            except Exception as e:
-                print(f"Error checking custom reference {normalized}: {e}")
-        
+    if is_custom_style_id(normalized):
+        if get_registry().has_reference(normalized):
+            return f'{normalized}.jpg'
         return None
     
-    # Check for exact match
-    if normalized in STYLE_REFERENCES:
-        return STYLE_REFERENCES[normalized]
-    
-    # Check with hyphens replaced by spaces
-    with_spaces = normalized.replace('-', ' ')
-    if with_spaces in STYLE_REFERENCES:
-        return STYLE_REFERENCES[with_spaces]
-    
-    # Check with spaces replaced by hyphens
-    with_hyphens = normalized.replace(' ', '-')
-    if with_hyphens in STYLE_REFERENCES:
-        return STYLE_REFERENCES[with_hyphens]
+    style_id = STYLE_ALIAS_INDEX.get(normalized.replace('-', ' '))
+    if style_id:
+        return STYLE_CATALOG[style_id].reference
     
     # No reference image found
     return None
+
+def get_style_reference_path(style_name):
+    """Get the checked path of a built-in style's reference image (None if missing)."""
+    style_id = resolve_style_id(style_name)
+    return STYLE_CATALOG[style_id].reference_path if style_id else None
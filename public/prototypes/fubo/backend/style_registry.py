@@ -0,0 +1,228 @@
+"""
+Custom Style Registry Module
+Holds the user-defined styles stored in custom_styles.json:
+- Parsed once and kept in memory; lookups never touch the file
+- Reloaded when the file's mtime/size changes (another worker saved a style)
+- Updates take an exclusive file lock, re-read the file, and replace it
+  atomically (temp file + rename), so concurrent workers never lose writes
+- Any number of custom styles ('custom-<id>'), not just the two default slots
+"""
+
+import copy
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+from config import STYLE_REGISTRY
+
+
+CUSTOM_STYLE_ID = re.compile(STYLE_REGISTRY['id_pattern'])
+
+_REGISTRIES: Dict[str, 'StyleRegistry'] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def is_custom_style_id(style_id) -> bool:
+    """True for well-formed custom style ids ('custom-1', 'custom-summer-promo', ...); False for non-strings."""
+    return isinstance(style_id, str) and bool(CUSTOM_STYLE_ID.match(style_id))
+
+
+def default_style(style_id: str) -> Dict:
+    """Empty definition for a custom style slot."""
+    return {'name': f"Custom {style_id[len('custom-'):]}", 'prompt': '', 'has_reference': False}
+
+
+def default_styles() -> Dict[str, Dict]:
+    """The slots that always exist (STYLE_REGISTRY['default_ids'])."""
+    return {style_id: default_style(style_id) for style_id in STYLE_REGISTRY['default_ids']}
+
+
+class StyleRegistry:
+    """
+    In-memory view of a custom styles JSON file.
+
+    Reads compare the file's (mtime, size) with the loaded snapshot and
+    reload only when it changed. Writes go through update()/remove(), which
+    serialize on a lock file shared by every worker process.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: custom_styles.json path (created on the first update if missing)
+        """
+        self.path = path
+        self.lock_path = path + '.lock'
+        self._styles: Dict[str, Dict] = {}
+        self._signature = None
+        self._lock = threading.RLock()
+        self.reloads = 0
+
+    def all(self) -> Dict[str, Dict]:
+        """Every custom style, default slots first."""
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._styles)
+
+    def get(self, style_id: str) -> Optional[Dict]:
+        """One style definition, or None if it does not exist."""
+        with self._lock:
+            self._refresh()
+            style = self._styles.get(style_id)
+            return dict(style) if style else None
+
+    def prompt(self, style_id: str) -> str:
+        """Style prompt, or '' if the style is undefined or empty."""
+        style = self.get(style_id)
+        return style.get('prompt', '') if style else ''
+
+    def has_reference(self, style_id: str) -> bool:
+        style = self.get(style_id)
+        return bool(style and style.get('has_reference'))
+
+    def update(self, style_id: str, **fields) -> Dict:
+        """
+        Create or modify a style.
+
+        Args:
+            style_id: Custom style id (see is_custom_style_id)
+            **fields: Keys to set ('name', 'prompt', 'has_reference')
+
+        Returns:
+            The stored definition
+        """
+        if not is_custom_style_id(style_id):
+            raise ValueError(f"Invalid style ID: {style_id}")
+
+        with self._transaction() as styles:
+            style = styles.setdefault(style_id, default_style(style_id))
+            style.update(fields)
+            return dict(style)
+
+    def remove(self, style_id: str) -> bool:
+        """
+        Delete a style. Default slots are cleared rather than removed.
+
+        Returns:
+            False if the style did not exist
+        """
+        with self._transaction() as styles:
+            if style_id not in styles:
+                return False
+            if style_id in STYLE_REGISTRY['default_ids']:
+                styles[style_id] = default_style(style_id)
+            else:
+                del styles[style_id]
+            return True
+
+    def _refresh(self):
+        """Reload from disk if the file changed since the last load (caller holds _lock)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Nothing saved yet: serve the default slots; the first update creates the file
+            if self._signature != 'missing':
+                self._styles = default_styles()
+                self._signature = 'missing'
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature != self._signature:
+            self._styles = self._read()
+            self._signature = signature
+            self.reloads += 1
+
+    def _read(self) -> Dict[str, Dict]:
+        styles = default_styles()
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return styles
+        except (OSError, ValueError) as e:
+            print(f"Error loading custom styles from {self.path}: {e}")
+            # Keep serving what was loaded before rather than dropping every style
+            return self._styles or styles
+
+        for style_id, style in stored.items():
+            if is_custom_style_id(style_id) and isinstance(style, dict):
+                styles[style_id] = {**default_style(style_id), **style}
+        return styles
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Yield the current styles for modification, then write them back if they changed.
+
+        Holds the thread lock and an exclusive flock on the lock file, and
+        re-reads the file inside the lock so another worker's save is never
+        overwritten with stale data.
+        """
+        with self._lock, self._file_lock():
+            styles = self._read()
+            original = copy.deepcopy(styles)
+            yield styles
+            if styles == original:
+                return
+            self._write(styles)
+            stat = os.stat(self.path)
+            self._styles = styles
+            self._signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, styles: Dict[str, Dict]):
+        """Replace the file atomically: readers see either the old or the new version."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix='.custom_styles.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(styles, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file 0600; keep the permissions of the file being replaced
+            try:
+                mode = os.stat(self.path).st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def get_registry(path: Optional[str] = None) -> StyleRegistry:
+    """
+    Shared registry for a styles file, created on first use.
+
+    Args:
+        path: JSON file (default STYLE_REGISTRY['filename'] next to this module)
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), STYLE_REGISTRY['filename'])
+    path = os.path.abspath(path)
+    with _REGISTRIES_LOCK:
+        if path not in _REGISTRIES:
+            _REGISTRIES[path] = StyleRegistry(path)
+        return _REGISTRIES[path]
@@ -0,0 +1,247 @@
+"""
+Team Catalog Module
+In-memory index of team_colors.csv:
+- league -> teams (dropdown order) and (league, team) -> colors
+- Alias lookup for path-derived names ('nfl/giants', 'nba/golden-state-warriors'),
+  with a fuzzy fallback within the league that only accepts a single
+  candidate team (strict cutoff for short nicknames)
+- /get_teams responses and the raw CSV pre-encoded with ETags
+- Reloaded when the CSV's mtime/size changes
+"""
+
+import csv
+import difflib
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import TEAM_CATALOG
+
+
+AMBIGUOUS = object()
+NOT_LOADED = object()
+
+
+def etag_for(data: bytes) -> str:
+    """Strong ETag value for a response body."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, with '-', '_' and repeated whitespace collapsed to single spaces."""
+    return ' '.join(re.sub(r'[-_]+', ' ', name.lower()).split())
+
+
+def team_aliases(team_name: str) -> List[str]:
+    """
+    Spellings a team can be referred to by (already normalized).
+
+    Full name, nickname ('giants') and two-word nickname ('red sox'); a
+    squashed form of each ('newyorkgiants') covers folder names without
+    separators.
+    """
+    words = normalize_name(team_name).split()
+    aliases = [' '.join(words)]
+    if len(words) > 1:
+        aliases.append(words[-1])
+    if len(words) > 2:
+        aliases.append(' '.join(words[-2:]))
+    return aliases + [alias.replace(' ', '') for alias in aliases if ' ' in alias]
+
+
+class TeamCatalog:
+    """
+    Team colors indexed for request-time lookups.
+
+    Every read checks the CSV's (mtime, size) and rebuilds the indexes only
+    when the file changed; nothing else touches the disk.
+    """
+
+    def __init__(self, csv_path: str):
+        """
+        Args:
+            csv_path: team_colors.csv path
+        """
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self._signature = NOT_LOADED
+        self._reset()
+
+    def _reset(self):
+        self.available = False
+        self.csv_data = b''
+        self.csv_etag = None
+        self.teams_by_league: Dict[str, List[Dict]] = {}
+        self.colors_by_key: Dict[Tuple[str, str], Dict] = {}
+        self.leagues_by_name: Dict[str, str] = {}
+        self.aliases: Dict[Tuple[str, str], object] = {}
+        self.full_names: Dict[str, List[str]] = {}
+        self.nicknames: Dict[str, List[str]] = {}
+        self._team_lists: Dict[str, bytes] = {}
+
+    def refresh(self):
+        """Rebuild the indexes if the CSV changed since the last load."""
+        with self._lock:
+            try:
+                stat = os.stat(self.csv_path)
+                signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except FileNotFoundError:
+                signature = None
+
+            if signature == self._signature:
+                return
+            self._signature = signature
+            if signature is None:
+                print("Team colors CSV not found, using defaults")
+                self._reset()
+                return
+            try:
+                with open(self.csv_path, 'rb') as f:
+                    self._load(f.read())
+            except Exception as e:
+                # Keep serving the previous version until the file is fixed
+                print(f"Error loading team colors: {e}")
+
+    def _load(self, data: bytes):
+        teams_by_league: Dict[str, List[Dict]] = {}
+        colors_by_key: Dict[Tuple[str, str], Dict] = {}
+        aliases: Dict[Tuple[str, str], object] = {}
+        full_name_aliases = set()
+
+        for row in csv.DictReader(io.StringIO(data.decode('utf-8'))):
+            league = row['sport']
+            # Skip comment lines
+            if not league or league.startswith('#'):
+                continue
+
+            team_name = row['team_name']
+            colors = {
+                'sport': league,
+                'team_name': team_name,
+                'primary_color': row['primary_color_hex'],
+                'secondary_color': row['secondary_color_hex'],
+                'accent_color': row['tertiary_color_hex'],
+                'text_color': row['text_color_hex']
+            }
+            colors_by_key[(league, team_name)] = colors
+            teams_by_league.setdefault(league, []).append({
+                'team_name': team_name,
+                'team_id': team_name.replace(' ', '_').upper()[:3],  # Generate team_id from name
+                'primary_color': colors['primary_color'],
+                'secondary_color': colors['secondary_color'],
+                'accent_color': colors['accent_color'],
+                'text_color': colors['text_color']
+            })
+
+            league_key = league.lower()
+            full_name = normalize_name(team_name)
+            full_name_aliases.update({(league_key, full_name), (league_key, full_name.replace(' ', ''))})
+            for alias in team_aliases(team_name):
+                existing = aliases.get((league_key, alias))
+                # A nickname shared by two teams in a league identifies neither
+                aliases[(league_key, alias)] = AMBIGUOUS if existing not in (None, team_name) else team_name
+
+        leagues_by_name = {league.lower(): league for league in teams_by_league}
+        for alias, league in TEAM_CATALOG['league_aliases'].items():
+            leagues_by_name[alias.lower()] = league
+
+        full_names: Dict[str, List[str]] = {}
+        nicknames: Dict[str, List[str]] = {}
+        for key in aliases:
+            league_key, alias = key
+            (full_names if key in full_name_aliases else nicknames).setdefault(league_key, []).append(alias)
+
+        # Swapped in only once complete, so readers never see a half-built catalog
+        self.csv_data = data
+        self.csv_etag = etag_for(data)
+        self.teams_by_league = teams_by_league
+        self.colors_by_key = colors_by_key
+        self.leagues_by_name = leagues_by_name
+        self.aliases = aliases
+        self.full_names = full_names
+        self.nicknames = nicknames
+        self._team_lists = {}
+        self.available = True
+        print(f"Loaded {len(colors_by_key)} teams in {len(teams_by_league)} leagues from team colors CSV")
+
+    def resolve_league(self, league: Optional[str]) -> Optional[str]:
+        """CSV league name for a league as requested or derived from a path."""
+        self.refresh()
+        return self._resolve_league(league)
+
+    def _resolve_league(self, league: Optional[str]) -> Optional[str]:
+        return self.leagues_by_name.get(league.strip().lower()) if league else None
+
+    def teams(self, league: str) -> List[Dict]:
+        """Teams of a league in CSV order (empty for unknown leagues)."""
+        return self.teams_by_league.get(self.resolve_league(league), [])
+
+    def teams_response(self, league: str) -> Tuple[bytes, str]:
+        """
+        Encoded /get_teams/<league> body and its ETag.
+
+        The team list is encoded once per CSV league and CSV version (so
+        spelling variants of a league share one entry); the small envelope
+        echoing the requested name is added per request.
+        """
+        self.refresh()
+        csv_league = self._resolve_league(league)
+        teams = self._team_lists.get(csv_league)
+        if teams is None:
+            teams = json.dumps(self.teams_by_league.get(csv_league, []), sort_keys=True).encode('utf-8')
+            if csv_league:
+                self._team_lists[csv_league] = teams
+
+        # Same bytes as json.dumps({...}, sort_keys=True)
+        body = b'{"league": ' + json.dumps(league).encode('utf-8') + b', "success": true, "teams": ' + teams + b'}'
+        return body, etag_for(body)
+
+    def colors(self, league: Optional[str], team: Optional[str]) -> Optional[Dict]:
+        """
+        Colors for a team, accepting exact CSV names or path-style aliases.
+
+        Args:
+            league: League ('NFL', 'nfl', 'Premier League', ...)
+            team: Team ('New York Giants', 'giants', 'new-york-giants', ...)
+
+        Returns:
+            Colors dict (as loaded from the CSV), or None if no single team matches
+        """
+        if not league or not team:
+            return None
+        csv_league = self.resolve_league(league)
+        if not csv_league:
+            return None
+
+        exact = self.colors_by_key.get((csv_league, team))
+        if exact:
+            return exact
+
+        league_key = csv_league.lower()
+        normalized = normalize_name(team)
+        match = self.aliases.get((league_key, normalized))
+        if match is None:
+            match = self.aliases.get((league_key, normalized.replace(' ', '')))
+        if match is None:
+            # Fuzzy fallback for misspelled folder names ('golden-state-warriers');
+            # short nicknames sit close to each other ('lakers'/'bakers'), so
+            # they need a stricter cutoff
+            match = (self._fuzzy_match(league_key, normalized, self.full_names, TEAM_CATALOG['fuzzy_cutoff'])
+                     or self._fuzzy_match(league_key, normalized, self.nicknames,
+                                          TEAM_CATALOG['nickname_fuzzy_cutoff']))
+
+        if match is None or match is AMBIGUOUS:
+            return None
+        return self.colors_by_key.get((csv_league, match))
+
+    def _fuzzy_match(self, league_key: str, name: str, names: Dict[str, List[str]], cutoff: float) -> Optional[str]:
+        """Team whose aliases are the only close matches for name, or None if none or several teams are close."""
+        close = difflib.get_close_matches(name, names.get(league_key, []), n=5, cutoff=cutoff)
+        teams = {self.aliases[(league_key, alias)] for alias in close}
+        if len(teams) != 1 or AMBIGUOUS in teams:
+            return None
+        return teams.pop()
@@ -0,0 +1,182 @@
+"""
+Tests for app routes: request validation and upload limits, without calling Gemini.
+"""
+
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+import app as backend
+from config import EXPORT_CONFIG, INGEST_CONFIG
+
+
+class NoGemini:
+    """Fails the test if a route gets as far as calling the model."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f'Gemini called (genai.{name})')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, 'genai', NoGemini())
+    return backend.app.test_client()
+
+
+def png(size, mode='RGB'):
+    buffer = io.BytesIO()
+    Image.new(mode, size).save(buffer, 'PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def test_apply_style_limits_custom_reference_image(client):
+    response = client.post('/apply_style', data={
+        'base_image': (png((64, 64)), 'base.png'),
+        'custom_reference_image': (png((INGEST_CONFIG['max_dimension'] + 1, 1), 'L'), 'reference.png'),
+        'style': 'comic-book'
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 413
+    assert 'limit' in response.get_json()['error']
+
+
+def test_apply_style_rejects_unreadable_custom_reference_image(client):
+    response = client.post('/apply_style', data={
+        'base_image': (png((64, 64)), 'base.png'),
+        'custom_reference_image': (io.BytesIO(b'not an image'), 'reference.png'),
+        'style': 'comic-book'
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 400
+
+
+def png_data_uri(size, mode='RGB'):
+    return 'data:image/png;base64,' + base64.b64encode(png(size, mode).getvalue()).decode('ascii')
+
+
+@pytest.mark.parametrize('payload, message', [
+    ({'preview_max_size': 'large'}, 'preview_max_size'),
+    ({'preview_max_size': 0}, 'preview_max_size'),
+    ({'variants': [{'section': 'Wide', 'shift_x': 'left'}]}, 'shift_x'),
+    ({'variants': [{'section': 'Wide', 'shift_y': 12.5}]}, 'shift_y'),
+    ({'variants': [{'section': 'Wide', 'shift_x': 10 ** 30}]}, 'shift_x'),
+    ({'variants': 'Wide'}, 'variants'),
+])
+def test_apply_overlay_variants_rejects_bad_parameters(client, payload, message):
+    request = {'generated_image': png_data_uri((32, 32)), 'variants': [{'section': 'Wide'}], **payload}
+    response = client.post('/apply_overlay_variants', json=request)
+
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+
+
+def test_apply_overlay_rejects_bad_shift(client):
+    response = client.post('/apply_overlay', json={'generated_image': png_data_uri((32, 32)), 'shift_x': [3]})
+    assert response.status_code == 400
+
+
+def test_overlay_sources_get_the_upload_limits(client, monkeypatch):
+    monkeypatch.setitem(INGEST_CONFIG, 'max_pixels', 32 * 32)
+    response = client.post('/apply_overlay_variants', json={
+        'generated_image': png_data_uri((64, 64)), 'variants': [{'section': 'Wide'}]
+    })
+    assert response.status_code == 413
+
+
+def test_overlay_source_must_be_base64(client):
+    response = client.post('/apply_overlay', json={'generated_image': 'data:image/png;base64,AAA'})
+    assert response.status_code == 400
+
+
+def test_apply_overlay_variants_accepts_numeric_strings(client):
+    response = client.post('/apply_overlay_variants', json={
+        'generated_image': png_data_uri((64, 48)),
+        'preview_max_size': '300',
+        'variants': [{'section': 'Wide', 'shift_x': '-40', 'shift_y': 12.0}, {'section': 'Tall', 'with_alpha': True}]
+    })
+
+    assert response.status_code == 200
+    variants = response.get_json()['variants']
+    assert len(variants) == 2 and all('preview' in variant for variant in variants)
+    assert (variants[0]['shift_x'], variants[0]['shift_y']) == (-40, 12)
+    preview = Image.open(io.BytesIO(base64.b64decode(variants[0]['preview'].split(',')[1])))
+    assert max(preview.size) == 480  # 300 snapped up to the next preview size
+
+
+@pytest.fixture
+def export_root(tmp_path, monkeypatch):
+    """Empty export root used by ExportManager() and file_access in the export routes."""
+    monkeypatch.setitem(EXPORT_CONFIG, 'base_path', str(tmp_path / 'Exports'))
+    return tmp_path / 'Exports'
+
+
+@pytest.mark.parametrize('query', ['max_qa=abc', 'min_qa=7.5', 'offset=-1', 'limit=ten', 'offset=1e3'])
+def test_search_exports_rejects_malformed_numbers(client, export_root, query):
+    response = client.get(f'/search_exports?{query}')
+
+    assert response.status_code == 400
+    assert query.split('=')[0] in response.get_json()['error']
+
+
+def test_search_exports_accepts_numbers(client, export_root):
+    response = client.get('/search_exports?min_qa=70&max_qa=90&offset=0&limit=5')
+
+    assert response.status_code == 200
+    assert response.get_json()['limit'] == 5
+
+
+@pytest.mark.parametrize('style_name', ['halftone-retro', 'Halftone Retro', ' HALFTONE-RETRO '])
+def test_generation_uses_the_catalog_reference(style_name):
+    from style_prompts import STYLE_CATALOG
+
+    reference_path = STYLE_CATALOG['halftone-retro'].reference_path
+    assert reference_path and reference_path.endswith('comic-book.jpeg')
+
+    image = backend.load_reference_image(style_name)
+    assert image is not None
+    assert image is backend.REFERENCE_ASSETS.get('bundled', 'comic-book.jpeg').image
+
+
+def test_unknown_style_has_no_reference():
+    assert backend.load_reference_image('no-such-style') is None
+
+
+@pytest.mark.parametrize('style_id', [123, None, ['custom-1']])
+def test_delete_custom_style_rejects_non_string_ids(client, style_id):
+    response = client.post('/delete_custom_style', json={'style_id': style_id})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('payload, status', [
+    ({'images': [{'id': 'no-image'}]}, 400),
+    ({'images': [{'id': 'wrong-type', 'image': 42}]}, 400),
+    ({'images': ['data:image/png;base64,AAA']}, 400),
+    ({'images': 'data:image/png;base64,AAA'}, 400),
+    ({'paths': '/etc/passwd'}, 400),
+    ({'paths': ['/etc/passwd']}, 403),
+    ({'folders': [None]}, 400),
+])
+def test_run_qa_batch_rejects_bad_entries(client, export_root, payload, status):
+    response = client.post('/run_qa_batch', json=payload)
+    assert response.status_code == status
+    assert response.get_json()['error']
+
+
+def test_run_qa_batch_requires_a_json_object(client):
+    assert client.post('/run_qa_batch', data='images', content_type='text/plain').status_code == 400
+
+
+def test_qa_and_export_folders_do_not_depend_on_working_directory(tmp_path, monkeypatch):
+    from file_access import allowed_roots
+    from qa_batch import new_summary_path
+    from export_manager import ExportManager
+
+    monkeypatch.chdir(tmp_path)
+    backend_dir = os.path.realpath(backend.BASE_DIR)
+    assert allowed_roots()[0] == os.path.join(backend_dir, 'Exports')
+    assert os.path.realpath(ExportManager().base_export_path) == os.path.join(backend_dir, 'Exports')
+    assert os.path.dirname(os.path.realpath(new_summary_path())) == os.path.join(backend_dir, 'QA')
@@ -0,0 +1,83 @@
+"""
+Tests for compositing: tile-region blending matches a full-frame alpha composite.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from compositing import PreparedOverlay, classify_alpha_regions, composite_overlay
+
+
+def overlay_frame(width=320, height=200, seed=3):
+    """RGBA overlay with opaque, semi-transparent, gradient and empty areas."""
+    rng = np.random.default_rng(seed)
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[..., :3] = rng.integers(0, 256, (height, width, 3))
+    rgba[:40, :, 3] = 255                                        # opaque banner
+    rgba[40:100, :, 3] = np.linspace(0, 255, width, dtype=np.uint8)  # fade
+    rgba[150:, 200:, 3] = rng.integers(1, 255, (height - 150, width - 200))  # noisy glass
+    rgba[130:170, 20:90, 3] = 255                                # logo crossing tile edges
+    return Image.fromarray(rgba, 'RGBA')
+
+
+def generated_frame(width=180, height=140, seed=4, alpha=True):
+    """Generated image; optionally with its own partial alpha."""
+    rng = np.random.default_rng(seed)
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., :3] = rng.integers(0, 256, (height, width, 3))
+    rgba[..., 3] = 255
+    if alpha:
+        rgba[:, :60, 3] = rng.integers(0, 256, (height, 60))
+        rgba[100:, 120:, 3] = 0
+    return Image.fromarray(rgba, 'RGBA')
+
+
+def reference_composite(generated, overlay, mode, shift_x, shift_y):
+    """Whole-frame composite with PIL, no tile regions involved."""
+    placed = Image.new('RGBA', overlay.size)
+    placed.paste(generated, ((overlay.width - generated.width) // 2 + shift_x,
+                             (overlay.height - generated.height) // 2 + shift_y))
+    if mode == 'under':
+        return Image.alpha_composite(placed, overlay)
+    return Image.alpha_composite(overlay, placed)
+
+
+def frame_difference(result, reference):
+    """Largest channel difference, ignoring color where both are fully transparent."""
+    result = np.asarray(result).astype(np.int16)
+    reference = np.asarray(reference).astype(np.int16)
+    visible = (result[..., 3] > 0) | (reference[..., 3] > 0)
+    return int(np.abs(result - reference)[visible].max())
+
+
+def test_regions_cover_every_visible_pixel():
+    overlay = PreparedOverlay(overlay_frame(), tile_size=32)
+    covered = np.zeros(overlay.pixels.shape[:2], dtype=bool)
+    for left, upper, right, lower in overlay.regions['opaque'] + overlay.regions['partial']:
+        covered[upper:lower, left:right] = True
+
+    assert np.all(covered[overlay.pixels[..., 3] > 0])
+    for left, upper, right, lower in overlay.regions['opaque']:
+        assert np.all(overlay.pixels[upper:lower, left:right, 3] == 255)
+
+
+def test_transparent_tiles_are_skipped():
+    alpha = np.zeros((64, 96), dtype=np.uint8)
+    alpha[:, 64:] = 255
+    regions = classify_alpha_regions(alpha, 32)
+    assert regions == {'opaque': [(64, 0, 96, 32), (64, 32, 96, 64)], 'partial': []}
+
+
+@pytest.mark.parametrize('mode', ['under', 'over'])
+@pytest.mark.parametrize('shift', [(0, 0), (37, -21), (-120, 90)])
+@pytest.mark.parametrize('alpha', [True, False])
+def test_region_blend_matches_full_frame_composite(mode, shift, alpha):
+    overlay = overlay_frame()
+    generated = generated_frame(alpha=alpha)
+
+    result = composite_overlay(generated, PreparedOverlay(overlay, tile_size=32), mode, *shift)
+    reference = reference_composite(generated, overlay, mode, *shift)
+
+    assert result.mode == 'RGBA' and result.size == overlay.size
+    assert frame_difference(result, reference) <= 1
@@ -0,0 +1,99 @@
+"""
+Tests for export_catalog: filtered, paginated queries over upserted manifest entries.
+"""
+
+import pytest
+
+from config import EXPORT_CATALOG
+from export_catalog import ExportCatalog
+
+
+def entry(number, league, team, content='player', qa=None, day=12):
+    """Manifest entry exported at 2026-10-{day} 08:{number}."""
+    return {
+        'id': f'ID{number:03d}',
+        'path': f'/exports/{league}/{team}/{number}.jpg',
+        'league': league,
+        'team': team,
+        'content': content,
+        'style': 'Classic',
+        'exported_at': f'2026-10-{day:02d}T08:{number:02d}:00.000',
+        'size': 1000 + number,
+        'qa': None if qa is None else {'combined_qa_score': qa, 'status': 'pass' if qa >= 80 else 'review'}
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = ExportCatalog(str(tmp_path / 'catalog.sqlite3'))
+    catalog.upsert([
+        entry(1, 'NFL', 'New_York_Giants', qa=91, day=10),
+        entry(2, 'NFL', 'New_York_Giants', content='matchup', qa=70, day=11),
+        entry(3, 'NFL', 'Dallas_Cowboys', qa=69),
+        entry(4, 'NBA', 'Boston_Celtics', qa=85),
+        entry(5, 'NBA', 'Boston_Celtics', content='matchup'),
+        entry(6, 'NFL', 'New_York_Giants', qa=40, day=13),
+    ])
+    return catalog
+
+
+def ids(page):
+    return [export['id'] for export in page['exports']]
+
+
+def test_filters_are_exact_and_case_insensitive(catalog):
+    assert ids(catalog.query(league='nfl', team='new_york_giants')) == ['ID006', 'ID002', 'ID001']
+    assert ids(catalog.query(league='NBA', content='matchup')) == ['ID005']
+    assert catalog.query(team='New_York')['total'] == 0
+
+
+def test_date_range_includes_since_and_excludes_until(catalog):
+    assert ids(catalog.query(since='2026-10-11', until='2026-10-13', order='oldest')) == ['ID002', 'ID003', 'ID004', 'ID005']
+    assert ids(catalog.query(since='2026-10-12T08:04')) == ['ID006', 'ID005', 'ID004']
+
+
+def test_qa_bounds(catalog):
+    assert ids(catalog.query(min_qa=70, order='qa_asc')) == ['ID002', 'ID004', 'ID001']
+    # max_qa is exclusive ("below 70"); exports without a score never match
+    assert ids(catalog.query(max_qa=70, order='qa_asc')) == ['ID006', 'ID003']
+    assert ids(catalog.query(qa_status='review', league='NFL', order='oldest')) == ['ID002', 'ID003', 'ID006']
+
+
+def test_unscored_exports_sort_last(catalog):
+    assert ids(catalog.query(order='qa_desc'))[-1] == 'ID005'
+    assert ids(catalog.query(order='qa_asc'))[-1] == 'ID005'
+
+
+def test_pagination_walks_every_match_once(catalog):
+    seen = []
+    offset = 0
+    while offset is not None:
+        page = catalog.query(order='largest', offset=offset, limit=4)
+        assert page['total'] == 6
+        seen += ids(page)
+        offset = page['next_offset']
+    assert seen == ['ID006', 'ID005', 'ID004', 'ID003', 'ID002', 'ID001']
+
+    last = catalog.query(order='largest', offset=4, limit=4)
+    assert (last['offset'], last['limit'], last['next_offset']) == (4, 4, None)
+    assert catalog.query(offset=6, limit=4) == {'total': 6, 'offset': 6, 'limit': 4, 'next_offset': None, 'exports': []}
+
+
+def test_page_size_is_clamped(catalog):
+    assert catalog.query()['limit'] == catalog.query(limit=0)['limit'] == EXPORT_CATALOG['page_size']
+    assert catalog.query(limit=-3)['limit'] == 1
+    assert catalog.query(limit=10 ** 9)['limit'] == EXPORT_CATALOG['max_page_size']
+    assert catalog.query(offset=-5)['offset'] == 0
+
+
+def test_partial_upsert_keeps_other_fields(catalog):
+    catalog.upsert([{'id': 'ID005', 'qa': {'combined_qa_score': 88, 'status': 'pass'}}])
+    row = catalog.get('ID005')
+    assert (row['qa_score'], row['qa_status']) == (88, 'pass')
+    assert (row['team'], row['content'], row['size']) == ('Boston_Celtics', 'matchup', 1005)
+    assert catalog.count() == 6
+
+
+def test_unknown_order_is_rejected(catalog):
+    with pytest.raises(ValueError):
+        catalog.query(order='size; DROP TABLE exports')
@@ -0,0 +1,98 @@
+"""
+Tests for export_manifest: monotonic ULID export ids, and folder listings that backfill older files.
+"""
+
+import base64
+import io
+import os
+from datetime import datetime
+
+from PIL import Image
+
+from export_manager import ExportManager
+from export_manifest import CROCKFORD, export_id_time, get_manifest, new_export_id
+
+
+def test_ids_are_strictly_increasing_within_a_millisecond():
+    ids = [new_export_id() for _ in range(2000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(len(export_id) == 26 and set(export_id) <= set(CROCKFORD) for export_id in ids)
+
+
+def test_ids_sort_by_timestamp():
+    stamps = [1_700_000_000.0, 1_700_000_000.001, 1_700_000_060.5, 1_750_000_000.0]
+    ids = [new_export_id(stamp) for stamp in reversed(stamps)]
+    assert sorted(ids) == ids[::-1]
+
+
+def test_export_id_time_round_trips_to_the_millisecond():
+    stamp = 1_760_000_000.123
+    assert export_id_time(new_export_id(stamp)) == datetime.fromtimestamp(1_760_000_000_123 / 1000)
+    assert export_id_time(new_export_id(stamp)).microsecond == 123_000
+
+
+def test_export_id_time_of_a_new_id_is_now():
+    before = datetime.now()
+    before = before.replace(microsecond=before.microsecond // 1000 * 1000)  # Ids keep milliseconds only
+    export_time = export_id_time(new_export_id())
+    assert before <= export_time <= datetime.now()
+
+
+def jpeg_base64(color=(30, 90, 160)):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def test_folder_listing_keeps_files_exported_before_the_manifest(tmp_path):
+    folder = tmp_path / 'NFL' / 'New_York_Giants'
+    folder.mkdir(parents=True)
+    older = folder / 'NFL_New_York_Giants_TeamNews_photo-real_20250101_120000.jpg'
+    older.write_bytes(base64.b64decode(jpeg_base64()))
+    (folder / 'NFL_New_York_Giants_TeamNews_photo-real_20250101_120000@preview_jpg.jpg').write_bytes(b'')
+
+    export_mgr = ExportManager(str(tmp_path))
+    assert export_mgr.export_image(jpeg_base64(), 'NFL', 'New York Giants', 'TeamNews', 'photo-real')['success']
+
+    listing = export_mgr.import_images_from_folder(str(folder))
+    assert listing['total'] == 2
+    assert listing['images'][0]['filename'] == older.name
+    # Backfilled ids carry the export time from the filename, not the file's mtime
+    assert export_id_time(listing['images'][0]['metadata']['export_id']) == datetime(2025, 1, 1, 12, 0, 0)
+
+    # Recorded once: later listings (and other workers) find it in the manifest
+    export_mgr.import_images_from_folder(str(folder))
+    assert len(get_manifest(str(tmp_path)).entries(folder=str(folder))) == 2
+
+
+def test_batch_export_matches_single_export_sidecars_and_files_indexes_apart(tmp_path, monkeypatch):
+    from config import EXPORT_PIPELINE
+
+    monkeypatch.setitem(EXPORT_PIPELINE, 'batch_index_keep', 2)
+    export_mgr = ExportManager(str(tmp_path))
+    metadata = {'prompt': 'stadium at night', 'seed': 7}
+    single = export_mgr.export_image(jpeg_base64(), 'NFL', 'New York Giants', 'TeamNews', 'photo-real',
+                                     metadata=metadata, export_metadata=True)
+
+    indexes = []
+    for _ in range(3):
+        batch = export_mgr.batch_export(
+            [{'image_data': jpeg_base64(), 'league': 'NFL', 'team': 'New York Giants',
+              'content_type': 'TeamNews', 'style': 'photo-real', 'metadata': metadata}],
+            export_metadata=True
+        )
+        assert batch['exported_count'] == 1
+        indexes.append(batch['batch_index'])
+
+    # Same sidecar format for both paths
+    with open(single['metadata_filepath']) as f:
+        single_sidecar = f.read()
+    with open(batch['results'][0]['metadata_filepath']) as f:
+        assert f.read() == single_sidecar
+
+    # Indexes live in their own folder, not the export root, and only the newest are kept
+    batches_dir = tmp_path / EXPORT_PIPELINE['batch_index_dir']
+    assert all(os.path.dirname(index) == str(batches_dir) for index in indexes)
+    assert not list(tmp_path.glob('batch_index_*.json'))
+    assert sorted(path.name for path in batches_dir.iterdir()) == [os.path.basename(index) for index in indexes[1:]]
@@ -0,0 +1,30 @@
+"""
+Tests for gunicorn.conf.py: sync workers, and preload only when warmup is enabled.
+"""
+
+import os
+import runpy
+
+import pytest
+
+CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+@pytest.mark.parametrize('flag, preload', [('1', True), ('on', True), ('0', False), ('', False)])
+def test_preload_app_follows_fubo_preload(monkeypatch, flag, preload):
+    monkeypatch.setenv('FUBO_PRELOAD', flag)
+    assert runpy.run_path(CONF)['preload_app'] is preload
+
+
+def test_preload_app_defaults_to_lifecycle_config(monkeypatch):
+    from config import LIFECYCLE
+
+    monkeypatch.delenv('FUBO_PRELOAD', raising=False)
+    assert runpy.run_path(CONF)['preload_app'] is LIFECYCLE['preload']
+
+
+def test_uses_sync_workers(monkeypatch):
+    monkeypatch.setenv('FUBO_THREADS', '4')
+    settings = runpy.run_path(CONF)
+    assert 'threads' not in settings
+    assert 'worker_class' not in settings
@@ -0,0 +1,86 @@
+"""
+Tests for import_browser: image ids only resolve inside the allowed roots,
+and QA job progress is readable by every worker.
+"""
+
+import os
+import time
+
+import pytest
+from PIL import Image
+
+import qa_batch
+from config import EXPORT_CONFIG
+from import_browser import QAJobs, image_id, image_path, page_bounds
+
+
+@pytest.fixture
+def export_root(tmp_path, monkeypatch):
+    root = tmp_path / 'Exports'
+    root.mkdir()
+    monkeypatch.setitem(EXPORT_CONFIG, 'base_path', str(root))
+    monkeypatch.delenv('FUBO_IMPORT_ROOTS', raising=False)
+    return root
+
+
+def image_file(path, size=(64, 48)):
+    Image.new('RGB', size, (30, 90, 160)).save(path)
+    return path
+
+
+def test_image_ids_round_trip_inside_the_export_root(export_root):
+    path = image_file(export_root / 'photo.jpg')
+    assert image_path(image_id(str(path))) == os.path.realpath(path)
+
+
+def test_image_ids_outside_the_roots_are_refused(export_root, tmp_path):
+    outside = image_file(tmp_path / 'outside.jpg')
+    assert image_path(image_id(str(outside))) is None
+    # '..' and symlinks are resolved before the root check
+    assert image_path(image_id(str(export_root / '..' / 'outside.jpg'))) is None
+    os.symlink(outside, export_root / 'link.jpg')
+    assert image_path(image_id(str(export_root / 'link.jpg'))) is None
+
+
+@pytest.mark.parametrize('name', ['notes.txt', 'missing.jpg'])
+def test_non_images_and_missing_files_are_refused(export_root, name):
+    if name == 'notes.txt':
+        (export_root / name).write_text('not an image')
+    assert image_path(image_id(str(export_root / name))) is None
+
+
+@pytest.mark.parametrize('bad_id', ['!!!', 'cmVsYXRpdmUuanBn', '__8'])
+def test_malformed_ids_are_refused(export_root, bad_id):
+    assert image_path(bad_id) is None
+
+
+def test_page_bounds_are_clamped():
+    assert page_bounds(-5, 10_000) == (0, 500)
+    assert page_bounds(None, 0)[1] == 100
+
+
+def test_qa_job_progress_is_shared_through_the_jobs_dir(tmp_path, monkeypatch):
+    # Run the items in-process instead of on the process pool
+    monkeypatch.setattr(qa_batch, 'run_parallel', lambda func, items: (func(item) for item in items))
+    paths = [str(image_file(tmp_path / f'{index}.png', (160, 90))) for index in range(3)]
+
+    starting_worker = QAJobs(str(tmp_path / 'jobs'), max_age=3600)
+    polling_worker = QAJobs(str(tmp_path / 'jobs'), max_age=3600)
+    job_id = starting_worker.start(paths, aspect_ratio='16:9')
+
+    deadline = time.time() + 30
+    status = polling_worker.get(job_id)
+    while status['status'] == 'running' and time.time() < deadline:
+        time.sleep(0.05)
+        status = polling_worker.get(job_id)
+
+    assert status['status'] == 'done'
+    assert status['total'] == status['completed'] == 3
+    assert sorted(result['id'] for result in status['results']) == sorted(image_id(path) for path in paths)
+    assert polling_worker.get(job_id, since=2)['results'] == status['results'][2:]
+
+
+def test_unknown_and_malformed_job_ids(tmp_path):
+    jobs = QAJobs(str(tmp_path / 'jobs'), max_age=3600)
+    assert jobs.get('0' * 32) is None
+    assert jobs.get('../../etc/passwd') is None
@@ -0,0 +1,80 @@
+"""
+Tests for phash_index: chunked Hamming-radius queries return exactly the hashes in range.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from config import PHASH_CONFIG
+from phash_index import PHashIndex, compute_phash, hamming_distance, hash_chunks, to_signed, to_unsigned
+
+BASE = 0xF0E1_D2C3_B4A5_9687  # Top bit set: stored as a negative SQLite integer
+
+
+def flip_spread(value, distance):
+    """Flip `distance` bits dealt round-robin over the four chunks (the pigeonhole worst case)."""
+    for i in range(distance):
+        value ^= 1 << ((i % 4) * 16 + i // 4)
+    return value
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = PHashIndex(str(tmp_path / 'phash.sqlite3'))
+    for distance in range(13):
+        index.add(str(tmp_path / f'd{distance:02d}.jpg'), phash=flip_spread(BASE, distance),
+                  league='NFL' if distance % 2 else 'NBA', team='Team')
+    return index
+
+
+def distances(matches):
+    return [match['distance'] for match in matches]
+
+
+def test_chunks_and_signed_storage_round_trip():
+    assert hash_chunks(BASE) == [0xF0E1, 0xD2C3, 0xB4A5, 0x9687]
+    assert to_signed(BASE) < 0
+    assert to_unsigned(to_signed(BASE)) == BASE
+    assert hamming_distance(BASE, flip_spread(BASE, 9)) == 9
+
+
+@pytest.mark.parametrize('max_distance', [0, 3, 4, 7, 8, 11])
+def test_query_returns_every_hash_within_radius(index, max_distance):
+    matches = index.query(BASE, max_distance)
+    assert distances(matches) == list(range(max_distance + 1))
+
+
+def test_query_radius_is_capped(index):
+    limit = PHASH_CONFIG['max_distance_limit']
+    assert distances(index.query(BASE, limit + 5)) == list(range(limit + 1))
+
+
+def test_query_from_far_hash_measures_full_distance(index):
+    probe = flip_spread(BASE, 12)
+    matches = index.query(probe, 4)
+    assert distances(matches) == [0, 1, 2, 3, 4]
+    assert matches[0]['path'].endswith('d12.jpg')
+
+
+def test_query_filters_by_league(index):
+    matches = index.query(BASE, 6, league='NFL')
+    assert distances(matches) == [1, 3, 5]
+    assert {match['league'] for match in matches} == {'NFL'}
+
+
+def test_reindexing_a_path_replaces_its_hash(index, tmp_path):
+    index.add(str(tmp_path / 'd00.jpg'), phash=flip_spread(BASE, 12))
+    assert index.count() == 13
+    assert distances(index.query(BASE, 0)) == []
+
+
+def test_compute_phash_is_stable_under_resize():
+    rng = np.random.default_rng(5)
+    pixels = np.kron(rng.integers(0, 256, (12, 16)), np.ones((40, 40))).astype(np.uint8)
+    image = Image.fromarray(pixels, 'L').convert('RGB')
+
+    original = compute_phash(image)
+    resized = compute_phash(image.resize((320, 240), Image.Resampling.BILINEAR))
+    assert hamming_distance(original, resized) <= PHASH_CONFIG['default_max_distance']
+    assert hamming_distance(original, compute_phash(Image.fromarray(255 - pixels, 'L'))) > 20
@@ -0,0 +1,66 @@
+"""
+Tests for qa_technical: transparent cutouts are measured on their opaque pixels.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from qa_technical import analyze_image, check_clipping, detect_banding, detect_letterbox, run_technical_qa
+
+
+def player_cutout(width=400, height=600, seed=1):
+    """RGBA cutout: a textured ellipse on a fully transparent (RGB 0) surround."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    rgb = np.stack([xx * 255 // width, yy * 255 // height, (xx + yy) * 255 // (width + height)], axis=-1)
+    rgb = np.clip(rgb + rng.integers(-12, 13, rgb.shape), 0, 255).astype(np.uint8)
+    subject = ((xx - width / 2) / (width * 0.3)) ** 2 + ((yy - height / 2) / (height * 0.37)) ** 2 <= 1
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[subject, :3] = rgb[subject]
+    rgba[subject, 3] = 255
+    return Image.fromarray(rgba, 'RGBA'), Image.fromarray(rgb, 'RGB')
+
+
+def test_cutout_surround_is_not_letterbox_clipping_or_banding():
+    cutout, _ = player_cutout()
+
+    analysis = analyze_image(cutout)
+    assert detect_letterbox(cutout, analysis)['pass']
+    assert detect_letterbox(cutout, analysis)['bars'] == {'top': 0, 'bottom': 0, 'left': 0, 'right': 0}
+    assert check_clipping(cutout, analysis)['shadow_ratio'] == 0.0
+    assert detect_banding(cutout, analysis)['score'] == 100
+
+
+def test_cutout_scores_like_its_opaque_pixels():
+    cutout, opaque = player_cutout()
+
+    cutout_scores = {check['check']: check['score'] for check in run_technical_qa(cutout, '2:3')['checks']}
+    opaque_scores = {check['check']: check['score'] for check in run_technical_qa(opaque, '2:3')['checks']}
+    for name in ('color_saturation', 'banding', 'clipping', 'letterbox'):
+        assert cutout_scores[name] == opaque_scores[name], name
+
+
+def test_histograms_count_only_opaque_pixels():
+    cutout, _ = player_cutout()
+    opaque_pixels = int((np.asarray(cutout.getchannel('A')) >= 128).sum())
+
+    analysis = analyze_image(cutout)
+    assert analysis.luminance_hist.sum() == opaque_pixels
+    assert analysis.saturation_hist.sum() == opaque_pixels
+
+
+@pytest.mark.parametrize('sampling', ['full', 'tiles'])
+def test_opaque_black_bar_on_rgba_is_still_detected(sampling):
+    rng = np.random.default_rng(2)
+    rgba = np.zeros((2160, 3840, 4), dtype=np.uint8)
+    rgba[..., :3] = rng.integers(60, 200, (2160, 3840, 3))
+    rgba[..., 3] = 255
+    rgba[:200, :, :3] = 0                # opaque black bar
+    rgba[1200:, 3000:] = 0               # transparent corner
+
+    image = Image.fromarray(rgba, 'RGBA')
+    result = detect_letterbox(image, analyze_image(image, sampling))
+    assert not result['pass']
+    assert result['bars']['top'] >= 192
+    assert result['bars']['right'] == 0
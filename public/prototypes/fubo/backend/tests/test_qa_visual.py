@@ -0,0 +1,164 @@
+"""
+Tests for qa_visual: the streaming verdict parser reads fields as soon as they are complete.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import InvalidArgument, ResourceExhausted
+
+import qa_visual
+from qa_visual import VERDICT_SCHEMAS, StreamingVerdictParser, request_verdict, validate_verdict
+
+SPORTS_RESPONSE = ('```json\n{\n  "sport_detected": "basketball",\n  "appropriate": true,\n'
+                   '  "equipment_found": ["ball", "hoop"],\n  "issues": []\n}\n```')
+
+
+def ready_at(parser, text, chunk_size):
+    """Feed text in chunks; return how many characters were fed when the parser became ready."""
+    for start in range(0, len(text), chunk_size):
+        if parser.feed(text[start:start + chunk_size]):
+            return min(start + chunk_size, len(text))
+    return None
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 1000])
+def test_passing_verdict_is_ready_before_its_details(chunk_size):
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['sports_equipment'])
+    fed = ready_at(parser, SPORTS_RESPONSE, chunk_size)
+
+    verdict_end = SPORTS_RESPONSE.index(']') + 1
+    # The first chunk that completes equipment_found (not the end of the stream) makes it ready
+    assert fed == min(-(-verdict_end // chunk_size) * chunk_size, len(SPORTS_RESPONSE))
+    assert parser.fields['sport_detected'] == 'basketball'
+    assert parser.fields['appropriate'] is True
+    assert parser.fields['equipment_found'] == ['ball', 'hoop']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 1000])
+def test_failing_verdict_reads_on_until_its_issues(chunk_size):
+    response = SPORTS_RESPONSE.replace('true', 'false').replace('"issues": []', '"issues": ["hockey stick"]')
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['sports_equipment'])
+    fed = ready_at(parser, response, chunk_size)
+
+    issues_end = response.rindex('"]') + 2
+    assert fed == min(-(-issues_end // chunk_size) * chunk_size, len(response))
+    assert parser.fields['issues'] == ['hockey stick']
+
+
+def test_partial_values_are_not_read():
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['sports_equipment'])
+    assert not parser.feed('{"sport_detected": "basket')
+    assert 'sport_detected' not in parser.fields
+    assert not parser.feed('ball", "appropriate": tr')
+    assert parser.fields == {'sport_detected': 'basketball'}
+    assert not parser.feed('ue, "equipment_found": ["ball"')
+    assert parser.feed('], "issues": [')
+
+
+def test_number_at_end_of_buffer_waits_for_more_digits():
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['text_accuracy'])
+    parser.feed('{"text_visible": true, "team_name": "Lakers", "jersey_number": 2')
+    assert 'jersey_number' not in parser.fields
+    parser.feed('3')
+    assert 'jersey_number' not in parser.fields
+    parser.feed(', "correct": true, "number_valid": true')
+    assert parser.fields['jersey_number'] == 23
+    assert parser.ready()
+
+
+@pytest.mark.parametrize('check, text', [
+    ('text_accuracy', '{"text_visible": false, "team_name": nu'),
+    ('human_pose', '{"anatomy_correct": true, "issues": ["'),
+])
+def test_final_value_settles_verdict_early(check, text):
+    assert StreamingVerdictParser(VERDICT_SCHEMAS[check]).feed(text)
+
+
+def test_final_value_only_settles_on_its_own_value():
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['human_pose'])
+    assert not parser.feed('{"anatomy_correct": false, "issues": ["extra finger"')
+    assert parser.fields == {'anatomy_correct': False}
+    assert parser.feed(', "two left feet"]')
+    assert parser.fields['issues'] == ['extra finger', 'two left feet']
+
+
+def test_result_parses_the_complete_response():
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['sports_equipment'])
+    for char in SPORTS_RESPONSE:
+        parser.feed(char)
+    assert parser.result() == json.loads(SPORTS_RESPONSE.strip('`json\n'))
+
+
+def test_result_falls_back_to_streamed_fields():
+    parser = StreamingVerdictParser(VERDICT_SCHEMAS['context_validation'])
+    parser.feed('{"sport_detected": "hockey", "context_match": false, "explanation": "The rink is')
+    assert parser.result() == {'sport_detected': 'hockey', 'context_match': False}
+
+
+def test_validate_verdict_reports_missing_and_mistyped_fields():
+    schema = VERDICT_SCHEMAS['sports_equipment']
+    assert validate_verdict(schema, {'sport_detected': 'soccer', 'appropriate': False}) == []
+    assert validate_verdict(schema, {'sport_detected': 'soccer'}) == ["missing 'appropriate'"]
+    assert validate_verdict(schema, {'sport_detected': 3, 'appropriate': 'yes'}) == [
+        "'sport_detected' should be string", "'appropriate' should be boolean"]
+    assert validate_verdict(VERDICT_SCHEMAS['text_accuracy'], {'text_visible': True, 'jersey_number': None}) == []
+
+
+class FakeModel:
+    """Stands in for GenerativeModel: fails the first `failures` requests, then streams `response`."""
+
+    def __init__(self, failures, response):
+        self.failures = list(failures)
+        self.response = response
+        self.configs = []
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        self.configs.append(generation_config)
+        if self.failures:
+            raise self.failures.pop(0)
+        return [SimpleNamespace(text=self.response[i:i + 8]) for i in range(0, len(self.response), 8)]
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Route request_verdict to a FakeModel; returns a function that installs one."""
+    monkeypatch.setattr(qa_visual, '_JSON_MODE_SUPPORTED', None)
+    monkeypatch.setattr(qa_visual, 'configure_gemini', lambda api_key: None)
+    monkeypatch.setattr(qa_visual, 'payloads_for', lambda image: SimpleNamespace(part=lambda check: {}))
+
+    def install(failures=(), response='{"anatomy_correct": false, "issues": ["three arms"]}'):
+        model = FakeModel(failures, response)
+        monkeypatch.setattr(qa_visual, 'genai', SimpleNamespace(
+            GenerativeModel=lambda name: model,
+            GenerationConfig=lambda **config: config
+        ))
+        return model
+    return install
+
+
+def test_failing_pose_reports_the_models_issues(gemini):
+    gemini()
+    result = qa_visual.check_human_pose(None, 'key')
+    assert not result['pass']
+    assert result['pose_issues'] == ['three arms']
+
+
+def test_rejected_json_mode_is_disabled(gemini):
+    model = gemini([InvalidArgument('Unknown field for GenerationConfig: response_mime_type')])
+    assert request_verdict('human_pose', 'prompt', None, 'key')['issues'] == ['three arms']
+    assert model.configs == [{'response_mime_type': 'application/json'}, None]
+    assert qa_visual._JSON_MODE_SUPPORTED is False
+
+
+@pytest.mark.parametrize('error', [ResourceExhausted('quota'), TimeoutError('deadline'), InvalidArgument('bad image')])
+def test_unrelated_failures_leave_json_mode_alone(gemini, error):
+    model = gemini([error])
+    with pytest.raises(type(error)):
+        request_verdict('human_pose', 'prompt', None, 'key')
+    assert qa_visual._JSON_MODE_SUPPORTED is None
+
+    request_verdict('human_pose', 'prompt', None, 'key')
+    assert model.configs[-1] == {'response_mime_type': 'application/json'}
+    assert qa_visual._JSON_MODE_SUPPORTED is True
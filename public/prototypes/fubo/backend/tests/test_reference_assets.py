@@ -0,0 +1,57 @@
+"""
+Tests for reference_assets: lookups follow files changed by other workers, and caches stay bounded.
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from config import REFERENCE_CONFIG
+from reference_assets import ReferenceAssetManager
+
+
+def write_reference(path, color, size=(80, 60)):
+    Image.new('RGB', size, color).save(path, 'JPEG')
+    # Make the change visible to stat-based checks even within one mtime tick
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def candidates(style_name, sport=None):
+    return [('builtin', f'{style_name}.jpg')]
+
+
+@pytest.fixture
+def directory(tmp_path):
+    write_reference(tmp_path / 'comic-book.jpg', (200, 30, 30))
+    return tmp_path
+
+
+def test_other_workers_see_replaced_and_removed_files(directory):
+    worker = ReferenceAssetManager({'builtin': str(directory)}, resolver=candidates)
+    other = ReferenceAssetManager({'builtin': str(directory)}, resolver=candidates)
+    assert worker.for_style('comic-book').image.getpixel((0, 0))[0] > 150
+
+    # Another worker uploads a replacement, then a new style
+    write_reference(directory / 'comic-book.jpg', (30, 30, 200))
+    other.refresh('builtin', 'comic-book.jpg')
+    assert worker.for_style('comic-book').image.getpixel((0, 0))[2] > 150
+
+    write_reference(directory / 'risograph.jpg', (30, 200, 30))
+    assert worker.for_style('risograph') is not None
+
+    os.remove(directory / 'comic-book.jpg')
+    assert worker.for_style('comic-book') is None
+    assert worker.stats() == {'builtin': ['risograph.jpg']}
+
+
+def test_resolutions_for_arbitrary_style_names_are_bounded(directory, monkeypatch):
+    monkeypatch.setitem(REFERENCE_CONFIG, 'resolved_cache_size', 8)
+    manager = ReferenceAssetManager({'builtin': str(directory)}, resolver=candidates)
+
+    assert manager.for_style('comic-book') is not None
+    for number in range(50):
+        assert manager.for_style(f'no-such-style-{number}') is None
+    assert len(manager._resolved) == 8
+    assert manager.for_style('comic-book') is not None
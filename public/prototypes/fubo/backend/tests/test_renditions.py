@@ -0,0 +1,76 @@
+"""
+Tests for renditions: sizes and formats from one decode, and rendition files
+never taken for export masters.
+"""
+
+import io
+import json
+import sys
+
+import pytest
+from PIL import Image
+
+import export_manifest
+from config import EXPORT_MANIFEST
+from export_manager import ExportManager
+from renditions import rendition_filename, render_renditions, resolve_renditions
+
+MASTER = 'NFL_New_York_Giants_TeamNews_photo-real_20250101_120000_01JGJ5QK7E8Y3N4M2P6R9S0T1V.jpg'
+
+
+def test_sets_and_names_resolve_without_duplicates():
+    assert resolve_renditions(None) == []
+    assert resolve_renditions('cms') == ['wide', 'tall', 'preview']
+    assert resolve_renditions(['preview', 'wide', 'preview']) == ['preview', 'wide']
+    with pytest.raises(ValueError):
+        resolve_renditions(['poster'])
+
+
+def test_renditions_have_their_configured_sizes():
+    image = Image.new('RGB', (2400, 1600), (30, 90, 160))
+    renditions = {rendition['name']: rendition for rendition in render_renditions(image, ['wide', 'tall', 'preview_jpg'])}
+
+    assert (renditions['wide']['width'], renditions['wide']['height']) == (1920, 1080)
+    assert (renditions['tall']['width'], renditions['tall']['height']) == (1280, 1920)
+    preview = Image.open(io.BytesIO(renditions['preview_jpg']['data']))
+    assert (preview.format, preview.size) == ('JPEG', (480, 320))
+
+
+def test_previews_never_upscale():
+    [preview] = render_renditions(Image.new('RGB', (300, 200)), ['preview_jpg'])
+    assert (preview['width'], preview['height']) == (300, 200)
+
+
+def test_rendition_files_are_not_export_masters():
+    export_mgr = ExportManager()
+    rendition = rendition_filename(MASTER, {'name': 'preview_jpg', 'extension': 'jpg'})
+    assert rendition == MASTER[:-4] + '@preview_jpg.jpg'
+
+    assert export_mgr.parse_filename(MASTER)['export_id'] == '01JGJ5QK7E8Y3N4M2P6R9S0T1V'
+    assert export_mgr.parse_filename(rendition) is None
+
+
+@pytest.mark.parametrize('filename, team', [
+    ('NFL_New_York_Giants_TeamNews_photo-real_20250101_120000.jpg', 'New_York_Giants'),
+    ('NFL_New_York_Giants_TeamNews_photo-real_20250101_120000_final_v2.jpg', 'New_York_Giants'),
+    ('NFL_Dallas_Cowboys_Highlights_comic_20250101_120000_1.png', 'Dallas_Cowboys'),
+])
+def test_legacy_names_still_parse(filename, team):
+    parsed = ExportManager().parse_filename(filename)
+    assert (parsed['team'], parsed['date'], parsed['time']) == (team, '20250101', '120000')
+    assert parsed['export_id'] is None
+
+
+def test_manifest_backfill_skips_rendition_files(tmp_path, monkeypatch):
+    folder = tmp_path / 'NFL' / 'New_York_Giants'
+    folder.mkdir(parents=True)
+    Image.new('RGB', (64, 48)).save(folder / MASTER)
+    Image.new('RGB', (48, 32)).save(folder / (MASTER[:-4] + '@preview_jpg.jpg'))
+
+    monkeypatch.setattr(sys, 'argv', ['export_manifest.py', str(tmp_path)])
+    assert export_manifest.main() == 0
+
+    with open(tmp_path / EXPORT_MANIFEST['filename']) as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry['path'] for entry in entries] == [f'NFL/New_York_Giants/{MASTER}']
+    assert entries[0]['id'] == '01JGJ5QK7E8Y3N4M2P6R9S0T1V'
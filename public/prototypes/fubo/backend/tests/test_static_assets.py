@@ -0,0 +1,66 @@
+"""
+Tests for static_assets: immutable caching only for URLs that name the file's content.
+"""
+
+import gzip
+import os
+
+import pytest
+from flask import Flask
+
+from static_assets import StaticAssetCache
+
+APP = Flask(__name__)
+SCRIPT = b'function render() { return "fubo"; }\n' * 64
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / 'app_v6.js'
+    path.write_bytes(SCRIPT)
+    return str(path)
+
+
+def serve(cache, path, query='', headers=None):
+    with APP.test_request_context(f'/app_v6.js{query}', headers=headers or {}):
+        return cache.serve(path, 'application/javascript')
+
+
+def test_content_version_is_immutable(script):
+    cache = StaticAssetCache()
+    version = cache.get(script, 'application/javascript').version
+
+    response = serve(cache, script, f'?v={version}')
+    assert 'immutable' in response.headers['Cache-Control']
+
+
+@pytest.mark.parametrize('query', ['', '?v=47', '?v='])
+def test_other_urls_revalidate(script, query):
+    response = serve(StaticAssetCache(), script, query)
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+
+def test_edit_changes_version_and_old_url_revalidates(script):
+    cache = StaticAssetCache()
+    old_version = cache.get(script, 'application/javascript').version
+
+    with open(script, 'ab') as f:
+        f.write(b'render();\n')
+    stat = os.stat(script)
+    os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    response = serve(cache, script, f'?v={old_version}')
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert response.get_data().endswith(b'render();\n')
+    assert cache.get(script, 'application/javascript').version != old_version
+
+
+def test_conditional_and_compressed_responses(script):
+    cache = StaticAssetCache()
+    response = serve(cache, script, headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == SCRIPT
+
+    etag = response.headers['ETag']
+    repeat = serve(cache, script, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert repeat.status_code == 304
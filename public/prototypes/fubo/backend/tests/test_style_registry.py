@@ -0,0 +1,53 @@
+"""
+Tests for style_registry: shared custom styles, written only when they change.
+"""
+
+import os
+
+import pytest
+
+from style_registry import StyleRegistry, is_custom_style_id
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'custom_styles.json')
+
+
+@pytest.mark.parametrize('style_id, expected', [
+    ('custom-1', True), ('custom-summer-promo', True), ('comic-book', False),
+    ('', False), (None, False), (123, False), (['custom-1'], False),
+])
+def test_is_custom_style_id(style_id, expected):
+    assert is_custom_style_id(style_id) is expected
+
+
+def test_removing_a_missing_style_does_not_write(path):
+    registry = StyleRegistry(path)
+    assert not registry.remove('custom-unknown')
+    assert not os.path.exists(path)
+
+    registry.update('custom-promo', name='Promo', prompt='neon')
+    before = os.stat(path)
+    assert not registry.remove('custom-unknown')
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+def test_other_workers_see_updates_and_removals(path):
+    worker, other = StyleRegistry(path), StyleRegistry(path)
+    other.update('custom-promo', name='Promo', prompt='neon')
+    assert worker.prompt('custom-promo') == 'neon'
+
+    worker.update('custom-1', prompt='chalk')
+    assert other.remove('custom-promo')
+    assert other.remove('custom-1')  # Default slots are cleared, not removed
+
+    styles = worker.all()
+    assert 'custom-promo' not in styles
+    assert styles['custom-1']['prompt'] == ''
+
+
+def test_invalid_ids_are_rejected(path):
+    with pytest.raises(ValueError):
+        StyleRegistry(path).update(7, prompt='x')
@@ -0,0 +1,91 @@
+"""
+Tests for team_catalog: path-style aliases, and fuzzy matches that never pick another team.
+"""
+
+import json
+import os
+
+import pytest
+
+from team_catalog import TeamCatalog
+
+CSV = """sport,team_name,primary_color_hex,secondary_color_hex,tertiary_color_hex,text_color_hex
+# comment,,,,,
+NBA,Los Angeles Lakers,#552583,#FDB927,#000000,#FFFFFF
+NBA,Golden State Warriors,#1D428A,#FFC72C,#000000,#FFFFFF
+NFL,New York Giants,#0B2265,#A71930,#A5ACAF,#FFFFFF
+NFL,New York Jets,#125740,#FFFFFF,#000000,#FFFFFF
+NFL,Philadelphia Eagles,#004C54,#A5ACAF,#000000,#FFFFFF
+NFL,Atlanta Falcons,#A71930,#000000,#A5ACAF,#FFFFFF
+MLB,Boston Red Sox,#BD3039,#0C2340,#FFFFFF,#FFFFFF
+MLB,Chicago White Sox,#27251F,#C4CED4,#FFFFFF,#FFFFFF
+EPL,Arsenal,#EF0107,#063672,#FFFFFF,#FFFFFF
+"""
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / 'team_colors.csv'
+    path.write_text(CSV)
+    return TeamCatalog(str(path))
+
+
+def team(colors):
+    return colors['team_name'] if colors else None
+
+
+@pytest.mark.parametrize('league, name, expected', [
+    ('NFL', 'New York Giants', 'New York Giants'),
+    ('nfl', 'giants', 'New York Giants'),
+    ('nfl', 'new-york-giants', 'New York Giants'),
+    ('nfl', 'newyorkgiants', 'New York Giants'),
+    ('mlb', 'red_sox', 'Boston Red Sox'),
+    ('Premier League', 'arsenal', 'Arsenal'),
+    ('nba', 'golden-state-warriers', 'Golden State Warriors'),
+])
+def test_aliases_and_misspellings_resolve(catalog, league, name, expected):
+    assert team(catalog.colors(league, name)) == expected
+
+
+@pytest.mark.parametrize('league, name', [
+    ('nba', 'bakers'),        # close to 'lakers', but another name entirely
+    ('nfl', 'wings'),         # no team
+    ('nfl', 'new york'),      # shared by the Giants and the Jets
+    ('mlb', 'sox'),           # shared by both Sox
+    ('nba', 'giants'),        # a team of another league
+    ('xfl', 'giants'),        # unknown league
+])
+def test_no_single_team_means_no_colors(catalog, league, name):
+    assert catalog.colors(league, name) is None
+
+
+def test_teams_response_is_plain_json_shared_across_league_spellings(catalog):
+    body, etag = catalog.teams_response('nfl')
+    assert json.loads(body) == {'league': 'nfl', 'success': True, 'teams': catalog.teams('NFL')}
+    assert body == json.dumps(json.loads(body), sort_keys=True).encode('utf-8')
+
+    # One encoded team list per CSV league; only the echoed name differs
+    catalog.teams_response('NFL')
+    assert list(catalog._team_lists) == ['NFL']
+    assert catalog.teams_response('NFL')[1] != etag
+
+
+def test_unknown_league_has_no_teams(catalog):
+    body, _ = catalog.teams_response('XFL')
+    assert json.loads(body)['teams'] == []
+    assert catalog._team_lists == {}
+
+
+def test_reloads_when_the_csv_changes(catalog):
+    assert catalog.colors('nfl', 'eagles')['primary_color'] == '#004C54'
+    with open(catalog.csv_path, 'w') as f:
+        f.write(CSV.replace('#004C54', '#065E68'))
+    os.utime(catalog.csv_path, ns=(0, 1))
+    assert catalog.colors('nfl', 'eagles')['primary_color'] == '#065E68'
+
+
+def test_missing_csv_serves_nothing(tmp_path):
+    catalog = TeamCatalog(str(tmp_path / 'missing.csv'))
+    assert catalog.colors('nfl', 'giants') is None
+    assert catalog.teams('NFL') == []
+    assert not catalog.available
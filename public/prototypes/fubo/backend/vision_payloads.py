@@ -0,0 +1,133 @@
+"""
+Vision Payload Module
+Sizes and encodes the images sent to Gemini for classification calls:
+- One upload size/quality per call type (see VISION_PAYLOADS in config)
+- Jersey-region crop from the alpha mask for text accuracy
+- Each variant is encoded once and shared by every check that uses it
+"""
+
+import io
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+from config import VISION_PAYLOADS
+
+
+class VisionPayloads:
+    """
+    Encoded JPEG variants of one image, keyed by call type.
+
+    Call types with the same size, quality and crop share a single encode.
+    """
+
+    def __init__(self, image: Image.Image):
+        self.image = image
+        self._encoded: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def part(self, call_type: str) -> Dict:
+        """
+        Gemini content part for a call type.
+
+        Args:
+            call_type: VISION_PAYLOADS key (falls back to 'default')
+
+        Returns:
+            Dict with 'mime_type' and 'data' (JPEG bytes)
+        """
+        policy = VISION_PAYLOADS.get(call_type, VISION_PAYLOADS['default'])
+        key = (policy['max_size'], policy['quality'], policy.get('crop'))
+        with self._lock:
+            if key not in self._encoded:
+                self._encoded[key] = self._encode(*key)
+            encoded = self._encoded[key]
+        return {'mime_type': 'image/jpeg', 'data': encoded['data']}
+
+    def summary(self) -> Dict:
+        """Size and byte count of every variant encoded so far."""
+        return {
+            f"{max_size}px_q{quality}" + (f"_{crop}" if crop else ''): {
+                'size': list(encoded['size']),
+                'bytes': len(encoded['data'])
+            }
+            for (max_size, quality, crop), encoded in self._encoded.items()
+        }
+
+    def _encode(self, max_size: int, quality: int, crop: Optional[str]) -> Dict:
+        image = self.image
+        if crop == 'jersey':
+            box = jersey_box(image)
+            if box:
+                image = image.crop(box)
+
+        image = flatten(image)
+        if max(image.size) > max_size:
+            image = image.copy()
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality)
+        return {'data': buffer.getvalue(), 'size': image.size}
+
+
+def flatten(image: Image.Image) -> Image.Image:
+    """RGB copy of an image, with any transparency composited onto white."""
+    if image.mode == 'RGB':
+        return image
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def jersey_box(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Torso region of the subject, found from the alpha mask.
+
+    Uses VISION_PAYLOADS['text_accuracy'] 'jersey_top'/'jersey_bottom' as
+    fractions of the subject's bounding-box height.
+
+    Args:
+        image: PIL Image (only RGBA images have a mask to work from)
+
+    Returns:
+        (left, top, right, bottom) crop box, or None if there is no usable mask
+    """
+    if image.mode != 'RGBA':
+        return None
+
+    policy = VISION_PAYLOADS['text_accuracy']
+    alpha = image.getchannel('A')
+    # The bounding box only needs to be approximate; find it on a reduced mask
+    scale = max(1, max(alpha.size) // 256)
+    small = alpha.reduce(scale) if scale > 1 else alpha
+    mask = np.asarray(small) > 128
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if not rows.size or mask.all():
+        return None
+
+    left, right = cols[0] * scale, (cols[-1] + 1) * scale
+    top, bottom = rows[0] * scale, (rows[-1] + 1) * scale
+    height = bottom - top
+    pad = int((right - left) * policy['jersey_padding'])
+
+    box = (
+        max(0, left - pad),
+        max(0, top + int(height * policy['jersey_top'])),
+        min(image.width, right + pad),
+        min(image.height, top + int(height * policy['jersey_bottom']))
+    )
+    if box[2] - box[0] < 16 or box[3] - box[1] < 16:
+        return None
+    return box
+
+
+def payloads_for(image: Union[Image.Image, VisionPayloads]) -> VisionPayloads:
+    """Wrap a PIL image (or pass through existing payloads)."""
+    return image if isinstance(image, VisionPayloads) else VisionPayloads(image)